@@ -35,6 +35,8 @@ from src.pipelines.utils import (
     copy_pdfs_to_data_dir,
     load_step_module,
 )
+from src.pipelines.utils.executor import DagExecutor
+from src.pipelines.utils.step_cache import StepCache, run_cached_step
 
 
 def setup_test_mcp_configs():
@@ -139,7 +141,8 @@ def run_pipeline(config_path: str, input_dir: Optional[str] = None,
         print("="*60)
     
     print(f"Config: {config_path}")
-    print(f"Mode: {config.get('mode', 'per_doi')}")
+    mode = config.get("mode", "per_doi")
+    print(f"Mode: {mode}")
     print(f"Steps: {', '.join(steps)}")
     print(f"Input: {input_dir}")
     print("="*60 + "\n")
@@ -178,6 +181,23 @@ def run_pipeline(config_path: str, input_dir: Optional[str] = None,
         copy_pdfs_to_data_dir(doi, doi_hash, input_dir, data_dir)
     print()
     
+    def build_step_config(step_name: str) -> dict:
+        step_config = {
+            "data_dir": data_dir,
+            **config.get("step_configs", {}).get(step_name, {})
+        }
+        
+        # If in test mode, add test MCP config to step config
+        if use_mcp and test_mcp_config_name:
+            step_config["test_mcp_config"] = test_mcp_config_name
+        
+        # Pass skip extraction flags to main_ontology_extractions step
+        if step_name == "main_ontology_extractions":
+            step_config["skip_iter2_extraction"] = skip_iter2_extraction
+            step_config["skip_iter3_extraction"] = skip_iter3_extraction
+            step_config["skip_iter4_extraction"] = skip_iter4_extraction
+        return step_config
+    
     # Execute pipeline steps
     # Note: steps variable is already defined and filtered above if iter1=True
     overall_success = True
@@ -186,66 +206,73 @@ def run_pipeline(config_path: str, input_dir: Optional[str] = None,
     with tqdm(total=len(doi_hashes), desc="Processing hashes", unit="hash", 
               bar_format='{l_bar}{bar}| {n_fmt}/{total_fmt} [{elapsed}<{remaining}]') as pbar:
         
-        for doi_hash in doi_hashes:
-            # Update progress bar description with current hash
-            pbar.set_description(f"Processing {doi_hash}")
-            
-            print(f"\n{'='*60}")
-            print(f"Processing: {doi_hash}")
-            print(f"{'='*60}")
-            
-            # Ensure DOI hash folder exists
-            doi_folder = os.path.join(data_dir, doi_hash)
-            os.makedirs(doi_folder, exist_ok=True)
-            print(f"[OK] DOI folder ready: {doi_folder}")
-            
-            for step_name in steps:
-                print(f"\n📍 Step: {step_name}")
+        if mode == "dag":
+            # Many DOIs in flight; steps scheduled by dependency (see src/pipelines/utils/executor.py)
+            try:
+                executor = DagExecutor(
+                    steps,
+                    build_step_config,
+                    dependencies=config.get("step_dependencies"),
+                    executor_config=config.get("executor", {}),
+                    cache_config=config.get("step_cache"),
+                    data_dir=data_dir,
+                )
+            except ValueError as e:
+                print(f"[FAIL] Invalid pipeline config: {e}")
+                return False
+            pbar.set_description("Processing hashes (dag)")
+            overall_success = executor.run(doi_hashes, progress=pbar)
+        else:
+            # Content-addressed step outputs (see src/pipelines/utils/step_cache.py)
+            step_cache = StepCache.from_config(config.get("step_cache"), data_dir)
+            for doi_hash in doi_hashes:
+                # Update progress bar description with current hash
+                pbar.set_description(f"Processing {doi_hash}")
                 
-                # Load step module
-                step_module = load_step_module(step_name)
-                if not step_module:
-                    print(f"[FAIL] Skipping {doi_hash} due to missing step module")
-                    overall_success = False
-                    break
+                print(f"\n{'='*60}")
+                print(f"Processing: {doi_hash}")
+                print(f"{'='*60}")
                 
-                # Run step
-                try:
-                    step_config = {
-                        "data_dir": data_dir,
-                        **config.get("step_configs", {}).get(step_name, {})
-                    }
-                    
-                    # If in test mode, add test MCP config to step config
-                    if use_mcp and test_mcp_config_name:
-                        step_config["test_mcp_config"] = test_mcp_config_name
-                    
-                    # Pass skip extraction flags to main_ontology_extractions step
-                    if step_name == "main_ontology_extractions":
-                        step_config["skip_iter2_extraction"] = skip_iter2_extraction
-                        step_config["skip_iter3_extraction"] = skip_iter3_extraction
-                        step_config["skip_iter4_extraction"] = skip_iter4_extraction
-                    
-                    success = step_module.run_step(doi_hash, step_config)
+                # Ensure DOI hash folder exists
+                doi_folder = os.path.join(data_dir, doi_hash)
+                os.makedirs(doi_folder, exist_ok=True)
+                print(f"[OK] DOI folder ready: {doi_folder}")
+                
+                for step_index, step_name in enumerate(steps):
+                    print(f"\n📍 Step: {step_name}")
                     
-                    if not success:
-                        print(f"[FAIL] Step '{step_name}' failed for {doi_hash}")
+                    # Load step module
+                    step_module = load_step_module(step_name)
+                    if not step_module:
+                        print(f"[FAIL] Skipping {doi_hash} due to missing step module")
                         overall_success = False
                         break
+                    
+                    # Run step
+                    try:
+                        step_config = build_step_config(step_name)
+                        success = run_cached_step(
+                            step_name, step_module, doi_hash, step_config, step_cache, upstream=steps[:step_index]
+                        )
                         
-                except Exception as e:
-                    print(f"[ERROR] Step '{step_name}' raised exception: {e}")
-                    import traceback
-                    traceback.print_exc()
-                    overall_success = False
-                    break
-            
-            print(f"\n{'='*60}")
-            print(f"Completed: {doi_hash}")
-            print(f"{'='*60}")
-            
-            # Update progress bar
-            pbar.update(1)
+                        if not success:
+                            print(f"[FAIL] Step '{step_name}' failed for {doi_hash}")
+                            overall_success = False
+                            break
+                            
+                    except Exception as e:
+                        print(f"[ERROR] Step '{step_name}' raised exception: {e}")
+                        import traceback
+                        traceback.print_exc()
+                        overall_success = False
+                        break
+                
+                print(f"\n{'='*60}")
+                print(f"Completed: {doi_hash}")
+                print(f"{'='*60}")
+                
+                # Update progress bar
+                pbar.update(1)
     
     # Summary
     print(f"\n{'='*60}")
@@ -22,6 +22,7 @@ from mini_marie.kg_server.kg_operations import (
     get_synthesis_temperatures,
     get_synthesis_durations,
     get_synthesis_products,
+    get_synthesis_overview,
     # MOP queries
     get_mop_building_units,
     # Corpus queries
@@ -43,6 +44,7 @@ __all__ = [
     "get_synthesis_temperatures",
     "get_synthesis_durations",
     "get_synthesis_products",
+    "get_synthesis_overview",
     "get_mop_building_units",
     "get_common_chemicals",
 ]
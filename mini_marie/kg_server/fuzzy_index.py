@@ -0,0 +1,446 @@
+"""
+Trigram-indexed fuzzy label lookup for the MOPs KG tools.
+
+`fuzzy_lookup_*` used to score `difflib.SequenceMatcher(None, query, label)`
+against every label of a category, which grows linearly with the KG. Each
+category is now a `FuzzyLabelIndex`:
+
+- labels and their lowercased form (what the ratio is computed on);
+- a character-trigram inverted index over the lowercased labels (padded, so
+  short labels still index), with per-label trigram counts;
+- per-label character counts, giving difflib's quick_ratio (an upper bound of
+  ratio) for all labels in a few vector operations.
+
+A query keeps the labels whose bound reaches `cutoff`. Up to FULL_SCAN_LIMIT of
+them are simply scored. Otherwise the top-K by trigram Dice overlap are scored
+first; the rest are then visited best bound first and scored only while their
+bound reaches the current limit-th best score. No label that could enter (or tie
+into) the result is skipped, so results, scores and tie order are exactly those
+of the full scan (`full_scan_rank`). Benchmark against it with:
+
+    python -m mini_marie.kg_server.fuzzy_index --bench 100000
+
+On disk (`kg_label_index.bin`) the categories are stored as:
+
+    b"MKLI" | uint32 header length | JSON header (meta, per-category sizes)
+    per category: labels (UTF-8, NUL-separated) | trigrams (UTF-8, NUL-separated)
+                  | uint32 label trigram counts | uint32 posting offsets | uint32 postings
+                  | characters (UTF-8, NUL-separated) | uint8 counts (character x label)
+"""
+
+import argparse
+import bisect
+import difflib
+import heapq
+import json
+import os
+import random
+import string
+import struct
+import sys
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+INDEX_VERSION = 1
+MAGIC = b"MKLI"
+
+# Indexes up to this many labels are scored in full (no pruning)
+FULL_SCAN_LIMIT = 2000
+# Otherwise at least this many candidates (or 50 x limit) are scored
+MIN_CANDIDATES = 500
+
+# Slack for float rounding in the upper bound, so it never drops a label the
+# ratio itself would accept
+_EPS = 1e-9
+
+
+def trigrams(text: str) -> set:
+    """Trigrams of an already lowercased string, padded so short strings still index."""
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def full_scan_rank(query: str, candidates: List[str], limit: int = 10, cutoff: float = 0.6) -> List[Dict[str, Any]]:
+    """
+    Rank candidates by similarity using stdlib difflib (no extra deps).
+    Returns list of {match, score}.
+    """
+    q = (query or "").strip()
+    if not q:
+        return []
+
+    scored: List[Tuple[float, str]] = []
+    for c in candidates:
+        # SequenceMatcher is robust and fast enough for a few thousand candidates
+        s = difflib.SequenceMatcher(None, q.lower(), (c or "").lower()).ratio()
+        if s >= cutoff:
+            scored.append((s, c))
+
+    scored.sort(key=lambda x: x[0], reverse=True)
+    out: List[Dict[str, Any]] = []
+    for s, c in scored[:limit]:
+        out.append({"match": c, "score": round(s, 4)})
+    return out
+
+
+class FuzzyLabelIndex:
+    """Fuzzy lookup structures over one list of labels (in their original order)."""
+
+    def __init__(self, labels: List[str], arrays: Optional[Dict[str, Any]] = None):
+        self.labels = list(labels)
+        self.lowered = [label.lower() for label in self.labels]
+        self.lengths = np.array([len(low) for low in self.lowered], dtype=np.int64)
+        if arrays is None:
+            arrays = self._build(self.lowered)
+        # trigram -> (start, end) slice of postings
+        self.grams: Dict[str, Tuple[int, int]] = arrays["grams"]
+        self.gram_counts: np.ndarray = arrays["gram_counts"]
+        self.postings: np.ndarray = arrays["postings"]
+        # character -> row of char_counts (occurrences per label, capped at 255)
+        self.alphabet: Dict[str, int] = arrays["alphabet"]
+        self.char_counts: np.ndarray = arrays["char_counts"]
+
+    @staticmethod
+    def _build(lowered: List[str]) -> Dict[str, Any]:
+        lists: Dict[str, List[int]] = defaultdict(list)
+        gram_counts = np.zeros(len(lowered), dtype=np.uint32)
+        chars: Dict[str, Dict[int, int]] = defaultdict(dict)
+        for i, low in enumerate(lowered):
+            grams = trigrams(low)
+            gram_counts[i] = len(grams)
+            for gram in grams:
+                lists[gram].append(i)
+            for ch in low:
+                row = chars[ch]
+                row[i] = row.get(i, 0) + 1
+
+        grams_out: Dict[str, Tuple[int, int]] = {}
+        postings = np.zeros(sum(len(v) for v in lists.values()), dtype=np.uint32)
+        pos = 0
+        for gram in sorted(lists):
+            ids = lists[gram]
+            postings[pos:pos + len(ids)] = ids
+            grams_out[gram] = (pos, pos + len(ids))
+            pos += len(ids)
+
+        alphabet = {ch: k for k, ch in enumerate(sorted(chars))}
+        char_counts = np.zeros((len(alphabet), len(lowered)), dtype=np.uint8)
+        for ch, k in alphabet.items():
+            row = chars[ch]
+            char_counts[k, list(row)] = np.minimum(list(row.values()), 255)
+        return {
+            "grams": grams_out,
+            "gram_counts": gram_counts,
+            "postings": postings,
+            "alphabet": alphabet,
+            "char_counts": char_counts,
+        }
+
+    def __len__(self) -> int:
+        return len(self.labels)
+
+    def updated(self, added: Iterable[str] = (), removed: Iterable[str] = ()) -> "FuzzyLabelIndex":
+        """
+        New index without `removed` and with `added` labels, built from this one's
+        arrays (only the changed labels are tokenized). Added labels are inserted in
+        sorted position, so a sorted label list stays sorted.
+        """
+        removed = set(removed)
+        present = set(self.labels)
+        added = sorted({label for label in added if label not in present or label in removed})
+        if not added and not (removed & present):
+            return self
+
+        keep = np.array([label not in removed for label in self.labels], dtype=bool)
+        labels = [label for label, k in zip(self.labels, keep) if k]
+        for label in added:
+            bisect.insort(labels, label)
+        slot = {label: i for i, label in enumerate(labels)}
+        remap = np.full(len(self.labels), -1, dtype=np.int64)
+        kept = np.flatnonzero(keep)
+        remap[kept] = [slot[self.labels[i]] for i in kept.tolist()]
+        new_slots = [slot[label] for label in added]
+        lowered = [label.lower() for label in added]
+
+        # Postings as sorted gram id * n + slot keys: kept ones are remapped (still in
+        # order, as kept labels keep their relative order), added ones merged in
+        n = len(labels) + 1
+        grams = sorted(self.grams, key=lambda g: self.grams[g][0])
+        gram_id = {g: k for k, g in enumerate(grams)}
+        spans = np.array([self.grams[g][1] - self.grams[g][0] for g in grams], dtype=np.int64)
+        old_slot = remap[self.postings.astype(np.int64)]
+        live = old_slot >= 0
+        keys = np.repeat(np.arange(len(grams), dtype=np.int64), spans)[live] * n + old_slot[live]
+        gram_counts = np.zeros(len(labels), dtype=np.uint32)
+        gram_counts[remap[kept]] = self.gram_counts[kept]
+        extra: List[int] = []
+        for s, low in zip(new_slots, lowered):
+            label_grams = trigrams(low)
+            gram_counts[s] = len(label_grams)
+            for g in label_grams:
+                if g not in gram_id:
+                    gram_id[g] = len(grams)
+                    grams.append(g)
+                extra.append(gram_id[g] * n + s)
+        extra_keys = np.sort(np.array(extra, dtype=np.int64))
+        keys = np.insert(keys, np.searchsorted(keys, extra_keys), extra_keys)
+        postings = (keys % n).astype(np.uint32)
+        counts = np.bincount(keys // n, minlength=len(grams))
+        ends = np.cumsum(counts)
+        grams_out = {
+            g: (int(ends[k] - counts[k]), int(ends[k])) for k, g in enumerate(grams) if counts[k]
+        }
+
+        alphabet = dict(self.alphabet)
+        for low in lowered:
+            for ch in low:
+                alphabet.setdefault(ch, len(alphabet))
+        char_counts = np.zeros((len(alphabet), len(labels)), dtype=np.uint8)
+        char_counts[:len(self.alphabet), remap[kept]] = self.char_counts[:, kept]
+        for s, low in zip(new_slots, lowered):
+            for ch, n in Counter(low).items():
+                char_counts[alphabet[ch], s] = min(n, 255)
+
+        return FuzzyLabelIndex(labels, {
+            "grams": grams_out,
+            "gram_counts": gram_counts,
+            "postings": postings,
+            "alphabet": alphabet,
+            "char_counts": char_counts,
+        })
+
+    def upper_bounds(self, query: str) -> np.ndarray:
+        """
+        Per-label upper bound of ratio for the lowercased `query`: difflib's
+        quick_ratio, 2 * |shared character multiset| / (len(query) + len(label)).
+        """
+        shared = np.zeros(len(self.labels), dtype=np.int64)
+        for ch, n in Counter(query).items():
+            k = self.alphabet.get(ch)
+            if k is not None:
+                shared += np.minimum(self.char_counts[k], n)
+        total = len(query) + self.lengths
+        return np.divide(2.0 * shared, total, out=np.zeros(len(self.labels)), where=total > 0)
+
+    def candidates(self, query: str, eligible: np.ndarray, keep: int) -> np.ndarray:
+        """Up to `keep` of the `eligible` slots sharing the most trigrams (Dice) with `query`."""
+        query_grams = trigrams(query)
+        shared = np.zeros(len(self.labels), dtype=np.int64)
+        for gram in query_grams:
+            span = self.grams.get(gram)
+            if span is not None:
+                shared[self.postings[span[0]:span[1]]] += 1
+        dice = 2.0 * shared[eligible] / (len(query_grams) + self.gram_counts[eligible])
+        if len(eligible) <= keep:
+            return eligible
+        top = np.argpartition(-dice, keep - 1)[:keep]
+        return np.sort(eligible[top])
+
+    def rank(self, query: str, limit: int = 10, cutoff: float = 0.6) -> List[Dict[str, Any]]:
+        """Best `limit` labels with ratio >= `cutoff`, as [{match, score}], same as `full_scan_rank`."""
+        q = (query or "").strip().lower()
+        if not q or limit <= 0 or not self.labels:
+            return []
+        bounds = self.upper_bounds(q)
+        eligible = np.flatnonzero(bounds >= cutoff - _EPS)
+        matcher = difflib.SequenceMatcher(None, q, "")
+        # (score, slot) of every label scored at or above cutoff
+        scored: List[Tuple[float, int]] = []
+        best: List[float] = []  # min-heap of the best `limit` scores
+
+        def score(i: int) -> None:
+            # Same argument order as the full scan: ratio is not symmetric
+            matcher.set_seq2(self.lowered[i])
+            s = matcher.ratio()
+            if s >= cutoff:
+                scored.append((s, i))
+                if len(best) < limit:
+                    heapq.heappush(best, s)
+                elif s > best[0]:
+                    heapq.heapreplace(best, s)
+
+        if len(eligible) <= FULL_SCAN_LIMIT:
+            for i in eligible.tolist():
+                score(i)
+        else:
+            # Likely matches first, so the bar for the rest rises quickly
+            keep = max(MIN_CANDIDATES, 50 * limit)
+            pre = self.candidates(q, eligible, keep)
+            for i in pre.tolist():
+                score(i)
+            rest = np.setdiff1d(eligible, pre, assume_unique=True)
+            # Every label whose bound reaches the current limit-th best score could
+            # still enter (or tie into) the result, so it is scored, best bound first
+            for i in rest[np.argsort(-bounds[rest], kind="stable")].tolist():
+                bar = best[0] if len(best) == limit else cutoff
+                if bounds[i] < bar - _EPS:
+                    break
+                score(i)
+
+        scored.sort(key=lambda x: (-x[0], x[1]))
+        return [{"match": self.labels[i], "score": round(s, 4)} for s, i in scored[:limit]]
+
+    # ── binary form ──
+    def _blobs(self) -> List[bytes]:
+        grams = sorted(self.grams, key=lambda g: self.grams[g][0])
+        offsets = np.array([self.grams[g][0] for g in grams] + [len(self.postings)], dtype=np.uint32)
+        alphabet = sorted(self.alphabet, key=self.alphabet.get)
+        return [
+            "\0".join(self.labels).encode("utf-8"),
+            "\0".join(grams).encode("utf-8"),
+            np.ascontiguousarray(self.gram_counts, dtype=np.uint32).tobytes(),
+            offsets.tobytes(),
+            np.ascontiguousarray(self.postings, dtype=np.uint32).tobytes(),
+            "\0".join(alphabet).encode("utf-8"),
+            np.ascontiguousarray(self.char_counts, dtype=np.uint8).tobytes(),
+        ]
+
+    @classmethod
+    def _from_blobs(cls, count: int, blobs: List[bytes]) -> "FuzzyLabelIndex":
+        labels = blobs[0].decode("utf-8").split("\0") if count else []
+        grams = blobs[1].decode("utf-8").split("\0") if blobs[1] else []
+        gram_counts = np.frombuffer(blobs[2], dtype=np.uint32)
+        offsets = np.frombuffer(blobs[3], dtype=np.uint32)
+        postings = np.frombuffer(blobs[4], dtype=np.uint32)
+        alphabet = blobs[5].decode("utf-8").split("\0") if blobs[5] else []
+        char_counts = np.frombuffer(blobs[6], dtype=np.uint8).reshape(len(alphabet), count)
+        if len(labels) != count or len(gram_counts) != count or len(offsets) != len(grams) + 1:
+            raise ValueError("Corrupt label index category")
+        bounds = offsets.tolist()
+        return cls(labels, {
+            "grams": {g: (bounds[k], bounds[k + 1]) for k, g in enumerate(grams)},
+            "gram_counts": gram_counts,
+            "postings": postings,
+            "alphabet": {ch: k for k, ch in enumerate(alphabet)},
+            "char_counts": char_counts,
+        })
+
+
+def save_label_index(path: Path, meta: Dict[str, Any], categories: Dict[str, FuzzyLabelIndex]) -> None:
+    """Write `categories` and `meta` to `path` in the binary form (atomically)."""
+    header: Dict[str, Any] = {
+        "version": INDEX_VERSION,
+        "byteorder": sys.byteorder,
+        "meta": meta,
+        "categories": [],
+    }
+    body: List[bytes] = []
+    for name, index in categories.items():
+        blobs = index._blobs()
+        header["categories"].append({"name": name, "count": len(index), "sizes": [len(b) for b in blobs]})
+        body.extend(blobs)
+    head = json.dumps(header, ensure_ascii=False).encode("utf-8")
+
+    path = Path(path)
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        f.write(MAGIC + struct.pack("<I", len(head)) + head)
+        for blob in body:
+            f.write(blob)
+    os.replace(tmp, path)
+
+
+def load_label_index(path: Path) -> Optional[Tuple[Dict[str, Any], Dict[str, FuzzyLabelIndex]]]:
+    """(meta, categories) from a file written by `save_label_index`; None if missing or unreadable."""
+    try:
+        data = Path(path).read_bytes()
+        if data[:4] != MAGIC:
+            return None
+        (head_len,) = struct.unpack("<I", data[4:8])
+        header = json.loads(data[8:8 + head_len].decode("utf-8"))
+        if header.get("version") != INDEX_VERSION or header.get("byteorder") != sys.byteorder:
+            return None
+        pos = 8 + head_len
+        categories: Dict[str, FuzzyLabelIndex] = {}
+        for cat in header["categories"]:
+            blobs = []
+            for size in cat["sizes"]:
+                blobs.append(data[pos:pos + size])
+                pos += size
+            categories[cat["name"]] = FuzzyLabelIndex._from_blobs(int(cat["count"]), blobs)
+        if pos != len(data):
+            return None
+        return header.get("meta") or {}, categories
+    except (OSError, ValueError, KeyError, TypeError, struct.error):
+        return None
+
+
+# ── benchmark ──
+def synthetic_labels(n: int, seed: int = 0) -> List[str]:
+    """`n` distinct MOP/synthesis-like labels (e.g. 'VMOP-17', 'Cu24(BDC)24 cage 3')."""
+    rng = random.Random(seed)
+    prefixes = ["VMOP", "UMC", "IRMOP", "CIAC", "MOP", "ZrT", "Cage", "PCC", "NKU", "TIF", "Cu", "Zr", "Rh", "Mo"]
+    words = ["cage", "synthesis", "procedure", "tetrahedron", "octahedron", "cuboctahedron", "ligand", "BDC", "bpy"]
+    out: Dict[str, None] = {}
+    while len(out) < n:
+        parts = [rng.choice(prefixes) + "-" + str(rng.randint(1, 999))]
+        for _ in range(rng.randint(0, 3)):
+            parts.append(rng.choice(words) if rng.random() < 0.6 else "".join(rng.choices(string.ascii_letters, k=rng.randint(2, 6))))
+        out[" ".join(parts)] = None
+    return list(out)
+
+
+def _typo(label: str, rng: random.Random) -> str:
+    chars = list(label)
+    for _ in range(rng.randint(0, 2)):
+        k = rng.randrange(len(chars))
+        op = rng.random()
+        if op < 0.4:
+            chars[k] = rng.choice(string.ascii_lowercase)
+        elif op < 0.7 and len(chars) > 3:
+            del chars[k]
+        else:
+            chars.insert(k, rng.choice(string.ascii_lowercase))
+    return "".join(chars)
+
+
+def benchmark(n: int = 100_000, queries: int = 50, limit: int = 10, cutoff: float = 0.6, seed: int = 0) -> Dict[str, Any]:
+    """Time index build and lookups against the full scan on `n` synthetic labels; report recall."""
+    rng = random.Random(seed)
+    labels = synthetic_labels(n, seed)
+    t0 = time.perf_counter()
+    index = FuzzyLabelIndex(labels)
+    build_s = time.perf_counter() - t0
+    qs = [_typo(rng.choice(labels), rng) for _ in range(queries)]
+
+    full_s = indexed_s = 0.0
+    exact = matched = expected = 0
+    for q in qs:
+        t0 = time.perf_counter()
+        want = full_scan_rank(q, labels, limit=limit, cutoff=cutoff)
+        full_s += time.perf_counter() - t0
+        t0 = time.perf_counter()
+        got = index.rank(q, limit=limit, cutoff=cutoff)
+        indexed_s += time.perf_counter() - t0
+        exact += got == want
+        want_set = {(r["match"], r["score"]) for r in want}
+        matched += len(want_set & {(r["match"], r["score"]) for r in got})
+        expected += len(want_set)
+    return {
+        "labels": n,
+        "queries": queries,
+        "build_s": round(build_s, 3),
+        "full_scan_ms_per_query": round(1000 * full_s / queries, 2),
+        "indexed_ms_per_query": round(1000 * indexed_s / queries, 2),
+        "speedup": round(full_s / indexed_s, 1) if indexed_s else None,
+        "identical_results": f"{exact}/{queries}",
+        "recall": round(matched / expected, 4) if expected else 1.0,
+    }
+
+
+def main(argv: Optional[Iterable[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the trigram fuzzy label index against the full difflib scan.")
+    parser.add_argument("--bench", type=int, default=100_000, metavar="N", help="Number of synthetic labels (default: 100000)")
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--cutoff", type=float, default=0.6)
+    args = parser.parse_args(list(argv) if argv is not None else None)
+    print(json.dumps(benchmark(args.bench, args.queries, args.limit, args.cutoff), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -6,13 +6,21 @@ All functions are standalone and can be tested independently.
 """
 
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Literal
-from rdflib import Graph, Namespace
+from typing import Iterable, List, Dict, Any, Optional, Literal
+from rdflib import RDF, Dataset, Graph, Namespace, URIRef
+from rdflib import Literal as RDFLiteral
+from rdflib.plugins.sparql import prepareQuery
 import logging
-import json
+import os
 import threading
 import time
-import difflib
+
+from mini_marie.kg_server.fuzzy_index import FuzzyLabelIndex, load_label_index, save_label_index
+from mini_marie.kg_server.kg_snapshot import build_snapshot, load_snapshot
+from mini_marie.kg_server.query_cache import QueryResultCache
+from mini_marie.kg_server.rw_lock import ReadWriteLock
+from mini_marie.kg_server.synthesis_views import GROUP_VAR, SynthesisViews, query_signature
+from src.utils.ttl_loader import parse_ttl_files
 
 # Define namespaces
 ONTOMOPS = Namespace("https://www.theworldavatar.com/kg/ontomops/")
@@ -25,55 +33,139 @@ logger = logging.getLogger(__name__)
 
 # Global knowledge graph (loaded once)
 _kg = None  # type: Optional[Graph]
-
-# Local fuzzy index cache (built from KG, persisted to disk under /data which is gitignored)
+# Bumped whenever _kg is (re)loaded; part of every result-cache key
+_kg_version = 0
+# Serializes the first load; readers only ever see a fully loaded graph
+_kg_lock = threading.Lock()
+# Queries hold the read side; refresh_kg holds the write side while it swaps a paper
+_kg_rw = ReadWriteLock()
+# Serializes refresh_kg
+_kg_refresh_lock = threading.Lock()
+# Paper hash -> [mtime_ns, size] of the merged TTL each loaded paper graph came from
+_kg_sources: Dict[str, List[int]] = {}
+# Snapshot _kg is served from (None once the KG is a mutable Dataset)
+_kg_snapshot = None
+_kg_reloads = 0
+
+# Named graph of each paper: <PAPER_GRAPH_PREFIX><hash>
+PAPER_GRAPH_PREFIX = "urn:mops-kg:paper:"
+
+# Prepared queries by (query id, query text) and their cached results
+_prepared_queries: Dict[tuple, Any] = {}
+_prepared_lock = threading.Lock()
+_result_cache = QueryResultCache(
+    max_bytes=int(float(os.environ.get("MARIE_QUERY_CACHE_MB", "64")) * 1024 * 1024)
+)
+
+# Per-synthesis materialized views (see synthesis_views.py), built after KG load
+_synthesis_views = None  # type: Optional[SynthesisViews]
+_synthesis_views_lock = threading.Lock()
+# Set on a thread while the view queries are being collected
+_view_capture = threading.local()
+
+# Local fuzzy index cache (built from KG, persisted to disk under /data which is gitignored).
+# Published by swapping the reference; the lock only serializes (re)builds, readers never take it.
 _label_index: Optional[Dict[str, Any]] = None
 _label_index_lock = threading.Lock()
 
-def load_knowledge_graph(data_path: str) -> Graph:
+def paper_graph_id(paper_hash: str) -> URIRef:
+    """Identifier of the named graph holding one paper's merged TTL."""
+    return URIRef(PAPER_GRAPH_PREFIX + paper_hash)
+
+
+def _add_paper(dataset: Dataset, paper_hash: str, triples: Iterable[tuple], namespaces: Iterable[tuple]) -> None:
+    """Add a parsed paper to `dataset` as its named graph (replacing nothing)."""
+    context = dataset.graph(paper_graph_id(paper_hash))
+    dataset.addN((s, p, o, context) for s, p, o in triples)
+    for prefix, namespace in namespaces:
+        dataset.bind(prefix, namespace, override=False)
+
+
+def load_knowledge_graph(data_path: str) -> Dataset:
     """
     Load all merged TTL files into a single knowledge graph.
+
+    Each `<hash>/<hash>.ttl` becomes the named graph `paper_graph_id(hash)`; queries
+    see the union of all papers, and one paper can later be replaced on its own
+    (see refresh_kg). The files are parsed in a process pool
+    (src.utils.ttl_loader, MOPS_TTL_PARSE_WORKERS) and added in directory order.
     
     Args:
         data_path: Path to merged_tll directory
         
     Returns:
-        RDF Graph with all loaded data
+        RDF Dataset with all loaded data
         
     Example:
         >>> graph = load_knowledge_graph("evaluation/data/merged_tll")
         >>> print(f"Loaded {len(graph)} triples")
     """
-    graph = Graph()
+    graph = Dataset(default_union=True)
     merged_dir = Path(data_path)
     
     if not merged_dir.exists():
         raise FileNotFoundError(f"Data directory not found: {merged_dir}")
     
+    ttl_files = [
+        hash_dir / f"{hash_dir.name}.ttl"
+        for hash_dir in sorted(merged_dir.iterdir())
+        if hash_dir.is_dir() and (hash_dir / f"{hash_dir.name}.ttl").exists()
+    ]
     ttl_count = 0
-    for hash_dir in sorted(merged_dir.iterdir()):
-        if hash_dir.is_dir():
-            ttl_file = hash_dir / f"{hash_dir.name}.ttl"
-            if ttl_file.exists():
-                try:
-                    graph.parse(str(ttl_file), format="turtle")
-                    ttl_count += 1
-                except Exception as e:
-                    logger.warning(f"Failed to load {ttl_file}: {e}")
+    for parsed in parse_ttl_files(ttl_files):
+        if parsed.error is not None:
+            logger.warning(f"Failed to load {parsed.path}: {parsed.error}")
+            continue
+        _add_paper(graph, Path(parsed.path).parent.name, parsed.triples, parsed.namespaces)
+        ttl_count += 1
     
     logger.info(f"Loaded {ttl_count} TTL files with {len(graph)} triples")
     return graph
 
 def ensure_kg_loaded() -> Graph:
-    """Ensure knowledge graph is loaded (lazy loading)."""
-    global _kg  # pylint: disable=global-statement
-    if _kg is None:
-        # Default path relative to repo root
-        repo_root = Path(__file__).resolve().parents[2]
-        data_path = repo_root / "evaluation" / "data" / "merged_tll"
+    """
+    Ensure knowledge graph is loaded (lazy loading).
+
+    Served from the compiled snapshot (see kg_snapshot.py) when it is at least as
+    new as merged_tll; otherwise the TTLs are parsed and the snapshot is rebuilt.
+    Later changes to single papers are picked up by refresh_kg.
+    """
+    global _kg, _kg_version, _synthesis_views, _kg_sources, _kg_snapshot  # pylint: disable=global-statement
+    kg = _kg
+    if kg is not None:
+        return kg
+    with _kg_lock:
+        if _kg is not None:
+            return _kg
+        # New graph: results cached for the previous one can never be hit again
+        _kg_version += 1
+        with _prepared_lock:
+            _prepared_queries.clear()
+        _result_cache.clear()
+        _synthesis_views = None
+        data_path = _merged_ttl_dir()
+        if not data_path.exists():
+            raise FileNotFoundError(f"Data directory not found: {data_path}")
+
+        source_mtime = _latest_mtime_in_dir(data_path)
+        sources = _source_fingerprints(data_path)
+        snapshot = load_snapshot(_snapshot_dir(), source_mtime)
+        if snapshot is not None:
+            logger.info(f"Loaded knowledge graph snapshot with {snapshot.num_triples} triples")
+            _kg_sources = snapshot.meta.get("sources") or sources
+            _kg_snapshot = snapshot
+            _kg = snapshot.graph()
+            return _kg
+
         logger.info(f"Loading knowledge graph from: {data_path}")
-        _kg = load_knowledge_graph(str(data_path))
-    return _kg
+        kg = load_knowledge_graph(str(data_path))
+        try:
+            build_snapshot(kg, _snapshot_dir(), source_mtime, len(sources), sources)
+        except Exception as e:
+            logger.warning(f"Failed to write knowledge graph snapshot: {e}")
+        _kg_sources = sources
+        _kg = kg
+        return _kg
 
 
 def _repo_root() -> Path:
@@ -88,13 +180,40 @@ def _cache_dir() -> Path:
 
 
 def _index_path() -> Path:
-    return _cache_dir() / "kg_label_index.json"
+    return _cache_dir() / "kg_label_index.bin"
+
+
+def _snapshot_dir() -> Path:
+    return _cache_dir() / "kg_snapshot"
+
+
+def _views_path() -> Path:
+    return _cache_dir() / "synthesis_views.json"
 
 
 def _merged_ttl_dir() -> Path:
     return _repo_root() / "evaluation" / "data" / "merged_tll"
 
 
+def _source_fingerprints(p: Path) -> Dict[str, List[int]]:
+    """
+    Paper hash -> [mtime_ns, size] of every merged_tll/<hash>/<hash>.ttl; a paper
+    whose entry differs from the loaded one has been republished.
+    """
+    sources: Dict[str, List[int]] = {}
+    try:
+        if not p.exists():
+            return sources
+        for sub in sorted(p.iterdir()):
+            ttl = sub / f"{sub.name}.ttl"
+            if sub.is_dir() and ttl.exists():
+                st = ttl.stat()
+                sources[sub.name] = [st.st_mtime_ns, st.st_size]
+    except OSError:
+        pass
+    return sources
+
+
 def _latest_mtime_in_dir(p: Path) -> float:
     """
     Best-effort latest mtime of *.ttl files under merged_tll/*/*.ttl.
@@ -114,104 +233,72 @@ def _latest_mtime_in_dir(p: Path) -> float:
         return 0.0
 
 
-def _build_label_index() -> Dict[str, Any]:
-    """
-    Build a local label index from the in-memory KG.
-    This runs full list queries once (no LIMIT), then persists to disk.
-    """
-    kg = ensure_kg_loaded()
-
-    # Full lists (no LIMIT)
-    synth_q = """
-    PREFIX ontosyn: <https://www.theworldavatar.com/kg/OntoSyn/>
-    PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-    SELECT DISTINCT ?label WHERE {
+# Label index categories: (projected variable, WHERE body); full lists, no LIMIT
+_LABEL_QUERIES: Dict[str, tuple] = {
+    "syntheses": ("label", """
       ?s a ontosyn:ChemicalSynthesis .
-      ?s rdfs:label ?label .
-    } ORDER BY ?label
-    """
-
-    mop_q = """
-    PREFIX ontomops: <https://www.theworldavatar.com/kg/ontomops/>
-    PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-    SELECT DISTINCT ?label WHERE {
+      ?s rdfs:label ?label ."""),
+    "mops": ("label", """
       ?m a ontomops:MetalOrganicPolyhedron .
-      ?m rdfs:label ?label .
-    } ORDER BY ?label
-    """
-
-    chem_q = """
-    PREFIX ontosyn: <https://www.theworldavatar.com/kg/OntoSyn/>
-    PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-    SELECT DISTINCT ?label WHERE {
+      ?m rdfs:label ?label ."""),
+    "chemicals": ("label", """
       ?s a ontosyn:ChemicalSynthesis .
       ?s ontosyn:hasChemicalInput ?c .
-      ?c rdfs:label ?label .
-    } ORDER BY ?label
-    """
-
-    # IR materials list (full, no LIMIT)
-    ir_mat_q = """
-    PREFIX ontospecies: <http://www.theworldavatar.com/ontology/ontospecies/OntoSpecies.owl#>
-    SELECT DISTINCT ?materialName WHERE {
+      ?c rdfs:label ?label ."""),
+    # IR materials list
+    "ir_materials": ("materialName", """
       ?species a ontospecies:Species .
       ?species ontospecies:hasInfraredSpectroscopyData ?ir .
       ?ir ontospecies:usesMaterial ?mat .
       ?mat ontospecies:hasMaterialName ?materialName .
-      FILTER(STRLEN(STR(?materialName)) > 0)
-    } ORDER BY ?materialName
-    """
+      FILTER(STRLEN(STR(?materialName)) > 0)"""),
+}
 
-    def _labels(query: str) -> List[str]:
-        out: List[str] = []
-        for row in kg.query(query):
-            try:
-                v = str(row["label"]) if "label" in row.labels else str(row[0])
-            except Exception:
-                v = str(row[0]) if row else ""
-            v = (v or "").strip()
+_LABEL_PREFIXES = """
+    PREFIX ontosyn: <https://www.theworldavatar.com/kg/OntoSyn/>
+    PREFIX ontomops: <https://www.theworldavatar.com/kg/ontomops/>
+    PREFIX ontospecies: <http://www.theworldavatar.com/ontology/ontospecies/OntoSpecies.owl#>
+    PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
+"""
+
+
+def _label_strings(graph: Graph, category: str) -> List[str]:
+    """Distinct, stripped, non-empty labels of `category` in `graph`, in label order."""
+    var, body = _LABEL_QUERIES[category]
+    query = f"{_LABEL_PREFIXES}SELECT DISTINCT ?{var} WHERE {{{body}\n    }} ORDER BY ?{var}"
+    out: List[str] = []
+    with _kg_rw.read():
+        for row in graph.query(query):
+            v = getattr(row, var, None)
+            v = str(v).strip() if v is not None else ""
             if v:
                 out.append(v)
-        # de-dupe preserve order
-        seen: set[str] = set()
-        dedup: List[str] = []
-        for s in out:
-            if s not in seen:
-                seen.add(s)
-                dedup.append(s)
-        return dedup
-
-    def _strings(query: str, var: str) -> List[str]:
-        out: List[str] = []
-        for row in kg.query(query):
-            v = str(getattr(row, var)) if getattr(row, var, None) is not None else None
-            if v:
-                v = v.strip()
-                if v:
-                    out.append(v)
-        seen: set[str] = set()
-        dedup: List[str] = []
-        for s in out:
-            if s not in seen:
-                seen.add(s)
-                dedup.append(s)
-        return dedup
-
-    syntheses = _labels(synth_q)
-    mops = _labels(mop_q)
-    chemicals = _labels(chem_q)
-    ir_materials = _strings(ir_mat_q, "materialName")
+    # de-dupe preserve order
+    return list(dict.fromkeys(out))
+
+
+def _paper_labels(graph: Graph) -> Dict[str, set]:
+    """Labels of every index category within one paper graph."""
+    return {category: set(_label_strings(graph, category)) for category in _LABEL_QUERIES}
+
+
+def _build_label_index() -> Dict[str, Any]:
+    """
+    Build a local label index from the in-memory KG.
+    This runs full list queries once (no LIMIT), then persists to disk.
+    """
+    kg = ensure_kg_loaded()
+    labels = {category: _label_strings(kg, category) for category in _LABEL_QUERIES}
+    with _kg_rw.read():
+        triples = len(kg)
 
     idx = {
         "meta": {
             "built_at_unix": time.time(),
             "source_merged_ttl_latest_mtime": _latest_mtime_in_dir(_merged_ttl_dir()),
-            "triples": len(kg),
+            "triples": triples,
         },
-        "syntheses": syntheses,
-        "mops": mops,
-        "chemicals": chemicals,
-        "ir_materials": ir_materials,
+        **labels,
     }
     return idx
 
@@ -224,8 +311,14 @@ def warm_label_index(force: bool = False) -> Dict[str, Any]:
     - If cache file missing -> build
     - If merged_tll latest mtime > cache meta mtime -> rebuild
     - If force=True -> rebuild
+
+    Readers keep getting the current index while a rebuild runs; the new one is
+    swapped in when complete.
     """
     global _label_index  # pylint: disable=global-statement
+    idx = _label_index
+    if idx is not None and not force:
+        return idx
     with _label_index_lock:
         if _label_index is not None and not force:
             return _label_index
@@ -234,67 +327,121 @@ def warm_label_index(force: bool = False) -> Dict[str, Any]:
         source_mtime = _latest_mtime_in_dir(_merged_ttl_dir())
 
         if not force and cache_file.exists():
-            try:
-                data = json.loads(cache_file.read_text(encoding="utf-8"))
-                cached_mtime = float((data.get("meta") or {}).get("source_merged_ttl_latest_mtime") or 0.0)
-                if cached_mtime >= source_mtime and data.get("syntheses") and data.get("mops"):
-                    _label_index = data
+            loaded = load_label_index(cache_file)
+            if loaded is not None:
+                meta, categories = loaded
+                cached_mtime = float(meta.get("source_merged_ttl_latest_mtime") or 0.0)
+                if cached_mtime >= source_mtime and categories.get("syntheses") and categories.get("mops"):
+                    _label_index = dict(categories, meta=meta)
                     return _label_index
-            except Exception:
-                # fall through to rebuild
-                pass
+            # else fall through to rebuild
 
         # Rebuild
-        idx = _build_label_index()
+        labels = _build_label_index()
+        meta = labels.pop("meta")
+        categories = {name: FuzzyLabelIndex(values) for name, values in labels.items()}
         try:
-            cache_file.write_text(json.dumps(idx, indent=2, ensure_ascii=False), encoding="utf-8")
+            save_label_index(cache_file, meta, categories)
         except Exception as e:
             logger.warning(f"Failed to write label index cache: {e}")
-        _label_index = idx
+        _label_index = dict(categories, meta=meta)
         return _label_index
 
 
-def _fuzzy_rank(query: str, candidates: List[str], limit: int = 10, cutoff: float = 0.6) -> List[Dict[str, Any]]:
-    """
-    Rank candidates by similarity using stdlib difflib (no extra deps).
-    Returns list of {match, score}.
-    """
-    q = (query or "").strip()
-    if not q:
-        return []
-
-    scored: List[tuple[float, str]] = []
-    for c in candidates:
-        # SequenceMatcher is robust and fast enough for a few thousand candidates
-        s = difflib.SequenceMatcher(None, q.lower(), (c or "").lower()).ratio()
-        if s >= cutoff:
-            scored.append((s, c))
-
-    scored.sort(key=lambda x: x[0], reverse=True)
-    out: List[Dict[str, Any]] = []
-    for s, c in scored[:limit]:
-        out.append({"match": c, "score": round(s, 4)})
-    return out
+def _fuzzy_lookup(category: str, query: str, limit: int, cutoff: float) -> List[Dict[str, Any]]:
+    index = warm_label_index(force=False).get(category)
+    return index.rank(query, limit=limit, cutoff=cutoff) if index is not None else []
 
 
 def fuzzy_lookup_synthesis_name(query: str, limit: int = 10, cutoff: float = 0.6) -> List[Dict[str, Any]]:
-    idx = warm_label_index(force=False)
-    return _fuzzy_rank(query, idx.get("syntheses") or [], limit=limit, cutoff=cutoff)
+    return _fuzzy_lookup("syntheses", query, limit, cutoff)
 
 
 def fuzzy_lookup_mop_name(query: str, limit: int = 10, cutoff: float = 0.6) -> List[Dict[str, Any]]:
-    idx = warm_label_index(force=False)
-    return _fuzzy_rank(query, idx.get("mops") or [], limit=limit, cutoff=cutoff)
+    return _fuzzy_lookup("mops", query, limit, cutoff)
 
 
 def fuzzy_lookup_chemical_name(query: str, limit: int = 10, cutoff: float = 0.6) -> List[Dict[str, Any]]:
-    idx = warm_label_index(force=False)
-    return _fuzzy_rank(query, idx.get("chemicals") or [], limit=limit, cutoff=cutoff)
+    return _fuzzy_lookup("chemicals", query, limit, cutoff)
 
 
 def fuzzy_lookup_ir_material(query: str, limit: int = 10, cutoff: float = 0.6) -> List[Dict[str, Any]]:
-    idx = warm_label_index(force=False)
-    return _fuzzy_rank(query, idx.get("ir_materials") or [], limit=limit, cutoff=cutoff)
+    return _fuzzy_lookup("ir_materials", query, limit, cutoff)
+
+def _result_rows(result) -> List[Dict[str, Any]]:
+    results = []
+    for row in result:
+        result_dict = {}
+        for var in row.labels:
+            value = row[var]
+            if value is not None:
+                result_dict[var] = str(value)
+            else:
+                result_dict[var] = None
+        results.append(result_dict)
+    return results
+
+
+def run_query(query_id: str, query: str, bindings: Optional[Dict[str, str]] = None) -> List[Dict[str, Any]]:
+    """
+    Execute a tool query compiled once with `prepareQuery`, with parameters passed as
+    `initBindings` (string values become plain literals) and results cached.
+
+    Args:
+        query_id: Name of the calling tool; part of the prepared-query and cache keys
+        query: SPARQL text; parameters appear as variables, not spliced in
+        bindings: Variable name (without '?') -> string value
+
+    Returns:
+        List of dictionaries with query results (a private copy)
+    """
+    params = tuple(sorted((bindings or {}).items()))
+    if len(params) == 1 and params[0][0] == GROUP_VAR:
+        capture = getattr(_view_capture, "keys", None)
+        if capture is not None:
+            capture.append((query_id, query))
+            return []
+
+    ensure_kg_loaded()
+    # The graph, its version and the views change together under the write lock
+    with _kg_rw.read():
+        kg = _kg
+        if len(params) == 1 and params[0][0] == GROUP_VAR:
+            views = _synthesis_views
+            if views is not None and views.meta.get("kg_version") == _kg_version:
+                rows = views.lookup(query_id, query, params[0][1])
+                if rows is not None:
+                    return rows
+
+        key = (query_id, query, params, _kg_version)
+        cached = _result_cache.get(key)
+        if cached is not None:
+            return cached
+
+        prepared_key = (query_id, query)
+        with _prepared_lock:
+            prepared = _prepared_queries.get(prepared_key)
+        if prepared is None:
+            prepared = prepareQuery(query, initNs=dict(kg.namespaces()))
+            with _prepared_lock:
+                _prepared_queries[prepared_key] = prepared
+
+        init_bindings = {k: RDFLiteral(v) for k, v in params}
+        results = _result_rows(kg.query(prepared, initBindings=init_bindings))
+        _result_cache.put(key, results)
+    return [dict(r) for r in results]
+
+
+def query_cache_stats() -> Dict[str, int]:
+    """Hit/miss counts and size of the query result cache."""
+    stats = _result_cache.stats()
+    stats["prepared_queries"] = len(_prepared_queries)
+    stats["synthesis_views"] = len(_synthesis_views.views) if _synthesis_views is not None else 0
+    stats["kg_version"] = _kg_version
+    stats["kg_papers"] = len(_kg_sources)
+    stats["kg_reloads"] = _kg_reloads
+    return stats
+
 
 def execute_sparql(query: str) -> List[Dict[str, Any]]:
     """
@@ -311,20 +458,9 @@ def execute_sparql(query: str) -> List[Dict[str, Any]]:
         >>> results = execute_sparql(query)
         >>> print(results)
     """
-    kg = ensure_kg_loaded()
-    
-    results = []
-    for row in kg.query(query):
-        result_dict = {}
-        for var in row.labels:
-            value = row[var]
-            if value is not None:
-                result_dict[var] = str(value)
-            else:
-                result_dict[var] = None
-        results.append(result_dict)
-    
-    return results
+    ensure_kg_loaded()
+    with _kg_rw.read():
+        return _result_rows(_kg.query(query))
 
 def format_results_as_tsv(results: List[Dict[str, Any]]) -> str:
     """
@@ -404,12 +540,12 @@ def lookup_synthesis_iri(name: str) -> List[Dict[str, Any]]:
     SELECT ?synthesis ?synthesisLabel
     WHERE {{
         ?synthesis a ontosyn:ChemicalSynthesis .
-        ?synthesis rdfs:label "{name}" .
-        BIND("{name}" as ?synthesisLabel)
+        ?synthesis rdfs:label ?name .
+        BIND(?name as ?synthesisLabel)
     }}
     LIMIT 5
     """
-    return execute_sparql(query)
+    return run_query("lookup_synthesis_iri", query, {"name": name})
 
 def lookup_mop_iri(name: str) -> List[Dict[str, Any]]:
     """
@@ -432,13 +568,13 @@ def lookup_mop_iri(name: str) -> List[Dict[str, Any]]:
     SELECT ?mop ?mopLabel ?ccdcNumber
     WHERE {{
         ?mop a ontomops:MetalOrganicPolyhedron .
-        ?mop rdfs:label "{name}" .
-        BIND("{name}" as ?mopLabel)
+        ?mop rdfs:label ?name .
+        BIND(?name as ?mopLabel)
         OPTIONAL {{ ?mop ontomops:hasCCDCNumber ?ccdcNumber }}
     }}
     LIMIT 5
     """
-    return execute_sparql(query)
+    return run_query("lookup_mop_iri", query, {"name": name})
 
 def lookup_by_ccdc(ccdc_number: str) -> List[Dict[str, Any]]:
     """
@@ -462,11 +598,11 @@ def lookup_by_ccdc(ccdc_number: str) -> List[Dict[str, Any]]:
     WHERE {{
         ?mop a ontomops:MetalOrganicPolyhedron .
         ?mop rdfs:label ?mopLabel .
-        ?mop ontomops:hasCCDCNumber "{ccdc_number}" .
+        ?mop ontomops:hasCCDCNumber ?ccdcQuery .
         OPTIONAL {{ ?mop ontomops:hasMOPFormula ?mopFormula }}
     }}
     """
-    return execute_sparql(query)
+    return run_query("lookup_by_ccdc", query, {"ccdcQuery": ccdc_number})
 
 # ============================================================================
 # General Query Functions
@@ -501,7 +637,7 @@ def get_all_mops(limit: int = 100) -> List[Dict[str, Any]]:
     ORDER BY ?mopLabel
     LIMIT {limit}
     """
-    return execute_sparql(query)
+    return run_query("get_all_mops", query)
 
 def get_kg_statistics() -> Dict[str, int]:
     """
@@ -539,7 +675,7 @@ def get_kg_statistics() -> Dict[str, int]:
     
     stats = {}
     for key, query in queries.items():
-        results = execute_sparql(query)
+        results = run_query(f"get_kg_statistics.{key}", query)
         stats[key] = int(results[0]['count']) if results and results[0]['count'] else 0
     
     return stats
@@ -577,7 +713,7 @@ def get_synthesis_recipe(synthesis_name: str) -> List[Dict[str, Any]]:
     SELECT DISTINCT ?role ?stepLabel ?chemicalLabel ?amount ?formula ?purity ?supplier
     WHERE {{
         ?synthesis a ontosyn:ChemicalSynthesis .
-        ?synthesis rdfs:label "{synthesis_name}" .
+        ?synthesis rdfs:label ?synthesisName .
 
         {{
             ?synthesis ontosyn:hasChemicalInput ?chemical .
@@ -624,7 +760,7 @@ def get_synthesis_recipe(synthesis_name: str) -> List[Dict[str, Any]]:
     }}
     ORDER BY ?role ?stepLabel ?chemicalLabel
     """
-    return execute_sparql(query)
+    return run_query("get_synthesis_recipe", query, {"synthesisName": synthesis_name})
 
 
 def get_syntheses_producing_mop(mop_name: str) -> List[Dict[str, Any]]:
@@ -645,18 +781,18 @@ def get_syntheses_producing_mop(mop_name: str) -> List[Dict[str, Any]]:
 
       {{
         ?out a ontomops:MetalOrganicPolyhedron .
-        ?out rdfs:label "{mop_name}" .
+        ?out rdfs:label ?mopName .
       }}
       UNION
       {{
         ?out ontosyn:isRepresentedBy ?mop .
         ?mop a ontomops:MetalOrganicPolyhedron .
-        ?mop rdfs:label "{mop_name}" .
+        ?mop rdfs:label ?mopName .
       }}
     }}
     ORDER BY ?synthesisLabel
     """
-    return execute_sparql(query)
+    return run_query("get_syntheses_producing_mop", query, {"mopName": mop_name})
 
 
 def find_mops_by_cbu_formula_contains(
@@ -683,12 +819,12 @@ def find_mops_by_cbu_formula_contains(
         OPTIONAL {{ ?mop ontomops:hasCCDCNumber ?ccdcNumber }}
         ?mop ontomops:hasChemicalBuildingUnit ?cbu .
         OPTIONAL {{ ?cbu ontomops:hasCBUFormula ?cbuFormula }}
-        FILTER(BOUND(?cbuFormula) && CONTAINS(LCASE(STR(?cbuFormula)), LCASE("{sub}")))
+        FILTER(BOUND(?cbuFormula) && CONTAINS(LCASE(STR(?cbuFormula)), LCASE(?substring)))
     }}
     {order_clause}
     LIMIT {limit}
     """
-    return execute_sparql(query)
+    return run_query("find_mops_by_cbu_formula_contains", query, {"substring": sub})
 
 def get_synthesis_steps(synthesis_name: str) -> List[Dict[str, Any]]:
     """
@@ -713,7 +849,7 @@ def get_synthesis_steps(synthesis_name: str) -> List[Dict[str, Any]]:
     SELECT DISTINCT ?stepLabel ?stepType
     WHERE {{
         ?synthesis a ontosyn:ChemicalSynthesis .
-        ?synthesis rdfs:label "{synthesis_name}" .
+        ?synthesis rdfs:label ?synthesisName .
         ?synthesis ontosyn:hasSynthesisStep ?step .
         ?step rdfs:label ?stepLabel .
         ?step rdf:type ?stepType .
@@ -722,7 +858,7 @@ def get_synthesis_steps(synthesis_name: str) -> List[Dict[str, Any]]:
     ORDER BY ?stepLabel
     """
     
-    results = execute_sparql(query)
+    results = run_query("get_synthesis_steps", query, {"synthesisName": synthesis_name})
     # Clean up step types to show only the class name
     for result in results:
         if 'stepType' in result and result['stepType']:
@@ -753,7 +889,7 @@ def get_synthesis_temperatures(synthesis_name: str) -> List[Dict[str, Any]]:
     SELECT DISTINCT ?stepLabel ?tempValue ?tempUnit
     WHERE {{
         ?synthesis a ontosyn:ChemicalSynthesis .
-        ?synthesis rdfs:label "{synthesis_name}" .
+        ?synthesis rdfs:label ?synthesisName .
         ?synthesis ontosyn:hasSynthesisStep ?step .
         ?step rdfs:label ?stepLabel .
         {{
@@ -767,7 +903,7 @@ def get_synthesis_temperatures(synthesis_name: str) -> List[Dict[str, Any]]:
     ORDER BY ?tempValue
     """
     
-    results = execute_sparql(query)
+    results = run_query("get_synthesis_temperatures", query, {"synthesisName": synthesis_name})
     # Clean up units
     for result in results:
         if 'tempUnit' in result and result['tempUnit']:
@@ -792,7 +928,7 @@ def get_synthesis_temperatures_ordered(
     SELECT DISTINCT ?stepLabel ?tempValue ?tempUnit
     WHERE {{
         ?synthesis a ontosyn:ChemicalSynthesis .
-        ?synthesis rdfs:label "{synthesis_name}" .
+        ?synthesis rdfs:label ?synthesisName .
         ?synthesis ontosyn:hasSynthesisStep ?step .
         ?step rdfs:label ?stepLabel .
         {{
@@ -805,7 +941,7 @@ def get_synthesis_temperatures_ordered(
     }}
     {order_clause}
     """
-    results = execute_sparql(query)
+    results = run_query("get_synthesis_temperatures_ordered", query, {"synthesisName": synthesis_name})
     for result in results:
         if 'tempUnit' in result and result['tempUnit']:
             result['tempUnit'] = result['tempUnit'].split('/')[-1]
@@ -834,7 +970,7 @@ def get_synthesis_durations(synthesis_name: str) -> List[Dict[str, Any]]:
     SELECT DISTINCT ?stepLabel ?durationValue ?durationUnit
     WHERE {{
         ?synthesis a ontosyn:ChemicalSynthesis .
-        ?synthesis rdfs:label "{synthesis_name}" .
+        ?synthesis rdfs:label ?synthesisName .
         ?synthesis ontosyn:hasSynthesisStep ?step .
         ?step rdfs:label ?stepLabel .
         ?step ontosyn:hasStepDuration ?duration .
@@ -844,7 +980,7 @@ def get_synthesis_durations(synthesis_name: str) -> List[Dict[str, Any]]:
     ORDER BY ?durationValue
     """
     
-    results = execute_sparql(query)
+    results = run_query("get_synthesis_durations", query, {"synthesisName": synthesis_name})
     # Clean up units
     for result in results:
         if 'durationUnit' in result and result['durationUnit']:
@@ -869,7 +1005,7 @@ def get_synthesis_durations_ordered(
     SELECT DISTINCT ?stepLabel ?durationValue ?durationUnit
     WHERE {{
         ?synthesis a ontosyn:ChemicalSynthesis .
-        ?synthesis rdfs:label "{synthesis_name}" .
+        ?synthesis rdfs:label ?synthesisName .
         ?synthesis ontosyn:hasSynthesisStep ?step .
         ?step rdfs:label ?stepLabel .
         ?step ontosyn:hasStepDuration ?duration .
@@ -878,7 +1014,7 @@ def get_synthesis_durations_ordered(
     }}
     {order_clause}
     """
-    results = execute_sparql(query)
+    results = run_query("get_synthesis_durations_ordered", query, {"synthesisName": synthesis_name})
     for result in results:
         if 'durationUnit' in result and result['durationUnit']:
             result['durationUnit'] = result['durationUnit'].split('/')[-1]
@@ -901,7 +1037,7 @@ def get_synthesis_step_index(synthesis_name: str) -> List[Dict[str, Any]]:
     SELECT DISTINCT ?step ?stepLabel ?order ?stepType
     WHERE {{
         ?synthesis a ontosyn:ChemicalSynthesis .
-        ?synthesis rdfs:label "{synthesis_name}" .
+        ?synthesis rdfs:label ?synthesisName .
         ?synthesis ontosyn:hasSynthesisStep ?step .
         ?step rdfs:label ?stepLabel .
         OPTIONAL {{ ?step ontosyn:hasOrder ?order }}
@@ -912,7 +1048,7 @@ def get_synthesis_step_index(synthesis_name: str) -> List[Dict[str, Any]]:
     }}
     ORDER BY ?order ?stepLabel
     """
-    results = execute_sparql(query)
+    results = run_query("get_synthesis_step_index", query, {"synthesisName": synthesis_name})
     for r in results:
         if r.get("stepType"):
             r["stepType"] = r["stepType"].split("/")[-1]
@@ -963,7 +1099,7 @@ def get_synthesis_step_temperatures(
     SELECT DISTINCT ?stepLabel ?temperatureKind ?tempValue ?tempUnit
     WHERE {{
         ?synthesis a ontosyn:ChemicalSynthesis .
-        ?synthesis rdfs:label "{synthesis_name}" .
+        ?synthesis rdfs:label ?synthesisName .
         ?synthesis ontosyn:hasSynthesisStep ?step .
         ?step rdfs:label ?stepLabel .
         {temp_block}
@@ -973,7 +1109,7 @@ def get_synthesis_step_temperatures(
     }}
     {order_clause}
     """
-    results = execute_sparql(query)
+    results = run_query("get_synthesis_step_temperatures", query, {"synthesisName": synthesis_name})
     for result in results:
         if 'tempUnit' in result and result['tempUnit']:
             result['tempUnit'] = result['tempUnit'].split('/')[-1]
@@ -996,7 +1132,7 @@ def get_synthesis_step_temperature_rates(
     SELECT DISTINCT ?stepLabel ?rateValue ?rateUnit
     WHERE {{
         ?synthesis a ontosyn:ChemicalSynthesis .
-        ?synthesis rdfs:label "{synthesis_name}" .
+        ?synthesis rdfs:label ?synthesisName .
         ?synthesis ontosyn:hasSynthesisStep ?step .
         ?step rdfs:label ?stepLabel .
         ?step ontosyn:hasTemperatureRate ?rate .
@@ -1005,7 +1141,7 @@ def get_synthesis_step_temperature_rates(
     }}
     {order_clause}
     """
-    results = execute_sparql(query)
+    results = run_query("get_synthesis_step_temperature_rates", query, {"synthesisName": synthesis_name})
     for result in results:
         if 'rateUnit' in result and result['rateUnit']:
             result['rateUnit'] = result['rateUnit'].split('/')[-1]
@@ -1028,7 +1164,7 @@ def get_synthesis_step_transferred_amounts(
     SELECT DISTINCT ?stepLabel ?amountValue ?amountUnit
     WHERE {{
         ?synthesis a ontosyn:ChemicalSynthesis .
-        ?synthesis rdfs:label "{synthesis_name}" .
+        ?synthesis rdfs:label ?synthesisName .
         ?synthesis ontosyn:hasSynthesisStep ?step .
         ?step rdfs:label ?stepLabel .
         ?step ontosyn:hasTransferedAmount ?amount .
@@ -1037,7 +1173,7 @@ def get_synthesis_step_transferred_amounts(
     }}
     {order_clause}
     """
-    results = execute_sparql(query)
+    results = run_query("get_synthesis_step_transferred_amounts", query, {"synthesisName": synthesis_name})
     for result in results:
         if 'amountUnit' in result and result['amountUnit']:
             result['amountUnit'] = result['amountUnit'].split('/')[-1]
@@ -1055,7 +1191,7 @@ def get_synthesis_step_vessels(synthesis_name: str) -> List[Dict[str, Any]]:
     SELECT DISTINCT ?stepLabel ?vesselName ?vesselTypeLabel ?vesselEnvironment
     WHERE {{
         ?synthesis a ontosyn:ChemicalSynthesis .
-        ?synthesis rdfs:label "{synthesis_name}" .
+        ?synthesis rdfs:label ?synthesisName .
         ?synthesis ontosyn:hasSynthesisStep ?step .
         ?step rdfs:label ?stepLabel .
         OPTIONAL {{
@@ -1073,7 +1209,7 @@ def get_synthesis_step_vessels(synthesis_name: str) -> List[Dict[str, Any]]:
     }}
     ORDER BY ?stepLabel
     """
-    return execute_sparql(query)
+    return run_query("get_synthesis_step_vessels", query, {"synthesisName": synthesis_name})
 
 
 # ============================================================================
@@ -1112,7 +1248,7 @@ def list_characterisation_species(
     {order_clause}
     LIMIT {limit}
     """
-    return execute_sparql(query)
+    return run_query("list_characterisation_species", query)
 
 
 def list_syntheses_with_characterisation(
@@ -1144,7 +1280,7 @@ def list_syntheses_with_characterisation(
     {order_clause}
     LIMIT {limit}
     """
-    return execute_sparql(query)
+    return run_query("list_syntheses_with_characterisation", query)
 
 
 def list_characterisation_devices(limit: int = 100) -> List[Dict[str, Any]]:
@@ -1174,7 +1310,7 @@ def list_characterisation_devices(limit: int = 100) -> List[Dict[str, Any]]:
     ORDER BY ?deviceType ?deviceName
     LIMIT {limit}
     """
-    return execute_sparql(query)
+    return run_query("list_characterisation_devices", query)
 
 
 def get_characterisation_for_synthesis(
@@ -1220,7 +1356,7 @@ def get_characterisation_for_synthesis(
       ?hnmrLabel
     WHERE {{
       ?synthesis a ontosyn:ChemicalSynthesis .
-      ?synthesis rdfs:label "{synthesis_name}" .
+      ?synthesis rdfs:label ?synthesisName .
       ?synthesis ontosyn:hasChemicalOutput ?species .
       ?species a ontospecies:Species .
 
@@ -1266,7 +1402,7 @@ def get_characterisation_for_synthesis(
     }}
     {order_clause}
     """
-    return execute_sparql(query)
+    return run_query("get_characterisation_for_synthesis", query, {"synthesisName": synthesis_name})
 
 
 def get_characterisation_by_ccdc(
@@ -1286,7 +1422,7 @@ def get_characterisation_by_ccdc(
       ?species a ontospecies:Species .
       ?species ontospecies:hasCCDCNumber ?ccdc .
       ?ccdc ontospecies:hasCCDCNumberValue ?ccdcVal .
-      FILTER(STR(?ccdcVal) = "{ccdc_number}")
+      FILTER(STR(?ccdcVal) = ?ccdcQuery)
 
       OPTIONAL {{ ?species rdfs:label ?speciesLabel }}
 
@@ -1325,7 +1461,7 @@ def get_characterisation_by_ccdc(
     }}
     {order_clause}
     """
-    return execute_sparql(query)
+    return run_query("get_characterisation_by_ccdc", query, {"ccdcQuery": ccdc_number})
 
 
 def get_common_ir_materials(
@@ -1357,7 +1493,7 @@ def get_common_ir_materials(
     {order_clause}
     LIMIT {limit}
     """
-    return execute_sparql(query)
+    return run_query("get_common_ir_materials", query)
 
 
 # ============================================================================
@@ -1375,12 +1511,12 @@ def get_synthesis_document_context(synthesis_name: str) -> List[Dict[str, Any]]:
     SELECT DISTINCT ?contextLabel
     WHERE {{
       ?synthesis a ontosyn:ChemicalSynthesis .
-      ?synthesis rdfs:label "{synthesis_name}" .
+      ?synthesis rdfs:label ?synthesisName .
       ?synthesis ontosyn:hasDocumentContext ?ctx .
       OPTIONAL {{ ?ctx rdfs:label ?contextLabel }}
     }}
     """
-    return execute_sparql(query)
+    return run_query("get_synthesis_document_context", query, {"synthesisName": synthesis_name})
 
 
 def get_synthesis_inheritance(synthesis_name: str) -> List[Dict[str, Any]]:
@@ -1394,7 +1530,7 @@ def get_synthesis_inheritance(synthesis_name: str) -> List[Dict[str, Any]]:
     SELECT DISTINCT ?relation ?otherSynthesisLabel
     WHERE {{
       ?synthesis a ontosyn:ChemicalSynthesis .
-      ?synthesis rdfs:label "{synthesis_name}" .
+      ?synthesis rdfs:label ?synthesisName .
 
       {{
         ?synthesis ontosyn:inheritsFromProcedure ?other .
@@ -1410,7 +1546,7 @@ def get_synthesis_inheritance(synthesis_name: str) -> List[Dict[str, Any]]:
     }}
     ORDER BY ?relation ?otherSynthesisLabel
     """
-    return execute_sparql(query)
+    return run_query("get_synthesis_inheritance", query, {"synthesisName": synthesis_name})
 
 
 def get_synthesis_yield(synthesis_name: str) -> List[Dict[str, Any]]:
@@ -1437,12 +1573,12 @@ def get_synthesis_yield(synthesis_name: str) -> List[Dict[str, Any]]:
       ?synthesis a ontosyn:ChemicalSynthesis .
 
       {{
-        ?synthesis rdfs:label "{synthesis_name}" .
+        ?synthesis rdfs:label ?synthesisName .
       }}
       UNION
       {{
         ?synthesis ontosyn:hasChemicalOutput ?out_match .
-        ?out_match rdfs:label "{synthesis_name}" .
+        ?out_match rdfs:label ?synthesisName .
       }}
 
       {{
@@ -1460,7 +1596,7 @@ def get_synthesis_yield(synthesis_name: str) -> List[Dict[str, Any]]:
       OPTIONAL {{ ?y rdfs:label ?yieldLabel }}
     }}
     """
-    results = execute_sparql(query)
+    results = run_query("get_synthesis_yield", query, {"synthesisName": synthesis_name})
 
     # Drop empty placeholders (e.g. yieldLabel = "N/A" with no value)
     cleaned: List[Dict[str, Any]] = []
@@ -1492,7 +1628,7 @@ def get_synthesis_equipment(synthesis_name: str) -> List[Dict[str, Any]]:
     SELECT DISTINCT ?scope ?stepLabel ?equipmentLabel
     WHERE {{
       ?synthesis a ontosyn:ChemicalSynthesis .
-      ?synthesis rdfs:label "{synthesis_name}" .
+      ?synthesis rdfs:label ?synthesisName .
 
       {{
         ?synthesis ontosyn:hasEquipment ?eq .
@@ -1511,7 +1647,7 @@ def get_synthesis_equipment(synthesis_name: str) -> List[Dict[str, Any]]:
     }}
     ORDER BY ?scope ?stepLabel ?equipmentLabel
     """
-    return execute_sparql(query)
+    return run_query("get_synthesis_equipment", query, {"synthesisName": synthesis_name})
 
 
 def get_synthesis_step_parameters(synthesis_name: str) -> List[Dict[str, Any]]:
@@ -1525,14 +1661,14 @@ def get_synthesis_step_parameters(synthesis_name: str) -> List[Dict[str, Any]]:
     SELECT DISTINCT ?stepLabel ?parameter
     WHERE {{
       ?synthesis a ontosyn:ChemicalSynthesis .
-      ?synthesis rdfs:label "{synthesis_name}" .
+      ?synthesis rdfs:label ?synthesisName .
       ?synthesis ontosyn:hasSynthesisStep ?step .
       ?step rdfs:label ?stepLabel .
       ?step ontosyn:hasParameter ?parameter .
     }}
     ORDER BY ?stepLabel
     """
-    return execute_sparql(query)
+    return run_query("get_synthesis_step_parameters", query, {"synthesisName": synthesis_name})
 
 
 def get_synthesis_step_vessel_environments(synthesis_name: str) -> List[Dict[str, Any]]:
@@ -1546,7 +1682,7 @@ def get_synthesis_step_vessel_environments(synthesis_name: str) -> List[Dict[str
     SELECT DISTINCT ?stepLabel ?environment
     WHERE {{
       ?synthesis a ontosyn:ChemicalSynthesis .
-      ?synthesis rdfs:label "{synthesis_name}" .
+      ?synthesis rdfs:label ?synthesisName .
       ?synthesis ontosyn:hasSynthesisStep ?step .
       ?step rdfs:label ?stepLabel .
       ?step ontosyn:hasVesselEnvironment ?env .
@@ -1554,7 +1690,7 @@ def get_synthesis_step_vessel_environments(synthesis_name: str) -> List[Dict[str
     }}
     ORDER BY ?stepLabel
     """
-    return execute_sparql(query)
+    return run_query("get_synthesis_step_vessel_environments", query, {"synthesisName": synthesis_name})
 
 
 def get_synthesis_drying_conditions(synthesis_name: str) -> List[Dict[str, Any]]:
@@ -1569,7 +1705,7 @@ def get_synthesis_drying_conditions(synthesis_name: str) -> List[Dict[str, Any]]
     SELECT DISTINCT ?stepLabel ?tempValue ?tempUnit ?pressureValue ?pressureUnit ?dryingAgentLabel
     WHERE {{
       ?synthesis a ontosyn:ChemicalSynthesis .
-      ?synthesis rdfs:label "{synthesis_name}" .
+      ?synthesis rdfs:label ?synthesisName .
       ?synthesis ontosyn:hasSynthesisStep ?step .
       ?step rdfs:label ?stepLabel .
       ?step a ontosyn:Dry .
@@ -1591,7 +1727,7 @@ def get_synthesis_drying_conditions(synthesis_name: str) -> List[Dict[str, Any]]
     }}
     ORDER BY ?stepLabel
     """
-    results = execute_sparql(query)
+    results = run_query("get_synthesis_drying_conditions", query, {"synthesisName": synthesis_name})
     for r in results:
         for k in ("tempUnit", "pressureUnit"):
             if r.get(k):
@@ -1611,7 +1747,7 @@ def get_synthesis_evaporation_conditions(synthesis_name: str) -> List[Dict[str,
     SELECT DISTINCT ?stepLabel ?tempValue ?tempUnit ?pressureValue ?pressureUnit ?targetVolValue ?targetVolUnit ?removedLabel
     WHERE {{
       ?synthesis a ontosyn:ChemicalSynthesis .
-      ?synthesis rdfs:label "{synthesis_name}" .
+      ?synthesis rdfs:label ?synthesisName .
       ?synthesis ontosyn:hasSynthesisStep ?step .
       ?step rdfs:label ?stepLabel .
       ?step a ontosyn:Evaporate .
@@ -1638,7 +1774,7 @@ def get_synthesis_evaporation_conditions(synthesis_name: str) -> List[Dict[str,
     }}
     ORDER BY ?stepLabel
     """
-    results = execute_sparql(query)
+    results = run_query("get_synthesis_evaporation_conditions", query, {"synthesisName": synthesis_name})
     for r in results:
         for k in ("tempUnit", "pressureUnit", "targetVolUnit"):
             if r.get(k):
@@ -1657,7 +1793,7 @@ def get_synthesis_separation_solvents(synthesis_name: str) -> List[Dict[str, Any
     SELECT DISTINCT ?stepLabel ?solventLabel ?amount
     WHERE {{
       ?synthesis a ontosyn:ChemicalSynthesis .
-      ?synthesis rdfs:label "{synthesis_name}" .
+      ?synthesis rdfs:label ?synthesisName .
       ?synthesis ontosyn:hasSynthesisStep ?step .
       ?step rdfs:label ?stepLabel .
       ?step a ontosyn:Separate .
@@ -1667,7 +1803,7 @@ def get_synthesis_separation_solvents(synthesis_name: str) -> List[Dict[str, Any
     }}
     ORDER BY ?stepLabel ?solventLabel
     """
-    return execute_sparql(query)
+    return run_query("get_synthesis_separation_solvents", query, {"synthesisName": synthesis_name})
 
 
 def get_hnmr_for_synthesis(synthesis_name: str) -> List[Dict[str, Any]]:
@@ -1683,7 +1819,7 @@ def get_hnmr_for_synthesis(synthesis_name: str) -> List[Dict[str, Any]]:
     SELECT DISTINCT ?speciesLabel ?shifts ?solventName ?temperature
     WHERE {{
       ?synthesis a ontosyn:ChemicalSynthesis .
-      ?synthesis rdfs:label "{synthesis_name}" .
+      ?synthesis rdfs:label ?synthesisName .
       ?synthesis ontosyn:hasChemicalOutput ?species .
       ?species a ontospecies:Species .
       OPTIONAL {{ ?species rdfs:label ?speciesLabel }}
@@ -1698,7 +1834,7 @@ def get_hnmr_for_synthesis(synthesis_name: str) -> List[Dict[str, Any]]:
     }}
     ORDER BY ?speciesLabel
     """
-    return execute_sparql(query)
+    return run_query("get_hnmr_for_synthesis", query, {"synthesisName": synthesis_name})
 
 
 def get_common_hnmr_solvents(limit: int = 20, order: Literal["asc", "desc", "none"] = "desc") -> List[Dict[str, Any]]:
@@ -1721,7 +1857,7 @@ def get_common_hnmr_solvents(limit: int = 20, order: Literal["asc", "desc", "non
     {order_clause}
     LIMIT {limit}
     """
-    return execute_sparql(query)
+    return run_query("get_common_hnmr_solvents", query)
 
 def get_synthesis_products(synthesis_name: str) -> List[Dict[str, Any]]:
     """
@@ -1746,7 +1882,7 @@ def get_synthesis_products(synthesis_name: str) -> List[Dict[str, Any]]:
     SELECT DISTINCT ?mopLabel ?ccdcNumber ?mopFormula
     WHERE {{
         ?synthesis a ontosyn:ChemicalSynthesis .
-        ?synthesis rdfs:label "{synthesis_name}" .
+        ?synthesis rdfs:label ?synthesisName .
         ?synthesis ontosyn:hasChemicalOutput ?output .
         ?output ontosyn:isRepresentedBy ?mop .
         ?mop a ontomops:MetalOrganicPolyhedron .
@@ -1755,7 +1891,7 @@ def get_synthesis_products(synthesis_name: str) -> List[Dict[str, Any]]:
         OPTIONAL {{ ?mop ontomops:hasMOPFormula ?mopFormula }}
     }}
     """
-    return execute_sparql(query)
+    return run_query("get_synthesis_products", query, {"synthesisName": synthesis_name})
 
 # ============================================================================
 # MOP Query Functions
@@ -1784,14 +1920,14 @@ def get_mop_building_units(mop_name: str) -> List[Dict[str, Any]]:
     SELECT DISTINCT ?cbuFormula ?cbuName ?altName
     WHERE {{
         ?mop a ontomops:MetalOrganicPolyhedron .
-        ?mop rdfs:label "{mop_name}" .
+        ?mop rdfs:label ?mopName .
         ?mop ontomops:hasChemicalBuildingUnit ?cbu .
         OPTIONAL {{ ?cbu ontomops:hasCBUFormula ?cbuFormula }}
         OPTIONAL {{ ?cbu rdfs:label ?cbuName }}
         OPTIONAL {{ ?cbu ontosyn:hasAlternativeNames ?altName }}
     }}
     """
-    return execute_sparql(query)
+    return run_query("get_mop_building_units", query, {"mopName": mop_name})
 
 # ============================================================================
 # Corpus-Wide Query Functions
@@ -1826,7 +1962,299 @@ def get_common_chemicals(limit: int = 20) -> List[Dict[str, Any]]:
     ORDER BY DESC(?usageCount)
     LIMIT {limit}
     """
-    return execute_sparql(query)
+    return run_query("get_common_chemicals", query)
+
+# ============================================================================
+# Per-Synthesis Overview (materialized views)
+# ============================================================================
+
+# Overview section -> per-synthesis tool; each tool's default query is materialized
+_OVERVIEW_SECTIONS = {
+    "steps": get_synthesis_step_index,
+    "recipe": get_synthesis_recipe,
+    "step_parameters": get_synthesis_step_parameters,
+    "temperatures": get_synthesis_step_temperatures,
+    "temperature_rates": get_synthesis_step_temperature_rates,
+    "durations": get_synthesis_durations,
+    "transferred_amounts": get_synthesis_step_transferred_amounts,
+    "vessels": get_synthesis_step_vessels,
+    "vessel_environments": get_synthesis_step_vessel_environments,
+    "equipment": get_synthesis_equipment,
+    "drying_conditions": get_synthesis_drying_conditions,
+    "evaporation_conditions": get_synthesis_evaporation_conditions,
+    "separation_solvents": get_synthesis_separation_solvents,
+    "products": get_synthesis_products,
+    "yield": get_synthesis_yield,
+    "characterisation": get_characterisation_for_synthesis,
+    "hnmr": get_hnmr_for_synthesis,
+    "document_context": get_synthesis_document_context,
+    "inheritance": get_synthesis_inheritance,
+}
+
+
+def _overview_view_queries() -> List[tuple]:
+    """(query id, query text) of every overview section, collected without running them."""
+    _view_capture.keys = []
+    try:
+        for fn in _OVERVIEW_SECTIONS.values():
+            fn("")
+        return list(_view_capture.keys)
+    finally:
+        _view_capture.keys = None
+
+
+def build_synthesis_views(force: bool = False) -> SynthesisViews:
+    """
+    Materialize the overview section queries for all syntheses, once per loaded KG.
+
+    Loaded from the on-disk cache when it was built from the same query texts and
+    is not older than merged_tll; otherwise each query is evaluated once over the
+    whole graph and the cache is rewritten. Afterwards, run_query answers those
+    queries for any synthesis from the views.
+    """
+    global _synthesis_views  # pylint: disable=global-statement
+    with _synthesis_views_lock:
+        ensure_kg_loaded()
+        version = _kg_version
+        if _synthesis_views is not None and _synthesis_views.meta.get("kg_version") == version and not force:
+            return _synthesis_views
+
+        keys = _overview_view_queries()
+        source_mtime = _latest_mtime_in_dir(_merged_ttl_dir())
+        views = None if force else SynthesisViews.load(_views_path(), source_mtime, query_signature(keys))
+        if views is None:
+            t0 = time.perf_counter()
+            with _kg_rw.read():
+                views = SynthesisViews.build(_kg, keys, meta={"source_merged_ttl_latest_mtime": source_mtime})
+            logger.info(
+                f"Materialized {len(keys)} synthesis views for {len(views.synthesis_names())} syntheses "
+                f"in {time.perf_counter() - t0:.2f}s"
+            )
+            try:
+                views.save(_views_path())
+            except Exception as e:
+                logger.warning(f"Failed to write synthesis views cache: {e}")
+
+        views.meta["kg_version"] = version
+        if version == _kg_version:
+            _synthesis_views = views
+        return views
+
+
+def get_synthesis_overview(synthesis_name: str) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Denormalized record of one synthesis: ordered steps with their conditions,
+    recipe, products, yield and characterisation (incl. CCDC numbers).
+
+    Served from the materialized views (built on first use). Sections without data
+    are omitted; an empty dict means the synthesis label is unknown or has no data.
+    """
+    build_synthesis_views()
+    overview: Dict[str, List[Dict[str, Any]]] = {}
+    for section, fn in _OVERVIEW_SECTIONS.items():
+        rows = fn(synthesis_name)
+        if rows:
+            overview[section] = rows
+    return overview
+
+# ============================================================================
+# Incremental reload of single papers
+# ============================================================================
+
+def _carry_over_key(old_version: int, new_version: int, affected: set):
+    """Result-cache rekey function keeping per-synthesis results of unaffected syntheses."""
+    def rekey(key):
+        query_id, query, params, version = key
+        if version != old_version or len(params) != 1 or params[0][0] != GROUP_VAR or params[0][1] in affected:
+            return None
+        return (query_id, query, params, new_version)
+    return rekey
+
+
+def _linked_papers(dataset: Dataset, graphs: List[Graph], names: set, skip: set) -> set:
+    """
+    Papers of `dataset` (other than `skip`) that a per-synthesis query over `graphs`
+    may reach: those sharing a subject or object node with them, or holding a
+    node labelled one of the synthesis `names`. Classes (objects of rdf:type) do
+    not link papers; the tool queries never walk from a class to its instances.
+    """
+    found = set()
+
+    def note(quads):
+        for _s, _p, _o, context in quads:
+            ident = str(context)
+            if ident.startswith(PAPER_GRAPH_PREFIX):
+                paper = ident[len(PAPER_GRAPH_PREFIX):]
+                if paper not in skip:
+                    found.add(paper)
+
+    for graph in graphs:
+        nodes = set()
+        for s, p, o in graph:
+            nodes.add(s)
+            if p != RDF.type and not isinstance(o, RDFLiteral):
+                nodes.add(o)
+        for node in nodes:
+            note(dataset.quads((node, None, None, None)))
+            note(q for q in dataset.quads((None, None, node, None)) if q[1] != RDF.type)
+    for name in names:
+        note(dataset.quads((None, RDFS.label, RDFLiteral(name), None)))
+    return found
+
+
+def _update_label_index(graph: Graph, old_labels: Dict[str, Dict[str, set]], new_labels: Dict[str, Dict[str, set]]) -> None:
+    """Apply the label changes of reloaded papers to the in-memory index and its file."""
+    global _label_index  # pylint: disable=global-statement
+    with _label_index_lock:
+        idx = _label_index
+        if idx is None:
+            # Not built yet; warm_label_index will build it from the new graph
+            return
+        categories = {name: index for name, index in idx.items() if name != "meta"}
+        for category, index in categories.items():
+            before = set().union(*(labels.get(category, set()) for labels in old_labels.values()))
+            after = set().union(*(labels.get(category, set()) for labels in new_labels.values()))
+            gone = before - after
+            if gone:
+                # A label dropped by these papers may still be used by another one
+                gone -= set(_label_strings(graph, category))
+            categories[category] = index.updated(added=after, removed=gone)
+        with _kg_rw.read():
+            triples = len(graph)
+        meta = dict(
+            idx["meta"],
+            updated_at_unix=time.time(),
+            source_merged_ttl_latest_mtime=_latest_mtime_in_dir(_merged_ttl_dir()),
+            triples=triples,
+        )
+        _label_index = dict(categories, meta=meta)
+        try:
+            save_label_index(_index_path(), meta, categories)
+        except Exception as e:
+            logger.warning(f"Failed to write label index cache: {e}")
+
+
+def refresh_kg() -> Dict[str, Any]:
+    """
+    Reload the papers whose merged TTL changed since the KG was loaded.
+
+    Every paper is its own named graph (see load_knowledge_graph). A changed or
+    new `<hash>.ttl` is parsed on its own and swapped in for that paper's graph
+    under the write lock; the graph of a removed file is dropped. The rest of the
+    KG is untouched. Then only the labels of those papers are updated in the label
+    index, only their syntheses (and those of papers sharing nodes with them, see
+    _linked_papers) are recomputed in the synthesis views, over a graph of just
+    those papers, and cached per-synthesis results of all other syntheses are
+    carried over to the new KG version. Prepared queries stay as they are.
+
+    A KG served from the snapshot is turned into a Dataset first
+    (KGSnapshot.dataset, no parsing). The snapshot is rewritten afterwards so the
+    next start loads the new state.
+
+    Returns:
+        {"changed": [...], "removed": [...], "failed": [...], "kg_version": int, "seconds": float}
+    """
+    global _kg, _kg_version, _kg_sources, _kg_snapshot, _kg_reloads  # pylint: disable=global-statement
+    with _kg_refresh_lock:
+        summary: Dict[str, Any] = {"changed": [], "removed": [], "failed": [], "kg_version": _kg_version}
+        kg = _kg
+        if kg is None:
+            # Not loaded yet: the first load reads the current files
+            return summary
+        t0 = time.perf_counter()
+        data_path = _merged_ttl_dir()
+        current = _source_fingerprints(data_path)
+        changed = sorted(h for h, fingerprint in current.items() if _kg_sources.get(h) != fingerprint)
+        removed = sorted(h for h in _kg_sources if h not in current)
+        if not changed and not removed:
+            return summary
+
+        parsed: Dict[str, Graph] = {}
+        for h, paper in zip(changed, parse_ttl_files([data_path / h / f"{h}.ttl" for h in changed])):
+            if paper.error is not None:
+                # Keep the loaded version; retried when the file changes again
+                logger.warning(f"Failed to reload paper {h}: {paper.error}")
+                summary["failed"].append(h)
+                continue
+            parsed[h] = paper.graph()
+        touched = sorted(parsed) + removed
+
+        if isinstance(kg, Dataset):
+            target = kg
+        else:
+            target = _kg_snapshot.dataset() if _kg_snapshot is not None else None
+            if target is None:
+                raise RuntimeError("The loaded KG has no per-paper graphs to reload")
+            logger.info(f"Converted the KG snapshot to a per-paper dataset ({len(target)} triples)")
+
+        old_labels = {h: _paper_labels(target.graph(paper_graph_id(h))) for h in touched if h in _kg_sources}
+        new_labels = {h: _paper_labels(graph) for h, graph in parsed.items()}
+        affected = set()
+        for labels in list(old_labels.values()) + list(new_labels.values()):
+            affected |= labels["syntheses"]
+        # Syntheses of other papers sharing nodes with the reloaded ones (old or new
+        # version) can change too; follow those links until no new paper turns up
+        with _kg_rw.read():
+            seeds = [target.graph(paper_graph_id(h)) for h in old_labels] + list(parsed.values())
+            linked: set = set()
+            while seeds:
+                found = _linked_papers(target, seeds, affected, set(touched) | linked)
+                seeds = [target.graph(paper_graph_id(h)) for h in sorted(found)]
+                linked |= found
+                for h in found:
+                    affected |= set(_label_strings(target.graph(paper_graph_id(h)), "syntheses"))
+
+        with _kg_rw.write():
+            for h in touched:
+                target.remove_graph(paper_graph_id(h))
+            for h, graph in parsed.items():
+                _add_paper(target, h, graph, graph.namespaces())
+            old_version = _kg_version
+            _kg_version += 1
+            _kg = target
+            _kg_snapshot = None
+            # Failed papers too, so they are only retried once their file changes again
+            _kg_sources = dict(current)
+            carried = _result_cache.rekey(_carry_over_key(old_version, _kg_version, affected))
+            views = _synthesis_views
+            if views is not None and views.meta.get("kg_version") == old_version:
+                views.invalidate(affected)
+                views.meta["kg_version"] = _kg_version
+            else:
+                views = None
+            _kg_reloads += 1
+
+        _update_label_index(target, old_labels, new_labels)
+        source_mtime = _latest_mtime_in_dir(data_path)
+        if views is not None:
+            # Those syntheses only depend on their own and the linked papers
+            scope = Graph()
+            with _kg_rw.read():
+                for h in sorted(set(parsed) | linked):
+                    scope += target.graph(paper_graph_id(h))
+                for prefix, namespace in target.namespaces():
+                    scope.bind(prefix, namespace, override=False)
+            views.refresh(scope, affected)
+            views.meta["source_merged_ttl_latest_mtime"] = source_mtime
+            try:
+                views.save(_views_path())
+            except Exception as e:
+                logger.warning(f"Failed to write synthesis views cache: {e}")
+
+        summary.update(changed=sorted(parsed), removed=removed, kg_version=_kg_version)
+        summary["seconds"] = round(time.perf_counter() - t0, 3)
+        logger.info(
+            f"Reloaded papers {summary['changed']} (removed {removed}) in {summary['seconds']}s; "
+            f"{len(linked)} linked papers, {len(affected)} syntheses recomputed, {carried} cached results kept"
+        )
+
+        try:
+            with _kg_rw.read():
+                build_snapshot(target, _snapshot_dir(), source_mtime, len(_kg_sources), _kg_sources)
+        except Exception as e:
+            logger.warning(f"Failed to write knowledge graph snapshot: {e}")
+        return summary
+
 
 # ============================================================================
 # Example Usage / Testing
@@ -0,0 +1,459 @@
+"""
+Compiled snapshot of the merged MOPs knowledge graph.
+
+Parsing every `evaluation/data/merged_tll/<hash>/<hash>.ttl` with rdflib's Turtle
+parser takes seconds, and the MCP server used to pay it on the first tool call of
+every process. The snapshot stores the parsed graph once as:
+
+- `terms.json`: the interned term table, sorted, one `[kind, value(, datatype, lang)]`
+  row per distinct term (kind: "u" URIRef, "b" BNode, "l" Literal); a term's id is
+  its position, so lookups are a binary search;
+- `triples.bin`: native int32 triple ids in three sorted permutations (SPO, POS,
+  OSP), each stored column by column;
+- `contexts.bin`: for a graph with one named graph per paper (see
+  kg_operations.load_knowledge_graph), the sorted SPO row numbers of each paper's
+  triples, concatenated in the order listed in `meta.json`;
+- `meta.json`: counts, namespace bindings, the paper graphs and the merged_tll
+  mtime used for invalidation (same check as `warm_label_index`), plus the
+  per-paper file fingerprints the graph was parsed from.
+
+Each build writes these files into a fresh `build-*` directory under the snapshot
+directory and then publishes it by atomically replacing the `CURRENT` file, which
+names the build. Readers therefore never see the meta of one build with the
+triples of another, and processes that still map the previous build keep working;
+builds older than that are removed.
+
+`load_snapshot` memory-maps `triples.bin` and returns immediately; the term table
+is read on the first query. `SnapshotStore` serves rdflib's `triples()` pattern
+lookups from the permutation that has the bound positions as its prefix, so the
+SPARQL in kg_operations runs unchanged on `Graph(store=SnapshotStore(...))`.
+The snapshot is read-only; `KGSnapshot.dataset()` turns it back into a mutable
+per-paper Dataset (without re-parsing) when a paper has to be reloaded.
+
+Rebuild by hand with:
+
+    python -m mini_marie.kg_server.kg_snapshot --rebuild
+"""
+
+import argparse
+import json
+import logging
+import mmap
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from rdflib import BNode, Dataset, Graph, Literal, URIRef
+from rdflib.store import Store
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION = 2
+TERMS_FILE = "terms.json"
+TRIPLES_FILE = "triples.bin"
+CONTEXTS_FILE = "contexts.bin"
+META_FILE = "meta.json"
+CURRENT_FILE = "CURRENT"
+BUILD_PREFIX = "build-"
+
+# Permutation name -> triple positions in column order (0=s, 1=p, 2=o)
+PERMUTATIONS: Dict[str, Tuple[int, int, int]] = {
+    "spo": (0, 1, 2),
+    "pos": (1, 2, 0),
+    "osp": (2, 0, 1),
+}
+# Bound positions -> permutation that has them as its prefix
+_PERMUTATION_FOR: Dict[Tuple[bool, bool, bool], str] = {
+    (False, False, False): "spo",
+    (True, False, False): "spo",
+    (True, True, False): "spo",
+    (True, True, True): "spo",
+    (False, True, False): "pos",
+    (False, True, True): "pos",
+    (False, False, True): "osp",
+    (True, False, True): "osp",
+}
+
+
+def term_key(term: Any) -> Optional[List[str]]:
+    """Term table row for an rdflib term (None for anything else, e.g. variables)."""
+    if isinstance(term, URIRef):
+        return ["u", str(term)]
+    if isinstance(term, BNode):
+        return ["b", str(term)]
+    if isinstance(term, Literal):
+        return ["l", str(term), str(term.datatype or ""), term.language or ""]
+    return None
+
+
+def _decode_term(row: List[str]) -> Any:
+    kind = row[0]
+    if kind == "u":
+        return URIRef(row[1])
+    if kind == "b":
+        return BNode(row[1])
+    return Literal(row[1], datatype=URIRef(row[2]) if row[2] else None, lang=row[3] or None)
+
+
+class KGSnapshot:
+    """Memory-mapped triple permutations plus a lazily loaded term table."""
+
+    def __init__(self, snapshot_dir: Path, meta: Dict[str, Any]):
+        self.snapshot_dir = Path(snapshot_dir)
+        self.meta = meta
+        self.num_triples = int(meta["triples"])
+        self._terms: Optional[List[List[str]]] = None
+        self._decoded: List[Any] = []
+        self._terms_lock = threading.Lock()
+        self._columns: Dict[str, Tuple[Any, Any, Any]] = {}
+        self._mmap = None
+        n = self.num_triples
+        if n:
+            with open(self.snapshot_dir / TRIPLES_FILE, "rb") as f:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            ints = memoryview(self._mmap).cast("i")
+            for k, name in enumerate(PERMUTATIONS):
+                base = 3 * n * k
+                self._columns[name] = (ints[base:base + n], ints[base + n:base + 2 * n], ints[base + 2 * n:base + 3 * n])
+
+    # ── terms ──
+    @property
+    def terms(self) -> List[List[str]]:
+        terms = self._terms
+        if terms is None:
+            with self._terms_lock:
+                terms = self._terms
+                if terms is None:
+                    with open(self.snapshot_dir / TERMS_FILE, "r", encoding="utf-8") as f:
+                        terms = json.load(f)
+                    # `_terms` is published last: a reader that sees it also sees `_decoded`
+                    self._decoded = [None] * len(terms)
+                    self._terms = terms
+        return terms
+
+    def term(self, term_id: int) -> Any:
+        terms = self.terms
+        t = self._decoded[term_id]
+        if t is None:
+            t = self._decoded[term_id] = _decode_term(terms[term_id])
+        return t
+
+    def term_id(self, term: Any) -> Optional[int]:
+        key = term_key(term)
+        if key is None:
+            return None
+        terms = self.terms
+        i = bisect_left(terms, key)
+        if i < len(terms) and terms[i] == key:
+            return i
+        return None
+
+    # ── triples ──
+    def match(self, s: Any = None, p: Any = None, o: Any = None) -> Iterator[Tuple[Any, Any, Any]]:
+        """Triples matching a pattern (None = wildcard), decoded to rdflib terms."""
+        pattern = (s, p, o)
+        ids: List[Optional[int]] = [None, None, None]
+        for pos, t in enumerate(pattern):
+            if t is not None:
+                ids[pos] = self.term_id(t)
+                if ids[pos] is None:
+                    return
+        if not self.num_triples:
+            return
+
+        perm = _PERMUTATION_FOR[(s is not None, p is not None, o is not None)]
+        order = PERMUTATIONS[perm]
+        cols = self._columns[perm]
+        lo, hi = 0, self.num_triples
+        for col, pos in zip(cols, order):
+            key = ids[pos]
+            if key is None:
+                break
+            lo = bisect_left(col, key, lo, hi)
+            hi = bisect_right(col, key, lo, hi)
+            if lo >= hi:
+                return
+
+        c0, c1, c2 = cols
+        out: List[Any] = [None, None, None]
+        for i in range(lo, hi):
+            out[order[0]] = self.term(c0[i])
+            out[order[1]] = self.term(c1[i])
+            out[order[2]] = self.term(c2[i])
+            yield out[0], out[1], out[2]
+
+    def dataset(self) -> Optional[Dataset]:
+        """
+        Mutable copy of the snapshot with one named graph per paper, as it was
+        built; None if the snapshot has no paper graphs.
+        """
+        contexts = self.meta.get("contexts")
+        if contexts is None:
+            return None
+        ds = Dataset(default_union=True)
+        for prefix, namespace in self.meta.get("namespaces", []):
+            ds.bind(prefix, URIRef(namespace), override=True, replace=True)
+        rows = array("i")
+        if contexts:
+            with open(self.snapshot_dir / CONTEXTS_FILE, "rb") as f:
+                rows.fromfile(f, sum(count for _, count in contexts))
+        c0, c1, c2 = self._columns.get("spo", ((), (), ()))
+        pos = 0
+        for identifier, count in contexts:
+            graph = ds.graph(URIRef(identifier))
+            ds.addN(
+                (self.term(c0[i]), self.term(c1[i]), self.term(c2[i]), graph) for i in rows[pos:pos + count]
+            )
+            pos += count
+        return ds
+
+    def graph(self) -> Graph:
+        """Read-only rdflib Graph over this snapshot, with the source namespace bindings."""
+        g = Graph(store=SnapshotStore(self))
+        for prefix, namespace in self.meta.get("namespaces", []):
+            g.bind(prefix, URIRef(namespace), override=True, replace=True)
+        return g
+
+    def close(self) -> None:
+        self._columns.clear()
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+
+class SnapshotStore(Store):
+    """Read-only rdflib store backed by a KGSnapshot."""
+
+    def __init__(self, snapshot: KGSnapshot):
+        super().__init__()
+        self.snapshot = snapshot
+        self.__namespace: Dict[str, URIRef] = {}
+        self.__prefix: Dict[URIRef, str] = {}
+
+    def triples(self, triple_pattern, context=None):  # type: ignore[override]
+        s, p, o = triple_pattern
+        for triple in self.snapshot.match(s, p, o):
+            yield triple, iter(())
+
+    def __len__(self, context=None) -> int:  # type: ignore[override]
+        return self.snapshot.num_triples
+
+    def contexts(self, triple=None):  # type: ignore[override]
+        return iter(())
+
+    def add(self, triple, context, quoted=False):  # type: ignore[override]
+        raise TypeError("The KG snapshot store is read-only")
+
+    def remove(self, triple, context=None):  # type: ignore[override]
+        raise TypeError("The KG snapshot store is read-only")
+
+    # Namespace bindings, as in rdflib's Memory store
+    def bind(self, prefix: str, namespace: URIRef, override: bool = True) -> None:  # type: ignore[override]
+        bound_namespace = self.__namespace.get(prefix)
+        bound_prefix = self.__prefix.get(namespace)
+        if bound_prefix is None and bound_namespace is not None:
+            bound_prefix = self.__prefix.get(bound_namespace)
+        if override:
+            if bound_prefix is not None:
+                self.__namespace.pop(bound_prefix, None)
+            if bound_namespace is not None:
+                self.__prefix.pop(bound_namespace, None)
+            self.__prefix[namespace] = prefix
+            self.__namespace[prefix] = namespace
+        else:
+            ns = bound_namespace if bound_namespace is not None else namespace
+            pf = bound_prefix if bound_prefix is not None else prefix
+            self.__prefix[ns] = pf
+            self.__namespace[pf] = ns
+
+    def namespace(self, prefix: str) -> Optional[URIRef]:  # type: ignore[override]
+        return self.__namespace.get(prefix)
+
+    def prefix(self, namespace: URIRef) -> Optional[str]:  # type: ignore[override]
+        return self.__prefix.get(namespace)
+
+    def namespaces(self):  # type: ignore[override]
+        for prefix, namespace in self.__namespace.items():
+            yield prefix, namespace
+
+
+def _row_key(triple: Tuple[Any, Any, Any]) -> Tuple[Tuple[str, ...], ...]:
+    return tuple(tuple(term_key(t) or ["u", str(t)]) for t in triple)
+
+
+def build_snapshot(
+    graph: Graph,
+    snapshot_dir: Path,
+    source_mtime: float,
+    ttl_files: int = 0,
+    sources: Optional[Dict[str, List[int]]] = None,
+) -> Path:
+    """
+    Compile `graph` into `snapshot_dir` (see module docstring for the format).
+
+    `source_mtime` is the merged_tll latest mtime the graph was parsed from and
+    `sources` the per-paper fingerprints (see kg_operations._source_fingerprints).
+    The named graphs of a Dataset are recorded so `KGSnapshot.dataset` can
+    restore them.
+    """
+    snapshot_dir = Path(snapshot_dir)
+    snapshot_dir.mkdir(parents=True, exist_ok=True)
+    build_dir = Path(tempfile.mkdtemp(prefix=BUILD_PREFIX, dir=snapshot_dir))
+
+    keys: Dict[Tuple[str, ...], None] = {}
+    raw: List[Tuple[Tuple[str, ...], Tuple[str, ...], Tuple[str, ...]]] = []
+    for triple in graph.triples((None, None, None)):
+        row = _row_key(triple)
+        for k in row:
+            keys[k] = None
+        raw.append(row)  # type: ignore[arg-type]
+
+    terms = sorted(keys)
+    ids = {k: i for i, k in enumerate(terms)}
+    spo = sorted({(ids[s], ids[p], ids[o]) for s, p, o in raw})
+
+    contexts: Optional[List[List[Any]]] = None
+    if isinstance(graph, Dataset):
+        row_of = {t: i for i, t in enumerate(spo)}
+        contexts = []
+        members = array("i")
+        for context in sorted(graph.graphs(), key=lambda g: str(g.identifier)):
+            rows = sorted(
+                row_of[tuple(ids[k] for k in _row_key(t))]  # type: ignore[misc]
+                for t in context.triples((None, None, None))
+            )
+            if rows:
+                contexts.append([str(context.identifier), len(rows)])
+                members.extend(rows)
+        with open(build_dir / CONTEXTS_FILE, "wb") as f:
+            members.tofile(f)
+
+    ints = array("i")
+    for order in PERMUTATIONS.values():
+        rows = sorted(tuple(t[pos] for pos in order) for t in spo)
+        for col in range(3):
+            ints.extend(r[col] for r in rows)
+
+    with open(build_dir / TRIPLES_FILE, "wb") as f:
+        ints.tofile(f)
+
+    with open(build_dir / TERMS_FILE, "w", encoding="utf-8") as f:
+        json.dump([list(t) for t in terms], f, ensure_ascii=False)
+
+    meta = {
+        "version": SNAPSHOT_VERSION,
+        "byteorder": sys.byteorder,
+        "built_at_unix": time.time(),
+        "source_merged_ttl_latest_mtime": source_mtime,
+        "ttl_files": ttl_files,
+        "triples": len(spo),
+        "terms": len(terms),
+        "namespaces": sorted([prefix, str(ns)] for prefix, ns in graph.namespaces()),
+        "contexts": contexts,
+        "sources": sources,
+    }
+    with open(build_dir / META_FILE, "w", encoding="utf-8") as f:
+        json.dump(meta, f, indent=2)
+
+    previous = _current_build(snapshot_dir)
+    tmp = snapshot_dir / f"{CURRENT_FILE}.{build_dir.name}.tmp"
+    tmp.write_text(build_dir.name, encoding="utf-8")
+    os.replace(tmp, snapshot_dir / CURRENT_FILE)
+    _remove_old_builds(snapshot_dir, keep={build_dir.name, previous})
+    return snapshot_dir
+
+
+def _current_build(snapshot_dir: Path) -> Optional[str]:
+    """Name of the published build directory, or None."""
+    try:
+        name = (Path(snapshot_dir) / CURRENT_FILE).read_text(encoding="utf-8").strip()
+    except OSError:
+        return None
+    return name or None
+
+
+def _remove_old_builds(snapshot_dir: Path, keep: set) -> None:
+    """Best effort: a build still mapped by another process may not be removable (Windows)."""
+    for path in Path(snapshot_dir).iterdir():
+        if path.is_dir() and path.name.startswith(BUILD_PREFIX) and path.name not in keep:
+            shutil.rmtree(path, ignore_errors=True)
+        elif path.is_file() and path.name in (TERMS_FILE, TRIPLES_FILE, CONTEXTS_FILE, META_FILE):
+            # Files of the single-directory layout written by earlier versions
+            path.unlink()
+
+
+def load_snapshot(snapshot_dir: Path, source_mtime: float) -> Optional[KGSnapshot]:
+    """
+    Memory-map the snapshot published in `snapshot_dir` if it is complete and not
+    older than `source_mtime` (the merged_tll latest mtime); None otherwise.
+    """
+    build = _current_build(Path(snapshot_dir))
+    if build is None:
+        return None
+    snapshot_dir = Path(snapshot_dir) / build
+    try:
+        meta = json.loads((snapshot_dir / META_FILE).read_text(encoding="utf-8"))
+        if meta.get("version") != SNAPSHOT_VERSION or meta.get("byteorder") != sys.byteorder:
+            return None
+        if float(meta.get("source_merged_ttl_latest_mtime") or 0.0) < source_mtime:
+            return None
+        expected = 9 * int(meta["triples"]) * array("i").itemsize
+        if (snapshot_dir / TRIPLES_FILE).stat().st_size != expected:
+            return None
+        if not (snapshot_dir / TERMS_FILE).exists():
+            return None
+        if meta.get("contexts"):
+            members = sum(int(count) for _, count in meta["contexts"])
+            if (snapshot_dir / CONTEXTS_FILE).stat().st_size != members * array("i").itemsize:
+                return None
+        return KGSnapshot(snapshot_dir, meta)
+    except (OSError, ValueError, KeyError, TypeError):
+        return None
+
+
+def main() -> None:
+    from mini_marie.kg_server.kg_operations import (
+        _latest_mtime_in_dir,
+        _merged_ttl_dir,
+        _snapshot_dir,
+        _source_fingerprints,
+        load_knowledge_graph,
+    )
+
+    parser = argparse.ArgumentParser(description="Build or inspect the compiled merged-KG snapshot.")
+    parser.add_argument("--rebuild", action="store_true", help="Re-parse merged_tll and rewrite the snapshot")
+    parser.add_argument("--data-path", default=None, help="merged_tll directory (default: evaluation/data/merged_tll)")
+    parser.add_argument("--out", default=None, help="Snapshot directory (default: data/mini_marie_cache/kg_snapshot)")
+    args = parser.parse_args()
+
+    data_path = Path(args.data_path) if args.data_path else _merged_ttl_dir()
+    out = Path(args.out) if args.out else _snapshot_dir()
+    source_mtime = _latest_mtime_in_dir(data_path)
+
+    snapshot = None if args.rebuild else load_snapshot(out, source_mtime)
+    if snapshot is None:
+        t0 = time.perf_counter()
+        sources = _source_fingerprints(data_path)
+        graph = load_knowledge_graph(str(data_path))
+        build_snapshot(graph, out, source_mtime, len(sources), sources)
+        print(f"Built snapshot of {len(graph)} triples in {time.perf_counter() - t0:.2f}s: {out}")
+        return
+
+    t0 = time.perf_counter()
+    snapshot.close()
+    snapshot = load_snapshot(out, source_mtime)
+    print(
+        f"Snapshot is up to date: {snapshot.meta['triples']} triples, {snapshot.meta['terms']} terms, "
+        f"{snapshot.meta['ttl_files']} TTL files (mapped in {(time.perf_counter() - t0) * 1000:.1f} ms): {out}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -7,10 +7,12 @@ Uses SPARQL queries from kg_operations.py
 
 from fastmcp import FastMCP
 import logging
+import os
 import sys
 from pathlib import Path
 from functools import wraps
 import threading
+import time
 
 # Import all operations
 from mini_marie.kg_server.kg_operations import (
@@ -58,8 +60,13 @@ from mini_marie.kg_server.kg_operations import (
     get_synthesis_separation_solvents,
     get_hnmr_for_synthesis,
     get_common_hnmr_solvents,
+    build_synthesis_views,
+    get_synthesis_overview,
+    query_cache_stats,
+    refresh_kg,
     format_results_as_tsv,
 )
+from mini_marie.kg_server.tool_executor import KGToolExecutor
 
 # Set up logging
 def setup_mops_kg_logger():
@@ -154,6 +161,18 @@ def mops_kg_tool_logger(func):
 
 mcp = FastMCP(name="mops-kg")
 
+# rdflib queries and difflib scoring block; run them off the event loop so parallel
+# tool calls overlap and a label index rebuild does not stall the server.
+kg_executor = KGToolExecutor(max_workers=int(os.environ.get("MARIE_KG_WORKERS", "4")))
+
+
+async def run_kg(fn, *args, **kwargs):
+    """Await a blocking kg_operations call on the bounded KG executor."""
+    result = await kg_executor.run(fn, *args, **kwargs)
+    stats = kg_executor.stats()
+    logger.info(f"{fn.__name__} done (in flight: {stats['in_flight']}, peak: {stats['peak_in_flight']})")
+    return result
+
 # Warm the local fuzzy index automatically on server startup (no tool call needed).
 # This runs in a background thread so the MCP server can accept requests immediately.
 def _warmup_index_background():
@@ -162,8 +181,34 @@ def _warmup_index_background():
         logger.warning("Local fuzzy index warmed and cached")
     except Exception as e:
         logger.error(f"Failed to warm local fuzzy index: {e}", exc_info=True)
-
-threading.Thread(target=_warmup_index_background, daemon=True).start()
+    try:
+        build_synthesis_views(force=False)
+        logger.warning("Per-synthesis views materialized")
+    except Exception as e:
+        logger.error(f"Failed to materialize synthesis views: {e}", exc_info=True)
+
+
+# Pick up papers republished by the pipeline: every MARIE_KG_RELOAD_INTERVAL seconds
+# (default 30, 0 disables) changed merged TTLs are reloaded one named graph at a time.
+def _reload_changed_papers_background(interval: float):
+    while True:
+        time.sleep(interval)
+        try:
+            summary = refresh_kg()
+            if summary["changed"] or summary["removed"]:
+                logger.warning(
+                    f"Reloaded papers {summary['changed']} (removed {summary['removed']}) "
+                    f"in {summary['seconds']}s, KG version {summary['kg_version']}"
+                )
+        except Exception as e:
+            logger.error(f"Failed to reload changed papers: {e}", exc_info=True)
+
+def _start_background_threads():
+    # Only when run as the server, not on import (e.g. by the tests)
+    threading.Thread(target=_warmup_index_background, daemon=True).start()
+    reload_interval = float(os.environ.get("MARIE_KG_RELOAD_INTERVAL", "30"))
+    if reload_interval > 0:
+        threading.Thread(target=_reload_changed_papers_background, args=(reload_interval,), daemon=True).start()
 
 @mcp.prompt(name="instruction")
 def instruction_prompt():
@@ -218,6 +263,8 @@ def instruction_prompt():
         "**Characterisation extras (OntoSpecies):**\n"
         "40. get_hnmr_for_synthesis - HNMR shifts/solvent/temperature for a synthesis output\n"
         "41. get_common_hnmr_solvents - Most common HNMR solvents across corpus\n\n"
+        "**One-shot Synthesis Overview:**\n"
+        "42. get_synthesis_overview - Steps, conditions, recipe, products, yield and characterisation (incl. CCDC) in one call\n\n"
         "**Query Logic:**\n"
         "The knowledge graph follows: Synthesis → Chemical Output → MOP\n"
         "Always start from synthesis when looking for relationships.\n\n"
@@ -236,7 +283,7 @@ def instruction_prompt():
 @mcp.tool(name="lookup_synthesis_by_name", description="Find synthesis IRI and verify existence by name")
 async def lookup_synthesis_by_name(name: str) -> str:
     """Find synthesis IRI by its label/name."""
-    results = lookup_synthesis_iri(name)
+    results = await run_kg(lookup_synthesis_iri, name)
     if not results:
         return f"No synthesis found with name: {name}"
     return format_results_as_tsv(results)
@@ -245,7 +292,7 @@ async def lookup_synthesis_by_name(name: str) -> str:
 @mcp.tool(name="lookup_mop_by_name", description="Find MOP IRI and basic info by name")
 async def lookup_mop_by_name(name: str) -> str:
     """Find MOP IRI by its label/name."""
-    results = lookup_mop_iri(name)
+    results = await run_kg(lookup_mop_iri, name)
     if not results:
         return f"No MOP found with name: {name}"
     return format_results_as_tsv(results)
@@ -254,7 +301,7 @@ async def lookup_mop_by_name(name: str) -> str:
 @mcp.tool(name="lookup_mop_by_ccdc", description="Find MOP by CCDC number")
 async def lookup_mop_by_ccdc(ccdc_number: str) -> str:
     """Find MOPs by CCDC number."""
-    results = lookup_by_ccdc(ccdc_number)
+    results = await run_kg(lookup_by_ccdc, ccdc_number)
     if not results:
         return f"No MOP found with CCDC number: {ccdc_number}"
     return format_results_as_tsv(results)
@@ -267,14 +314,14 @@ async def lookup_mop_by_ccdc(ccdc_number: str) -> str:
 @mcp.tool(name="get_all_mops", description="Get all MOPs with CCDC numbers and formulas")
 async def get_all_mops_tool(limit: int = 100) -> str:
     """Get all MOPs with their CCDC numbers and formulas."""
-    results = get_all_mops(limit=limit)
+    results = await run_kg(get_all_mops, limit=limit)
     return format_results_as_tsv(results)
 
 @mops_kg_tool_logger
 @mcp.tool(name="get_kg_statistics", description="Get overall knowledge graph statistics")
 async def get_kg_statistics_tool() -> str:
     """Get overall statistics about the knowledge graph."""
-    stats = get_kg_statistics()
+    stats = await run_kg(get_kg_statistics)
     stats_list = [{"metric": k, "value": str(v)} for k, v in stats.items()]
     return format_results_as_tsv(stats_list)
 
@@ -286,7 +333,7 @@ async def get_kg_statistics_tool() -> str:
 @mcp.tool(name="get_synthesis_recipe", description="Get complete recipe (chemicals, amounts, suppliers) for a synthesis")
 async def get_synthesis_recipe_tool(synthesis_name: str) -> str:
     """Get the complete recipe (chemical inputs) for a synthesis."""
-    results = get_synthesis_recipe(synthesis_name)
+    results = await run_kg(get_synthesis_recipe, synthesis_name)
     if not results:
         return f"No recipe found for synthesis: {synthesis_name}"
     return format_results_as_tsv(results)
@@ -295,7 +342,7 @@ async def get_synthesis_recipe_tool(synthesis_name: str) -> str:
 @mcp.tool(name="get_synthesis_steps", description="Get all synthesis steps and their types for a procedure")
 async def get_synthesis_steps_tool(synthesis_name: str) -> str:
     """Get all synthesis steps for a procedure."""
-    results = get_synthesis_steps(synthesis_name)
+    results = await run_kg(get_synthesis_steps, synthesis_name)
     if not results:
         return f"No steps found for synthesis: {synthesis_name}"
     return format_results_as_tsv(results)
@@ -305,7 +352,7 @@ async def get_synthesis_steps_tool(synthesis_name: str) -> str:
 async def get_synthesis_temperatures_tool(synthesis_name: str, order: str = "asc") -> str:
     """Get temperature conditions for a synthesis."""
     # Keep backward compat: default order matches previous behavior (ascending)
-    results = get_synthesis_temperatures_ordered(synthesis_name, order=order)
+    results = await run_kg(get_synthesis_temperatures_ordered, synthesis_name, order=order)
     if not results:
         return f"No temperature data found for synthesis: {synthesis_name}"
     return format_results_as_tsv(results)
@@ -314,7 +361,7 @@ async def get_synthesis_temperatures_tool(synthesis_name: str, order: str = "asc
 @mcp.tool(name="get_synthesis_durations", description="Get duration/time conditions for synthesis steps (order: asc|desc|none)")
 async def get_synthesis_durations_tool(synthesis_name: str, order: str = "asc") -> str:
     """Get duration conditions for a synthesis."""
-    results = get_synthesis_durations_ordered(synthesis_name, order=order)
+    results = await run_kg(get_synthesis_durations_ordered, synthesis_name, order=order)
     if not results:
         return f"No duration data found for synthesis: {synthesis_name}"
     return format_results_as_tsv(results)
@@ -327,7 +374,7 @@ async def get_synthesis_durations_tool(synthesis_name: str, order: str = "asc")
 @mops_kg_tool_logger
 @mcp.tool(name="get_synthesis_step_index", description="Get step IRIs, labels, optional order and types for a synthesis")
 async def get_synthesis_step_index_tool(synthesis_name: str) -> str:
-    results = get_synthesis_step_index(synthesis_name)
+    results = await run_kg(get_synthesis_step_index, synthesis_name)
     if not results:
         return f"No steps found for synthesis: {synthesis_name}"
     return format_results_as_tsv(results)
@@ -343,7 +390,7 @@ async def get_synthesis_step_temperatures_atomic_tool(
     temperature_kind: str = "any",
     order: str = "asc",
 ) -> str:
-    results = get_synthesis_step_temperatures(synthesis_name, temperature_kind=temperature_kind, order=order)
+    results = await run_kg(get_synthesis_step_temperatures, synthesis_name, temperature_kind=temperature_kind, order=order)
     if not results:
         return f"No step temperature data found for synthesis: {synthesis_name}"
     return format_results_as_tsv(results)
@@ -358,7 +405,7 @@ async def get_synthesis_step_temperature_rates_tool(
     synthesis_name: str,
     order: str = "asc",
 ) -> str:
-    results = get_synthesis_step_temperature_rates(synthesis_name, order=order)
+    results = await run_kg(get_synthesis_step_temperature_rates, synthesis_name, order=order)
     if not results:
         return f"No step temperature-rate data found for synthesis: {synthesis_name}"
     return format_results_as_tsv(results)
@@ -373,7 +420,7 @@ async def get_synthesis_step_transferred_amounts_tool(
     synthesis_name: str,
     order: str = "asc",
 ) -> str:
-    results = get_synthesis_step_transferred_amounts(synthesis_name, order=order)
+    results = await run_kg(get_synthesis_step_transferred_amounts, synthesis_name, order=order)
     if not results:
         return f"No step transferred-amount data found for synthesis: {synthesis_name}"
     return format_results_as_tsv(results)
@@ -385,7 +432,7 @@ async def get_synthesis_step_transferred_amounts_tool(
     description="Get step-level vessel name/type/environment where available",
 )
 async def get_synthesis_step_vessels_tool(synthesis_name: str) -> str:
-    results = get_synthesis_step_vessels(synthesis_name)
+    results = await run_kg(get_synthesis_step_vessels, synthesis_name)
     if not results:
         return f"No step vessel data found for synthesis: {synthesis_name}"
     return format_results_as_tsv(results)
@@ -401,7 +448,7 @@ async def get_synthesis_step_vessels_tool(synthesis_name: str) -> str:
     description="List OntoSpecies species that have characterisation sessions (limit, order: asc|desc|none)",
 )
 async def list_characterisation_species_tool(limit: int = 100, order: str = "asc") -> str:
-    results = list_characterisation_species(limit=limit, order=order)
+    results = await run_kg(list_characterisation_species, limit=limit, order=order)
     if not results:
         return "No characterised species found"
     return format_results_as_tsv(results)
@@ -413,7 +460,7 @@ async def list_characterisation_species_tool(limit: int = 100, order: str = "asc
     description="List syntheses that have characterised species outputs (limit, order: asc|desc|none)",
 )
 async def list_syntheses_with_characterisation_tool(limit: int = 100, order: str = "asc") -> str:
-    results = list_syntheses_with_characterisation(limit=limit, order=order)
+    results = await run_kg(list_syntheses_with_characterisation, limit=limit, order=order)
     if not results:
         return "No syntheses with characterisation found"
     return format_results_as_tsv(results)
@@ -425,7 +472,7 @@ async def list_syntheses_with_characterisation_tool(limit: int = 100, order: str
     description="List characterisation devices discovered under characterisation sessions (limit)",
 )
 async def list_characterisation_devices_tool(limit: int = 100) -> str:
-    results = list_characterisation_devices(limit=limit)
+    results = await run_kg(list_characterisation_devices, limit=limit)
     if not results:
         return "No characterisation devices found"
     return format_results_as_tsv(results)
@@ -441,7 +488,7 @@ async def get_characterisation_for_synthesis_tool(
     order: str = "none",
     order_by: str = "speciesLabel",
 ) -> str:
-    results = get_characterisation_for_synthesis(synthesis_name, order=order, order_by=order_by)
+    results = await run_kg(get_characterisation_for_synthesis, synthesis_name, order=order, order_by=order_by)
     if not results:
         return f"No characterisation found for synthesis: {synthesis_name}"
     return format_results_as_tsv(results)
@@ -453,7 +500,7 @@ async def get_characterisation_for_synthesis_tool(
     description="Get characterisation summary for a CCDC number (order: asc|desc|none)",
 )
 async def get_characterisation_by_ccdc_tool(ccdc_number: str, order: str = "none") -> str:
-    results = get_characterisation_by_ccdc(ccdc_number, order=order)
+    results = await run_kg(get_characterisation_by_ccdc, ccdc_number, order=order)
     if not results:
         return f"No characterisation found for CCDC number: {ccdc_number}"
     return format_results_as_tsv(results)
@@ -465,7 +512,7 @@ async def get_characterisation_by_ccdc_tool(ccdc_number: str, order: str = "none
     description="Get most commonly used materials for IR spectroscopy across the corpus (limit, order: asc|desc|none)",
 )
 async def get_common_ir_materials_tool(limit: int = 20, order: str = "desc") -> str:
-    results = get_common_ir_materials(limit=limit, order=order)
+    results = await run_kg(get_common_ir_materials, limit=limit, order=order)
     if not results:
         return "No IR spectroscopy material usage found"
     return format_results_as_tsv(results)
@@ -481,7 +528,7 @@ async def get_common_ir_materials_tool(limit: int = 20, order: str = "desc") ->
     description="Rebuild the local fuzzy index cache from the KG (force=true).",
 )
 async def refresh_local_fuzzy_index_tool() -> str:
-    warm_label_index(force=True)
+    await run_kg(warm_label_index, force=True)
     return "Local fuzzy index refreshed"
 
 
@@ -491,7 +538,7 @@ async def refresh_local_fuzzy_index_tool() -> str:
     description="Fuzzy search synthesis names locally (limit, cutoff 0-1).",
 )
 async def fuzzy_lookup_synthesis_name_tool(query: str, limit: int = 10, cutoff: float = 0.6) -> str:
-    results = fuzzy_lookup_synthesis_name(query, limit=limit, cutoff=cutoff)
+    results = await run_kg(fuzzy_lookup_synthesis_name, query, limit=limit, cutoff=cutoff)
     if not results:
         return "No close matches found"
     return format_results_as_tsv(results)
@@ -503,7 +550,7 @@ async def fuzzy_lookup_synthesis_name_tool(query: str, limit: int = 10, cutoff:
     description="Fuzzy search MOP names locally (limit, cutoff 0-1).",
 )
 async def fuzzy_lookup_mop_name_tool(query: str, limit: int = 10, cutoff: float = 0.6) -> str:
-    results = fuzzy_lookup_mop_name(query, limit=limit, cutoff=cutoff)
+    results = await run_kg(fuzzy_lookup_mop_name, query, limit=limit, cutoff=cutoff)
     if not results:
         return "No close matches found"
     return format_results_as_tsv(results)
@@ -515,7 +562,7 @@ async def fuzzy_lookup_mop_name_tool(query: str, limit: int = 10, cutoff: float
     description="Fuzzy search chemical input names locally (limit, cutoff 0-1).",
 )
 async def fuzzy_lookup_chemical_name_tool(query: str, limit: int = 10, cutoff: float = 0.6) -> str:
-    results = fuzzy_lookup_chemical_name(query, limit=limit, cutoff=cutoff)
+    results = await run_kg(fuzzy_lookup_chemical_name, query, limit=limit, cutoff=cutoff)
     if not results:
         return "No close matches found"
     return format_results_as_tsv(results)
@@ -527,7 +574,7 @@ async def fuzzy_lookup_chemical_name_tool(query: str, limit: int = 10, cutoff: f
     description="Fuzzy search IR material names locally (limit, cutoff 0-1).",
 )
 async def fuzzy_lookup_ir_material_tool(query: str, limit: int = 10, cutoff: float = 0.6) -> str:
-    results = fuzzy_lookup_ir_material(query, limit=limit, cutoff=cutoff)
+    results = await run_kg(fuzzy_lookup_ir_material, query, limit=limit, cutoff=cutoff)
     if not results:
         return "No close matches found"
     return format_results_as_tsv(results)
@@ -539,7 +586,7 @@ async def fuzzy_lookup_ir_material_tool(query: str, limit: int = 10, cutoff: flo
     description="Given a MOP name (label), list synthesis labels that produce it.",
 )
 async def get_syntheses_producing_mop_tool(mop_name: str) -> str:
-    results = get_syntheses_producing_mop(mop_name)
+    results = await run_kg(get_syntheses_producing_mop, mop_name)
     if not results:
         return f"No syntheses found producing MOP: {mop_name}"
     return format_results_as_tsv(results)
@@ -555,7 +602,7 @@ async def find_mops_by_cbu_formula_contains_tool(
     limit: int = 100,
     order: str = "asc",
 ) -> str:
-    results = find_mops_by_cbu_formula_contains(substring=substring, limit=limit, order=order)
+    results = await run_kg(find_mops_by_cbu_formula_contains, substring=substring, limit=limit, order=order)
     if not results:
         return f"No MOPs found with CBU formula containing: {substring}"
     return format_results_as_tsv(results)
@@ -564,7 +611,7 @@ async def find_mops_by_cbu_formula_contains_tool(
 @mops_kg_tool_logger
 @mcp.tool(name="get_synthesis_document_context", description="Get document context (section/anchor) for a synthesis")
 async def get_synthesis_document_context_tool(synthesis_name: str) -> str:
-    results = get_synthesis_document_context(synthesis_name)
+    results = await run_kg(get_synthesis_document_context, synthesis_name)
     if not results:
         return f"No document context found for synthesis: {synthesis_name}"
     return format_results_as_tsv(results)
@@ -573,7 +620,7 @@ async def get_synthesis_document_context_tool(synthesis_name: str) -> str:
 @mops_kg_tool_logger
 @mcp.tool(name="get_synthesis_inheritance", description="Get inheritance links for a synthesis (inherits_from / inherited_by)")
 async def get_synthesis_inheritance_tool(synthesis_name: str) -> str:
-    results = get_synthesis_inheritance(synthesis_name)
+    results = await run_kg(get_synthesis_inheritance, synthesis_name)
     if not results:
         return f"No inheritance links found for synthesis: {synthesis_name}"
     return format_results_as_tsv(results)
@@ -582,7 +629,7 @@ async def get_synthesis_inheritance_tool(synthesis_name: str) -> str:
 @mops_kg_tool_logger
 @mcp.tool(name="get_synthesis_yield", description="Get yield value(s) for a synthesis if present")
 async def get_synthesis_yield_tool(synthesis_name: str) -> str:
-    results = get_synthesis_yield(synthesis_name)
+    results = await run_kg(get_synthesis_yield, synthesis_name)
     if not results:
         return f"No yield found for synthesis: {synthesis_name}"
     return format_results_as_tsv(results)
@@ -591,7 +638,7 @@ async def get_synthesis_yield_tool(synthesis_name: str) -> str:
 @mops_kg_tool_logger
 @mcp.tool(name="get_synthesis_equipment", description="Get process equipment used (global + per-step)")
 async def get_synthesis_equipment_tool(synthesis_name: str) -> str:
-    results = get_synthesis_equipment(synthesis_name)
+    results = await run_kg(get_synthesis_equipment, synthesis_name)
     if not results:
         return f"No equipment found for synthesis: {synthesis_name}"
     return format_results_as_tsv(results)
@@ -600,7 +647,7 @@ async def get_synthesis_equipment_tool(synthesis_name: str) -> str:
 @mops_kg_tool_logger
 @mcp.tool(name="get_synthesis_step_parameters", description="Get free-text step parameters (ontosyn:hasParameter)")
 async def get_synthesis_step_parameters_tool(synthesis_name: str) -> str:
-    results = get_synthesis_step_parameters(synthesis_name)
+    results = await run_kg(get_synthesis_step_parameters, synthesis_name)
     if not results:
         return f"No step parameters found for synthesis: {synthesis_name}"
     return format_results_as_tsv(results)
@@ -609,7 +656,7 @@ async def get_synthesis_step_parameters_tool(synthesis_name: str) -> str:
 @mops_kg_tool_logger
 @mcp.tool(name="get_synthesis_step_vessel_environments", description="Get atmosphere/vessel environment per step (explicit only)")
 async def get_synthesis_step_vessel_environments_tool(synthesis_name: str) -> str:
-    results = get_synthesis_step_vessel_environments(synthesis_name)
+    results = await run_kg(get_synthesis_step_vessel_environments, synthesis_name)
     if not results:
         return f"No vessel environment data found for synthesis: {synthesis_name}"
     return format_results_as_tsv(results)
@@ -618,7 +665,7 @@ async def get_synthesis_step_vessel_environments_tool(synthesis_name: str) -> st
 @mops_kg_tool_logger
 @mcp.tool(name="get_synthesis_drying_conditions", description="Get Dry step conditions (temp/pressure/agent)")
 async def get_synthesis_drying_conditions_tool(synthesis_name: str) -> str:
-    results = get_synthesis_drying_conditions(synthesis_name)
+    results = await run_kg(get_synthesis_drying_conditions, synthesis_name)
     if not results:
         return f"No drying conditions found for synthesis: {synthesis_name}"
     return format_results_as_tsv(results)
@@ -627,7 +674,7 @@ async def get_synthesis_drying_conditions_tool(synthesis_name: str) -> str:
 @mops_kg_tool_logger
 @mcp.tool(name="get_synthesis_evaporation_conditions", description="Get Evaporate step conditions (temp/pressure/target volume/removed species)")
 async def get_synthesis_evaporation_conditions_tool(synthesis_name: str) -> str:
-    results = get_synthesis_evaporation_conditions(synthesis_name)
+    results = await run_kg(get_synthesis_evaporation_conditions, synthesis_name)
     if not results:
         return f"No evaporation conditions found for synthesis: {synthesis_name}"
     return format_results_as_tsv(results)
@@ -636,7 +683,7 @@ async def get_synthesis_evaporation_conditions_tool(synthesis_name: str) -> str:
 @mops_kg_tool_logger
 @mcp.tool(name="get_synthesis_separation_solvents", description="Get Separate step solvents (extraction/phase separation media)")
 async def get_synthesis_separation_solvents_tool(synthesis_name: str) -> str:
-    results = get_synthesis_separation_solvents(synthesis_name)
+    results = await run_kg(get_synthesis_separation_solvents, synthesis_name)
     if not results:
         return f"No separation solvents found for synthesis: {synthesis_name}"
     return format_results_as_tsv(results)
@@ -645,7 +692,7 @@ async def get_synthesis_separation_solvents_tool(synthesis_name: str) -> str:
 @mops_kg_tool_logger
 @mcp.tool(name="get_hnmr_for_synthesis", description="HNMR shifts/solvent/temperature for species outputs of a synthesis")
 async def get_hnmr_for_synthesis_tool(synthesis_name: str) -> str:
-    results = get_hnmr_for_synthesis(synthesis_name)
+    results = await run_kg(get_hnmr_for_synthesis, synthesis_name)
     if not results:
         return f"No HNMR data found for synthesis: {synthesis_name}"
     return format_results_as_tsv(results)
@@ -654,7 +701,7 @@ async def get_hnmr_for_synthesis_tool(synthesis_name: str) -> str:
 @mops_kg_tool_logger
 @mcp.tool(name="get_common_hnmr_solvents", description="Most common HNMR solvents across the corpus (limit, order)")
 async def get_common_hnmr_solvents_tool(limit: int = 20, order: str = "desc") -> str:
-    results = get_common_hnmr_solvents(limit=limit, order=order)
+    results = await run_kg(get_common_hnmr_solvents, limit=limit, order=order)
     if not results:
         return "No HNMR solvent usage found"
     return format_results_as_tsv(results)
@@ -663,11 +710,20 @@ async def get_common_hnmr_solvents_tool(limit: int = 20, order: str = "desc") ->
 @mcp.tool(name="get_synthesis_products", description="Get MOP products from a synthesis (Synthesis → Output → MOP)")
 async def get_synthesis_products_tool(synthesis_name: str) -> str:
     """Get MOP products from a synthesis."""
-    results = get_synthesis_products(synthesis_name)
+    results = await run_kg(get_synthesis_products, synthesis_name)
     if not results:
         return f"No MOP products found for synthesis: {synthesis_name}"
     return format_results_as_tsv(results)
 
+@mops_kg_tool_logger
+@mcp.tool(name="get_synthesis_overview", description="Get the full record of a synthesis in one call: ordered steps with conditions, recipe, products, yield and characterisation (incl. CCDC)")
+async def get_synthesis_overview_tool(synthesis_name: str) -> str:
+    """Get the materialized per-synthesis overview, one TSV block per section."""
+    overview = await run_kg(get_synthesis_overview, synthesis_name)
+    if not overview:
+        return f"No data found for synthesis: {synthesis_name}"
+    return "\n\n".join(f"## {section}\n{format_results_as_tsv(rows)}" for section, rows in overview.items())
+
 # ============================================================================
 # MOP Query Tools
 # ============================================================================
@@ -676,7 +732,7 @@ async def get_synthesis_products_tool(synthesis_name: str) -> str:
 @mcp.tool(name="get_mop_building_units", description="Get chemical building units (CBUs) for a specific MOP")
 async def get_mop_building_units_tool(mop_name: str) -> str:
     """Get chemical building units for a specific MOP."""
-    results = get_mop_building_units(mop_name)
+    results = await run_kg(get_mop_building_units, mop_name)
     if not results:
         return f"No CBU data found for MOP: {mop_name}"
     return format_results_as_tsv(results)
@@ -689,9 +745,22 @@ async def get_mop_building_units_tool(mop_name: str) -> str:
 @mcp.tool(name="get_common_chemicals", description="Get most commonly used chemicals across all syntheses")
 async def get_common_chemicals_tool(limit: int = 20) -> str:
     """Get most commonly used chemicals across all syntheses."""
-    results = get_common_chemicals(limit=limit)
+    results = await run_kg(get_common_chemicals, limit=limit)
     return format_results_as_tsv(results)
 
+# ============================================================================
+# Server Diagnostics
+# ============================================================================
+
+@mops_kg_tool_logger
+@mcp.tool(name="get_server_stats", description="Get KG executor concurrency (in-flight/peak requests) and query cache statistics")
+async def get_server_stats_tool() -> str:
+    """Get executor and query cache counters of this server."""
+    stats = {f"executor_{k}": v for k, v in kg_executor.stats().items()}
+    stats.update({f"query_cache_{k}": v for k, v in query_cache_stats().items()})
+    return format_results_as_tsv([stats])
+
 if __name__ == "__main__":
+    _start_background_threads()
     mcp.run(transport="stdio")
 
@@ -0,0 +1,99 @@
+"""
+Size-bounded LRU cache for SPARQL results of the MOPs KG tools.
+
+Results are lists of flat `{var: str | None}` rows. Entries are keyed by
+(query id, query text, bindings, KG version) and evicted least-recently-used
+first once the estimated size of all cached rows exceeds `max_bytes`.
+Callers get copies, so post-processing a result never alters the cache.
+"""
+
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+Rows = List[Dict[str, Any]]
+
+# Rough per-row / per-entry overhead on top of the string payload
+_ROW_OVERHEAD = 64
+_ENTRY_OVERHEAD = 256
+
+
+def estimate_size(rows: Rows) -> int:
+    """Approximate memory taken by a result, in bytes."""
+    size = _ENTRY_OVERHEAD
+    for row in rows:
+        size += _ROW_OVERHEAD
+        for k, v in row.items():
+            size += sys.getsizeof(k) + (sys.getsizeof(v) if v is not None else 0)
+    return size
+
+
+class QueryResultCache:
+    """Thread-safe LRU over query results with a byte budget."""
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024):
+        self.max_bytes = int(max_bytes)
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Hashable) -> Optional[Rows]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            rows = entry[0]
+        return [dict(r) for r in rows]
+
+    def put(self, key: Hashable, rows: Rows) -> None:
+        size = estimate_size(rows)
+        if size > self.max_bytes:
+            return
+        stored = [dict(r) for r in rows]
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[key] = (stored, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes and self._entries:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._bytes -= evicted
+
+    def rekey(self, fn: Callable[[Hashable], Optional[Hashable]]) -> int:
+        """
+        Replace every key by `fn(key)`, dropping the entries it maps to None (e.g.
+        to carry results that are still valid over to a new KG version). Returns
+        the number of entries kept.
+        """
+        with self._lock:
+            entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+            for key, entry in self._entries.items():
+                new_key = fn(key)
+                if new_key is None:
+                    self._bytes -= entry[1]
+                else:
+                    entries[new_key] = entry
+            self._entries = entries
+            return len(entries)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+            }
@@ -0,0 +1,66 @@
+"""
+Readers-writer lock guarding the in-memory MOPs KG.
+
+Tool queries only read the graph and run in parallel on the KG executor; a paper
+reload (kg_operations.refresh_kg) mutates it in place. rdflib's memory store is
+not safe to iterate while it changes, so queries hold the read side and the
+reload holds the write side for the short swap of one paper's triples.
+
+Writers are preferred (new readers wait while a writer is waiting) so a reload
+is not starved by a steady stream of queries. The read side is reentrant per
+thread (and open to the thread holding the write side), so nested reads never
+deadlock against a waiting writer.
+"""
+
+import threading
+from contextlib import contextmanager
+from typing import Iterator
+
+
+class ReadWriteLock:
+    """Many readers or one writer."""
+
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = False
+        self._writers_waiting = 0
+        self._local = threading.local()
+
+    @contextmanager
+    def read(self) -> Iterator[None]:
+        depth = getattr(self._local, "depth", 0)
+        if depth == 0 and not getattr(self._local, "writing", False):
+            with self._cond:
+                while self._writer or self._writers_waiting:
+                    self._cond.wait()
+                self._readers += 1
+        self._local.depth = depth + 1
+        try:
+            yield
+        finally:
+            self._local.depth = depth
+            if depth == 0 and not getattr(self._local, "writing", False):
+                with self._cond:
+                    self._readers -= 1
+                    if self._readers == 0:
+                        self._cond.notify_all()
+
+    @contextmanager
+    def write(self) -> Iterator[None]:
+        with self._cond:
+            self._writers_waiting += 1
+            try:
+                while self._writer or self._readers:
+                    self._cond.wait()
+            finally:
+                self._writers_waiting -= 1
+            self._writer = True
+        self._local.writing = True
+        try:
+            yield
+        finally:
+            self._local.writing = False
+            with self._cond:
+                self._writer = False
+                self._cond.notify_all()
@@ -0,0 +1,168 @@
+"""
+Per-synthesis materialized views of the MOPs KG tool queries.
+
+Most MARIE questions walk Synthesis -> Recipe/Steps -> Conditions -> Products,
+i.e. a dozen per-synthesis tool queries, each a multi-join SPARQL evaluation
+with `?synthesisName` bound to one label. A view runs such a query once for the
+whole graph, with `?synthesisName` left unbound and projected, and groups the
+rows by synthesis label. Answering the tool for any synthesis is then a dict
+lookup.
+
+Rows for label X are exactly the rows the bound query returns: the bound
+variable is joined like any other, DISTINCT applies per label, and ORDER BY is
+kept so each group stays in query order. Only plain literals are grouped,
+matching the plain literal that `run_query` binds.
+
+Each view is stored column-wise: the column names once, then one tuple of
+values per row. Views are persisted next to the label index and invalidated by
+the merged_tll mtime or by any change to the query texts.
+
+When one paper is reloaded, only its syntheses are recomputed: `invalidate`
+marks their labels stale (lookups for them fall back to SPARQL) and `refresh`
+re-materializes the views over a graph holding just the papers those syntheses
+depend on, replacing only their groups.
+"""
+
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from rdflib import Graph, Literal as RDFLiteral
+from rdflib.plugins.sparql import prepareQuery
+
+GROUP_VAR = "synthesisName"
+VIEWS_VERSION = 1
+
+# (query id, query text)
+QueryKey = Tuple[str, str]
+
+_SELECT_DISTINCT = re.compile(r"\bSELECT\s+DISTINCT\b", re.IGNORECASE)
+
+
+def unbound_query(query: str, var: str = GROUP_VAR) -> str:
+    """`query` with `?var` added to the projection of its (single) SELECT DISTINCT."""
+    if re.search(r"\bLIMIT\b|\bGROUP\s+BY\b", query, re.IGNORECASE):
+        raise ValueError("Queries with LIMIT or GROUP BY cannot be materialized per synthesis")
+    if len(_SELECT_DISTINCT.findall(query)) != 1:
+        raise ValueError("Expected exactly one SELECT DISTINCT")
+    return _SELECT_DISTINCT.sub(f"SELECT DISTINCT ?{var}", query, count=1)
+
+
+def query_signature(keys: Iterable[QueryKey]) -> str:
+    h = hashlib.sha256()
+    for query_id, query in sorted(keys):
+        h.update(query_id.encode("utf-8") + b"\0" + query.encode("utf-8") + b"\0")
+    return h.hexdigest()[:16]
+
+
+class SectionView:
+    """Rows of one query, grouped by synthesis label, stored column-wise."""
+
+    def __init__(self, columns: List[str], groups: Dict[str, List[Tuple[Optional[str], ...]]]):
+        self.columns = list(columns)
+        self.groups = groups
+
+    def rows(self, name: str) -> List[Dict[str, Any]]:
+        return [dict(zip(self.columns, values)) for values in self.groups.get(name, ())]
+
+    def to_json(self) -> Dict[str, Any]:
+        return {"columns": self.columns, "groups": {k: [list(v) for v in rows] for k, rows in self.groups.items()}}
+
+    @classmethod
+    def from_json(cls, data: Dict[str, Any]) -> "SectionView":
+        return cls(data["columns"], {k: [tuple(v) for v in rows] for k, rows in data["groups"].items()})
+
+
+def materialize(graph: Graph, query: str, var: str = GROUP_VAR) -> SectionView:
+    """Evaluate `query` once with `?var` unbound and group its rows by the value of `?var`."""
+    prepared = prepareQuery(unbound_query(query, var), initNs=dict(graph.namespaces()))
+    result = graph.query(prepared)
+    columns = [str(v) for v in result.vars if str(v) != var]
+    groups: Dict[str, List[Tuple[Optional[str], ...]]] = {}
+    for row in result:
+        key = row[var]
+        if not isinstance(key, RDFLiteral) or key.datatype is not None or key.language:
+            continue
+        values = tuple(str(row[c]) if row[c] is not None else None for c in columns)
+        groups.setdefault(str(key), []).append(values)
+    return SectionView(columns, groups)
+
+
+class SynthesisViews:
+    """Materialized views for a fixed set of per-synthesis queries."""
+
+    def __init__(self, views: Dict[QueryKey, SectionView], meta: Optional[Dict[str, Any]] = None):
+        self.views = views
+        self.meta = dict(meta or {})
+        # Labels whose groups are being recomputed; not answered from the views
+        self.stale: frozenset = frozenset()
+
+    @classmethod
+    def build(cls, graph: Graph, keys: Iterable[QueryKey], meta: Optional[Dict[str, Any]] = None) -> "SynthesisViews":
+        keys = sorted(set(keys))
+        views = {key: materialize(graph, key[1]) for key in keys}
+        meta = dict(meta or {})
+        meta["signature"] = query_signature(keys)
+        return cls(views, meta)
+
+    def lookup(self, query_id: str, query: str, name: str) -> Optional[List[Dict[str, Any]]]:
+        """Rows of the bound query for synthesis `name`; None if the query has no view."""
+        view = self.views.get((query_id, query))
+        if view is None or name in self.stale:
+            return None
+        return view.rows(name)
+
+    def invalidate(self, names: Iterable[str]) -> None:
+        """Stop answering for `names` until `refresh` recomputes them."""
+        self.stale = self.stale | frozenset(names)
+
+    def refresh(self, graph: Graph, names: Iterable[str]) -> None:
+        """
+        Recompute the groups of `names` from `graph` and answer for them again.
+
+        `graph` only needs the triples those groups depend on (e.g. the papers the
+        syntheses come from); groups of other labels are left as they are.
+        """
+        names = sorted(set(names))
+        for (_query_id, query), view in self.views.items():
+            groups = materialize(graph, query).groups
+            for name in names:
+                if name in groups:
+                    view.groups[name] = groups[name]
+                else:
+                    view.groups.pop(name, None)
+        self.stale = self.stale - frozenset(names)
+
+    def synthesis_names(self) -> List[str]:
+        names = set()
+        for view in self.views.values():
+            names.update(view.groups)
+        return sorted(names)
+
+    def save(self, path: Path) -> None:
+        data = {
+            "meta": dict(self.meta, version=VIEWS_VERSION),
+            "views": [[query_id, query, view.to_json()] for (query_id, query), view in self.views.items()],
+        }
+        path = Path(path)
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: Path, source_mtime: float, signature: str) -> Optional["SynthesisViews"]:
+        """Views from `path` if they cover the same queries and are not older than `source_mtime`."""
+        try:
+            data = json.loads(Path(path).read_text(encoding="utf-8"))
+            meta = data.get("meta") or {}
+            if meta.get("version") != VIEWS_VERSION or meta.get("signature") != signature:
+                return None
+            if float(meta.get("source_merged_ttl_latest_mtime") or 0.0) < source_mtime:
+                return None
+            views = {(query_id, query): SectionView.from_json(view) for query_id, query, view in data["views"]}
+            return cls(views, meta)
+        except (OSError, ValueError, KeyError, TypeError):
+            return None
@@ -0,0 +1,80 @@
+"""
+Bounded executor for the blocking work behind the mops-kg MCP tools.
+
+The tools are `async def`, but rdflib query evaluation and difflib scoring are
+synchronous and CPU-bound. Run on the event loop they serialize parallel tool
+calls and stall the server while the label index is rebuilt. `KGToolExecutor`
+runs them on a small thread pool (the KG is shared in-process, so threads
+rather than processes) and keeps counters for the requests in flight.
+"""
+
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+
+class KGToolExecutor:
+    """Runs blocking KG calls off the event loop, at most `max_workers` at a time."""
+
+    def __init__(self, max_workers: int = 4):
+        self.max_workers = max(1, int(max_workers))
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="mops-kg")
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._peak_in_flight = 0
+        self._running = 0
+        self._completed = 0
+        self._failed = 0
+        self._queue_seconds = 0.0
+        self._run_seconds = 0.0
+
+    async def run(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """Await `fn(*args, **kwargs)` evaluated on the pool."""
+        submitted = time.perf_counter()
+        with self._lock:
+            self._in_flight += 1
+            self._peak_in_flight = max(self._peak_in_flight, self._in_flight)
+
+        def call():
+            started = time.perf_counter()
+            with self._lock:
+                self._running += 1
+                self._queue_seconds += started - submitted
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    self._run_seconds += time.perf_counter() - started
+
+        ok = False
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(self._pool, call)
+            ok = True
+            return result
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+                if ok:
+                    self._completed += 1
+                else:
+                    self._failed += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """In-flight, peak and completed counts plus cumulative queue/run seconds."""
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "in_flight": self._in_flight,
+                "running": self._running,
+                "peak_in_flight": self._peak_in_flight,
+                "completed": self._completed,
+                "failed": self._failed,
+                "queue_seconds": round(self._queue_seconds, 4),
+                "run_seconds": round(self._run_seconds, 4),
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._pool.shutdown(wait=wait)
@@ -7,7 +7,7 @@ synthesis using the MOPs Knowledge Graph through MCP tools.
 
 import asyncio
 from pathlib import Path
-from typing import Dict, Any, Tuple, Optional
+from typing import AsyncIterator, Dict, Any, Tuple, Optional
 from models.BaseAgent import BaseAgent
 from models.ModelConfig import ModelConfig
 from src.utils.global_logger import get_logger
@@ -26,6 +26,7 @@ class MarieAgent:
         model_name: str = "gpt-4o-mini",
         remote_model: bool = True,
         model_config: Optional[ModelConfig] = None,
+        persistent_mcp_sessions: Optional[bool] = None,
     ):
         """
         Initialize MARIE agent with MOPs KG MCP server.
@@ -34,15 +35,23 @@ class MarieAgent:
             model_name: Name of the LLM model to use
             remote_model: Whether to use remote (OpenAI) or local model
             model_config: Optional model configuration
+            persistent_mcp_sessions: Share one resident mops-kg server through the
+                process-wide MCP session pool instead of starting one per question
+                (None: BaseAgent default, i.e. MOPS_MCP_SESSION_POOL)
         """
         self.logger = get_logger("agent", "MarieAgent")
         self.logger.info(f"Initializing MARIE agent with model: {model_name}")
         self.model_name = model_name
         self.remote_model = remote_model
         self.model_config = model_config
+        self.persistent_mcp_sessions = persistent_mcp_sessions
         
         # Get path to MCP config in configs folder
         self.config_path = Path(__file__).parent.parent / "configs" / "marie_kg.json"
+
+        # Built on first use and reused for every question (the LLM client and,
+        # with pooled sessions, the mops-kg server are shared across asks)
+        self._base_agent: Optional[BaseAgent] = None
         
         self.logger.info("MARIE agent initialized successfully")
     
@@ -78,16 +87,7 @@ class MarieAgent:
         )
         
         try:
-            # Create a fresh BaseAgent per question (no reuse across requests)
-            base_agent = BaseAgent(
-                model_name=self.model_name,
-                remote_model=self.remote_model,
-                model_config=self.model_config,
-                mcp_set_name=str(self.config_path),
-                mcp_tools=["mops-kg"],
-                structured_output=False,
-            )
-
+            base_agent = self._get_base_agent()
             result, metadata = await base_agent.run(
                 task_instruction=enhanced_instruction,
                 recursion_limit=recursion_limit
@@ -103,6 +103,49 @@ class MarieAgent:
             self.logger.error(f"Error processing question: {e}", exc_info=True)
             raise
     
+    async def astream(
+        self,
+        question: str,
+        previous_question: Optional[str] = None,
+        previous_answer: Optional[str] = None,
+        recursion_limit: int = 200,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Ask MARIE a question and stream the answer.
+
+        Yields the events of `BaseAgent.astream`: "token" and "tool_start"/"tool_end"
+        while the agent works, then one "done" event with the answer and metadata
+        (token usage, cost and time to first token).
+        """
+        self.logger.info(f"Streaming question: {question[:100]}...")
+        enhanced_instruction = self._enhance_question(
+            question,
+            previous_question=previous_question,
+            previous_answer=previous_answer,
+        )
+        async for event in self._get_base_agent().astream(
+            task_instruction=enhanced_instruction,
+            recursion_limit=recursion_limit,
+        ):
+            yield event
+
+    def _get_base_agent(self) -> BaseAgent:
+        if self._base_agent is None:
+            self._base_agent = BaseAgent(
+                model_name=self.model_name,
+                remote_model=self.remote_model,
+                model_config=self.model_config,
+                mcp_set_name=str(self.config_path),
+                mcp_tools=["mops-kg"],
+                structured_output=False,
+                persistent_mcp_sessions=self.persistent_mcp_sessions,
+            )
+        return self._base_agent
+
+    async def warm_up(self) -> None:
+        """Build the agent and start the shared mops-kg server (pooled sessions only)."""
+        await self._get_base_agent().warm_up()
+
     def _enhance_question(
         self,
         question: str,
@@ -0,0 +1,191 @@
+"""
+Pool of pre-built MARIE agents for the web app.
+
+Every `/api/ask` used to build a new MarieAgent, which started a new stdio
+mops-kg server, reloaded the KG and rebuilt the fuzzy index. The pool instead
+holds `workers` agents built once at start-up. They all use the process-wide MCP
+session pool, so a single resident mops-kg server answers the tool calls of
+every worker.
+
+With an `answer_cache` (see answer_cache.py), questions answered before are
+served from it without taking an agent, and new answers are stored in it.
+
+A request takes an idle agent and gives it back when done (for `stream`, when
+the stream is finished, closed or cancelled). When all are busy,
+requests wait in line: at most `max_queue` of them, for at most `queue_timeout`
+seconds each. Beyond that, `PoolBusyError` is raised and the app answers 503.
+
+All methods must be awaited on the app's single background event loop.
+
+Environment (read by `MarieAgentPool.from_env`):
+- MARIE_WORKERS: concurrent agents (default 4)
+- MARIE_MAX_QUEUE: requests allowed to wait for an agent (default 32)
+- MARIE_QUEUE_TIMEOUT: seconds a request may wait (default 300)
+- MARIE_MODEL: LLM model name (default gpt-4o-mini)
+- MARIE_ANSWER_CACHE*: answer cache settings (see AnswerCache.from_env)
+"""
+
+import asyncio
+import os
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+DEFAULT_WORKERS = 4
+DEFAULT_MAX_QUEUE = 32
+DEFAULT_QUEUE_TIMEOUT = 300.0
+DEFAULT_MODEL = "gpt-4o-mini"
+
+
+class PoolBusyError(RuntimeError):
+    """All agents are busy and the wait queue is full (or the wait timed out)."""
+
+
+def _default_factory(model_name: str) -> Any:
+    from mini_marie.marie_agent import MarieAgent
+
+    return MarieAgent(model_name=model_name, persistent_mcp_sessions=True)
+
+
+class MarieAgentPool:
+    """Fixed set of reusable MarieAgents with bounded request queueing."""
+
+    def __init__(
+        self,
+        workers: int = DEFAULT_WORKERS,
+        max_queue: int = DEFAULT_MAX_QUEUE,
+        queue_timeout: float = DEFAULT_QUEUE_TIMEOUT,
+        model_name: str = DEFAULT_MODEL,
+        agent_factory: Optional[Callable[[str], Any]] = None,
+        answer_cache: Optional[Any] = None,
+    ):
+        self.workers = max(1, int(workers))
+        self.max_queue = max(0, int(max_queue))
+        self.queue_timeout = float(queue_timeout)
+        self.model_name = model_name
+        self._factory = agent_factory or _default_factory
+        self.answer_cache = answer_cache
+        self._agents: List[Any] = []
+        self._idle: Optional[asyncio.Queue] = None
+        self._start_lock = asyncio.Lock()
+        self._waiting = 0
+        self._served = 0
+
+    @classmethod
+    def from_env(cls, **overrides: Any) -> "MarieAgentPool":
+        kwargs: Dict[str, Any] = {
+            "workers": int(os.environ.get("MARIE_WORKERS", DEFAULT_WORKERS)),
+            "max_queue": int(os.environ.get("MARIE_MAX_QUEUE", DEFAULT_MAX_QUEUE)),
+            "queue_timeout": float(os.environ.get("MARIE_QUEUE_TIMEOUT", DEFAULT_QUEUE_TIMEOUT)),
+            "model_name": os.environ.get("MARIE_MODEL", DEFAULT_MODEL),
+        }
+        kwargs.update({k: v for k, v in overrides.items() if v is not None})
+        if "answer_cache" not in kwargs:
+            from mini_marie.webapp.answer_cache import AnswerCache
+
+            kwargs["answer_cache"] = AnswerCache.from_env()
+        return cls(**kwargs)
+
+    @property
+    def started(self) -> bool:
+        return self._idle is not None
+
+    async def start(self) -> None:
+        """Build the agents and start the shared mops-kg server once."""
+        async with self._start_lock:
+            if self._idle is not None:
+                return
+            idle: asyncio.Queue = asyncio.Queue()
+            agents = [self._factory(self.model_name) for _ in range(self.workers)]
+            # One warm-up is enough: all agents share the pooled server
+            warm_up = getattr(agents[0], "warm_up", None)
+            if warm_up is not None:
+                await warm_up()
+            for agent in agents:
+                idle.put_nowait(agent)
+            self._agents = agents
+            self._idle = idle
+
+    async def _acquire(self) -> Any:
+        """Next free agent, waiting in line if all are busy."""
+        await self.start()
+        try:
+            return self._idle.get_nowait()
+        except asyncio.QueueEmpty:
+            if self._waiting >= self.max_queue:
+                raise PoolBusyError(
+                    f"All {self.workers} agents are busy and {self._waiting} requests are waiting"
+                ) from None
+            self._waiting += 1
+            try:
+                return await asyncio.wait_for(self._idle.get(), timeout=self.queue_timeout)
+            except asyncio.TimeoutError:
+                raise PoolBusyError(f"No agent became free within {self.queue_timeout:.0f}s") from None
+            finally:
+                self._waiting -= 1
+
+    def _release(self, agent: Any) -> None:
+        self._served += 1
+        self._idle.put_nowait(agent)
+
+    async def _cached(self, question: str, kwargs: Dict[str, Any]) -> Optional[Tuple[str, Dict[str, Any]]]:
+        if self.answer_cache is None:
+            return None
+        return await asyncio.to_thread(
+            self.answer_cache.get, question, kwargs.get("previous_question"), kwargs.get("previous_answer")
+        )
+
+    async def _store(self, question: str, answer: str, metadata: Dict[str, Any], kwargs: Dict[str, Any]) -> None:
+        if self.answer_cache is not None:
+            await asyncio.to_thread(
+                self.answer_cache.put,
+                question,
+                answer,
+                metadata,
+                kwargs.get("previous_question"),
+                kwargs.get("previous_answer"),
+            )
+
+    async def ask(self, question: str, **kwargs: Any) -> Tuple[str, Dict[str, Any]]:
+        """Answer `question` from the cache or with the next free agent, waiting in line if all are busy."""
+        cached = await self._cached(question, kwargs)
+        if cached is not None:
+            return cached
+        agent = await self._acquire()
+        try:
+            answer, metadata = await agent.ask(question, **kwargs)
+        finally:
+            self._release(agent)
+        await self._store(question, answer, metadata, kwargs)
+        return answer, metadata
+
+    async def stream(self, question: str, **kwargs: Any) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream the events of `question` from the next free agent (see MarieAgent.astream).
+
+        A cached answer is a single "done" event.
+        """
+        cached = await self._cached(question, kwargs)
+        if cached is not None:
+            yield {"type": "done", "answer": cached[0], "metadata": cached[1]}
+            return
+        agent = await self._acquire()
+        done = None
+        try:
+            async for event in agent.astream(question, **kwargs):
+                if event.get("type") == "done":
+                    done = event
+                yield event
+        finally:
+            self._release(agent)
+        if done is not None:
+            await self._store(question, done["answer"], done["metadata"], kwargs)
+
+    def stats(self) -> Dict[str, Any]:
+        idle = self._idle.qsize() if self._idle is not None else 0
+        return {
+            "workers": self.workers,
+            "busy": len(self._agents) - idle,
+            "waiting": self._waiting,
+            "max_queue": self.max_queue,
+            "served": self._served,
+            "started": self.started,
+        }
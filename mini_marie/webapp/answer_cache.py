@@ -0,0 +1,409 @@
+"""
+Answer cache in front of the MARIE agents.
+
+Many questions differ only in wording ("recipe for VMOP-17", "What is the
+recipe of VMOP 17?"), yet each one costs a full multi-call agent run. The pool
+first looks the question up here and only runs an agent on a miss.
+
+A question is keyed on:
+
+- its entity mentions, resolved to KG labels through the mops-kg label index
+  (`data/mini_marie_cache/kg_label_index.bin`). A span matches a label when both
+  are equal ignoring case, spaces and punctuation ("VMOP 17" -> "VMOP-17").
+  Close but different names (VMOP-17 / VMOP-18) never match. When several labels
+  only differ in case or punctuation, the span must match one of them up to
+  spaces and punctuation, otherwise it is left as plain words;
+- the remaining words, without stop words and plural "s", with each entity
+  replaced by a placeholder. Numbers are kept as written, sign and decimal point
+  included ("-20" / "20", "1.5" / "15"). Only dictionary words (lowercase or
+  capitalized) are lowercased; element symbols and formulas keep their case
+  ("Co" / "CO", "Hf" / "HF", "No" / "NO"). Only filler words are stop words:
+  connectives and negations ("and", "or", "not", "without") and the verbs that
+  set the kind of answer ("list", "describe", "explain", "compare") are kept;
+- the previous question and a hash of the previous answer when the turn is a
+  follow-up (its answer depends on both);
+- the KG version: a fingerprint of the merged_tll TTL files (name, size, mtime).
+  When it changes, entries of older versions are dropped.
+
+Entries live in a local SQLite table, expire after `ttl` seconds and are evicted
+least recently used beyond `max_entries`. The cache never raises: on any error
+it behaves as a miss and logs a warning.
+
+Environment (read by `AnswerCache.from_env`):
+- MARIE_ANSWER_CACHE: 0 disables the cache (default 1)
+- MARIE_ANSWER_CACHE_TTL: seconds an answer stays valid (default 86400)
+- MARIE_ANSWER_CACHE_MAX_ENTRIES: entries kept (default 1000)
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.utils.global_logger import get_logger
+
+DEFAULT_TTL = 86400.0
+DEFAULT_MAX_ENTRIES = 1000
+# Longest entity mention tried, in words ("Cage 1 a" -> "Cage-1a")
+MAX_SPAN_WORDS = 4
+ENTITY_CATEGORIES = ("syntheses", "mops", "chemicals", "ir_materials")
+# Metadata kept with an answer (per-call usage is left out)
+STORED_METADATA = ("model_name", "aggregated_usage")
+_NO_USAGE = {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0, "calls": 0, "total_cost_usd": 0.0}
+
+STOP_WORDS = frozenset(
+    """a an the of for to in on at by with from about is are was were be been do does
+    did can could would should will shall may might i me my we our you your it its this that
+    these those there what which who whom how please tell give show provide know""".split()
+)
+
+ELEMENT_SYMBOLS = frozenset(
+    """H He Li Be B C N O F Ne Na Mg Al Si P S Cl Ar K Ca Sc Ti V Cr Mn Fe Co Ni Cu Zn
+    Ga Ge As Se Br Kr Rb Sr Y Zr Nb Mo Tc Ru Rh Pd Ag Cd In Sn Sb Te I Xe Cs Ba La Ce
+    Pr Nd Pm Sm Eu Gd Tb Dy Ho Er Tm Yb Lu Hf Ta W Re Os Ir Pt Au Hg Tl Pb Bi Po At Rn
+    Fr Ra Ac Th Pa U Np Pu Am Cm Bk Cf Es Fm Md No Lr Rf Db Sg Bh Hs Mt Ds Rg Cn Nh Fl
+    Mc Lv Ts Og""".split()
+)
+
+_WORD = re.compile(r"[\w\-+.()\[\]/,']+", re.UNICODE)
+_NON_ALNUM = re.compile(r"[\W_]+", re.UNICODE)
+_NUMBER = re.compile(r"[-+\u2212]?\d+(?:[.,]\d+)*")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS answers (
+    key TEXT PRIMARY KEY,
+    kg_version TEXT NOT NULL,
+    question TEXT NOT NULL,
+    answer TEXT NOT NULL,
+    metadata TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    last_used REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS answers_last_used ON answers (last_used);
+"""
+
+
+def _repo_root() -> Path:
+    return Path(__file__).resolve().parents[2]
+
+
+def _cache_dir() -> Path:
+    return _repo_root() / "data" / "mini_marie_cache"
+
+
+def canonical(text: str) -> str:
+    """Lowercased text without whitespace and punctuation ("VMOP 17" -> "vmop17")."""
+    return _NON_ALNUM.sub("", text.lower())
+
+
+def _cased(text: str) -> str:
+    """Text without whitespace and punctuation, case kept ("Co 1" -> "Co1")."""
+    return _NON_ALNUM.sub("", text)
+
+
+def merged_ttl_fingerprint(merged_dir: Path) -> str:
+    """Fingerprint of merged_tll/*/*.ttl (names, sizes, mtimes); changes with any edit, addition or removal."""
+    digest = hashlib.sha1()
+    try:
+        for sub in sorted(merged_dir.iterdir()):
+            ttl = sub / f"{sub.name}.ttl"
+            if sub.is_dir() and ttl.exists():
+                st = ttl.stat()
+                digest.update(f"{sub.name}\0{st.st_size}\0{st.st_mtime_ns}\n".encode("utf-8"))
+    except OSError:
+        pass
+    return digest.hexdigest()[:16]
+
+
+class EntityResolver:
+    """Maps entity mentions in a question to KG labels, using the persisted label index."""
+
+    def __init__(self, index_path: Path):
+        self.index_path = Path(index_path)
+        self._loaded_mtime: Optional[float] = None
+        self._labels: Dict[str, List[Tuple[str, str]]] = {}
+        self._lock = threading.Lock()
+
+    def _refresh(self) -> None:
+        try:
+            mtime = self.index_path.stat().st_mtime
+        except OSError:
+            mtime = None
+        if mtime == self._loaded_mtime:
+            return
+        with self._lock:
+            if mtime == self._loaded_mtime:
+                return
+            labels: Dict[str, List[Tuple[str, str]]] = {}
+            if mtime is not None:
+                from mini_marie.kg_server.fuzzy_index import load_label_index
+
+                loaded = load_label_index(self.index_path)
+                if loaded is not None:
+                    _meta, categories = loaded
+                    # Earlier categories win on collisions (a synthesis named like its MOP)
+                    for category in ENTITY_CATEGORIES:
+                        index = categories.get(category)
+                        for label in (index.labels if index is not None else ()):
+                            key = canonical(label)
+                            if len(key) < 3:
+                                continue
+                            same = labels.setdefault(key, [])
+                            if all(_cased(known) != _cased(label) for _category, known in same):
+                                same.append((category, label))
+            self._labels = labels
+            self._loaded_mtime = mtime
+
+    def __len__(self) -> int:
+        self._refresh()
+        return len(self._labels)
+
+    def resolve(self, words: List[str]) -> List[Tuple[int, int, str, str]]:
+        """Longest-first, non-overlapping (start, end, category, label) matches over `words`."""
+        self._refresh()
+        labels = self._labels
+        found: List[Tuple[int, int, str, str]] = []
+        if not labels:
+            return found
+        i = 0
+        while i < len(words):
+            for n in range(min(MAX_SPAN_WORDS, len(words) - i), 0, -1):
+                match = self._match(labels, " ".join(words[i:i + n]))
+                if match is not None:
+                    found.append((i, i + n, match[0], match[1]))
+                    i += n
+                    break
+            else:
+                i += 1
+        return found
+
+    @staticmethod
+    def _match(labels: Dict[str, List[Tuple[str, str]]], span: str) -> Optional[Tuple[str, str]]:
+        candidates = labels.get(canonical(span))
+        if not candidates:
+            return None
+        if len(candidates) == 1:
+            return candidates[0]
+        # Labels differing only in case ("Co-MOP" / "CO-MOP") are different entities
+        cased = _cased(span)
+        return next((c for c in candidates if _cased(c[1]) == cased), None)
+
+
+def _content_word(word: str) -> Optional[str]:
+    number = _NUMBER.fullmatch(word.strip("()[]/,'").rstrip("."))
+    if number is not None:
+        return number.group().replace("\u2212", "-")
+    word = _cased(word)
+    if word in ELEMENT_SYMBOLS or not (word.islower() or word[1:].islower()):
+        # Symbols and formulas: "Co" is cobalt, "CO" carbon monoxide
+        return word or None
+    word = word.lower()
+    if word in STOP_WORDS:
+        return None
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        word = word[:-1]
+    return word
+
+
+class AnswerCache:
+    """SQLite-backed cache of MARIE answers, keyed on the normalized question and KG version."""
+
+    def __init__(
+        self,
+        db_path: Optional[Path] = None,
+        ttl: float = DEFAULT_TTL,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        merged_dir: Optional[Path] = None,
+        index_path: Optional[Path] = None,
+    ):
+        self.logger = get_logger("webapp", "AnswerCache")
+        self.db_path = Path(db_path) if db_path is not None else _cache_dir() / "answer_cache.sqlite"
+        self.ttl = float(ttl)
+        self.max_entries = max(1, int(max_entries))
+        self.merged_dir = Path(merged_dir) if merged_dir is not None else _repo_root() / "evaluation" / "data" / "merged_tll"
+        self.resolver = EntityResolver(
+            index_path if index_path is not None else _cache_dir() / "kg_label_index.bin"
+        )
+        self._lock = threading.Lock()
+        self._kg_version: Optional[str] = None
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.invalidations = 0
+        self.errors = 0
+
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._db.executescript(_SCHEMA)
+        self._db.commit()
+
+    @classmethod
+    def from_env(cls, **overrides: Any) -> Optional["AnswerCache"]:
+        """The cache configured by MARIE_ANSWER_CACHE*, or None when disabled."""
+        if os.environ.get("MARIE_ANSWER_CACHE", "1").strip().lower() in ("0", "false", "no", "off"):
+            return None
+        kwargs: Dict[str, Any] = {
+            "ttl": float(os.environ.get("MARIE_ANSWER_CACHE_TTL", DEFAULT_TTL)),
+            "max_entries": int(os.environ.get("MARIE_ANSWER_CACHE_MAX_ENTRIES", DEFAULT_MAX_ENTRIES)),
+        }
+        kwargs.update({k: v for k, v in overrides.items() if v is not None})
+        return cls(**kwargs)
+
+    # ------------------------------------------------------------------
+    # Keys
+    # ------------------------------------------------------------------
+
+    def normalize(self, question: str) -> Tuple[str, List[str]]:
+        """(normalized question, resolved entities as "category:label") of `question`."""
+        words = _WORD.findall(question)
+        matches = self.resolver.resolve(words)
+        parts: List[str] = []
+        entities: List[str] = []
+        i = 0
+        for start, end, category, label in matches + [(len(words), len(words), "", "")]:
+            for word in words[i:start]:
+                content = _content_word(word)
+                if content:
+                    parts.append(content)
+            if category:
+                parts.append("<e>")
+                entities.append(f"{category}:{label}")
+            i = end
+        return " ".join(parts), entities
+
+    def kg_version(self) -> str:
+        """Current merged_tll fingerprint; drops entries of other versions when it changes."""
+        version = merged_ttl_fingerprint(self.merged_dir)
+        if version != self._kg_version:
+            with self._lock:
+                if version != self._kg_version:
+                    removed = self._db.execute("DELETE FROM answers WHERE kg_version != ?", (version,)).rowcount
+                    self._db.commit()
+                    if self._kg_version is not None or removed:
+                        self.invalidations += 1
+                        self.logger.info(f"merged_tll changed, dropped {removed} cached answers")
+                    self._kg_version = version
+        return version
+
+    def key(
+        self, question: str, previous_question: Optional[str] = None, previous_answer: Optional[str] = None
+    ) -> Tuple[str, str]:
+        """(cache key, KG version) of a question, optionally asked as a follow-up."""
+        version = self.kg_version()
+        normalized, entities = self.normalize(question)
+        context = [
+            self.normalize(previous_question) if previous_question else None,
+            hashlib.sha256(previous_answer.encode("utf-8")).hexdigest() if previous_answer else None,
+        ]
+        raw = json.dumps([normalized, entities, context, version], ensure_ascii=False)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest(), version
+
+    # ------------------------------------------------------------------
+    # Lookup / store
+    # ------------------------------------------------------------------
+
+    def get(
+        self, question: str, previous_question: Optional[str] = None, previous_answer: Optional[str] = None
+    ) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """Cached (answer, metadata) of the question, or None."""
+        try:
+            key, _version = self.key(question, previous_question, previous_answer)
+            now = time.time()
+            with self._lock:
+                row = self._db.execute(
+                    "SELECT answer, metadata, created_at FROM answers WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None and now - row[2] > self.ttl:
+                    self._db.execute("DELETE FROM answers WHERE key = ?", (key,))
+                    self._db.commit()
+                    row = None
+                if row is None:
+                    self.misses += 1
+                    return None
+                self._db.execute(
+                    "UPDATE answers SET last_used = ?, hits = hits + 1 WHERE key = ?", (now, key)
+                )
+                self._db.commit()
+                self.hits += 1
+            metadata = json.loads(row[1])
+            saved = metadata.get("aggregated_usage") or {}
+            # Nothing was spent on this answer; report what the original run cost
+            metadata["aggregated_usage"] = dict(_NO_USAGE, **{k: 0 for k in saved})
+            metadata["answer_cache"] = {"hit": True, "age_s": round(now - row[2], 1), "saved_usage": saved}
+            return row[0], metadata
+        except Exception as e:
+            self._failed("lookup", e)
+            return None
+
+    def put(
+        self,
+        question: str,
+        answer: str,
+        metadata: Dict[str, Any],
+        previous_question: Optional[str] = None,
+        previous_answer: Optional[str] = None,
+    ) -> None:
+        """Store an answer, evicting the least recently used entries beyond `max_entries`."""
+        if not answer or not answer.strip():
+            return
+        try:
+            key, version = self.key(question, previous_question, previous_answer)
+            now = time.time()
+            stored = json.dumps(
+                {k: metadata[k] for k in STORED_METADATA if k in metadata}, ensure_ascii=False, default=str
+            )
+            with self._lock:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO answers (key, kg_version, question, answer, metadata, created_at, last_used, hits) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, 0)",
+                    (key, version, question, answer, stored, now, now),
+                )
+                self._db.execute(
+                    "DELETE FROM answers WHERE key IN "
+                    "(SELECT key FROM answers ORDER BY last_used DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entries,),
+                )
+                self._db.commit()
+                self.stores += 1
+        except Exception as e:
+            self._failed("store", e)
+
+    def _failed(self, what: str, error: Exception) -> None:
+        self.errors += 1
+        self.logger.warning(f"Answer cache {what} failed, ignoring: {error}")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._db.execute("DELETE FROM answers")
+            self._db.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            try:
+                entries = self._db.execute("SELECT COUNT(*) FROM answers").fetchone()[0]
+            except sqlite3.Error:
+                entries = None
+        lookups = self.hits + self.misses
+        return {
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "ttl_s": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "stores": self.stores,
+            "invalidations": self.invalidations,
+            "errors": self.errors,
+            "kg_version": self._kg_version,
+            "known_entities": len(self.resolver),
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            self._db.close()
@@ -5,7 +5,7 @@ Flask web interface that extends the existing MOP extraction agent/pipeline in t
 Provides a ChatGPT-style Q&A interface for querying the MOPs synthesis knowledge graph.
 """
 
-from flask import Flask, render_template, request, jsonify, session
+from flask import Flask, Response, render_template, request, jsonify, session, stream_with_context
 from flask_cors import CORS
 from dotenv import load_dotenv
 import asyncio
@@ -13,6 +13,9 @@ import os
 import sys
 from pathlib import Path
 from datetime import datetime
+import json
+import queue
+import time
 import uuid
 import threading
 from concurrent.futures import TimeoutError as FuturesTimeoutError
@@ -23,7 +26,7 @@ load_dotenv()
 # Add project root to path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
-from mini_marie.marie_agent import MarieAgent
+from mini_marie.webapp.agent_pool import MarieAgentPool, PoolBusyError
 from src.utils.global_logger import get_logger
 
 app = Flask(__name__)
@@ -85,6 +88,84 @@ def run_async(coro, timeout: float | None = None):
         future.cancel()
         raise
 
+_STREAM_END = object()
+
+
+def stream_async(agen, timeout: float | None = None, heartbeat: float = 15.0):
+    """
+    Iterate an async generator on the shared background loop from a sync caller.
+
+    Yields its items, or None every `heartbeat` seconds while it is quiet (so the
+    caller can write a keep-alive and notice a dropped client). Closing this
+    generator, or exceeding `timeout`, cancels the async generator's task.
+    """
+    loop = get_async_loop()
+    items: queue.Queue = queue.Queue()
+
+    async def pump():
+        try:
+            async for item in agen:
+                items.put((True, item))
+        except asyncio.CancelledError:
+            raise
+        except BaseException as e:
+            items.put((False, e))
+        finally:
+            items.put((True, _STREAM_END))
+            await agen.aclose()
+
+    future = asyncio.run_coroutine_threadsafe(pump(), loop)
+    deadline = time.monotonic() + timeout if timeout is not None else None
+    try:
+        while True:
+            wait = heartbeat
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise FuturesTimeoutError()
+                wait = min(wait, remaining)
+            try:
+                ok, item = items.get(timeout=wait)
+            except queue.Empty:
+                yield None
+                continue
+            if not ok:
+                raise item
+            if item is _STREAM_END:
+                return
+            yield item
+    finally:
+        # Client gone, timeout or error: stop the agent and give it back to the pool
+        future.cancel()
+
+
+def sse_event(event: str, data) -> str:
+    """One Server-Sent Events message."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False, default=str)}\n\n"
+
+# -----------------------------------------------------------------------------
+# Agent pool
+#
+# A fixed set of MarieAgents (MARIE_WORKERS, default 4) is built once on the
+# background loop and shared by all requests. The agents use pooled MCP sessions,
+# so one resident mops-kg server (KG and fuzzy index loaded once) serves them all.
+# Requests beyond the worker count queue up (MARIE_MAX_QUEUE, MARIE_QUEUE_TIMEOUT).
+# -----------------------------------------------------------------------------
+
+_agent_pool: MarieAgentPool | None = None
+_agent_pool_lock = threading.Lock()
+
+
+def get_agent_pool() -> MarieAgentPool:
+    global _agent_pool
+    if _agent_pool is not None:
+        return _agent_pool
+    with _agent_pool_lock:
+        if _agent_pool is None:
+            _agent_pool = MarieAgentPool.from_env()
+        return _agent_pool
+
+
 # Preset example questions
 EXAMPLE_QUESTIONS = [
     {
@@ -197,6 +278,7 @@ def ask_question():
             "metadata": {
                 "tokens": 1234,
                 "cost": 0.005,
+                "cached": false,
                 "timestamp": "2024-..."
             },
             "status": "success"
@@ -221,13 +303,11 @@ def ask_question():
             prev_q = prev.get("question")
             prev_a = prev.get("answer")
         
-        async def _answer(q: str):
-            # Create everything inside the async thread/loop
-            marie = MarieAgent(model_name="gpt-4o-mini")
-            return await marie.ask(q, previous_question=prev_q, previous_answer=prev_a)
-
-        # Run async query on the shared background event loop
-        answer, metadata = run_async(_answer(question), timeout=600)
+        # Run async query on the shared background event loop with a pooled agent
+        pool = get_agent_pool()
+        answer, metadata = run_async(
+            pool.ask(question, previous_question=prev_q, previous_answer=prev_a), timeout=600
+        )
 
         # Update last-turn memory only on success
         with _last_turn_lock:
@@ -241,6 +321,7 @@ def ask_question():
                 "tokens": metadata['aggregated_usage']['total_tokens'],
                 "cost": metadata['aggregated_usage']['total_cost_usd'],
                 "calls": metadata['aggregated_usage']['calls'],
+                "cached": "answer_cache" in metadata,
                 "timestamp": datetime.now().isoformat()
             }
         }
@@ -248,6 +329,13 @@ def ask_question():
         logger.info(f"[{session_id}] Answer generated (tokens: {response['metadata']['tokens']})")
         
         return jsonify(response)
+
+    except PoolBusyError as e:
+        logger.warning(f"Rejected question, agent pool is busy: {e}")
+        return jsonify({
+            "status": "error",
+            "error": "The service is busy, please try again shortly."
+        }), 503
         
     except Exception as e:
         logger.error(f"Error processing question: {e}", exc_info=True)
@@ -256,16 +344,109 @@ def ask_question():
             "error": str(e)
         }), 500
 
+@app.route('/api/ask/stream', methods=['POST'])
+def ask_question_stream():
+    """
+    Handle a question from the user, streaming the answer as Server-Sent Events.
+
+    Request JSON: same as /api/ask.
+
+    Events:
+        token:      {"content": "..."}                  LLM output as it is generated
+        tool_start: {"name": "...", "input": {...}}     a KG tool call starts
+        tool_end:   {"name": "...", "output": "..."}    a KG tool call returns (output truncated)
+        done:       {"answer": "...", "metadata": {...}} same metadata as /api/ask, plus
+                    "time_to_first_token" and "elapsed" in seconds (an answer from
+                    the answer cache is a single done event, with "cached": true)
+        error:      {"error": "..."}
+
+    Closing the connection cancels the agent run and frees its worker.
+    """
+    data = request.get_json(silent=True) or {}
+    question = (data.get('question') or '').strip()
+    session_id = data.get('session_id', session.get('session_id', 'unknown'))
+
+    if not question:
+        return jsonify({
+            "status": "error",
+            "error": "Question cannot be empty"
+        }), 400
+
+    logger.info(f"[{session_id}] Received streaming question: {question[:100]}...")
+
+    with _last_turn_lock:
+        prev = _last_turn_by_session.get(session_id, {})
+        prev_q = prev.get("question")
+        prev_a = prev.get("answer")
+
+    def generate():
+        pool = get_agent_pool()
+        events = stream_async(
+            pool.stream(question, previous_question=prev_q, previous_answer=prev_a), timeout=600
+        )
+        try:
+            for event in events:
+                if event is None:
+                    yield ": keep-alive\n\n"
+                    continue
+                kind = event.get("type")
+                if kind == "token":
+                    yield sse_event("token", {"content": event["content"]})
+                elif kind == "tool_start":
+                    yield sse_event("tool_start", {"name": event["name"], "input": event.get("input")})
+                elif kind == "tool_end":
+                    yield sse_event("tool_end", {"name": event["name"], "output": event.get("output", "")[:500]})
+                elif kind == "done":
+                    answer, metadata = event["answer"], event["metadata"]
+                    with _last_turn_lock:
+                        _last_turn_by_session[session_id] = {"question": question, "answer": answer}
+                    payload = {
+                        "answer": answer,
+                        "metadata": {
+                            "tokens": metadata['aggregated_usage']['total_tokens'],
+                            "cost": metadata['aggregated_usage']['total_cost_usd'],
+                            "calls": metadata['aggregated_usage']['calls'],
+                            "time_to_first_token": metadata.get("time_to_first_token_s"),
+                            "elapsed": metadata.get("elapsed_s"),
+                            "cached": "answer_cache" in metadata,
+                            "timestamp": datetime.now().isoformat()
+                        }
+                    }
+                    logger.info(
+                        f"[{session_id}] Streamed answer (tokens: {payload['metadata']['tokens']}, "
+                        f"time to first token: {payload['metadata']['time_to_first_token']}s)"
+                    )
+                    yield sse_event("done", payload)
+        except GeneratorExit:
+            logger.info(f"[{session_id}] Client disconnected, agent run cancelled")
+            raise
+        except PoolBusyError as e:
+            logger.warning(f"Rejected streaming question, agent pool is busy: {e}")
+            yield sse_event("error", {"error": "The service is busy, please try again shortly."})
+        except Exception as e:
+            logger.error(f"Error streaming answer: {e}", exc_info=True)
+            yield sse_event("error", {"error": str(e) or type(e).__name__})
+        finally:
+            events.close()
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint."""
     try:
         # Service is healthy if we can reach this endpoint
-        # Each question creates its own agent instance
+        pool = get_agent_pool()
         return jsonify({
             "status": "healthy",
             "service": "MOP Extraction Agent - Web Extension",
-            "agent": "instance per request"
+            "agent": "shared pool",
+            "pool": pool.stats(),
+            "answer_cache": pool.answer_cache.stats() if pool.answer_cache is not None else None,
         })
     except Exception as e:
         return jsonify({
@@ -323,8 +504,17 @@ if __name__ == '__main__':
     parser.add_argument('--host', default='127.0.0.1', help='Host to bind to')
     parser.add_argument('--port', type=int, default=5000, help='Port to bind to')
     parser.add_argument('--debug', action='store_true', help='Enable debug mode')
+    parser.add_argument('--workers', type=int, default=None, help='Concurrent MARIE agents (default: MARIE_WORKERS or 4)')
     
     args = parser.parse_args()
+
+    # Build the agents and start the shared mops-kg server before serving requests
+    _agent_pool = MarieAgentPool.from_env(workers=args.workers)
+    try:
+        run_async(_agent_pool.start(), timeout=300)
+        logger.info(f"Agent pool ready: {_agent_pool.stats()}")
+    except Exception as e:
+        logger.error(f"Agent pool warm-up failed, will retry on first request: {e}", exc_info=True)
     
     print("="*80)
     print("MOP Extraction Agent - Web Extension")
@@ -332,6 +522,7 @@ if __name__ == '__main__':
     print(f"\n🚀 Starting web server...")
     print(f"📍 URL: http://{args.host}:{args.port}")
     print(f"🔍 Debug mode: {'ON' if args.debug else 'OFF'}")
+    print(f"🤖 Agent workers: {_agent_pool.workers}")
     print("\nPress Ctrl+C to stop the server\n")
     print("="*80)
     
@@ -1,13 +1,26 @@
 """
 BaseAgent – a reusable ReAct-based agent that can load one or more MCP
 tools and keep their sessions alive for the whole run.
+
+With `persistent_mcp_sessions=True` (or MOPS_MCP_SESSION_POOL=1) the MCP servers,
+their tool schemas and instruction prompts are kept alive across runs in the
+process-wide MCPSessionPool instead of being restarted on every `run`.
+
+`astream` runs the same agent but yields LLM tokens and tool-call events as they
+happen, ending with the answer and the usual metadata (plus time to first token).
+
+`mcp_env` (see src/utils/session_context.py) is added to the environment of every
+stdio server this agent spawns, e.g. the (hash, entity, entity IRI) of a KG-building
+session. Such servers are private to the run and never taken from the pool.
 """
 
 from __future__ import annotations
 
 import asyncio
-from contextlib import AsyncExitStack
-from typing import Any, Dict, List, Tuple, Optional, Callable
+import os
+import time
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Tuple, Optional, Callable
 from langchain_core.messages import HumanMessage
 from langchain_core.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langgraph.prebuilt import create_react_agent
@@ -17,9 +30,11 @@ from langchain_mcp_adapters.tools import load_mcp_tools
 
 from models.LLMCreator import LLMCreator
 from models.MCPConfig import MCPConfig
+from models.MCPSessionPool import get_mcp_session_pool
 from models.ModelConfig import ModelConfig
 from models.TokenCalculator import TokenCounter
 from src.utils.global_logger import get_logger
+from src.utils.session_context import apply_session_env
 
 class BaseAgent:
     # ──────────────────────────── init ────────────────────────────
@@ -32,11 +47,18 @@ class BaseAgent:
         mcp_tools: List[str] | None = None,
         structured_output: bool = False,
         structured_output_schema: Any = None,
+        persistent_mcp_sessions: bool | None = None,
+        mcp_env: Dict[str, str] | None = None,
     ):
         self.model_name = model_name
         self.remote_model = remote_model
         self.model_config = model_config or ModelConfig()
+        self.mcp_set_name = mcp_set_name
         self.mcp_config = MCPConfig(config_name=mcp_set_name)
+        if persistent_mcp_sessions is None:
+            persistent_mcp_sessions = os.getenv("MOPS_MCP_SESSION_POOL", "").strip() in ("1", "true", "TRUE", "yes", "YES")
+        self.persistent_mcp_sessions = persistent_mcp_sessions
+        self.mcp_env = dict(mcp_env) if mcp_env else None
         self.mcp_tools = mcp_tools or ["github", "filesystem"]
         self.logger = get_logger("agent", "BaseAgent")
 
@@ -48,21 +70,12 @@ class BaseAgent:
             structured_output_schema=structured_output_schema,
         ).setup_llm()
 
-    # ──────────────────────────── run ────────────────────────────
-    async def run(
-        self,
-        task_instruction: str,
-        recursion_limit: int | None = None,
-    ) -> Tuple[str, Dict[str, Any]]:
-        """Execute *task_instruction* through a ReAct agent wired to MCP tools."""
-        # Truncate task instruction for logging to avoid console spam
-        task_preview = task_instruction[:200] + "..." if len(task_instruction) > 200 else task_instruction
-        self.logger.info(f"Starting BaseAgent run with task: {task_preview}")
-        
-        # 1️⃣ MCP configs
+    # ──────────────────────────── MCP config ────────────────────────────
+    def _server_config(self) -> Dict[str, Any]:
+        """Connection configs for `mcp_tools`, sanitized and with `mcp_env` applied."""
         server_cfg = self.mcp_config.get_config(self.mcp_tools)
         self.logger.info(f"Loaded MCP tools: {self.mcp_tools}")
-        
+
         # Compatibility: some MCP client stacks (depending on installed `mcp` version) do not accept a
         # `description` kwarg when creating stdio sessions. Our config files sometimes include it
         # (e.g., `configs/mops_mcp.json` for the `document` server). Strip it to avoid runtime errors.
@@ -75,13 +88,93 @@ class BaseAgent:
             # If sanitization fails for any reason, fall back to the raw config.
             pass
 
+        if self.mcp_env:
+            server_cfg = apply_session_env(server_cfg, self.mcp_env)
+        return server_cfg
+
+    async def warm_up(self) -> None:
+        """
+        Start this agent's pooled MCP servers before the first `run`, so the first
+        request does not pay their start-up. No-op unless sessions are pooled.
+        """
+        if not self.persistent_mcp_sessions or self.mcp_env:
+            return
+        await get_mcp_session_pool().get_tools_and_instructions(
+            self.mcp_set_name, self._server_config(), self.mcp_tools
+        )
+
+    # ──────────────────────────── run ────────────────────────────
+    async def run(
+        self,
+        task_instruction: str,
+        recursion_limit: int | None = None,
+    ) -> Tuple[str, Dict[str, Any]]:
+        """Execute *task_instruction* through a ReAct agent wired to MCP tools."""
+        # Truncate task instruction for logging to avoid console spam
+        task_preview = task_instruction[:200] + "..." if len(task_instruction) > 200 else task_instruction
+        self.logger.info(f"Starting BaseAgent run with task: {task_preview}")
+        
+        # 1️⃣ MCP configs
+        server_cfg = self._server_config()
+
         # 2️⃣ Docker check (non-fatal)
         if not await self.mcp_config.is_docker_running():
             self.logger.error("Docker is not running – MCP tools need it.")
             # raise RuntimeError("Docker is not running – MCP tools need it.")
 
-        # 3️⃣ Multi-server MCP client
-        #
+        # 3️⃣ MCP sessions: pooled (kept alive across runs) or per-run.
+        async with self._tools_and_instructions(server_cfg) as (tools, instruction_msgs):
+            result, counter = await self._invoke_react_agent(
+                tools, instruction_msgs, task_instruction, recursion_limit
+            )
+
+        # 6️⃣ Final message + run metadata
+        last_msg = result["messages"][-1]
+        metadata = self._run_metadata(last_msg, counter)
+        return last_msg.content, metadata
+
+    def _run_metadata(self, last_msg: Any, counter: TokenCounter) -> Dict[str, Any]:
+        meta = getattr(last_msg, "response_metadata", {}) or {}
+        final_call_token_usage = meta.get("token_usage", {})  # may be empty depending on provider
+
+        # Aggregated totals
+        aggregated = {
+            "prompt_tokens": counter.prompt_tokens,
+            "completion_tokens": counter.completion_tokens,
+            "total_tokens": counter.total_tokens,
+            "calls": counter.calls,
+            "total_cost_usd": round(counter.input_cost_usd + counter.output_cost_usd, 6),
+        }
+
+        # Full metadata payload with both views
+        metadata = {
+            "model_name": meta.get("model_name", ""),
+            "final_call_token_usage": final_call_token_usage,  # last LLM call only
+            "aggregated_usage": aggregated,                    # run-level totals
+            "per_call_usage": counter.calls_detail,            # list of per-call dicts
+        }
+
+        self.logger.info(
+            f"Agent tokens (run-level): {aggregated['total_tokens']} "
+            f"over {aggregated['calls']} calls"
+        )
+        return metadata
+
+
+    @asynccontextmanager
+    async def _tools_and_instructions(self, server_cfg: Dict[str, Any]) -> AsyncIterator[Tuple[List[Any], List[Any]]]:
+        """MCP tools and instruction prompts, bound to sessions that stay open inside the block."""
+        # Session-scoped servers carry per-run context in their environment, so they are never pooled.
+        if self.persistent_mcp_sessions and not self.mcp_env:
+            tools, instruction_msgs = await get_mcp_session_pool().get_tools_and_instructions(
+                self.mcp_set_name, server_cfg, self.mcp_tools
+            )
+            if not tools:
+                self.logger.error("No MCP tools were successfully loaded.")
+                raise RuntimeError("No MCP tools were successfully loaded.")
+            yield tools, instruction_msgs
+            return
+
         # IMPORTANT: langchain-mcp-adapters 0.1.0 does NOT allow `async with MultiServerMCPClient(...)`.
         # To ensure deterministic cleanup and avoid spawning a new stdio server process on every tool call,
         # we open one session per configured MCP server for the duration of this run.
@@ -122,75 +215,145 @@ class BaseAgent:
                 except Exception as e:
                     self.logger.warning(f"'{server_name}' lacks an 'instruction' prompt ({e})")
 
-            # 4️⃣ ReAct agent
-            if instruction_msgs:
-                system_text = "\n\n".join(m.content for m in instruction_msgs)
-                prompt = ChatPromptTemplate.from_messages(
-                    [
-                        ("system", system_text),
-                        MessagesPlaceholder("messages"),
-                    ]
-                )
-                agent = create_react_agent(self.llm, tools, prompt=prompt)
-                self.logger.info("Created ReAct agent with custom prompt")
-            else:
-                agent = create_react_agent(self.llm, tools)
-                self.logger.info("Created ReAct agent with default prompt")
-
-            # 5️⃣ Run with per-call + aggregated accounting
-            invoke_kwargs: Dict[str, Any] = {
-                "messages": [HumanMessage(content=task_instruction)]
-            }
-            self.logger.info("Starting agent execution")
+            yield tools, instruction_msgs
+
+    def _create_react_agent(self, llm: Any, tools: List[Any], instruction_msgs: List[Any]) -> Any:
+        # 4️⃣ ReAct agent
+        if instruction_msgs:
+            system_text = "\n\n".join(m.content for m in instruction_msgs)
+            prompt = ChatPromptTemplate.from_messages(
+                [
+                    ("system", system_text),
+                    MessagesPlaceholder("messages"),
+                ]
+            )
+            agent = create_react_agent(llm, tools, prompt=prompt)
+            self.logger.info("Created ReAct agent with custom prompt")
+        else:
+            agent = create_react_agent(llm, tools)
+            self.logger.info("Created ReAct agent with default prompt")
+        return agent
+
+    def _log_exception_group(self, e: BaseException) -> None:
+        # Python 3.11+: langgraph can raise ExceptionGroup/TaskGroup errors.
+        # Surface the nested exceptions so pipeline logs are actionable.
+        sub_excs = getattr(e, "exceptions", None)
+        if sub_excs:
+            try:
+                self.logger.error(f"Agent raised an exception group with {len(sub_excs)} sub-exception(s):")
+                for i, sub in enumerate(sub_excs, start=1):
+                    self.logger.error(f"  [{i}] {type(sub).__name__}: {sub}")
+            except Exception:
+                pass
+
+    async def _invoke_react_agent(
+        self,
+        tools: List[Any],
+        instruction_msgs: List[Any],
+        task_instruction: str,
+        recursion_limit: int | None,
+    ) -> Tuple[Dict[str, Any], TokenCounter]:
+        agent = self._create_react_agent(self.llm, tools, instruction_msgs)
+
+        # 5️⃣ Run with per-call + aggregated accounting
+        invoke_kwargs: Dict[str, Any] = {
+            "messages": [HumanMessage(content=task_instruction)]
+        }
+        self.logger.info("Starting agent execution")
+
+        counter = TokenCounter(log_fn=self.logger.info)
+        config: Dict[str, Any] = {"callbacks": [counter]}
+        if recursion_limit is not None:
+            config["recursion_limit"] = recursion_limit
+
+        try:
+            result = await agent.ainvoke(invoke_kwargs, config)
+        except BaseException as e:
+            self._log_exception_group(e)
+            raise
+        self.logger.info("Agent execution completed")
+        return result, counter
+
+    # ──────────────────────────── stream ────────────────────────────
+    def _streaming_llm(self) -> Any:
+        """`self.llm` with token streaming (and streamed usage) switched on, if it supports it."""
+        fields = getattr(type(self.llm), "model_fields", {}) or {}
+        if "streaming" not in fields:
+            return self.llm
+        update: Dict[str, Any] = {"streaming": True}
+        if "stream_usage" in fields:
+            update["stream_usage"] = True
+        return self.llm.model_copy(update=update)
+
+    async def astream(
+        self,
+        task_instruction: str,
+        recursion_limit: int | None = None,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Like `run`, but yield events while the ReAct loop runs:
+
+        - {"type": "token", "content": str}: a chunk of LLM output
+        - {"type": "tool_start", "name": str, "input": Any}
+        - {"type": "tool_end", "name": str, "output": str}
+        - {"type": "done", "answer": str, "metadata": dict}: last event; metadata is
+          `run`'s plus "time_to_first_token_s" (None if no token was streamed)
 
+        Closing the generator (or cancelling the task consuming it) stops the agent.
+        """
+        task_preview = task_instruction[:200] + "..." if len(task_instruction) > 200 else task_instruction
+        self.logger.info(f"Starting BaseAgent stream with task: {task_preview}")
+        started = time.perf_counter()
+        server_cfg = self._server_config()
+        if not await self.mcp_config.is_docker_running():
+            self.logger.error("Docker is not running – MCP tools need it.")
+
+        async with self._tools_and_instructions(server_cfg) as (tools, instruction_msgs):
+            agent = self._create_react_agent(self._streaming_llm(), tools, instruction_msgs)
             counter = TokenCounter(log_fn=self.logger.info)
             config: Dict[str, Any] = {"callbacks": [counter]}
             if recursion_limit is not None:
                 config["recursion_limit"] = recursion_limit
 
+            first_token_s: float | None = None
+            final_state: Dict[str, Any] | None = None
+            last_ai_msg: Any = None
             try:
-                result = await agent.ainvoke(invoke_kwargs, config)
+                async for event in agent.astream_events(
+                    {"messages": [HumanMessage(content=task_instruction)]}, config, version="v2"
+                ):
+                    kind = event.get("event")
+                    data = event.get("data") or {}
+                    if kind == "on_chat_model_stream":
+                        content = getattr(data.get("chunk"), "content", "")
+                        if isinstance(content, str) and content:
+                            if first_token_s is None:
+                                first_token_s = time.perf_counter() - started
+                            yield {"type": "token", "content": content}
+                    elif kind == "on_chat_model_end":
+                        last_ai_msg = data.get("output")
+                    elif kind == "on_tool_start":
+                        yield {"type": "tool_start", "name": event.get("name", ""), "input": data.get("input")}
+                    elif kind == "on_tool_end":
+                        output = data.get("output")
+                        output = getattr(output, "content", output)
+                        yield {"type": "tool_end", "name": event.get("name", ""), "output": str(output)}
+                    elif kind == "on_chain_end" and not event.get("parent_ids"):
+                        output = data.get("output")
+                        if isinstance(output, dict) and output.get("messages"):
+                            final_state = output
             except BaseException as e:
-                # Python 3.11+: langgraph can raise ExceptionGroup/TaskGroup errors.
-                # Surface the nested exceptions so pipeline logs are actionable.
-                sub_excs = getattr(e, "exceptions", None)
-                if sub_excs:
-                    try:
-                        self.logger.error(f"Agent raised an exception group with {len(sub_excs)} sub-exception(s):")
-                        for i, sub in enumerate(sub_excs, start=1):
-                            self.logger.error(f"  [{i}] {type(sub).__name__}: {sub}")
-                    except Exception:
-                        pass
+                self._log_exception_group(e)
                 raise
-            self.logger.info("Agent execution completed")
-
-            # 6️⃣ Final message + final-call meta (optional)
-            last_msg = result["messages"][-1]
-            meta = getattr(last_msg, "response_metadata", {}) or {}
-            final_call_token_usage = meta.get("token_usage", {})  # may be empty depending on provider
-
-        # Aggregated totals
-        aggregated = {
-            "prompt_tokens": counter.prompt_tokens,
-            "completion_tokens": counter.completion_tokens,
-            "total_tokens": counter.total_tokens,
-            "calls": counter.calls,
-            "total_cost_usd": round(counter.input_cost_usd + counter.output_cost_usd, 6),
-        }
 
-        # Full metadata payload with both views
-        metadata = {
-            "model_name": meta.get("model_name", ""),
-            "final_call_token_usage": final_call_token_usage,  # last LLM call only
-            "aggregated_usage": aggregated,                    # run-level totals
-            "per_call_usage": counter.calls_detail,            # list of per-call dicts
-        }
-
-        self.logger.info(
-            f"Agent tokens (run-level): {aggregated['total_tokens']} "
-            f"over {aggregated['calls']} calls"
-        )
-        return last_msg.content, metadata
+        last_msg = final_state["messages"][-1] if final_state else last_ai_msg
+        if last_msg is None:
+            raise RuntimeError("Agent stream ended without a final message")
+        metadata = self._run_metadata(last_msg, counter)
+        metadata["time_to_first_token_s"] = round(first_token_s, 3) if first_token_s is not None else None
+        metadata["elapsed_s"] = round(time.perf_counter() - started, 3)
+        self.logger.info(f"Agent stream completed (time to first token: {metadata['time_to_first_token_s']}s)")
+        yield {"type": "done", "answer": last_msg.content, "metadata": metadata}
 
 
 # ─────────────────────────── demo ───────────────────────────
@@ -25,14 +25,23 @@ class MCPConfig:
             raise Exception(f"Error loading MCP config file: {str(e)}")
 
 
-    async def is_docker_running(self):
-        process = await asyncio.create_subprocess_exec(
-            'docker', 'info',
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE
-        )
-        stdout, stderr = await process.communicate()
-        return process.returncode == 0
+    # `docker info` takes ~0.5-2 s; probe once per process and share the result across instances.
+    _docker_running = None
+
+    async def is_docker_running(self, refresh: bool = False):
+        if MCPConfig._docker_running is not None and not refresh:
+            return MCPConfig._docker_running
+        try:
+            process = await asyncio.create_subprocess_exec(
+                'docker', 'info',
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE
+            )
+            stdout, stderr = await process.communicate()
+            MCPConfig._docker_running = process.returncode == 0
+        except FileNotFoundError:
+            MCPConfig._docker_running = False
+        return MCPConfig._docker_running
 
     def get_config(self, mcp_name_list: list[str]):
         import sys
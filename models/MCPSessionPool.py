@@ -0,0 +1,274 @@
+"""
+MCPSessionPool – process-wide pool of long-lived MCP server sessions.
+
+`BaseAgent.run` normally starts every configured stdio server, lists its tools and
+fetches its `instruction` prompt on every call. Pipelines call `run` once per
+section / entity / retry, so that is thousands of interpreter start-ups per paper.
+
+The pool keeps one session per (config file, server name) alive in a dedicated
+background event loop (sessions are bound to the loop that opened them, and the
+pipelines call `asyncio.run` per agent run). Tool schemas and instruction prompts
+are cached for the lifetime of the session; tool calls made from any loop are
+forwarded to the pool loop. Before a session is handed out it is health-checked
+with an MCP ping and restarted if the server died. A tool call that finds the
+server gone restarts it too, under the same per-server lock as the hand-out, so
+concurrent callers (several agents sharing one server) start one replacement.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import atexit
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+import anyio
+from langchain_core.messages import BaseMessage
+from langchain_core.tools import BaseTool
+from langchain_mcp_adapters.prompts import load_mcp_prompt
+from langchain_mcp_adapters.sessions import create_session
+from langchain_mcp_adapters.tools import load_mcp_tools
+
+from src.utils.global_logger import get_logger
+
+PING_TIMEOUT_S = 10.0
+START_TIMEOUT_S = 120.0
+CLOSE_TIMEOUT_S = 10.0
+
+
+class _SessionProxy:
+    """Stands in for a ClientSession inside LangChain tools; forwards calls to the pool loop."""
+
+    def __init__(self, server: "_PooledServer"):
+        self._server = server
+
+    async def list_tools(self, cursor: str | None = None):
+        # Only used by load_mcp_tools while the server starts, on the pool loop
+        return await self._server.session.list_tools(cursor=cursor)
+
+    async def call_tool(self, name: str, arguments: Dict[str, Any] | None = None):
+        return await self._server.call_tool(name, arguments)
+
+
+class _PooledServer:
+    """One MCP server process plus its cached tool schemas and instruction prompt."""
+
+    def __init__(self, pool: "MCPSessionPool", key: Tuple[str, str], connection: Dict[str, Any]):
+        self.pool = pool
+        self.key = key
+        self.connection = connection
+        self.session = None
+        self.tools: List[BaseTool] = []
+        self.instruction_msgs: List[BaseMessage] = []
+        self.restarts = 0
+        self._task: Optional[asyncio.Task] = None
+        self._closing: Optional[asyncio.Event] = None
+        self._ready: Optional[asyncio.Future] = None
+
+    # ── lifecycle (runs on the pool loop) ──
+    async def _serve(self) -> None:
+        try:
+            async with create_session(self.connection) as session:
+                await session.initialize()
+                self.session = session
+                # The tools call through the proxy, so they survive restarts of the server
+                tools = await load_mcp_tools(_SessionProxy(self))
+                try:
+                    instruction_msgs = await load_mcp_prompt(session, "instruction")
+                except Exception as e:
+                    self.pool.logger.warning(f"'{self.key[1]}' lacks an 'instruction' prompt ({e})")
+                    instruction_msgs = []
+                self.tools = tools
+                self.instruction_msgs = instruction_msgs
+                if not self._ready.done():
+                    self._ready.set_result(True)
+                await self._closing.wait()
+        except BaseException as exc:
+            if not self._ready.done():
+                self._ready.set_exception(exc if isinstance(exc, Exception) else RuntimeError(str(exc)))
+            else:
+                self.pool.logger.warning(f"MCP server {self.key} stopped: {exc}")
+        finally:
+            self.session = None
+
+    async def _start(self) -> None:
+        self._closing = asyncio.Event()
+        self._ready = asyncio.get_running_loop().create_future()
+        self._task = asyncio.create_task(self._serve())
+        await asyncio.wait_for(asyncio.shield(self._ready), timeout=START_TIMEOUT_S)
+
+    async def _stop(self) -> None:
+        if self._task is None:
+            return
+        self._closing.set()
+        try:
+            await asyncio.wait_for(self._task, timeout=CLOSE_TIMEOUT_S)
+        except BaseException:
+            self._task.cancel()
+        self._task = None
+        self.session = None
+
+    async def _is_healthy(self) -> bool:
+        if self.session is None or self._task is None or self._task.done():
+            return False
+        try:
+            await asyncio.wait_for(self.session.send_ping(), timeout=PING_TIMEOUT_S)
+            return True
+        except Exception:
+            return False
+
+    async def _ensure_started(self) -> None:
+        if await self._is_healthy():
+            return
+        if self._task is not None:
+            self.restarts += 1
+            self.pool.logger.warning(f"Restarting MCP server {self.key} (restart #{self.restarts})")
+            await self._stop()
+        await self._start()
+        self.pool.logger.info(f"Pooled MCP server {self.key} ready with {len(self.tools)} tools")
+
+    async def _restart(self, dead: Any) -> Any:
+        """Restart the server if its session is still `dead`, and return the current session."""
+        async with self.pool._server_lock(self.key):
+            # Re-checked under the lock: a concurrent caller may have replaced the session already
+            if self.session is None or self.session is dead:
+                await self._ensure_started()
+            return self.session
+
+    async def _call_tool(self, name: str, arguments: Dict[str, Any] | None):
+        session = self.session
+        if session is None:
+            session = await self._restart(session)
+        try:
+            return await session.call_tool(name, arguments)
+        except (anyio.ClosedResourceError, anyio.BrokenResourceError):
+            # The server was gone before the request was sent: restart it and send the request once more
+            session = await self._restart(session)
+            return await session.call_tool(name, arguments)
+
+    # ── caller side (any loop) ──
+    async def call_tool(self, name: str, arguments: Dict[str, Any] | None = None):
+        return await self.pool.submit(self._call_tool(name, arguments))
+
+    def langchain_tools(self) -> List[BaseTool]:
+        return self.tools
+
+
+class MCPSessionPool:
+    """Keeps MCP servers alive across agent runs; see module docstring."""
+
+    _instance: Optional["MCPSessionPool"] = None
+    _instance_lock = threading.Lock()
+
+    def __init__(self):
+        self.logger = get_logger("agent", "MCPSessionPool")
+        self._servers: Dict[Tuple[str, str], _PooledServer] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+        self._server_locks: Dict[Tuple[str, str], asyncio.Lock] = {}
+
+    @classmethod
+    def instance(cls) -> "MCPSessionPool":
+        with cls._instance_lock:
+            if cls._instance is None:
+                cls._instance = cls()
+                atexit.register(cls._instance.close)
+            return cls._instance
+
+    # ── pool loop ──
+    def _ensure_loop(self) -> asyncio.AbstractEventLoop:
+        with self._start_lock:
+            if self._loop is None or not self._thread.is_alive():
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(
+                    target=self._loop.run_forever, name="mcp-session-pool", daemon=True
+                )
+                self._thread.start()
+            return self._loop
+
+    async def submit(self, coro):
+        """Run *coro* on the pool loop and await its result from the caller's loop."""
+        loop = self._ensure_loop()
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            return await coro
+        return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coro, loop))
+
+    def _server_lock(self, key: Tuple[str, str]) -> asyncio.Lock:
+        """Serializes starting, restarting and replacing the server `key` (pool loop only)."""
+        return self._server_locks.setdefault(key, asyncio.Lock())
+
+    async def _acquire(self, key: Tuple[str, str], connection: Dict[str, Any]) -> _PooledServer:
+        async with self._server_lock(key):
+            server = self._servers.get(key)
+            if server is None or server.connection != connection:
+                if server is not None:
+                    await server._stop()
+                server = _PooledServer(self, key, connection)
+                self._servers[key] = server
+            await server._ensure_started()
+            return server
+
+    # ── public API ──
+    async def get_tools_and_instructions(
+        self,
+        config_name: str,
+        server_cfg: Dict[str, Dict[str, Any]],
+        server_names: List[str],
+    ) -> Tuple[List[BaseTool], List[BaseMessage]]:
+        """Return LangChain tools and instruction messages for *server_names*, starting servers on demand."""
+        tools: List[BaseTool] = []
+        instruction_msgs: List[BaseMessage] = []
+        for server_name in server_names:
+            if server_name not in server_cfg:
+                raise RuntimeError(f"Could not open MCP session for '{server_name}': not found in {config_name}")
+            key = (config_name, server_name)
+            try:
+                server = await self.submit(self._acquire(key, server_cfg[server_name]))
+            except Exception as exc:
+                self.logger.error(f"Could not open MCP session for '{server_name}': {exc}")
+                raise RuntimeError(f"Could not open MCP session for '{server_name}': {exc}") from exc
+            server_tools = server.langchain_tools()
+            tools.extend(server_tools)
+            instruction_msgs.extend(server.instruction_msgs)
+            self.logger.info(f"Reusing {len(server_tools)} pooled MCP tools from {server_name}")
+        return tools, instruction_msgs
+
+    async def _close_all(self) -> None:
+        for server in list(self._servers.values()):
+            await server._stop()
+        self._servers.clear()
+
+    def invalidate(self, config_name: Optional[str] = None, server_name: Optional[str] = None) -> None:
+        """Stop matching servers so the next run restarts them (e.g. after regenerating a server script)."""
+        if self._loop is None:
+            return
+
+        async def _drop():
+            for key in list(self._servers):
+                if (config_name is None or key[0] == config_name) and (server_name is None or key[1] == server_name):
+                    await self._servers.pop(key)._stop()
+
+        asyncio.run_coroutine_threadsafe(_drop(), self._loop).result(timeout=CLOSE_TIMEOUT_S * 2)
+
+    def close(self) -> None:
+        if self._loop is None or not self._thread.is_alive():
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._close_all(), self._loop).result(
+                timeout=CLOSE_TIMEOUT_S * max(1, len(self._servers))
+            )
+        except Exception as e:
+            self.logger.warning(f"Error while closing pooled MCP sessions: {e}")
+        finally:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=CLOSE_TIMEOUT_S)
+            self._loop = None
+
+
+def get_mcp_session_pool() -> MCPSessionPool:
+    return MCPSessionPool.instance()
@@ -163,6 +163,7 @@ class TokenCounter(BaseCallbackHandler):
             usage.get("cached_prompt_tokens")
             or usage.get("cache_read_input_tokens")
             or ((usage.get("prompt_tokens_details") or {}).get("cached_tokens"))
+            or ((usage.get("input_token_details") or {}).get("cache_read"))
         )
         tt = usage.get("total_tokens") or (pt or 0) + (ct or 0)
 
@@ -263,6 +264,9 @@ class TokenCounter(BaseCallbackHandler):
                         gmeta = gen.message.response_metadata or {}
                     gmeta = {**(getattr(gen, "generation_info", {}) or {}), **gmeta}
                     usage2 = gmeta.get("token_usage", {}) or {}
+                    if not usage2 and hasattr(gen, "message"):
+                        # Streamed responses carry usage only on the message (stream_usage=True)
+                        usage2 = dict(getattr(gen.message, "usage_metadata", None) or {})
                     meta2 = {"model_name": gmeta.get("model_name") or gmeta.get("model")}
                     if any(
                         k in usage2
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Benchmark the grounding internal merge (src/agents/grounding/internal_merge.py)
+on synthetic graphs, against the full-recompute fixpoint it replaced.
+
+The synthetic graphs are built to need several rounds: entity trees of `depth`
+levels are instantiated `copies` times under different IRIs, so the leaves merge
+in round 1, their parents in round 2, and so on. Some copies differ in one
+literal (they merge up to that level only), the nodes also point at shared type
+nodes and at random copies of older trees (fan-in for the reverse index), and
+unique noise nodes never merge.
+
+Usage:
+    python scripts/benchmark_internal_merge.py                    # 1e5, 3e5, 1e6 triples
+    python scripts/benchmark_internal_merge.py --sizes 100000 --no-reference --json out.json
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple, Union
+
+_repo_root = Path(__file__).resolve().parents[1]
+if str(_repo_root) not in sys.path:
+    sys.path.insert(0, str(_repo_root))
+
+from rdflib import Graph, Literal, Namespace, RDF, RDFS, URIRef
+from rdflib.term import BNode
+
+from src.agents.grounding.internal_merge import compute_internal_merge_mapping
+
+EX = Namespace("https://example.org/bench/")
+
+
+def synthetic_graph(n_triples: int, seed: int = 0, depth: int = 6, copies: int = 3) -> Graph:
+    """A graph of about `n_triples` triples whose duplicates merge over `depth` rounds."""
+    rng = random.Random(seed)
+    g = Graph()
+    kinds = [EX[f"Kind{i}"] for i in range(20)]
+    template = 0
+    while len(g) < n_triples:
+        # One tree template: level i has a label, a type, a child at level i-1 and sometimes a cross link
+        values = [f"t{template}-{level}-{rng.randrange(1000)}" for level in range(depth)]
+        kind = rng.choice(kinds)
+        # Cross links go to a random copy of an older tree: the copies merge once that level of it has
+        cross = [rng.randrange(template) if template and rng.random() < 0.3 else None for _ in range(depth)]
+        perturb = rng.randrange(depth) if rng.random() < 0.3 else None
+        for copy in range(copies):
+            child = None
+            for level in range(depth):
+                node = EX[f"t{template}/c{copy}/n{level}"]
+                label = values[level]
+                if copy == copies - 1 and perturb == level:
+                    label += "-variant"
+                g.add((node, RDF.type, kind))
+                g.add((node, RDFS.label, Literal(label)))
+                if child is not None:
+                    g.add((node, EX.hasPart, child))
+                if cross[level] is not None:
+                    g.add((node, EX.refersTo, EX[f"t{cross[level]}/c{rng.randrange(copies)}/n{level}"]))
+                child = node
+        # Noise: a unique node that points into the tree
+        g.add((EX[f"noise{template}"], EX.about, EX[f"t{template}/c0/n{depth - 1}"]))
+        g.add((EX[f"noise{template}"], RDFS.label, Literal(f"noise {template}")))
+        template += 1
+    return g
+
+
+def reference_internal_merge_mapping(graph: Graph, *, max_rounds: int = 10) -> Dict[str, str]:
+    """The previous implementation: every round re-signs and regroups every subject."""
+    parents: Dict[str, str] = {}
+
+    def _init(x: str) -> None:
+        if x not in parents:
+            parents[x] = x
+
+    def find(x: str) -> str:
+        _init(x)
+        while parents[x] != x:
+            parents[x] = parents[parents[x]]
+            x = parents[x]
+        return x
+
+    def union(a: str, b: str) -> bool:
+        ra, rb = find(a), find(b)
+        if ra == rb:
+            return False
+        if ra < rb:
+            parents[rb] = ra
+        else:
+            parents[ra] = rb
+        return True
+
+    subjects: List[str] = sorted({str(s) for s in graph.subjects() if isinstance(s, URIRef)})
+    for s in subjects:
+        _init(s)
+
+    def norm_term(t: Union[URIRef, BNode, Literal]) -> Tuple[str, str]:
+        if isinstance(t, URIRef):
+            return ("uri", find(str(t)))
+        if isinstance(t, BNode):
+            return ("bnode", t.n3())
+        return ("lit", t.n3())
+
+    def signature_for(subj_iri: str) -> Tuple[Tuple[Tuple[str, str], Tuple[str, str]], ...]:
+        pairs = []
+        for p, o in graph.predicate_objects(URIRef(subj_iri)):
+            p_key = norm_term(p) if isinstance(p, (URIRef, BNode, Literal)) else ("other", str(p))
+            o_key = norm_term(o) if isinstance(o, (URIRef, BNode, Literal)) else ("other", str(o))
+            pairs.append((p_key, o_key))
+        pairs.sort()
+        return tuple(pairs)
+
+    for _round in range(max_rounds):
+        groups: Dict[Tuple, List[str]] = {}
+        for s in subjects:
+            groups.setdefault(signature_for(find(s)), []).append(find(s))
+        changed = False
+        for members in groups.values():
+            uniq = sorted(set(members))
+            for other in uniq[1:]:
+                changed = union(uniq[0], other) or changed
+        if not changed:
+            break
+
+    out: Dict[str, str] = {}
+    for s in subjects:
+        r = find(s)
+        if r != s:
+            out[s] = r
+    return out
+
+
+def _timed(fn, graph: Graph) -> Tuple[Dict[str, str], float]:
+    started = time.perf_counter()
+    mapping = fn(graph)
+    return mapping, time.perf_counter() - started
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Time the incremental internal merge vs. the full-recompute fixpoint")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100_000, 300_000, 1_000_000], help="Triples per graph")
+    parser.add_argument("--depth", type=int, default=6, help="Levels per entity tree (rounds needed to merge them)")
+    parser.add_argument("--copies", type=int, default=3, help="Instances of each entity tree")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-reference", action="store_true", help="Only time the incremental implementation")
+    parser.add_argument("--json", default=None, help="Write the results to this file")
+    args = parser.parse_args()
+
+    results = []
+    for size in args.sizes:
+        graph = synthetic_graph(size, seed=args.seed, depth=args.depth, copies=args.copies)
+        mapping, seconds = _timed(compute_internal_merge_mapping, graph)
+        row = {"triples": len(graph), "merged": len(mapping), "incremental_seconds": round(seconds, 3)}
+        if not args.no_reference:
+            expected, ref_seconds = _timed(reference_internal_merge_mapping, graph)
+            row["reference_seconds"] = round(ref_seconds, 3)
+            row["speedup"] = round(ref_seconds / seconds, 2) if seconds else None
+            row["identical"] = mapping == expected
+        results.append(row)
+        print(json.dumps(row))
+
+    if args.json:
+        Path(args.json).write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+    return 0 if all(r.get("identical", True) for r in results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Benchmark the fitz table pre-pass (src/pipelines/pdf_conversion/table_detection.py)
+against running docling on every page.
+
+Every page of each PDF is converted by docling on its own, which gives the
+tables of each page and what docling costs per page. The pre-pass is then scored
+by the tables it would keep (recall: tables on candidate pages / all tables) and
+the docling time it would save (seconds spent on non-candidate pages), against
+its own cost.
+
+Usage:
+    python scripts/benchmark_table_detection.py                 # data/*/*.pdf
+    python scripts/benchmark_table_detection.py a.pdf b.pdf --threshold 0.2 --json out.json
+"""
+
+import argparse
+import glob
+import json
+import os
+import sys
+from pathlib import Path
+
+_repo_root = Path(__file__).resolve().parents[1]
+if str(_repo_root) not in sys.path:
+    sys.path.insert(0, str(_repo_root))
+
+from src.pipelines.pdf_conversion.engine import TableExtractionEngine
+from src.pipelines.pdf_conversion.table_detection import DEFAULT_THRESHOLD, detect_table_pages
+
+
+def benchmark_pdf(engine: TableExtractionEngine, pdf_path: str, threshold: float) -> dict:
+    scores = detect_table_pages(pdf_path, threshold)
+    pending = engine.submit(pdf_path, pages=[s.page for s in scores])
+    per_page = {page_range[0]: (len(tables), seconds) for page_range, tables, seconds in pending.by_range()}
+
+    candidates = {s.page for s in scores if s.candidate}
+    tables_total = sum(n for n, _s in per_page.values())
+    tables_kept = sum(n for page, (n, _s) in per_page.items() if page in candidates)
+    docling_all = sum(s for _n, s in per_page.values())
+    docling_detected = sum(s for page, (_n, s) in per_page.items() if page in candidates)
+    return {
+        "pdf": pdf_path,
+        "pages": len(scores),
+        "candidate_pages": len(candidates),
+        "table_pages": sorted(page for page, (n, _s) in per_page.items() if n),
+        "missed_pages": sorted(page for page, (n, _s) in per_page.items() if n and page not in candidates),
+        "tables_all": tables_total,
+        "tables_detected": tables_kept,
+        "recall": tables_kept / tables_total if tables_total else 1.0,
+        "detection_seconds": sum(s.seconds for s in scores),
+        "docling_seconds_all": docling_all,
+        "docling_seconds_detected": docling_detected,
+        "page_scores": [s.to_json() for s in scores],
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Recall and time of the table pre-pass vs. docling on all pages")
+    parser.add_argument("pdfs", nargs="*", help="PDFs to benchmark (default: data/*/*.pdf)")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="candidate score threshold")
+    parser.add_argument("--workers", type=int, default=0, help="docling worker processes (0 = in process)")
+    parser.add_argument("--json", help="write the per-PDF results to this file")
+    args = parser.parse_args()
+
+    pdfs = args.pdfs or sorted(glob.glob(os.path.join("data", "*", "*.pdf")))
+    if not pdfs:
+        print("No PDFs found (pass paths or put them under data/<hash>/)", file=sys.stderr)
+        return 2
+
+    # One page per task: per-page tables and timing
+    engine = TableExtractionEngine(workers=args.workers, pages_per_task=1, split_pages=True)
+    results = []
+    try:
+        for pdf in pdfs:
+            r = benchmark_pdf(engine, pdf, args.threshold)
+            results.append(r)
+            print(
+                f"{os.path.basename(pdf)}: {r['candidate_pages']}/{r['pages']} pages, "
+                f"tables {r['tables_detected']}/{r['tables_all']} (recall {r['recall']:.2f}), "
+                f"docling {r['docling_seconds_detected']:.1f}s vs {r['docling_seconds_all']:.1f}s, "
+                f"pre-pass {r['detection_seconds']:.2f}s"
+                + (f", missed pages {r['missed_pages']}" if r["missed_pages"] else "")
+            )
+    finally:
+        engine.shutdown()
+
+    tables_all = sum(r["tables_all"] for r in results)
+    tables_detected = sum(r["tables_detected"] for r in results)
+    seconds_all = sum(r["docling_seconds_all"] for r in results)
+    seconds_detected = sum(r["docling_seconds_detected"] + r["detection_seconds"] for r in results)
+    print(
+        f"\nTotal: {len(results)} PDFs, {sum(r['pages'] for r in results)} pages, "
+        f"recall {tables_detected}/{tables_all} = {(tables_detected / tables_all if tables_all else 1.0):.3f}, "
+        f"time {seconds_detected:.1f}s (detected, incl. pre-pass) vs {seconds_all:.1f}s (all pages)"
+    )
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"threshold": args.threshold, "results": results}, f, indent=2)
+        print(f"Wrote {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
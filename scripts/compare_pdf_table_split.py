@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Compare the tables of page-split docling tasks with whole-PDF conversion.
+
+The PDF conversion step used to run docling once per PDF and write every table
+it found to `<name>_tables.md`. The engine (src/pipelines/pdf_conversion/engine.py)
+can instead convert a PDF as ranges of MOPS_PDF_PAGES_PER_TASK pages. This script
+writes both versions of `<name>_tables.md` for each multi-page PDF and reports
+whether they are identical, so the split can be checked before it is enabled.
+
+Usage:
+    python scripts/compare_pdf_table_split.py                    # data/*/*.pdf
+    python scripts/compare_pdf_table_split.py a.pdf b.pdf --pages-per-task 2 --json out.json
+
+Exits with 1 when any PDF differs.
+"""
+
+import argparse
+import difflib
+import glob
+import json
+import os
+import sys
+from pathlib import Path
+from typing import List
+
+_repo_root = Path(__file__).resolve().parents[1]
+if str(_repo_root) not in sys.path:
+    sys.path.insert(0, str(_repo_root))
+
+from src.pipelines.pdf_conversion.engine import TableExtractionEngine, count_pages, tables_markdown
+
+
+def tables_md(tables: List[str]) -> str:
+    """`<name>_tables.md` content for the given table markdown, as the conversion step writes it."""
+    lines = []
+    for i, table in enumerate(tables, start=1):
+        lines.append(f"## Table {i}\n")
+        lines.append(table)
+        lines.append("")
+    return "\n".join(lines)
+
+
+def compare_pdf(engine: TableExtractionEngine, pdf_path: str) -> dict:
+    """Whole-PDF tables vs. the tables of `engine`'s page ranges for one PDF."""
+    whole = tables_md(tables_markdown(pdf_path))
+    pending = engine.submit(pdf_path)
+    split = tables_md(pending.result())
+    diff = list(difflib.unified_diff(
+        whole.splitlines(), split.splitlines(), "whole", f"{engine.pages_per_task} pages per task", lineterm=""
+    ))
+    return {
+        "pdf": pdf_path,
+        "pages": count_pages(pdf_path),
+        "ranges": [list(r) if r else "all" for r in pending.ranges],
+        "tables_whole": whole.count("## Table "),
+        "tables_split": split.count("## Table "),
+        "identical": whole == split,
+        "diff": diff,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Check that page-split docling tasks give the same tables as whole PDFs")
+    parser.add_argument("pdfs", nargs="*", help="PDFs to compare (default: data/*/*.pdf)")
+    parser.add_argument("--pages-per-task", type=int, default=4, help="pages per docling task to check")
+    parser.add_argument("--workers", type=int, default=0, help="docling worker processes (0 = in process)")
+    parser.add_argument("--json", help="write the per-PDF results to this file")
+    args = parser.parse_args()
+
+    pdfs = args.pdfs or sorted(glob.glob(os.path.join("data", "*", "*.pdf")))
+    pdfs = [pdf for pdf in pdfs if count_pages(pdf) > max(1, args.pages_per_task)]
+    if not pdfs:
+        print("No PDFs longer than one task found (pass paths or put them under data/<hash>/)", file=sys.stderr)
+        return 2
+
+    engine = TableExtractionEngine(workers=args.workers, pages_per_task=args.pages_per_task, split_pages=True)
+    results = []
+    try:
+        for pdf in pdfs:
+            r = compare_pdf(engine, pdf)
+            results.append(r)
+            status = "identical" if r["identical"] else "DIFFERENT"
+            print(f"{os.path.basename(pdf)}: {r['pages']} pages, tables {r['tables_split']} vs {r['tables_whole']}, {status}")
+            if not r["identical"]:
+                print("\n".join(r["diff"][:40]))
+    finally:
+        engine.shutdown()
+
+    different = [r["pdf"] for r in results if not r["identical"]]
+    print(f"\nTotal: {len(results)} PDFs, {len(different)} different")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"pages_per_task": args.pages_per_task, "results": results}, f, indent=2)
+        print(f"Wrote {args.json}")
+    return 1 if different else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
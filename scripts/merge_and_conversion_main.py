@@ -1,8 +1,37 @@
+"""
+Merge the TTLs of every paper hash under data/ and convert the merged graph to
+the evaluation JSON files, one directory per hash (evaluation/data/merged_tll/<hash>/).
+
+Each hash is built on its own, in two stages:
+
+- merge: data/<hash>/output_*.ttl, ontospecies_output/*.ttl and
+  cbu_derivation/integrated/*.ttl -> <hash>.ttl, link.ttl;
+- conversion: <hash>.ttl -> cbu.json, characterisation.json, chemicals.json, steps.json.
+
+A stage's key is the sha256 of its input files, of the code that runs it and of
+the flags that change its output. It is recorded in merged_tll/<hash>/.build_stamp.json
+once the stage has succeeded. With --changed-only a stage is skipped when its key
+matches the stamp and its outputs exist, so a re-run after one new paper merges and
+converts that paper's hash only. The conversion key covers the merged TTL, so a
+merge whose output did not change does not trigger a conversion either.
+
+--jobs N builds N hashes at a time in worker processes. The workers parse their
+TTLs one after the other (MOPS_TTL_PARSE_WORKERS=1) rather than each starting a
+parse pool of its own.
+"""
+
 import json
 import os
 import argparse
+import hashlib
+import multiprocessing
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict, dataclass
 from pathlib import Path
 import sys
+from typing import Any, Dict, List, Optional
 
 # Ensure project root is on sys.path so 'scripts' package imports work when run directly
 _repo_root = Path(__file__).resolve().parents[1]
@@ -11,7 +40,9 @@ if str(_repo_root) not in sys.path:
 
 from rdflib import Graph
 
+from scripts.output_conversion_ttl_to_json.graph_index import indexed
 from scripts.output_conversion_ttl_to_json.ttl_merge import (
+    input_files_for_hash,
     merge_for_hash,
     build_link_graph,
     remove_orphan_entities,
@@ -38,12 +69,230 @@ from scripts.output_conversion_ttl_to_json.ontosynthesis_step_conversion import
     build_json_structure as step_build_json,
 )
 
+STAMP_NAME = ".build_stamp.json"
+# Bump to rebuild every hash after a change the code fingerprints below do not cover
+STAMP_VERSION = 1
+CONVERSION_OUTPUTS = ["cbu.json", "characterisation.json", "chemicals.json", "steps.json"]
+
+_conversion_dir = _repo_root / "scripts" / "output_conversion_ttl_to_json"
+MERGE_CODE = [
+    _conversion_dir / "ttl_merge.py",
+    _repo_root / "src" / "utils" / "ttl_loader.py",
+    _repo_root / "src" / "utils" / "ttl_parse_worker.py",
+]
+CONVERSION_CODE = sorted(p for p in _conversion_dir.rglob("*.py") if p.name != "ttl_merge.py")
+
+
+def _hash_file(path: str) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+@dataclass
+class BuildOptions:
+    merge: bool = True
+    conversion: bool = True
+    heuristic_linking: bool = True
+    debug: bool = False
+    changed_only: bool = False
+
+
+def _stage_key(stage: str, inputs: Dict[str, str], code: List[Path], config: Dict[str, Any]) -> str:
+    """sha256 over a stage's input files ({name: path}), code files and config."""
+    payload = {
+        "version": STAMP_VERSION,
+        "stage": stage,
+        "inputs": [[name, _hash_file(path)] for name, path in sorted(inputs.items())],
+        "code": [[p.relative_to(_repo_root).as_posix(), _hash_file(str(p))] for p in code if p.exists()],
+        "config": config,
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def merge_key(hash_dir: Path, options: BuildOptions) -> str:
+    # Paths relative to the hash directory, so moving data/ does not invalidate the stamps
+    inputs = {os.path.relpath(path, hash_dir).replace(os.sep, "/"): path for path in input_files_for_hash(str(hash_dir))}
+    return _stage_key("merge", inputs, MERGE_CODE, {"heuristic_linking": options.heuristic_linking})
+
+
+def conversion_key(merged_ttl: Path, options: BuildOptions) -> str:
+    return _stage_key("conversion", {"merged": str(merged_ttl)}, CONVERSION_CODE, {"debug": options.debug})
+
+
+def read_stamp(out_dir: Path) -> Dict[str, Any]:
+    try:
+        with open(out_dir / STAMP_NAME, "r", encoding="utf-8") as f:
+            stamp = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return stamp if isinstance(stamp, dict) else {}
+
+
+def write_stamp(out_dir: Path, stamp: Dict[str, Any]) -> None:
+    stamp["updated"] = time.time()
+    tmp = out_dir / f"{STAMP_NAME}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(stamp, f, indent=2)
+    os.replace(tmp, out_dir / STAMP_NAME)
+
+
+def _up_to_date(stamp: Dict[str, Any], stage: str, key: str, outputs: List[Path]) -> bool:
+    return stamp.get(stage) == key and all(p.exists() for p in outputs)
+
+
+def merge_hash(hash_value: str, data_root: Path, out_dir: Path, heuristic_linking: bool = True) -> Graph:
+    """Merge the TTLs of a hash, write link.ttl and the pruned <hash>.ttl; returns the pruned graph."""
+    g: Graph = merge_for_hash(
+        hash_value=hash_value,
+        data_root=str(data_root),
+        add_links=True,
+        enable_heuristic_linking=heuristic_linking,
+    )
+
+    # Export link-only subgraph for debugging
+    link_g = build_link_graph(g)
+    link_path = out_dir / "link.ttl"
+    link_g.serialize(destination=str(link_path), format="turtle")
+
+    # Prune orphans in the full graph (not applied to link.ttl)
+    pruned_g = remove_orphan_entities(g)
+    pruned_g.serialize(destination=str(out_dir / f"{hash_value}.ttl"), format="turtle")
+    return pruned_g
+
+
+def _write_json(path: Path, data: Any) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+
+
+def convert_graph(pruned_g: Graph, out_dir: Path, debug: bool = False) -> None:
+    """Write the four evaluation JSON files of a merged graph to `out_dir`."""
+    # One index of the graph serves all four converters
+    with indexed(pruned_g):
+        _convert_indexed(pruned_g, out_dir, debug)
+
+
+def _convert_indexed(pruned_g: Graph, out_dir: Path, debug: bool) -> None:
+    # Emit CBU JSON per hash, built from pruned graph
+    _write_json(out_dir / "cbu.json", build_cbu_json_from_graph(pruned_g))
+
+    # Emit Characterisation JSON per hash from pruned graph (OntoSpecies side)
+    namespaces = char_get_namespaces(pruned_g)
+    devices = char_query_devices(pruned_g, namespaces)
+    characterisations = char_query_data(pruned_g, namespaces)
+    _write_json(out_dir / "characterisation.json", char_build_json(devices, characterisations))
+
+    # Emit Chemicals JSON per hash
+    chem_ns = chem_get_namespaces(pruned_g)
+    ontomops_info = chem_query_ontomops(pruned_g, chem_ns)
+    syntheses = chem_query_syntheses(pruned_g, chem_ns)
+    _write_json(out_dir / "chemicals.json", chem_build_json(pruned_g, chem_ns, syntheses, ontomops_info, debug=debug))
+
+    # Emit Steps JSON per hash (now simplified to only chemicals per synthesis)
+    step_ns = step_get_namespaces(pruned_g)
+    step_syntheses = step_query_syntheses(pruned_g, step_ns)
+    if not step_syntheses:
+        step_syntheses = step_query_syntheses_fallback(pruned_g, step_ns)
+    _write_json(out_dir / "steps.json", step_build_json(pruned_g, step_ns, step_syntheses, debug=debug))
+
+
+def build_hash(hash_value: str, data_root: Path, output_root: Path, options: BuildOptions) -> Dict[str, Any]:
+    """
+    Run the stale stages of one hash (every stage unless `options.changed_only`).
+
+    Returns {"hash", "merged", "converted", "seconds"}; a failing stage raises, with
+    the stamp of the stages that succeeded before it already written.
+    """
+    started = time.perf_counter()
+    result: Dict[str, Any] = {"hash": hash_value, "merged": False, "converted": False}
+    hash_dir = data_root / hash_value
+    out_dir = output_root / hash_value
+    out_dir.mkdir(parents=True, exist_ok=True)
+    out_path = out_dir / f"{hash_value}.ttl"
+    stamp = read_stamp(out_dir)
+
+    pruned_g: Optional[Graph] = None
+
+    if options.merge:
+        key = merge_key(hash_dir, options)
+        if not (options.changed_only and _up_to_date(stamp, "merge", key, [out_path, out_dir / "link.ttl"])):
+            pruned_g = merge_hash(hash_value, data_root, out_dir, options.heuristic_linking)
+            stamp["merge"] = key
+            write_stamp(out_dir, stamp)
+            result["merged"] = True
+
+    # No TTL to convert from; skip
+    if options.conversion and (pruned_g is not None or out_path.exists()):
+        key = conversion_key(out_path, options)
+        if not (options.changed_only and _up_to_date(stamp, "conversion", key, [out_dir / name for name in CONVERSION_OUTPUTS])):
+            # Load from existing merged TTL if not produced in this run
+            if pruned_g is None:
+                pruned_g = Graph()
+                pruned_g.parse(str(out_path), format="turtle")
+            convert_graph(pruned_g, out_dir, debug=options.debug)
+            stamp["conversion"] = key
+            write_stamp(out_dir, stamp)
+            result["converted"] = True
+
+    result["seconds"] = round(time.perf_counter() - started, 2)
+    return result
+
+
+def _build_hash_task(hash_value: str, data_root: str, output_root: str, options: Dict[str, Any]) -> Dict[str, Any]:
+    # Pool entry point: plain arguments, and a failure is reported rather than raised
+    try:
+        return build_hash(hash_value, Path(data_root), Path(output_root), BuildOptions(**options))
+    except Exception as e:
+        return {"hash": hash_value, "error": f"{type(e).__name__}: {e}", "traceback": traceback.format_exc()}
+
+
+def _init_worker() -> None:
+    # Hashes are already built in parallel; a parse pool per worker would oversubscribe the CPUs
+    os.environ["MOPS_TTL_PARSE_WORKERS"] = "1"
+
+
+def build_all(
+    hash_values: List[str], data_root: Path, output_root: Path, options: BuildOptions, jobs: int = 1
+) -> List[Dict[str, Any]]:
+    """Build every hash in `hash_values` that has a data directory, `jobs` at a time; results in input order."""
+    hash_values = [h for h in hash_values if (data_root / h).is_dir()]
+    args = (str(data_root), str(output_root), asdict(options))
+    results: Dict[str, Dict[str, Any]] = {}
+    if jobs <= 1 or len(hash_values) <= 1:
+        for hash_value in hash_values:
+            results[hash_value] = _build_hash_task(hash_value, *args)
+            _report(results[hash_value])
+    else:
+        # spawn: rdflib graphs and open pools in the parent must not be inherited by the workers
+        context = multiprocessing.get_context("spawn")
+        workers = min(jobs, len(hash_values))
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker) as pool:
+            futures = [pool.submit(_build_hash_task, hash_value, *args) for hash_value in hash_values]
+            for future in as_completed(futures):
+                result = future.result()
+                results[result["hash"]] = result
+                _report(result)
+    return [results[h] for h in hash_values]
+
+
+def _report(result: Dict[str, Any]) -> None:
+    if "error" in result:
+        print(f"[{result['hash']}] FAILED: {result['error']}")
+        return
+    done = [stage for stage in ("merged", "converted") if result[stage]]
+    print(f"[{result['hash']}] {', '.join(done) if done else 'up to date'} ({result['seconds']}s)")
+
 
 def main() -> None:
     parser = argparse.ArgumentParser(description="Merge TTLs and generate debug/cbu outputs")
     parser.add_argument("--actual-model", action="store_true", help="Disable heuristic label/filename-based linking")
     parser.add_argument("--debug", action="store_true", help="Include debug fields (IRIs) in JSON outputs where supported")
     parser.add_argument("--hash", type=str, help="Process only the specified hash (e.g., '3a4646d4')")
+    parser.add_argument("--changed-only", action="store_true", help="Skip hashes (and stages) whose inputs are unchanged since the last build")
+    parser.add_argument("--jobs", type=int, default=1, help="Number of hashes built in parallel (worker processes)")
     # Allow running only one stage when specified
     group = parser.add_mutually_exclusive_group()
     group.add_argument("--merge", action="store_true", help="Only perform merge/linking stage and write TTLs")
@@ -51,11 +300,11 @@ def main() -> None:
     args = parser.parse_args()
     repo_root = Path(__file__).resolve().parents[1]
     data_root = repo_root / "data"
-    
+
     # Discover all hash directories from data folder
     hash_dirs = [p for p in data_root.iterdir() if p.is_dir() and not p.name.startswith('.')]
     hash_values = sorted([p.name for p in hash_dirs])
-    
+
     # Filter to specific hash if requested
     if args.hash:
         if args.hash in hash_values:
@@ -71,83 +320,23 @@ def main() -> None:
     output_root = repo_root / "evaluation" / "data" / "merged_tll"
     output_root.mkdir(parents=True, exist_ok=True)
 
-    do_merge = args.merge or (not args.merge and not args.conversion)
-    do_conversion = args.conversion or (not args.merge and not args.conversion)
-
-    for hash_value in hash_values:
-        hash_dir = data_root / hash_value
-        if not hash_dir.exists():
-            # skip silently if data for hash does not exist
-            continue
+    options = BuildOptions(
+        merge=args.merge or (not args.merge and not args.conversion),
+        conversion=args.conversion or (not args.merge and not args.conversion),
+        heuristic_linking=not args.actual_model,
+        debug=args.debug,
+        changed_only=args.changed_only,
+    )
+    results = build_all(hash_values, data_root, output_root, options, jobs=args.jobs)
 
-        out_dir = output_root / hash_value
-        out_dir.mkdir(parents=True, exist_ok=True)
-        out_path = out_dir / f"{hash_value}.ttl"
-
-        pruned_g: Graph | None = None
-
-        if do_merge:
-            g: Graph = merge_for_hash(
-                hash_value=hash_value,
-                data_root=str(data_root),
-                add_links=True,
-                enable_heuristic_linking=not args.__dict__.get("actual_model", False),
-            )
-
-            # Export link-only subgraph for debugging
-            link_g = build_link_graph(g)
-            link_path = out_dir / "link.ttl"
-            link_g.serialize(destination=str(link_path), format="turtle")
-
-            # Prune orphans in the full graph (not applied to link.ttl)
-            pruned_g = remove_orphan_entities(g)
-            pruned_g.serialize(destination=str(out_path), format="turtle")
-
-        if do_conversion:
-            # Load from existing merged TTL if not produced in this run
-            if pruned_g is None:
-                if not out_path.exists():
-                    # No TTL to convert from; skip
-                    continue
-                pruned_g = Graph()
-                pruned_g.parse(str(out_path), format="turtle")
-
-            # Emit CBU JSON per hash, built from pruned graph
-            cbu_json = build_cbu_json_from_graph(pruned_g)
-            cbu_out_path = out_dir / "cbu.json"
-            with open(cbu_out_path, "w", encoding="utf-8") as f:
-                json.dump(cbu_json, f, indent=2, ensure_ascii=False)
-
-            # Emit Characterisation JSON per hash from pruned graph (OntoSpecies side)
-            namespaces = char_get_namespaces(pruned_g)
-            devices = char_query_devices(pruned_g, namespaces)
-            characterisations = char_query_data(pruned_g, namespaces)
-            char_json = char_build_json(devices, characterisations)
-            char_out_path = out_dir / "characterisation.json"
-            with open(char_out_path, "w", encoding="utf-8") as f:
-                json.dump(char_json, f, indent=2, ensure_ascii=False)
-
-            # Emit Chemicals JSON per hash
-            chem_ns = chem_get_namespaces(pruned_g)
-            ontomops_info = chem_query_ontomops(pruned_g, chem_ns)
-            syntheses = chem_query_syntheses(pruned_g, chem_ns)
-            chem_json = chem_build_json(pruned_g, chem_ns, syntheses, ontomops_info, debug=args.debug)
-            chem_out_path = out_dir / "chemicals.json"
-            with open(chem_out_path, "w", encoding="utf-8") as f:
-                json.dump(chem_json, f, indent=2, ensure_ascii=False)
-
-            # Emit Steps JSON per hash (now simplified to only chemicals per synthesis)
-            step_ns = step_get_namespaces(pruned_g)
-            step_syntheses = step_query_syntheses(pruned_g, step_ns)
-            if not step_syntheses:
-                step_syntheses = step_query_syntheses_fallback(pruned_g, step_ns)
-            steps_json = step_build_json(pruned_g, step_ns, step_syntheses, debug=args.debug)
-            steps_out_path = out_dir / "steps.json"
-            with open(steps_out_path, "w", encoding="utf-8") as f:
-                json.dump(steps_json, f, indent=2, ensure_ascii=False)
+    failed = [r for r in results if "error" in r]
+    built = [r for r in results if "error" not in r and (r["merged"] or r["converted"])]
+    print(f"{len(built)} hashes built, {len(results) - len(built) - len(failed)} up to date, {len(failed)} failed")
+    for r in failed:
+        print(f"\n[{r['hash']}]\n{r['traceback']}")
+    if failed:
+        sys.exit(1)
 
 
 if __name__ == "__main__":
     main()
-
-
@@ -0,0 +1,145 @@
+"""
+In-memory adjacency index shared by the TTL -> JSON converters.
+
+The converters used to run one SPARQL query per synthesis, per output, per
+step and per property, with the entity passed in `initBindings` or inlined as
+an IRI. rdflib parses and translates the query text on every call, which for
+a merged KG with hundreds of steps dominated the conversion time.
+
+Here the graph is walked once and indexed both ways:
+
+- `objects(s, p)`: objects in the order `graph.objects(s, p)` yields them;
+- `subjects(p, o)`: subjects in the order `graph.subjects(p, o)` yields them.
+
+Those per-entity queries start from the bound entity (rdflib evaluates the
+patterns with the most bound terms first) and nest the OPTIONALs in textual
+order, so nested loops over these lists visit values in the order the queries
+returned them and the JSON comes out the same.
+
+The few whole-graph queries (list all syntheses, all MOPs, ...) still run in
+SPARQL, once per graph; derived tables can be kept on the index with `memo`.
+
+An index is a snapshot, so it is scoped to one conversion call rather than
+cached on the graph (rdflib has no mutation counter, and a triple count misses
+an edit that removes and adds as many triples): `indexed(graph)` (or the
+`with_graph_index` decorator on a converter's entry point) keeps one index for
+the duration of the call, and `graph_index(graph)` returns it. Outside such a
+call `graph_index` builds a fresh index each time.
+"""
+
+from __future__ import annotations
+
+import functools
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from rdflib import Graph, Namespace
+from rdflib.term import Node
+
+ONTOSYN = Namespace("https://www.theworldavatar.com/kg/OntoSyn/")
+ONTOMOPS = Namespace("https://www.theworldavatar.com/kg/ontomops/")
+ONTOSPECIES = Namespace("http://www.theworldavatar.com/ontology/ontospecies/OntoSpecies.owl#")
+OM2 = Namespace("http://www.ontology-of-units-of-measure.org/resource/om-2/")
+DC = Namespace("http://purl.org/dc/elements/1.1/")
+
+_EMPTY: List[Node] = []
+
+
+class Row(dict):
+    """A result row built from the index: attribute access like rdflib's ResultRow, None when unbound."""
+
+    def __getattr__(self, name: str) -> Any:
+        return self.get(name)
+
+
+def optional(values: List[Node]) -> List[Optional[Node]]:
+    """`values`, or a single unbound value: how an OPTIONAL without a match extends a row."""
+    return values or [None]
+
+
+class GraphIndex:
+    """Both-way adjacency maps of one graph, in the graph's own iteration order."""
+
+    def __init__(self, graph: Graph):
+        # s -> p -> [o] and p -> o -> [s]. A full scan of the Memory store comes out of a
+        # set, so the maps are filled per subject and per predicate, whose lookups keep
+        # the store's (insertion) order
+        self._out: Dict[Node, Dict[Node, List[Node]]] = {}
+        self._pos: Dict[Node, Dict[Node, List[Node]]] = {}
+        subjects = set()
+        predicates = set()
+        for s, p, _o in graph:
+            subjects.add(s)
+            predicates.add(p)
+        for s in subjects:
+            out = self._out[s] = {}
+            for p, o in graph.predicate_objects(s):
+                out.setdefault(p, []).append(o)
+        for p in predicates:
+            pos = self._pos[p] = {}
+            for s, _p, o in graph.triples((None, p, None)):
+                pos.setdefault(o, []).append(s)
+        self._memo: Dict[str, Any] = {}
+
+    def objects(self, s: Node, p: Node) -> List[Node]:
+        return self._out.get(s, {}).get(p, _EMPTY)
+
+    def first(self, s: Node, p: Node) -> Optional[Node]:
+        values = self.objects(s, p)
+        return values[0] if values else None
+
+    def subjects(self, p: Node, o: Node) -> List[Node]:
+        return self._pos.get(p, {}).get(o, _EMPTY)
+
+    def memo(self, name: str, compute: Callable[[], Any]) -> Any:
+        """`compute()` once per index (e.g. a whole-graph query), then the stored result."""
+        if name not in self._memo:
+            self._memo[name] = compute()
+        return self._memo[name]
+
+
+# id(graph) -> [graph, index, depth] of the conversions running in this thread
+_scopes = threading.local()
+
+
+def _active() -> Dict[int, List[Any]]:
+    active = getattr(_scopes, "active", None)
+    if active is None:
+        active = _scopes.active = {}
+    return active
+
+
+@contextmanager
+def indexed(graph: Graph) -> Iterator[GraphIndex]:
+    """Build the index of `graph` once for the duration of a conversion; nested scopes reuse it."""
+    active = _active()
+    scope = active.get(id(graph))
+    if scope is None:
+        scope = active[id(graph)] = [graph, GraphIndex(graph), 0]
+    scope[2] += 1
+    try:
+        yield scope[1]
+    finally:
+        scope[2] -= 1
+        if scope[2] == 0:
+            del active[id(graph)]
+
+
+def with_graph_index(fn: Callable[..., Any]) -> Callable[..., Any]:
+    """Decorator: run `fn(graph, ...)` inside `indexed(graph)`."""
+
+    @functools.wraps(fn)
+    def wrapper(graph: Graph, *args: Any, **kwargs: Any) -> Any:
+        with indexed(graph):
+            return fn(graph, *args, **kwargs)
+
+    return wrapper
+
+
+def graph_index(graph: Graph) -> GraphIndex:
+    """The index of the conversion running on `graph`, or a fresh one outside a conversion."""
+    scope = _active().get(id(graph))
+    if scope is not None and scope[0] is graph:
+        return scope[1]
+    return GraphIndex(graph)
@@ -7,6 +7,7 @@ to create JSON output matching the CBU ground truth format.
 """
 
 import json
+from itertools import islice
 from rdflib import Graph, Namespace, URIRef, RDF, RDFS, Literal
 from rdflib.namespace import OWL
 from rdflib.plugins.sparql import prepareQuery
@@ -114,33 +115,35 @@ def build_cbu_json_from_graph(graph: Graph) -> Dict[str, Any]:
                 if name not in mop_to_cbus[mop_key]['cbus'][formula]:
                     mop_to_cbus[mop_key]['cbus'][formula].append(name)
 
-    # Path A: Iterate syntheses → outputs → isRepresentedBy → MOP
-    for synth in graph.subjects(RDF.type, URIRef(str(ONTOSYN) + "ChemicalSynthesis")):
-        for chem_out in graph.objects(synth, URIRef(str(ONTOSYN) + "hasChemicalOutput")):
-            # Attempt to capture yields associated with this output
-            yield_vals: List[float] = []
-            for y in graph.objects(chem_out, URIRef(str(ONTOSYN) + "hasYield")):
-                # Try common numeric value predicates
-                for pv in graph.objects(y, URIRef(str(ONTOSYN) + "hasNumericalValue")):
-                    fv = _literal_to_float(pv)
-                    if fv is not None:
-                        yield_vals.append(fv)
-                for pv in graph.objects(y, URIRef(str(QUDT) + "numericValue")):
-                    fv = _literal_to_float(pv)
-                    if fv is not None:
-                        yield_vals.append(fv)
-            for mop in graph.objects(chem_out, URIRef(str(ONTOSYN) + "isRepresentedBy")):
-                # Store yield for this MOP
-                mop_key = str(mop)
-                if yield_vals:
-                    mx = max(yield_vals)
-                    if mop_key in mop_to_cbus:
-                        mop_to_cbus[mop_key]['yield'] = mx
-                add_mop_to_aggregation(mop)
-
-    # Path B (fallback or supplemental): directly scan all MOP instances in the graph
-    for mop in graph.subjects(RDF.type, URIRef(str(ONTOMOPS) + "MetalOrganicPolyhedron")):
-        add_mop_to_aggregation(mop)
+    def aggregate_mops() -> None:
+        """Fill mop_to_cbus (only needed when the direct MOP scan finds nothing)."""
+        # Path A: Iterate syntheses → outputs → isRepresentedBy → MOP
+        for synth in graph.subjects(RDF.type, URIRef(str(ONTOSYN) + "ChemicalSynthesis")):
+            for chem_out in graph.objects(synth, URIRef(str(ONTOSYN) + "hasChemicalOutput")):
+                # Attempt to capture yields associated with this output
+                yield_vals: List[float] = []
+                for y in graph.objects(chem_out, URIRef(str(ONTOSYN) + "hasYield")):
+                    # Try common numeric value predicates
+                    for pv in graph.objects(y, URIRef(str(ONTOSYN) + "hasNumericalValue")):
+                        fv = _literal_to_float(pv)
+                        if fv is not None:
+                            yield_vals.append(fv)
+                    for pv in graph.objects(y, URIRef(str(QUDT) + "numericValue")):
+                        fv = _literal_to_float(pv)
+                        if fv is not None:
+                            yield_vals.append(fv)
+                for mop in graph.objects(chem_out, URIRef(str(ONTOSYN) + "isRepresentedBy")):
+                    # Store yield for this MOP
+                    mop_key = str(mop)
+                    if yield_vals:
+                        mx = max(yield_vals)
+                        if mop_key in mop_to_cbus:
+                            mop_to_cbus[mop_key]['yield'] = mx
+                    add_mop_to_aggregation(mop)
+
+        # Path B (fallback or supplemental): directly scan all MOP instances in the graph
+        for mop in graph.subjects(RDF.type, URIRef(str(ONTOMOPS) + "MetalOrganicPolyhedron")):
+            add_mop_to_aggregation(mop)
 
     # Build one entry per MOP with its CBUs
     procedures: List[Dict[str, Any]] = []
@@ -149,9 +152,9 @@ def build_cbu_json_from_graph(graph: Graph) -> Dict[str, Any]:
     print("Trying direct MOP processing...")
     mop_type_uri = URIRef(str(ONTOMOPS) + "MetalOrganicPolyhedron")
     print(f"Looking for MOPs with type: {mop_type_uri}")
-    all_subjects = list(graph.subjects())
-    print(f"Total subjects in graph: {len(all_subjects)}")
-    for s in all_subjects[:5]:  # Show first 5
+    # graph.subjects() yields one subject per triple; count and peek without materialising them
+    print(f"Total subjects in graph: {len(graph)}")
+    for s in islice(graph.subjects(), 5):  # Show first 5
         print(f"Subject: {s}")
     direct_mops_found = 0
     for mop in graph.subjects(RDF.type, mop_type_uri):
@@ -245,6 +248,7 @@ def build_cbu_json_from_graph(graph: Graph) -> Dict[str, Any]:
         return {"synthesisProcedures": procedures}
 
     # Fallback to the original logic
+    aggregate_mops()
     for mop_key, mop_data in sorted(mop_to_cbus.items()):
         ccdc = mop_data['ccdc']
         cbu_map = mop_data['cbus']
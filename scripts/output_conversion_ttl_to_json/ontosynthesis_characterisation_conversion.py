@@ -15,6 +15,12 @@ import json
 import sys
 from typing import Dict, List, Any, Optional
 from rdflib import Graph, Namespace, URIRef
+from rdflib.namespace import RDF, RDFS
+from rdflib.term import Node
+
+from scripts.output_conversion_ttl_to_json.graph_index import (
+    DC, ONTOMOPS, ONTOSPECIES, ONTOSYN, GraphIndex, graph_index, optional,
+)
 
 
 # ---------- RDF helpers ----------
@@ -47,23 +53,18 @@ def _select_uris(graph: Graph, query: str) -> List[URIRef]:
     return uris
 
 
-def _row_to_dict(row) -> Dict[str, Optional[str]]:
-    return {
-        k: (str(getattr(row, k)) if getattr(row, k) is not None else None)
-        for k in row.labels
-    }
+def _str_or_none(value: Optional[Node]) -> Optional[str]:
+    return str(value) if value is not None else None
 
 
-def _select_first_row(graph: Graph, query: str) -> Optional[Dict[str, Any]]:
-    results = graph.query(query)
-    for row in results:
-        return _row_to_dict(row)
-    return None
-
-
-def _select_all_rows(graph: Graph, query: str) -> List[Dict[str, Any]]:
-    results = graph.query(query)
-    return [_row_to_dict(row) for row in results]
+def _first_path(index: GraphIndex, start: Node, *path: Node) -> Optional[Node]:
+    """Object reached from `start` by following the first value of each property in `path`."""
+    node: Optional[Node] = start
+    for prop in path:
+        if node is None:
+            return None
+        node = index.first(node, prop)
+    return node
 
 
 # ---------- Discovery queries ----------
@@ -77,15 +78,10 @@ def _find_all_syntheses(graph: Graph) -> List[URIRef]:
 
 
 def _find_species_for_synthesis(graph: Graph, synth: URIRef) -> List[URIRef]:
-    q = f"""
-    PREFIX ontosyn: <https://www.theworldavatar.com/kg/OntoSyn/>
-    PREFIX ontospecies: <http://www.theworldavatar.com/ontology/ontospecies/OntoSpecies.owl#>
-    SELECT DISTINCT ?uri WHERE {{
-      <{synth}> ontosyn:hasChemicalOutput ?uri .
-      ?uri a ontospecies:Species .
-    }}
-    """
-    return _select_uris(graph, q)
+    """ontospecies:Species outputs of `synth` (in ontospecies:Species instance order)."""
+    index = graph_index(graph)
+    outputs = set(index.objects(URIRef(synth), ONTOSYN.hasChemicalOutput))
+    return [URIRef(str(uri)) for uri in index.subjects(RDF.type, ONTOSPECIES.Species) if uri in outputs]
 
 
 # ---------- Extraction ----------
@@ -102,54 +98,41 @@ def query_characterisation_devices(graph: Graph, namespaces: Dict[str, Namespace
         "InfraredSpectroscopyDevice": {},
     }
 
+    index = graph_index(graph)
+
+    def _first_device(species: URIRef, device_prop: URIRef) -> Optional[Node]:
+        # First device of the species' characterisation sessions
+        for cs in index.objects(species, ONTOSPECIES.hasCharacterizationSession):
+            device = index.first(cs, device_prop)
+            if device is not None:
+                return device
+        return None
+
     synths = _find_all_syntheses(graph)
     for synth in synths:
         for species in _find_species_for_synthesis(graph, synth):
-            # HNMR device
-            q_hnmr = f"""
-            PREFIX ontospecies: <http://www.theworldavatar.com/ontology/ontospecies/OntoSpecies.owl#>
-            PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-            SELECT DISTINCT ?deviceName ?frequency WHERE {{
-              <{species}> ontospecies:hasCharacterizationSession ?cs .
-              ?cs ontospecies:hasHNMRDevice ?device .
-              OPTIONAL {{ ?device rdfs:label ?deviceName }}
-              OPTIONAL {{ ?device ontospecies:hasFrequency ?frequency }}
-            }} LIMIT 1
-            """
-            row = _select_first_row(graph, q_hnmr)
-            if row:
-                info: Dict[str, Any] = {"deviceName": row.get("deviceName") or "N/A"}
-                if row.get("frequency"):
-                    info["frequency"] = row["frequency"]
-                devices["HNMRDevice"] = info
-
-            # Elemental Analysis device
-            q_ea = f"""
-            PREFIX ontospecies: <http://www.theworldavatar.com/ontology/ontospecies/OntoSpecies.owl#>
-            PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-            SELECT DISTINCT ?deviceName WHERE {{
-              <{species}> ontospecies:hasCharacterizationSession ?cs .
-              ?cs ontospecies:hasElementalAnalysisDevice ?device .
-              OPTIONAL {{ ?device rdfs:label ?deviceName }}
-            }} LIMIT 1
-            """
-            row = _select_first_row(graph, q_ea)
-            if row:
-                devices["ElementalAnalysisDevice"] = {"deviceName": row.get("deviceName") or "N/A"}
-
-            # IR device
-            q_irdev = f"""
-            PREFIX ontospecies: <http://www.theworldavatar.com/ontology/ontospecies/OntoSpecies.owl#>
-            PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-            SELECT DISTINCT ?deviceName WHERE {{
-              <{species}> ontospecies:hasCharacterizationSession ?cs .
-              ?cs ontospecies:hasInfraredSpectroscopyDevice ?device .
-              OPTIONAL {{ ?device rdfs:label ?deviceName }}
-            }} LIMIT 1
-            """
-            row = _select_first_row(graph, q_irdev)
-            if row:
-                devices["InfraredSpectroscopyDevice"] = {"deviceName": row.get("deviceName") or "N/A"}
+            # HNMR device (a device with neither name nor frequency is not reported)
+            device = _first_device(species, ONTOSPECIES.hasHNMRDevice)
+            if device is not None:
+                name = _str_or_none(index.first(device, RDFS.label))
+                frequency = _str_or_none(index.first(device, ONTOSPECIES.hasFrequency))
+                if name is not None or frequency is not None:
+                    info: Dict[str, Any] = {"deviceName": name or "N/A"}
+                    if frequency:
+                        info["frequency"] = frequency
+                    devices["HNMRDevice"] = info
+
+            # Elemental Analysis device (reported when it has a name)
+            device = _first_device(species, ONTOSPECIES.hasElementalAnalysisDevice)
+            name = _str_or_none(index.first(device, RDFS.label)) if device is not None else None
+            if name is not None:
+                devices["ElementalAnalysisDevice"] = {"deviceName": name or "N/A"}
+
+            # IR device (reported when it has a name)
+            device = _first_device(species, ONTOSPECIES.hasInfraredSpectroscopyDevice)
+            name = _str_or_none(index.first(device, RDFS.label)) if device is not None else None
+            if name is not None:
+                devices["InfraredSpectroscopyDevice"] = {"deviceName": name or "N/A"}
 
     return devices
 
@@ -162,154 +145,81 @@ def query_characterisation_data(graph: Graph, namespaces: Dict[str, Namespace])
 
     records: List[Dict[str, Any]] = []
 
+    index = graph_index(graph)
+
     synths = _find_all_syntheses(graph)
     for synth in synths:
         # Synthesis label (e.g., "ZrT-1")
-        q_synth_label = f"""
-        PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-        SELECT DISTINCT ?label WHERE {{ <{synth}> rdfs:label ?label }} LIMIT 1
-        """
-        synth_label_row = _select_first_row(graph, q_synth_label)
-        synth_label = (synth_label_row.get("label") if synth_label_row else None) or None
+        synth_label = _str_or_none(index.first(synth, RDFS.label)) or None
 
         # All chemical outputs (both OntoSpecies:Species and OntoSyn:ChemicalOutput URIs)
-        q_outputs = f"""
-        PREFIX ontosyn: <https://www.theworldavatar.com/kg/OntoSyn/>
-        SELECT DISTINCT ?out WHERE {{ <{synth}> ontosyn:hasChemicalOutput ?out . }}
-        """
         output_uris: List[str] = []
-        try:
-            for r in graph.query(q_outputs):
-                if getattr(r, 'out', None):
-                    u = str(r.out).strip()
-                    if u:
-                        output_uris.append(u)
-        except Exception:
-            pass
+        for out in index.objects(synth, ONTOSYN.hasChemicalOutput):
+            u = str(out).strip()
+            if u:
+                output_uris.append(u)
 
         def _labels_and_mop_formulas_for_output(out_uri: str) -> List[str]:
+            # Labels of the output, then the ontomops:hasMOPFormula of the MOPs it is
+            # represented by (or of itself, if it is a MOP), label by label
+            out = URIRef(out_uri)
+            mops = list(index.objects(out, ONTOSYN.isRepresentedBy))
+            if ONTOMOPS.MetalOrganicPolyhedron in index.objects(out, RDF.type):
+                mops.append(out)
+            formulas = [mf for mop in mops for mf in optional(index.objects(mop, ONTOMOPS.hasMOPFormula))] or [None]
             names: List[str] = []
-            q = f"""
-            PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-            SELECT DISTINCT ?lbl ?mf WHERE {{
-              OPTIONAL {{ <{out_uri}> rdfs:label ?lbl }}
-              OPTIONAL {{
-                {{ <{out_uri}> <https://www.theworldavatar.com/kg/OntoSyn/isRepresentedBy> ?mop }}
-                UNION
-                {{ <{out_uri}> a <https://www.theworldavatar.com/kg/ontomops/MetalOrganicPolyhedron> . BIND(<{out_uri}> AS ?mop) }}
-                OPTIONAL {{ ?mop <https://www.theworldavatar.com/kg/ontomops/hasMOPFormula> ?mf }}
-              }}
-            }}
-            """
-            try:
-                for r in graph.query(q):
-                    if getattr(r, 'lbl', None):
-                        s = str(r.lbl).strip()
-                        if s and s not in names:
-                            names.append(s)
-                    if getattr(r, 'mf', None):
-                        s = str(r.mf).strip()
-                        if s and s not in names:
-                            names.append(s)
-            except Exception:
-                pass
+            for lbl in optional(index.objects(out, RDFS.label)):
+                for mf in formulas:
+                    for value in (lbl, mf):
+                        if value:
+                            s = str(value).strip()
+                            if s and s not in names:
+                                names.append(s)
             return names
 
         for species in _find_species_for_synthesis(graph, synth):
             # Species label
-            q_label = f"""
-            PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-            SELECT DISTINCT ?label WHERE {{ <{species}> rdfs:label ?label }} LIMIT 1
-            """
-            label_row = _select_first_row(graph, q_label)
-            species_label = (label_row.get("label") if label_row else None) or "Unknown"
+            species_label = _str_or_none(index.first(species, RDFS.label)) or "Unknown"
 
             # CCDC number via canonical route: Species -> hasCCDCNumber -> hasCCDCNumberValue
-            q_ccdc_val = f"""
-            PREFIX ontospecies: <http://www.theworldavatar.com/ontology/ontospecies/OntoSpecies.owl#>
-            SELECT DISTINCT ?ccdcVal WHERE {{
-              OPTIONAL {{
-                <{species}> ontospecies:hasCCDCNumber ?ccdc .
-                OPTIONAL {{ ?ccdc ontospecies:hasCCDCNumberValue ?ccdcVal }}
-              }}
-            }} LIMIT 1
-            """
-            ccdc_row = _select_first_row(graph, q_ccdc_val) or {}
-            ccdc_number = ccdc_row.get("ccdcVal") or None
+            ccdc = index.first(species, ONTOSPECIES.hasCCDCNumber)
+            ccdc_number = _str_or_none(_first_path(index, ccdc, ONTOSPECIES.hasCCDCNumberValue)) or None
             if not ccdc_number:
                 # Fallback to legacy properties if value not present
-                q_ccdc_legacy = f"""
-                PREFIX ontospecies: <http://www.theworldavatar.com/ontology/ontospecies/OntoSpecies.owl#>
-                PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-                PREFIX dc: <http://purl.org/dc/elements/1.1/>
-                SELECT DISTINCT ?ccdcId ?ccdcLabel WHERE {{
-                  OPTIONAL {{
-                    <{species}> ontospecies:hasCCDCNumber ?ccdc .
-                    OPTIONAL {{ ?ccdc ontospecies:hasCCDCNumberValue ?_v }}
-                    OPTIONAL {{ ?ccdc dc:identifier ?ccdcId }}
-                    OPTIONAL {{ ?ccdc rdfs:label ?ccdcLabel }}
-                  }}
-                }} LIMIT 1
-                """
-                legacy_row = _select_first_row(graph, q_ccdc_legacy) or {}
-                ccdc_number = legacy_row.get("ccdcId") or legacy_row.get("ccdcLabel") or "N/A"
+                ccdc_number = (
+                    _str_or_none(_first_path(index, ccdc, DC.identifier))
+                    or _str_or_none(_first_path(index, ccdc, RDFS.label))
+                    or "N/A"
+                )
             # Normalize
             ccdc_number = (ccdc_number or "").strip() or "N/A"
 
             # Molecular formula (prefer value node: hasMolecularFormulaValue; fallback to rdfs:label)
-            q_formula_val = f"""
-            PREFIX ontospecies: <http://www.theworldavatar.com/ontology/ontospecies/OntoSpecies.owl#>
-            PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-            SELECT DISTINCT ?mfVal ?mfLabel WHERE {{
-              OPTIONAL {{
-                <{species}> ontospecies:hasMolecularFormula ?f .
-                OPTIONAL {{ ?f ontospecies:hasMolecularFormulaValue ?mfVal }}
-                OPTIONAL {{ ?f rdfs:label ?mfLabel }}
-              }}
-            }} LIMIT 1
-            """
-            formula_row = _select_first_row(graph, q_formula_val) or {}
-            molecular_formula = formula_row.get("mfVal") or formula_row.get("mfLabel") or "N/A"
+            formula = index.first(species, ONTOSPECIES.hasMolecularFormula)
+            molecular_formula = (
+                _str_or_none(_first_path(index, formula, ONTOSPECIES.hasMolecularFormulaValue))
+                or _str_or_none(_first_path(index, formula, RDFS.label))
+                or "N/A"
+            )
 
             # Elemental Analysis values
-            q_ea_vals = f"""
-            PREFIX ontospecies: <http://www.theworldavatar.com/ontology/ontospecies/OntoSpecies.owl#>
-            SELECT DISTINCT ?expVal ?calcVal WHERE {{
-              OPTIONAL {{
-                <{species}> ontospecies:hasElementalAnalysisData ?ead .
-                OPTIONAL {{
-                  ?ead ontospecies:hasWeightPercentageExperimental ?wpe .
-                  OPTIONAL {{ ?wpe ontospecies:hasWeightPercentageExperimentalValue ?expVal }}
-                }}
-                OPTIONAL {{
-                  ?ead ontospecies:hasWeightPercentageCalculated ?wpc .
-                  OPTIONAL {{ ?wpc ontospecies:hasWeightPercentageCalculatedValue ?calcVal }}
-                }}
-              }}
-            }} LIMIT 1
-            """
-            ea_row = _select_first_row(graph, q_ea_vals) or {}
-            wp_exp = ea_row.get("expVal") or "N/A"
-            wp_calc = ea_row.get("calcVal") or "N/A"
-
-            # IR data: query bands and material separately to avoid coupling
+            ead = index.first(species, ONTOSPECIES.hasElementalAnalysisData)
+            wp_exp = _str_or_none(_first_path(
+                index, ead, ONTOSPECIES.hasWeightPercentageExperimental, ONTOSPECIES.hasWeightPercentageExperimentalValue
+            )) or "N/A"
+            wp_calc = _str_or_none(_first_path(
+                index, ead, ONTOSPECIES.hasWeightPercentageCalculated, ONTOSPECIES.hasWeightPercentageCalculatedValue
+            )) or "N/A"
+
+            # IR data: bands and material separately to avoid coupling
+            ir_data = index.objects(species, ONTOSPECIES.hasInfraredSpectroscopyData)
             # Bands
-            q_ir_bands = f"""
-            PREFIX ontospecies: <http://www.theworldavatar.com/ontology/ontospecies/OntoSpecies.owl#>
-            SELECT DISTINCT ?bands WHERE {{
-              <{species}> ontospecies:hasInfraredSpectroscopyData ?ir .
-              OPTIONAL {{ ?ir ontospecies:hasBands ?bands }}
-            }}
-            """
             ir_bands_vals: list[str] = []
-            try:
-                for r in graph.query(q_ir_bands):
-                    if getattr(r, 'bands', None):
-                        s = str(r.bands).strip()
-                        if s:
-                            ir_bands_vals.append(s)
-            except Exception:
-                pass
+            for ir in ir_data:
+                for bands in index.objects(ir, ONTOSPECIES.hasBands):
+                    s = str(bands).strip() if bands else ""
+                    if s:
+                        ir_bands_vals.append(s)
             # Deduplicate and join bands
             seen_b: set[str] = set()
             bands_uniq: list[str] = []
@@ -320,34 +230,13 @@ def query_characterisation_data(graph: Graph, namespaces: Dict[str, Namespace])
             ir_bands = (" ; ".join(bands_uniq)).strip() if bands_uniq else "N/A"
 
             # Material
-            q_ir_mat = f"""
-            PREFIX ontospecies: <http://www.theworldavatar.com/ontology/ontospecies/OntoSpecies.owl#>
-            SELECT DISTINCT ?matName WHERE {{
-              <{species}> ontospecies:hasInfraredSpectroscopyData ?ir .
-              OPTIONAL {{
-                ?ir ontospecies:usesMaterial ?mat .
-                OPTIONAL {{ ?mat ontospecies:hasMaterialName ?matName }}
-              }}
-            }} LIMIT 1
-            """
             ir_material = "N/A"
-            try:
-                for r in graph.query(q_ir_mat):
-                    nm  = str(r.matName).strip() if getattr(r, 'matName',  None) else ""
-                    ir_material = (nm or "N/A").strip() or "N/A"
-                    break
-            except Exception:
-                pass
-
-            # HNMR data placeholder (extend when structure available)
-            q_nmr = f"""
-            PREFIX ontospecies: <http://www.theworldavatar.com/ontology/ontospecies/OntoSpecies.owl#>
-            PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-            SELECT DISTINCT ?label WHERE {{
-              OPTIONAL {{ <{species}> ontospecies:hasHNMRData ?n . ?n rdfs:label ?label }}
-            }} LIMIT 1
-            """
-            _nmr_row = _select_first_row(graph, q_nmr) or {}
+            if ir_data:
+                mat_name = _first_path(index, ir_data[0], ONTOSPECIES.usesMaterial, ONTOSPECIES.hasMaterialName)
+                nm = str(mat_name).strip() if mat_name else ""
+                ir_material = (nm or "N/A").strip() or "N/A"
+
+            # HNMR data: placeholder (extend when structure available)
 
             # Assemble product names: include species label, synthesis label, and for each output include its label and ontomops:hasMOPFormula
             names: List[str] = []
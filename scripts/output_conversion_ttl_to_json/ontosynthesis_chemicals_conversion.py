@@ -8,8 +8,12 @@ to extract chemical synthesis data and convert it to the chemicals JSON format.
 
 import json
 from rdflib import Graph, Namespace, URIRef
+from rdflib.namespace import RDF, RDFS
 from rdflib.plugins.sparql import prepareQuery
-from typing import Dict, List, Any, Optional
+from typing import Dict, Iterator, List, Any, Optional
+from scripts.output_conversion_ttl_to_json.graph_index import (
+    DC, GraphIndex, ONTOMOPS, ONTOSPECIES, ONTOSYN, OM2, Row, graph_index, optional, with_graph_index,
+)
 
 
 def load_ttl_files(file_paths: List[str]) -> Graph:
@@ -81,6 +85,24 @@ def query_synthesis_procedures(graph: Graph, namespaces: Dict[str, Namespace]) -
     return syntheses
 
 
+def _input_rows(index: GraphIndex, synthesis: URIRef) -> Iterator[Row]:
+    """Chemical inputs of `synthesis` with all labels, alternative names and CBU formula:
+    one row per combination of the OPTIONAL values, in SPARQL's nested-loop order."""
+    for chemical in index.objects(synthesis, ONTOSYN.hasChemicalInput):
+        suppliers = [name for supplier in index.objects(chemical, ONTOSYN.isSuppliedBy)
+                     for name in index.objects(supplier, RDFS.label)]
+        for label in optional(index.objects(chemical, RDFS.label)):
+            for alt in optional(index.objects(chemical, ONTOSYN.hasAlternativeNames)):
+                for amount in optional(index.objects(chemical, ONTOSYN.hasAmount)):
+                    for formula in optional(index.objects(chemical, ONTOSYN.hasChemicalFormula)):
+                        for purity in optional(index.objects(chemical, ONTOSYN.hasPurity)):
+                            for cbu_formula in optional(index.objects(chemical, ONTOMOPS.hasCBUFormula)):
+                                for supplier_name in optional(suppliers):
+                                    yield Row(chemical=chemical, chemicalLabel=label, altName=alt,
+                                              amount=amount, formula=formula, purity=purity,
+                                              supplierName=supplier_name, cbuFormula=cbu_formula)
+
+
 def query_synthesis_inputs(graph: Graph, namespaces: Dict[str, Namespace], synthesis_uri: str) -> List[Dict[str, Any]]:
     """Query chemical inputs for a synthesis.
     
@@ -95,29 +117,7 @@ def query_synthesis_inputs(graph: Graph, namespaces: Dict[str, Namespace], synth
     if not ontosyn or not rdfs:
         return []
     
-    # SPARQL query to get chemical inputs with all labels, alternative names, and CBU formula
-    query = """
-    PREFIX ontosyn: <https://www.theworldavatar.com/kg/OntoSyn/>
-    PREFIX ontomops: <https://www.theworldavatar.com/kg/ontomops/>
-    PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-    
-    SELECT DISTINCT ?chemical ?chemicalLabel ?altName ?amount ?formula ?purity ?supplierName ?cbuFormula
-    WHERE {
-        ?synthesis ontosyn:hasChemicalInput ?chemical .
-        OPTIONAL { ?chemical rdfs:label ?chemicalLabel }
-        OPTIONAL { ?chemical ontosyn:hasAlternativeNames ?altName }
-        OPTIONAL { ?chemical ontosyn:hasAmount ?amount }
-        OPTIONAL { ?chemical ontosyn:hasChemicalFormula ?formula }
-        OPTIONAL { ?chemical ontosyn:hasPurity ?purity }
-        OPTIONAL { ?chemical ontomops:hasCBUFormula ?cbuFormula }
-        OPTIONAL { 
-            ?chemical ontosyn:isSuppliedBy ?supplier .
-            ?supplier rdfs:label ?supplierName .
-        }
-    }
-    """
-    
-    results = graph.query(query, initBindings={'synthesis': URIRef(synthesis_uri)})
+    results = _input_rows(graph_index(graph), URIRef(synthesis_uri))
     
     # Group by chemical URI to collect all labels and alternative names
     chemicals_dict = {}
@@ -188,19 +188,13 @@ def extract_yield(graph: Graph, namespaces: Dict[str, Namespace], output_uri: st
     if not ontosyn:
         return "N/A"
 
-    # SPARQL: only require numerical value; unit is assumed percent per schema
-    query = """
-    PREFIX ontosyn: <https://www.theworldavatar.com/kg/OntoSyn/>
-    PREFIX om-2: <http://www.ontology-of-units-of-measure.org/resource/om-2/>
-
-    SELECT DISTINCT ?yieldValue
-    WHERE {
-        ?output ontosyn:hasYield ?yieldUri .
-        ?yieldUri om-2:hasNumericalValue ?yieldValue .
-    } LIMIT 1
-    """
-
-    results = graph.query(query, initBindings={'output': URIRef(output_uri)})
+    # Only require a numerical value; unit is assumed percent per schema
+    index = graph_index(graph)
+    results = [
+        Row(yieldValue=value)
+        for yield_uri in index.objects(URIRef(output_uri), ONTOSYN.hasYield)
+        for value in index.objects(yield_uri, OM2.hasNumericalValue)
+    ][:1]
 
     for row in results:
         if getattr(row, 'yieldValue', None):
@@ -231,60 +225,35 @@ def query_synthesis_outputs(graph: Graph, namespaces: Dict[str, Namespace], synt
         return []
     
     # Get all outputs and their labels (Species or ChemicalOutput)
-    query = """
-    PREFIX ontosyn: <https://www.theworldavatar.com/kg/OntoSyn/>
-    PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-    
-    SELECT DISTINCT ?output ?outputLabel
-    WHERE {
-        ?synthesis ontosyn:hasChemicalOutput ?output .
-        OPTIONAL { ?output rdfs:label ?outputLabel }
-    }
-    """
-    
-    results = graph.query(query, initBindings={'synthesis': URIRef(synthesis_uri)})
+    index = graph_index(graph)
+    results = [
+        Row(output=output, outputLabel=label)
+        for output in index.objects(URIRef(synthesis_uri), ONTOSYN.hasChemicalOutput)
+        for label in optional(index.objects(output, RDFS.label))
+    ]
     
     outputs = []
     def _species_info(out_uri: str) -> Dict[str, str]:
-        q = f"""
-        PREFIX ontospecies: <http://www.theworldavatar.com/ontology/ontospecies/OntoSpecies.owl#>
-        PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-        PREFIX dc: <http://purl.org/dc/elements/1.1/>
-        SELECT DISTINCT ?label ?ccdcVal ?ccdcId ?mfLabel WHERE {{
-          OPTIONAL {{ <{out_uri}> rdfs:label ?label }}
-          OPTIONAL {{
-            <{out_uri}> ontospecies:hasCCDCNumber ?c .
-            OPTIONAL {{ ?c ontospecies:hasCCDCNumberValue ?ccdcVal }}
-            OPTIONAL {{ ?c dc:identifier ?ccdcId }}
-          }}
-          OPTIONAL {{
-            <{out_uri}> ontospecies:hasMolecularFormula ?mf .
-            OPTIONAL {{ ?mf rdfs:label ?mfLabel }}
-          }}
-        }} LIMIT 1
-        """
-        for r in graph.query(q):
-            return {
-                'label': (str(r.label) if getattr(r, 'label', None) else 'Unknown'),
-                'ccdc_id': (str(getattr(r, 'ccdcVal', None)) if getattr(r, 'ccdcVal', None) else (str(getattr(r, 'ccdcId', None)) if getattr(r, 'ccdcId', None) else 'N/A')),
-                'formula': (str(r.mfLabel) if getattr(r, 'mfLabel', None) else 'N/A'),
-            }
-        return {'label': 'Unknown', 'ccdc_id': 'N/A', 'formula': 'N/A'}
+        out = URIRef(out_uri)
+        # First label, first CCDC number (value, else identifier) and first formula label
+        label = index.first(out, RDFS.label)
+        ccdc = index.first(out, ONTOSPECIES.hasCCDCNumber)
+        ccdc_val = index.first(ccdc, ONTOSPECIES.hasCCDCNumberValue) if ccdc is not None else None
+        ccdc_id = index.first(ccdc, DC.identifier) if ccdc is not None else None
+        formula = index.first(out, ONTOSPECIES.hasMolecularFormula)
+        mf_label = index.first(formula, RDFS.label) if formula is not None else None
+        return {
+            'label': (str(label) if label else 'Unknown'),
+            'ccdc_id': (str(ccdc_val) if ccdc_val else (str(ccdc_id) if ccdc_id else 'N/A')),
+            'formula': (str(mf_label) if mf_label else 'N/A'),
+        }
 
     def _is_species(out_uri: str) -> bool:
-        q = f"""
-        ASK {{ <{out_uri}> a <http://www.theworldavatar.com/ontology/ontospecies/OntoSpecies.owl#Species> }}
-        """
-        return bool(graph.query(q).askAnswer)
+        return ONTOSPECIES.Species in index.objects(URIRef(out_uri), RDF.type)
 
     def _mop_via_is_represented_by(out_uri: str) -> Optional[str]:
-        q = f"""
-        PREFIX ontosyn: <https://www.theworldavatar.com/kg/OntoSyn/>
-        SELECT DISTINCT ?mop WHERE {{ <{out_uri}> ontosyn:isRepresentedBy ?mop }} LIMIT 1
-        """
-        for r in graph.query(q):
-            return str(r.mop)
-        return None
+        mop = index.first(URIRef(out_uri), ONTOSYN.isRepresentedBy)
+        return str(mop) if mop is not None else None
 
     # Aggregate possibly-multiple outputs (Species and ChemicalOutput) by human label
     aggregated: Dict[str, Dict[str, Any]] = {}
@@ -303,13 +272,7 @@ def query_synthesis_outputs(graph: Graph, namespaces: Dict[str, Namespace], synt
 
     # Helper: check if a node is a ChemicalOutput
     def _is_chemical_output(out_uri: str) -> bool:
-        q = f"""
-        ASK {{ <{out_uri}> a <https://www.theworldavatar.com/kg/OntoSyn/ChemicalOutput> }}
-        """
-        try:
-            return bool(graph.query(q).askAnswer)
-        except Exception:
-            return False
+        return ONTOSYN.ChemicalOutput in index.objects(URIRef(out_uri), RDF.type)
 
     for row in results:
         output_uri = str(row.output)
@@ -464,6 +427,7 @@ def build_procedure_json(graph: Graph, namespaces: Dict[str, Namespace], synthes
     }
 
 
+@with_graph_index
 def build_json_structure(graph: Graph, namespaces: Dict[str, Namespace], syntheses: List[Dict[str, str]], ontomops_data: Dict[str, Dict[str, str]], debug: bool = False) -> Dict[str, Any]:
     """Build complete JSON structure."""
     
@@ -8,8 +8,12 @@ to extract synthesis step data and convert it to the steps JSON format.
 
 import json
 from rdflib import Graph, Namespace, URIRef
+from rdflib.namespace import RDF, RDFS
 from rdflib.plugins.sparql import prepareQuery
-from typing import Dict, List, Any, Optional
+from typing import Dict, Iterator, List, Any, Optional, Tuple
+from scripts.output_conversion_ttl_to_json.graph_index import (
+    GraphIndex, ONTOMOPS, ONTOSPECIES, ONTOSYN, OM2, Row, graph_index, optional, with_graph_index,
+)
 from scripts.output_conversion_ttl_to_json.step.chemicalinput_query import query_synthesis_inputs
 from scripts.output_conversion_ttl_to_json.step.ccdc_query import query_ccdc_numbers
 from scripts.output_conversion_ttl_to_json.step.step_query import query_synthesis_steps
@@ -78,40 +82,31 @@ def query_outputs(graph: Graph, synthesis_uri: str) -> Dict[str, List[str]]:
     
     Returns dict with 'labels' and 'ccdc' keys, each containing a list of found values.
     """
-    query = """
-    PREFIX rdfs:       <http://www.w3.org/2000/01/rdf-schema#>
-    PREFIX ontosyn:    <https://www.theworldavatar.com/kg/OntoSyn/>
-    PREFIX ontospecies:<http://www.theworldavatar.com/ontology/ontospecies/OntoSpecies.owl#>
-    PREFIX ontomops:   <https://www.theworldavatar.com/kg/ontomops/>
+    index = graph_index(graph)
+    syn = URIRef(synthesis_uri)
+    outputs = set(index.objects(syn, ONTOSYN.hasChemicalOutput))
+
+    def ccdc_values(out: Any, output_type: URIRef) -> List[Any]:
+        if output_type == ONTOSPECIES.Species:
+            return [v for c in index.objects(out, ONTOSPECIES.hasCCDCNumber)
+                    for v in index.objects(c, ONTOSPECIES.hasCCDCNumberValue)]
+        if output_type == ONTOMOPS.MetalOrganicPolyhedron:
+            return index.objects(out, ONTOMOPS.hasCCDCNumber)
+        return []
 
-    SELECT DISTINCT ?productLabel ?ccdcVal
-    WHERE {
-      { # OntoSpecies Species as output
-        ?syn ontosyn:hasChemicalOutput ?sp .
-        ?sp a ontospecies:Species .
-        OPTIONAL { ?sp rdfs:label ?productLabel }
-        OPTIONAL { ?sp ontospecies:hasCCDCNumber/ontospecies:hasCCDCNumberValue ?ccdcVal }
-      }
-      UNION
-      { # OntoSyn ChemicalOutput as output
-        ?syn ontosyn:hasChemicalOutput ?co .
-        ?co a ontosyn:ChemicalOutput .
-        OPTIONAL { ?co rdfs:label ?productLabel }
-      }
-      UNION
-      { # OntoMOPs MetalOrganicPolyhedron as output
-        ?syn ontosyn:hasChemicalOutput ?mop .
-        ?mop a ontomops:MetalOrganicPolyhedron .
-        OPTIONAL { ?mop rdfs:label ?productLabel }
-        OPTIONAL { ?mop ontomops:hasCCDCNumber ?ccdcVal }
-      }
-    }
-    """
+    # Species, ChemicalOutput and MOP outputs in turn, each in instance order
+    rows: List[Row] = []
+    for output_type in (ONTOSPECIES.Species, ONTOSYN.ChemicalOutput, ONTOMOPS.MetalOrganicPolyhedron):
+        for out in index.subjects(RDF.type, output_type):
+            if out not in outputs:
+                continue
+            for label in optional(index.objects(out, RDFS.label)):
+                for ccdc in optional(ccdc_values(out, output_type)):
+                    rows.append(Row(productLabel=label, ccdcVal=ccdc))
     labels: List[str] = []
     ccdc_vals: List[str] = []
     try:
-        res = graph.query(query, initBindings={'syn': URIRef(synthesis_uri)})
-        for row in res:
+        for row in rows:
             if getattr(row, 'productLabel', None):
                 lbl = str(row.productLabel).strip()
                 if lbl and lbl not in labels:
@@ -172,6 +167,15 @@ def query_syntheses_via_steps(graph: Graph, namespaces: Dict[str, Namespace]) ->
 ## Local query_synthesis_inputs removed; using implementation from step/chemicalinput_query.py
 
 
+def _measured_values(index: GraphIndex, step: URIRef, prop: URIRef) -> Iterator[Tuple[Any, Any, Any]]:
+    """(value, unit, label) of the om-2 quantities `step` links to by `prop`; label may be None."""
+    for q in index.objects(step, prop):
+        for value in index.objects(q, OM2.hasNumericalValue):
+            for unit in index.objects(q, OM2.hasUnit):
+                for label in optional(index.objects(q, RDFS.label)):
+                    yield value, unit, label
+
+
 def extract_duration(graph: Graph, namespaces: Dict[str, Namespace], step_uri: str) -> str:
     """Extract duration information from a step URI using SPARQL and return clean format."""
     ontosyn = namespaces.get('ontosyn')
@@ -181,22 +185,10 @@ def extract_duration(graph: Graph, namespaces: Dict[str, Namespace], step_uri: s
     if not ontosyn or not rdfs:
         return "N/A"
     
-    # SPARQL query to get duration information
-    query = """
-    PREFIX ontosyn: <https://www.theworldavatar.com/kg/OntoSyn/>
-    PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-    PREFIX om-2: <http://www.ontology-of-units-of-measure.org/resource/om-2/>
-    
-    SELECT DISTINCT ?durationValue ?durationUnit ?durationLabel
-    WHERE {
-        ?step ontosyn:hasStepDuration ?durationUri .
-        ?durationUri om-2:hasNumericalValue ?durationValue .
-        ?durationUri om-2:hasUnit ?durationUnit .
-        OPTIONAL { ?durationUri rdfs:label ?durationLabel }
-    }
-    """
-    
-    results = graph.query(query, initBindings={'step': URIRef(step_uri)})
+    results = (
+        Row(durationValue=value, durationUnit=unit, durationLabel=label)
+        for value, unit, label in _measured_values(graph_index(graph), URIRef(step_uri), ONTOSYN.hasStepDuration)
+    )
     
     for row in results:
         if row.durationValue and row.durationUnit:
@@ -227,22 +219,10 @@ def extract_temperature(graph: Graph, namespaces: Dict[str, Namespace], step_uri
     if not ontosyn or not rdfs:
         return "N/A"
     
-    # SPARQL query to get temperature information
-    query = """
-    PREFIX ontosyn: <https://www.theworldavatar.com/kg/OntoSyn/>
-    PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-    PREFIX om-2: <http://www.ontology-of-units-of-measure.org/resource/om-2/>
-    
-    SELECT DISTINCT ?tempValue ?tempUnit ?tempLabel
-    WHERE {
-        ?step ?temperatureProperty ?tempUri .
-        ?tempUri om-2:hasNumericalValue ?tempValue .
-        ?tempUri om-2:hasUnit ?tempUnit .
-        OPTIONAL { ?tempUri rdfs:label ?tempLabel }
-    }
-    """
-    
-    results = graph.query(query, initBindings={'step': URIRef(step_uri), 'temperatureProperty': URIRef(temperature_property)})
+    results = (
+        Row(tempValue=value, tempUnit=unit, tempLabel=label)
+        for value, unit, label in _measured_values(graph_index(graph), URIRef(step_uri), URIRef(temperature_property))
+    )
     
     for row in results:
         if row.tempValue and row.tempUnit:
@@ -272,22 +252,13 @@ def extract_temperature_rate(graph: Graph, namespaces: Dict[str, Namespace], ste
     if not ontosyn:
         return "N/A"
 
-    query = """
-    PREFIX ontosyn: <https://www.theworldavatar.com/kg/OntoSyn/>
-    PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-    PREFIX om-2: <http://www.ontology-of-units-of-measure.org/resource/om-2/>
-    SELECT DISTINCT ?val ?unit ?label WHERE {
-      ?step ontosyn:hasTemperatureRate ?rate .
-      ?rate om-2:hasNumericalValue ?val .
-      OPTIONAL { ?rate om-2:hasUnit ?unit }
-      OPTIONAL { ?rate rdfs:label ?label }
-    } LIMIT 1
-    """
-
-    try:
-        results = graph.query(query, initBindings={'step': URIRef(step_uri)})
-    except Exception:
-        results = []
+    # The first rate with a numerical value (first unit and label, if any)
+    index = graph_index(graph)
+    results = [
+        Row(val=val, unit=index.first(rate, OM2.hasUnit), label=index.first(rate, RDFS.label))
+        for rate in index.objects(URIRef(step_uri), ONTOSYN.hasTemperatureRate)
+        for val in index.objects(rate, OM2.hasNumericalValue)
+    ][:1]
 
     for row in results:
         try:
@@ -319,23 +290,12 @@ def extract_transferred_amount(graph: Graph, namespaces: Dict[str, Namespace], s
     if not ontosyn:
         return "N/A"
     
-    query = """
-    PREFIX ontosyn: <https://www.theworldavatar.com/kg/OntoSyn/>
-    PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-    PREFIX om-2: <http://www.ontology-of-units-of-measure.org/resource/om-2/>
-    
-    SELECT DISTINCT ?val ?unit ?label WHERE {
-      ?step ontosyn:hasTransferedAmount ?amount .
-      OPTIONAL { ?amount om-2:hasNumericalValue ?val }
-      OPTIONAL { ?amount om-2:hasUnit ?unit }
-      OPTIONAL { ?amount rdfs:label ?label }
-    } LIMIT 1
-    """
-    
-    try:
-        results = graph.query(query, initBindings={'step': URIRef(step_uri)})
-    except Exception:
-        results = []
+    index = graph_index(graph)
+    results = [
+        Row(val=index.first(amount, OM2.hasNumericalValue), unit=index.first(amount, OM2.hasUnit),
+            label=index.first(amount, RDFS.label))
+        for amount in index.objects(URIRef(step_uri), ONTOSYN.hasTransferedAmount)[:1]
+    ]
     
     for row in results:
         label = str(row.label) if getattr(row, 'label', None) else ""
@@ -360,6 +320,16 @@ def extract_transferred_amount(graph: Graph, namespaces: Dict[str, Namespace], s
     return "N/A"
 
 
+def _vessel_type_label(index: GraphIndex, step: URIRef, prop: URIRef) -> Optional[Any]:
+    """First label of a vessel type of the vessels `step` links to by `prop`."""
+    for vessel in index.objects(step, prop):
+        for vessel_type in index.objects(vessel, ONTOSYN.hasVesselType):
+            label = index.first(vessel_type, RDFS.label)
+            if label is not None:
+                return label
+    return None
+
+
 def extract_target_vessel(graph: Graph, namespaces: Dict[str, Namespace], step_uri: str) -> Dict[str, str]:
     """Extract target vessel information for Transfer steps via ontosyn:isTransferedTo.
     Returns dict with 'name' and 'type' keys.
@@ -368,45 +338,18 @@ def extract_target_vessel(graph: Graph, namespaces: Dict[str, Namespace], step_u
     if not ontosyn:
         return {"name": "N/A", "type": "N/A"}
     
-    # Query for target vessel name
-    query_name = """
-    PREFIX ontosyn: <https://www.theworldavatar.com/kg/OntoSyn/>
-    PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-    
-    SELECT DISTINCT ?vesselName WHERE {
-      ?step ontosyn:isTransferedTo ?vessel .
-      OPTIONAL { ?vessel rdfs:label ?vesselName }
-    } LIMIT 1
-    """
-    
-    # Query for target vessel type
-    query_type = """
-    PREFIX ontosyn: <https://www.theworldavatar.com/kg/OntoSyn/>
-    PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-    
-    SELECT DISTINCT ?vesselTypeLabel WHERE {
-      ?step ontosyn:isTransferedTo ?vessel .
-      ?vessel ontosyn:hasVesselType ?vesselType .
-      ?vesselType rdfs:label ?vesselTypeLabel .
-    } LIMIT 1
-    """
-    
+    index = graph_index(graph)
+    step = URIRef(step_uri)
     vessel_name = "N/A"
     vessel_type = "N/A"
     
-    try:
-        results_name = list(graph.query(query_name, initBindings={'step': URIRef(step_uri)}))
-        if results_name and getattr(results_name[0], 'vesselName', None):
-            vessel_name = str(results_name[0].vesselName)
-    except Exception:
-        pass
+    vessel = index.first(step, ONTOSYN.isTransferedTo)
+    if vessel is not None and index.first(vessel, RDFS.label):
+        vessel_name = str(index.first(vessel, RDFS.label))
     
-    try:
-        results_type = list(graph.query(query_type, initBindings={'step': URIRef(step_uri)}))
-        if results_type and getattr(results_type[0], 'vesselTypeLabel', None):
-            vessel_type = str(results_type[0].vesselTypeLabel)
-    except Exception:
-        pass
+    type_label = _vessel_type_label(index, step, ONTOSYN.isTransferedTo)
+    if type_label:
+        vessel_type = str(type_label)
     
     return {"name": vessel_name, "type": vessel_type}
 
@@ -423,42 +366,34 @@ def query_step_details(graph: Graph, namespaces: Dict[str, Namespace], step_uri:
         print("Required namespaces not found!")
         return {}
     
-    # SPARQL query to get step details (excluding duration and temperature)
-    query = """
-    PREFIX ontosyn: <https://www.theworldavatar.com/kg/OntoSyn/>
-    PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-    
-    SELECT DISTINCT ?stepType ?label ?order ?comment ?vesselName ?vesselEnvironment ?isStirred ?isLayered ?isSealed ?isVacuum ?isRepeated ?isVacuumFiltration ?targetPh ?deviceLabel ?isLayeredTransfer ?isWait
-    WHERE {
-        ?step a ?stepType .
-        ?step rdfs:label ?label .
-        OPTIONAL { ?step rdfs:comment ?comment }
-        OPTIONAL { ?step ontosyn:hasOrder ?order }
-        OPTIONAL { 
-            ?step ontosyn:hasVessel ?vessel .
-            OPTIONAL { ?vessel rdfs:label ?vesselName }
-        }
-        OPTIONAL {
-            ?step ontosyn:hasVesselEnvironment ?env .
-            OPTIONAL { ?env rdfs:label ?vesselEnvironment }
-        }
-        OPTIONAL {
-            ?step ontosyn:hasHeatChillDevice ?dev .
-            OPTIONAL { ?dev rdfs:label ?deviceLabel }
-        }
-        OPTIONAL { ?step ontosyn:isStirred ?isStirred }
-        OPTIONAL { ?step ontosyn:isLayered ?isLayered }
-        OPTIONAL { ?step ontosyn:isSealed ?isSealed }
-        OPTIONAL { ?step ontosyn:hasVacuum ?isVacuum }
-        OPTIONAL { ?step ontosyn:isRepeated ?isRepeated }
-        OPTIONAL { ?step ontosyn:isVacuumFiltration ?isVacuumFiltration }
-        OPTIONAL { ?step ontosyn:hasTargetPh ?targetPh }
-        OPTIONAL { ?step ontosyn:isLayeredTransfer ?isLayeredTransfer }
-        OPTIONAL { ?step ontosyn:isWait ?isWait }
-    }
-    """
-    
-    res = list(graph.query(query, initBindings={'step': URIRef(step_uri)}))
+    index = graph_index(graph)
+    step = URIRef(step_uri)
+    res: List[Row] = []
+    if index.objects(step, RDFS.label):
+        def linked_label(prop: URIRef) -> Optional[Any]:
+            node = index.first(step, prop)
+            return index.first(node, RDFS.label) if node is not None else None
+
+        # One row per step type with the first value of each optional property
+        for step_type in index.objects(step, RDF.type):
+            res.append(Row(
+                stepType=step_type,
+                label=index.first(step, RDFS.label),
+                comment=index.first(step, RDFS.comment),
+                order=index.first(step, ONTOSYN.hasOrder),
+                vesselName=linked_label(ONTOSYN.hasVessel),
+                vesselEnvironment=linked_label(ONTOSYN.hasVesselEnvironment),
+                deviceLabel=linked_label(ONTOSYN.hasHeatChillDevice),
+                isStirred=index.first(step, ONTOSYN.isStirred),
+                isLayered=index.first(step, ONTOSYN.isLayered),
+                isSealed=index.first(step, ONTOSYN.isSealed),
+                isVacuum=index.first(step, ONTOSYN.hasVacuum),
+                isRepeated=index.first(step, ONTOSYN.isRepeated),
+                isVacuumFiltration=index.first(step, ONTOSYN.isVacuumFiltration),
+                targetPh=index.first(step, ONTOSYN.hasTargetPh),
+                isLayeredTransfer=index.first(step, ONTOSYN.isLayeredTransfer),
+                isWait=index.first(step, ONTOSYN.isWait),
+            ))
     
     # Choose the most specific type (not SynthesisStep) if present
     chosen_row = None
@@ -485,21 +420,9 @@ def query_step_details(graph: Graph, namespaces: Dict[str, Namespace], step_uri:
     comment = str(row.comment) if row.comment else "N/A"
     vessel_name = str(row.vesselName) if row.vesselName else "N/A"
     
-    # Separate query for vessel type to ensure we follow the correct path:
-    # SynthesisStep -> hasVessel -> Vessel -> hasVesselType -> VesselType -> label
-    vessel_type_query = """
-    PREFIX ontosyn: <https://www.theworldavatar.com/kg/OntoSyn/>
-    PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-    
-    SELECT DISTINCT ?vesselTypeLabel
-    WHERE {
-        ?step ontosyn:hasVessel ?vessel .
-        ?vessel ontosyn:hasVesselType ?vesselType .
-        ?vesselType rdfs:label ?vesselTypeLabel .
-    }
-    """
-    vessel_type_result = list(graph.query(vessel_type_query, initBindings={'step': URIRef(step_uri)}))
-    vessel_type = str(vessel_type_result[0].vesselTypeLabel) if vessel_type_result and vessel_type_result[0].vesselTypeLabel else "N/A"
+    # Vessel type follows SynthesisStep -> hasVessel -> Vessel -> hasVesselType -> VesselType -> label
+    vessel_type_label = _vessel_type_label(index, step, ONTOSYN.hasVessel)
+    vessel_type = str(vessel_type_label) if vessel_type_label else "N/A"
     
     vessel_environment = str(row.vesselEnvironment) if row.vesselEnvironment else "N/A"
     device_label = str(row.deviceLabel) if row.deviceLabel else "N/A"
@@ -552,6 +475,24 @@ def query_step_details(graph: Graph, namespaces: Dict[str, Namespace], step_uri:
     return step_details
 
 
+def _chemical_rows(index: GraphIndex, step: URIRef, prop: URIRef) -> Iterator[Row]:
+    """Rows of the chemicals `step` links to by `prop`: label, amount, alternative
+    name and formula (label / value), each OPTIONAL, in SPARQL's nested-loop order."""
+    for chemical in index.objects(step, prop):
+        for label in optional(index.objects(chemical, RDFS.label)):
+            for amount in optional(index.objects(chemical, ONTOSYN.hasAmount)):
+                for alt in optional(index.objects(chemical, ONTOSYN.hasAlternativeNames)):
+                    for cf in optional(index.objects(chemical, ONTOSYN.hasChemicalFormula)):
+                        if cf is None:
+                            yield Row(chemical=chemical, label=label, amount=amount, alt=alt)
+                            continue
+                        for cf_label in optional(index.objects(cf, RDFS.label)):
+                            for cf_val in optional(index.objects(cf, ONTOSPECIES.hasChemicalFormulaValue)):
+                                for cf_val_syn in optional(index.objects(cf, ONTOSYN.hasChemicalFormulaValue)):
+                                    yield Row(chemical=chemical, label=label, amount=amount, alt=alt,
+                                              cfLabel=cf_label, cfVal=cf_val, cfValSyn=cf_val_syn)
+
+
 def query_step_chemicals(graph: Graph, namespaces: Dict[str, Namespace], step_uri: str) -> Dict[str, List[Dict[str, Any]]]:
     """Query chemical information for a synthesis step."""
     
@@ -561,33 +502,11 @@ def query_step_chemicals(graph: Graph, namespaces: Dict[str, Namespace], step_ur
     if not ontosyn or not rdfs:
         return {"addedChemical": [], "solvent": [], "washingSolvent": []}
     
-    # Queries for chemicals: include label, alternative names and chemical formula values
-    def _chem_query_for(prop_iri: str) -> str:
-        return f"""
-    PREFIX ontosyn: <https://www.theworldavatar.com/kg/OntoSyn/>
-    PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-    PREFIX os: <http://www.theworldavatar.com/ontology/ontospecies/OntoSpecies.owl#>
-    
-    SELECT DISTINCT ?chemical ?label ?amount ?alt ?cfLabel ?cfVal ?cfValSyn
-    WHERE {{
-        ?step {prop_iri} ?chemical .
-        OPTIONAL {{ ?chemical rdfs:label ?label }}
-        OPTIONAL {{ ?chemical ontosyn:hasAmount ?amount }}
-        OPTIONAL {{ ?chemical ontosyn:hasAlternativeNames ?alt }}
-        OPTIONAL {{
-          ?chemical ontosyn:hasChemicalFormula ?cf .
-          OPTIONAL {{ ?cf rdfs:label ?cfLabel }}
-          OPTIONAL {{ ?cf os:hasChemicalFormulaValue ?cfVal }}
-          OPTIONAL {{ ?cf ontosyn:hasChemicalFormulaValue ?cfValSyn }}
-        }}
-    }}
-    """
-
-    added_chemicals_query = _chem_query_for("ontosyn:hasAddedChemicalInput")
-    solvent_chemicals_query = _chem_query_for("ontosyn:hasSolventDissolve")
+    index = graph_index(graph)
+    step = URIRef(step_uri)
     
-    def process_chemicals(query: str) -> List[Dict[str, Any]]:
-        results = graph.query(query, initBindings={'step': URIRef(step_uri)})
+    def process_chemicals(prop: URIRef) -> List[Dict[str, Any]]:
+        results = _chemical_rows(index, step, prop)
         # Group by chemical node
         grouped: Dict[str, Dict[str, Any]] = {}
         for row in results:
@@ -628,63 +547,10 @@ def query_step_chemicals(graph: Graph, namespaces: Dict[str, Namespace], step_ur
     
     def process_washing_solvents() -> List[Dict[str, Any]]:
         """Separate function to query washing solvents using both possible property names."""
-        # Try ontosyn:hasWashingSolvent first
-        query1 = """
-        PREFIX ontosyn: <https://www.theworldavatar.com/kg/OntoSyn/>
-        PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-        PREFIX os: <http://www.theworldavatar.com/ontology/ontospecies/OntoSpecies.owl#>
-        
-        SELECT DISTINCT ?chemical ?label ?amount ?alt ?cfLabel ?cfVal ?cfValSyn
-        WHERE {
-            ?step ontosyn:hasWashingSolvent ?chemical .
-            OPTIONAL { ?chemical rdfs:label ?label }
-            OPTIONAL { ?chemical ontosyn:hasAmount ?amount }
-            OPTIONAL { ?chemical ontosyn:hasAlternativeNames ?alt }
-            OPTIONAL {
-              ?chemical ontosyn:hasChemicalFormula ?cf .
-              OPTIONAL { ?cf rdfs:label ?cfLabel }
-              OPTIONAL { ?cf os:hasChemicalFormulaValue ?cfVal }
-              OPTIONAL { ?cf ontosyn:hasChemicalFormulaValue ?cfValSyn }
-            }
-        }
-        """
-        
-        # Try ontosyn:hasWashingChemical as fallback
-        query2 = """
-        PREFIX ontosyn: <https://www.theworldavatar.com/kg/OntoSyn/>
-        PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-        PREFIX os: <http://www.theworldavatar.com/ontology/ontospecies/OntoSpecies.owl#>
-        
-        SELECT DISTINCT ?chemical ?label ?amount ?alt ?cfLabel ?cfVal ?cfValSyn
-        WHERE {
-            ?step ontosyn:hasWashingChemical ?chemical .
-            OPTIONAL { ?chemical rdfs:label ?label }
-            OPTIONAL { ?chemical ontosyn:hasAmount ?amount }
-            OPTIONAL { ?chemical ontosyn:hasAlternativeNames ?alt }
-            OPTIONAL {
-              ?chemical ontosyn:hasChemicalFormula ?cf .
-              OPTIONAL { ?cf rdfs:label ?cfLabel }
-              OPTIONAL { ?cf os:hasChemicalFormulaValue ?cfVal }
-              OPTIONAL { ?cf ontosyn:hasChemicalFormulaValue ?cfValSyn }
-            }
-        }
-        """
-        
-        # Try first query
-        try:
-            results1 = list(graph.query(query1, initBindings={'step': URIRef(step_uri)}))
-        except Exception:
-            results1 = []
-        
-        # If no results, try second query
-        if not results1:
-            try:
-                results2 = list(graph.query(query2, initBindings={'step': URIRef(step_uri)}))
-            except Exception:
-                results2 = []
-            results = results2
-        else:
-            results = results1
+        # Try ontosyn:hasWashingSolvent first, ontosyn:hasWashingChemical as fallback
+        results = list(_chemical_rows(index, step, ONTOSYN.hasWashingSolvent))
+        if not results:
+            results = list(_chemical_rows(index, step, ONTOSYN.hasWashingChemical))
         
         # Group by chemical node
         grouped: Dict[str, Dict[str, Any]] = {}
@@ -725,8 +591,8 @@ def query_step_chemicals(graph: Graph, namespaces: Dict[str, Namespace], step_ur
         return chemicals
     
     return {
-        "addedChemical": process_chemicals(added_chemicals_query),
-        "solvent": process_chemicals(solvent_chemicals_query),
+        "addedChemical": process_chemicals(ONTOSYN.hasAddedChemicalInput),
+        "solvent": process_chemicals(ONTOSYN.hasSolventDissolve),
         "washingSolvent": process_washing_solvents()
     }
 
@@ -818,6 +684,7 @@ def build_step_json(step_details: Dict[str, Any], chemicals: Dict[str, List[Dict
     return {step_type: base_step}
 
 
+@with_graph_index
 def build_json_structure(graph: Graph, namespaces: Dict[str, Namespace], syntheses: List[Dict[str, str]], debug: bool = False) -> Dict[str, Any]:
     """Build JSON with only chemicals per synthesis (via hasChemicalInput)."""
     # Map synthesis URI -> list of CCDC number values via legacy path (fallback only)
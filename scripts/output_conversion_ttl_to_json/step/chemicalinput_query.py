@@ -2,6 +2,9 @@ from pathlib import Path
 from typing import Dict, List
 
 from rdflib import Graph, URIRef
+from rdflib.namespace import RDFS
+
+from scripts.output_conversion_ttl_to_json.graph_index import ONTOSYN, Row, graph_index, optional, with_graph_index
 
 
 def load_graph_from_ttl(ttl_path: str) -> Graph:
@@ -21,19 +24,15 @@ def query_all_syntheses(graph: Graph) -> List[str]:
 
 def query_synthesis_inputs(graph: Graph, synthesis_uri: str) -> List[Dict[str, any]]:
     """Find chemicals for a synthesis via ontosyn:hasChemicalInput (label, amount, alternative names, and IRI)."""
-    query = """
-    PREFIX ontosyn: <https://www.theworldavatar.com/kg/OntoSyn/>
-    PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
-
-    SELECT DISTINCT ?chemical ?label ?amount ?altName
-    WHERE {
-        ?synthesis ontosyn:hasChemicalInput ?chemical .
-        OPTIONAL { ?chemical rdfs:label ?label }
-        OPTIONAL { ?chemical ontosyn:hasAmount ?amount }
-        OPTIONAL { ?chemical ontosyn:hasAlternativeNames ?altName }
-    }
-    """
-    results = graph.query(query, initBindings={"synthesis": URIRef(synthesis_uri)})
+    # One row per combination of label, amount and alternative name of each input chemical
+    index = graph_index(graph)
+    results = (
+        Row(chemical=chemical, label=label, amount=amount, altName=alt)
+        for chemical in index.objects(URIRef(synthesis_uri), ONTOSYN.hasChemicalInput)
+        for label in optional(index.objects(chemical, RDFS.label))
+        for amount in optional(index.objects(chemical, ONTOSYN.hasAmount))
+        for alt in optional(index.objects(chemical, ONTOSYN.hasAlternativeNames))
+    )
     
     # Group by chemical URI to collect all alternative names
     grouped: Dict[str, Dict[str, any]] = {}
@@ -55,6 +54,7 @@ def query_synthesis_inputs(graph: Graph, synthesis_uri: str) -> List[Dict[str, a
     return list(grouped.values())
 
 
+@with_graph_index
 def query_inputs_for_all_syntheses(graph: Graph) -> Dict[str, List[Dict[str, str]]]:
     """Map synthesis URI -> list of input chemicals (uri, label, amount)."""
     mapping: Dict[str, List[Dict[str, str]]] = {}
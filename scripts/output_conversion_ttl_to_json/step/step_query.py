@@ -2,6 +2,9 @@ from pathlib import Path
 from typing import Dict, List
 
 from rdflib import Graph, URIRef
+from rdflib.term import Node
+
+from scripts.output_conversion_ttl_to_json.graph_index import graph_index
 
 from scripts.output_conversion_ttl_to_json.step.chemicalinput_query import (
     query_all_syntheses,
@@ -14,46 +17,54 @@ def load_graph_from_ttl(ttl_path: str) -> Graph:
     return g
 
 
-def query_synthesis_steps(graph: Graph, synthesis_uri: str) -> List[Dict[str, str]]:
-    """
-    Return one row per step for a synthesis via ontosyn:hasSynthesisStep.
-    - Deduplicate multiple labels via MIN over lowercased string for stability.
-    - Deduplicate multiple orders via MIN and cast to xsd:integer for correct sort.
-    """
-    query = """
-    PREFIX ontosyn: <https://www.theworldavatar.com/kg/OntoSyn/>
-    PREFIX rdfs:    <http://www.w3.org/2000/01/rdf-schema#>
-    PREFIX xsd:     <http://www.w3.org/2001/XMLSchema#>
-
-    SELECT ?step (MIN(?labelCanon) AS ?label) (MIN(?orderInt) AS ?order)
-    WHERE {
-      ?synthesis a ontosyn:ChemicalSynthesis ;
-                 ontosyn:hasSynthesisStep ?step .
-
-      OPTIONAL {
-        ?step rdfs:label ?lbl .
-        BIND(LCASE(STR(?lbl)) AS ?labelCanon)
-      }
-
-      OPTIONAL {
-        ?step ontosyn:hasOrder ?ordRaw .
-        BIND(xsd:integer(?ordRaw) AS ?orderInt)
-      }
-    }
-    GROUP BY ?step
-    ORDER BY ?order ?step
-    """
-    results = graph.query(query, initBindings={"synthesis": URIRef(synthesis_uri)})
-    out: List[Dict[str, str]] = []
-    for row in results:
-        out.append(
+_STEPS_QUERY = """
+PREFIX ontosyn: <https://www.theworldavatar.com/kg/OntoSyn/>
+PREFIX rdfs:    <http://www.w3.org/2000/01/rdf-schema#>
+PREFIX xsd:     <http://www.w3.org/2001/XMLSchema#>
+
+SELECT ?synthesis ?step (MIN(?labelCanon) AS ?label) (MIN(?orderInt) AS ?order)
+WHERE {
+  ?synthesis a ontosyn:ChemicalSynthesis ;
+             ontosyn:hasSynthesisStep ?step .
+
+  OPTIONAL {
+    ?step rdfs:label ?lbl .
+    BIND(LCASE(STR(?lbl)) AS ?labelCanon)
+  }
+
+  OPTIONAL {
+    ?step ontosyn:hasOrder ?ordRaw .
+    BIND(xsd:integer(?ordRaw) AS ?orderInt)
+  }
+}
+GROUP BY ?synthesis ?step
+ORDER BY ?order ?step
+"""
+
+
+def _steps_by_synthesis(graph: Graph) -> Dict[Node, List[Dict[str, str]]]:
+    """Steps of every synthesis in one query (sorted per synthesis as a per-synthesis query would)."""
+    steps: Dict[Node, List[Dict[str, str]]] = {}
+    for row in graph.query(_STEPS_QUERY):
+        steps.setdefault(row.synthesis, []).append(
             {
                 "uri": str(row.step),
                 "label": str(row.label) if row.label else "",
                 "order": str(row.order) if row.order else "",
             }
         )
-    return out
+    return steps
+
+
+def query_synthesis_steps(graph: Graph, synthesis_uri: str) -> List[Dict[str, str]]:
+    """
+    Return one row per step for a synthesis via ontosyn:hasSynthesisStep.
+    - Deduplicate multiple labels via MIN over lowercased string for stability.
+    - Deduplicate multiple orders via MIN and cast to xsd:integer for correct sort.
+    The steps of all syntheses are queried once per graph and kept on its index.
+    """
+    steps = graph_index(graph).memo("synthesis_steps", lambda: _steps_by_synthesis(graph))
+    return [dict(step) for step in steps.get(URIRef(synthesis_uri), [])]
 
 
 if __name__ == "__main__":
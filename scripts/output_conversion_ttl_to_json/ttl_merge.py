@@ -16,6 +16,8 @@ import hashlib
 from rdflib import BNode, Graph, Namespace, RDF, RDFS, URIRef, Literal
 from rdflib.namespace import OWL
 
+from src.utils.ttl_loader import parse_into
+
 
 # Namespaces
 RDF_NS = RDF
@@ -59,9 +61,15 @@ def _gather_files_for_hash(hash_dir: str) -> Tuple[List[str], List[str], List[st
     return root_output, ontospecies_files, integrated_files
 
 
+def input_files_for_hash(hash_dir: str) -> List[str]:
+    """All TTLs `merge_for_hash` reads for a hash directory, in the order they are parsed."""
+    root_output, ontospecies_files, integrated_files = _gather_files_for_hash(hash_dir)
+    return root_output + ontospecies_files + integrated_files
+
+
 def _parse_into_graph(graph: Graph, ttl_files: Iterable[str]) -> None:
-    for path in ttl_files:
-        graph.parse(path, format="turtle")
+    # Parsed in a process pool, added in the given order; raises TTLParseError on a bad file
+    parse_into(graph, list(ttl_files))
 
 
 def _normalize_synthesis_label_from_filename(base_name: str) -> str:
@@ -138,15 +146,11 @@ def merge_for_hash(
     """
     hash_dir = os.path.join(data_root, hash_value)
 
-    root_output, ontospecies_files, integrated_files = _gather_files_for_hash(hash_dir)
-
     g = Graph()
     _bind_prefixes(g)
 
     # Parse and merge all files without any additional alignment/linking
-    _parse_into_graph(g, root_output)
-    _parse_into_graph(g, ontospecies_files)
-    _parse_into_graph(g, integrated_files)
+    _parse_into_graph(g, input_files_for_hash(hash_dir))
 
     return g
 
@@ -5,6 +5,9 @@ This implementation is intentionally minimal and deterministic:
 - Hardcodes the example TTL: `evaluation/data/merged_tll/0e299eb4/0e299eb4.ttl`
 - Uses the OntoSpecies MCP stdio server config at: `configs/grounding.json`
 - Produces a stable JSON mapping (sorted keys + deterministic tie-breaking)
+- Fuzzy lookups are deduplicated on (class, normalized label), run concurrently over the
+  one MCP session and memoized per label-index version (see `lookup_cache.py`)
+- Batch mode first canonicalizes duplicate entities across files (see `internal_merge.py`)
 
 The core output is a JSON object mapping *source TTL IRIs* -> *OntoSpecies IRIs* (or null if not found),
 plus a detailed list explaining how each mapping was chosen.
@@ -17,15 +20,25 @@ import argparse
 import json
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 
 from rdflib import Graph, Namespace, RDF, RDFS, URIRef
-from rdflib.term import BNode, Literal
 from rdflib.namespace import OWL
 
 from mcp.client.session import ClientSession
 from mcp.client.stdio import StdioServerParameters, stdio_client
 
+from src.agents.grounding.internal_merge import compute_internal_merge_mapping
+from src.agents.grounding.lookup_cache import (
+    DEFAULT_CACHE_ROOT,
+    DEFAULT_CONCURRENCY,
+    LookupCache,
+    LookupKey,
+    fetch_lookups,
+    normalize_label,
+)
+from src.utils.ttl_loader import TTLParseError, parse_ttl_files
+
 
 EXAMPLE_TTL_PATH = Path("evaluation/data/merged_tll/0e299eb4/0e299eb4.ttl")
 MCP_CONFIG_PATH = Path("configs/grounding.json")
@@ -169,6 +182,10 @@ class OntoSpeciesLookupClient:
             raise KeyError(f"Missing MCP server key '{server_key}' in {mcp_config_path}")
         self._server_cfg = cfg[server_key]
 
+    @property
+    def server_cfg(self) -> Dict[str, Any]:
+        return dict(self._server_cfg)
+
     async def __aenter__(self) -> "OntoSpeciesLookupClient":
         params = StdioServerParameters(
             command=self._server_cfg["command"],
@@ -222,6 +239,48 @@ class OntoSpeciesLookupClient:
         return list(await self._call_tool(tool, {"query": query, "limit": limit, "cutoff": cutoff}) or [])
 
 
+async def prefetch_fuzzy_lookups(
+    *,
+    client: OntoSpeciesLookupClient,
+    candidates: Sequence[Candidate],
+    classes: Sequence[str],
+    fuzzy_cutoff: float = 0.6,
+    lookup_cache: Optional[LookupCache] = None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    known: Optional[Dict[LookupKey, List[Dict[str, Any]]]] = None,
+) -> Dict[LookupKey, List[Dict[str, Any]]]:
+    """
+    Fetch every fuzzy lookup the grounding loop needs for `candidates`, in label-priority rounds.
+
+    Round k queries the k-th label of each candidate that had no hit for its earlier labels,
+    so alternative names are only looked up when the per-candidate loop would reach them.
+    Within a round, (class, normalized label) pairs are deduplicated across all candidates
+    and fetched concurrently. `known` (same cutoff) is extended in place and returned.
+    """
+    lookups: Dict[LookupKey, List[Dict[str, Any]]] = known if known is not None else {}
+    pending = [c for c in candidates if c.labels]
+    depth = 0
+    while pending and classes:
+        keys = {(cls, normalize_label(c.labels[depth])) for c in pending for cls in classes}
+        await fetch_lookups(
+            client,
+            keys,
+            limit=10,
+            cutoff=fuzzy_cutoff,
+            cache=lookup_cache,
+            concurrency=concurrency,
+            known=lookups,
+        )
+        pending = [
+            c
+            for c in pending
+            if len(c.labels) > depth + 1
+            and not any(_pick_best_fuzzy_with_score(lookups[(cls, normalize_label(c.labels[depth]))]) for cls in classes)
+        ]
+        depth += 1
+    return lookups
+
+
 async def ground_example_ttl_to_ontospecies(
     *,
     ttl_path: Path = EXAMPLE_TTL_PATH,
@@ -229,6 +288,9 @@ async def ground_example_ttl_to_ontospecies(
     server_key: str = MCP_SERVER_KEY,
     fuzzy_cutoff: float = 0.6,
     enable_fuzzy: bool = True,
+    use_lookup_cache: bool = True,
+    lookup_cache_root: Path = DEFAULT_CACHE_ROOT,
+    concurrency: int = DEFAULT_CONCURRENCY,
 ) -> Dict[str, Any]:
     """
     Ground the hardcoded example TTL and return a deterministic JSON-serializable dict.
@@ -238,14 +300,20 @@ async def ground_example_ttl_to_ontospecies(
         raise FileNotFoundError(f"TTL not found: {ttl_path}")
 
     async with OntoSpeciesLookupClient(mcp_config_path=mcp_config_path, server_key=server_key) as client:
-        return await ground_ttl_with_client(
+        cache = LookupCache.for_server(client.server_cfg, server_key, lookup_cache_root) if use_lookup_cache else None
+        result = await ground_ttl_with_client(
             ttl_path=ttl_path,
             client=client,
             mcp_config_path=mcp_config_path,
             server_key=server_key,
             fuzzy_cutoff=fuzzy_cutoff,
             enable_fuzzy=enable_fuzzy,
+            lookup_cache=cache,
+            concurrency=concurrency,
         )
+        if cache is not None:
+            cache.save()
+        return result
 
 async def ground_ttl_with_client(
     *,
@@ -255,6 +323,8 @@ async def ground_ttl_with_client(
     server_key: str = MCP_SERVER_KEY,
     fuzzy_cutoff: float = 0.6,
     enable_fuzzy: bool = True,
+    lookup_cache: Optional[LookupCache] = None,
+    concurrency: int = DEFAULT_CONCURRENCY,
 ) -> Dict[str, Any]:
     """
     Ground a TTL using an *already-open* OntoSpeciesLookupClient session.
@@ -271,6 +341,8 @@ async def ground_ttl_with_client(
         server_key=server_key,
         fuzzy_cutoff=fuzzy_cutoff,
         enable_fuzzy=enable_fuzzy,
+        lookup_cache=lookup_cache,
+        concurrency=concurrency,
     )
 
 
@@ -283,10 +355,17 @@ async def ground_graph_with_client(
     server_key: str = MCP_SERVER_KEY,
     fuzzy_cutoff: float = 0.6,
     enable_fuzzy: bool = True,
+    classes: Optional[Sequence[str]] = None,
+    lookups: Optional[Dict[LookupKey, List[Dict[str, Any]]]] = None,
+    lookup_cache: Optional[LookupCache] = None,
+    concurrency: int = DEFAULT_CONCURRENCY,
 ) -> Dict[str, Any]:
     """
     Ground an in-memory graph using an *already-open* OntoSpeciesLookupClient session.
     Used in batch mode after internal-merge canonicalization to avoid re-reading files.
+
+    Batch mode passes `classes` and the `lookups` prefetched for the whole batch; only
+    lookups missing from them are queried here.
     """
     ttl_path = Path(ttl_path)
     candidates = extract_candidates_from_graph(graph)
@@ -294,9 +373,21 @@ async def ground_graph_with_client(
     details: List[Dict[str, Any]] = []
     mapping: Dict[str, Optional[str]] = {}
 
-    classes = await client.fuzzy_lookup_classes()
+    if classes is None:
+        classes = await client.fuzzy_lookup_classes()
     classes = sorted(set(classes))  # stable
 
+    if enable_fuzzy and classes:
+        lookups = await prefetch_fuzzy_lookups(
+            client=client,
+            candidates=candidates,
+            classes=classes,
+            fuzzy_cutoff=fuzzy_cutoff,
+            lookup_cache=lookup_cache,
+            concurrency=concurrency,
+            known=lookups,
+        )
+
     for c in candidates:
         chosen: Optional[str] = None
         chosen_class: Optional[str] = None
@@ -311,7 +402,7 @@ async def ground_graph_with_client(
             for label in c.labels:
                 per_label_rows: Dict[str, List[Dict[str, Any]]] = {}
                 for cls in classes:
-                    rows = await client.fuzzy_lookup(cls, label, limit=10, cutoff=fuzzy_cutoff)
+                    rows = lookups[(cls, normalize_label(label))]
                     per_label_rows[cls] = rows
                     best = _pick_best_fuzzy_with_score(rows)
                     if best:
@@ -469,98 +560,6 @@ def write_graph_ttl(graph: Graph, out_path: Path) -> None:
     graph.serialize(destination=str(out_path), format="turtle")
 
 
-def compute_internal_merge_mapping(
-    graph: Graph,
-    *,
-    max_rounds: int = 10,
-) -> Dict[str, str]:
-    """
-    Compute a canonicalization mapping for subjects that are identical *except IRI*.
-
-    Definition of "identical" here:
-    - Same set of outgoing triples (predicate, object) for the subject
-    - Subject IRI itself is ignored
-    - URIRef objects are compared using the current canonical representative (fixpoint iteration)
-
-    Returns: old_iri -> canonical_iri (only for IRIs that change).
-    """
-    # Union-find over URIRefs (subjects only; but can be pointed-to by object and still be canonicalized)
-    parents: Dict[str, str] = {}
-
-    def _init(x: str) -> None:
-        if x not in parents:
-            parents[x] = x
-
-    def find(x: str) -> str:
-        _init(x)
-        while parents[x] != x:
-            parents[x] = parents[parents[x]]
-            x = parents[x]
-        return x
-
-    def union(a: str, b: str) -> bool:
-        ra, rb = find(a), find(b)
-        if ra == rb:
-            return False
-        # deterministic: attach larger to smaller
-        if ra < rb:
-            parents[rb] = ra
-        else:
-            parents[ra] = rb
-        return True
-
-    # Collect URIRef subjects (skip blank nodes)
-    subjects: List[str] = sorted({str(s) for s in graph.subjects() if isinstance(s, URIRef)})
-    for s in subjects:
-        _init(s)
-
-    def norm_term(t: Union[URIRef, BNode, Literal]) -> Tuple[str, str]:
-        if isinstance(t, URIRef):
-            return ("uri", find(str(t)))
-        if isinstance(t, BNode):
-            # BNodes are scoped to a parse; treat by N3 for stability within this merged graph
-            return ("bnode", t.n3())
-        # Literal
-        return ("lit", t.n3())
-
-    def signature_for(subj_iri: str) -> Tuple[Tuple[Tuple[str, str], Tuple[str, str]], ...]:
-        subj = URIRef(subj_iri)
-        pairs: List[Tuple[Tuple[str, str], Tuple[str, str]]] = []
-        for p, o in graph.predicate_objects(subj):
-            # Normalize predicate too (rarely needed, but safe)
-            p_kind, p_val = norm_term(p) if isinstance(p, (URIRef, BNode, Literal)) else ("other", str(p))
-            o_kind, o_val = norm_term(o) if isinstance(o, (URIRef, BNode, Literal)) else ("other", str(o))
-            pairs.append(((p_kind, p_val), (o_kind, o_val)))
-        pairs.sort()
-        return tuple(pairs)
-
-    # Fixpoint: signatures depend on object canonicalization
-    for _round in range(max_rounds):
-        groups: Dict[Tuple[Tuple[Tuple[str, str], Tuple[str, str]], ...], List[str]] = {}
-        for s in subjects:
-            sig = signature_for(find(s))
-            groups.setdefault(sig, []).append(find(s))
-
-        changed = False
-        for sig, members in groups.items():
-            uniq = sorted(set(members))
-            if len(uniq) <= 1:
-                continue
-            canon = uniq[0]
-            for other in uniq[1:]:
-                changed = union(canon, other) or changed
-        if not changed:
-            break
-
-    # Emit mapping for subjects that change
-    out: Dict[str, str] = {}
-    for s in subjects:
-        r = find(s)
-        if r != s:
-            out[s] = r
-    return out
-
-
 def apply_iri_mapping_to_graph(graph: Graph, iri_mapping: Dict[str, str]) -> Graph:
     """
     Replace IRIs throughout a graph according to iri_mapping (subject/predicate/object).
@@ -632,6 +631,23 @@ def main() -> None:
         action="store_true",
         help="Disable internal merge across TTLs in batch mode (default: enabled).",
     )
+    p.add_argument(
+        "--lookup-cache-dir",
+        default=str(DEFAULT_CACHE_ROOT),
+        help="Root of the persistent fuzzy-lookup cache (default: data/grounding_cache; "
+        "files go to <root>/<server-key>/lookups/<label-index-version>.json).",
+    )
+    p.add_argument(
+        "--no-lookup-cache",
+        action="store_true",
+        help="Do not read or write the persistent fuzzy-lookup cache.",
+    )
+    p.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help=f"Maximum concurrent fuzzy lookups over the MCP session (default: {DEFAULT_CONCURRENCY}).",
+    )
     args = p.parse_args()
 
     ttl_path = Path(args.ttl)
@@ -647,12 +663,12 @@ def main() -> None:
             graphs: Dict[str, Graph] = {}
             merged = Graph()
 
-            # 1) Load + merge all TTLs in-memory
-            for pth in ttl_files:
-                g = Graph()
-                g.parse(str(pth), format="turtle")
-                graphs[str(pth)] = g
-                merged += g
+            # 1) Load + merge all TTLs in-memory (parsed in a process pool, kept in file order)
+            for parsed in parse_ttl_files(ttl_files):
+                if parsed.error is not None:
+                    raise TTLParseError(parsed.path, parsed.error)
+                graphs[parsed.path] = parsed.graph()
+                parsed.add_to(merged)
 
             # 2) Internal merge (canonicalize duplicate entities across the whole merged graph)
             internal_map: Dict[str, str] = {}
@@ -663,8 +679,29 @@ def main() -> None:
                     for k, g in list(graphs.items()):
                         graphs[k] = apply_iri_mapping_to_graph(g, internal_map)
 
-            # 3) Ground each (now-internally-merged) graph, reusing one MCP session
+            # 3) Ground each (now-internally-merged) graph, reusing one MCP session.
+            #    Lookups for the whole batch are deduplicated and fetched up front.
             async with OntoSpeciesLookupClient(mcp_config_path=mcp_cfg, server_key=str(args.server_key)) as client:
+                cache: Optional[LookupCache] = None
+                if not args.no_lookup_cache:
+                    cache = LookupCache.for_server(
+                        client.server_cfg, str(args.server_key), Path(args.lookup_cache_dir)
+                    )
+                classes = sorted(set(await client.fuzzy_lookup_classes()))
+                lookups: Dict[LookupKey, List[Dict[str, Any]]] = {}
+                if args.enable_fuzzy and classes:
+                    all_candidates = [c for g in graphs.values() for c in extract_candidates_from_graph(g)]
+                    await prefetch_fuzzy_lookups(
+                        client=client,
+                        candidates=all_candidates,
+                        classes=classes,
+                        lookup_cache=cache,
+                        concurrency=int(args.concurrency),
+                        known=lookups,
+                    )
+                    if cache is not None:
+                        cache.save()
+
                 for in_ttl in ttl_files:
                     g = graphs[str(in_ttl)]
                     per = await ground_graph_with_client(
@@ -674,6 +711,10 @@ def main() -> None:
                         mcp_config_path=mcp_cfg,
                         server_key=str(args.server_key),
                         enable_fuzzy=bool(args.enable_fuzzy),
+                        classes=classes,
+                        lookups=lookups,
+                        lookup_cache=cache,
+                        concurrency=int(args.concurrency),
                     )
                     per["internal_merge_changes"] = len(internal_map)
 
@@ -700,7 +741,12 @@ def main() -> None:
                         "enabled": not bool(args.no_internal_merge),
                         "num_input_ttls": len(ttl_files),
                         "num_iri_rewrites": len(internal_map),
-                    }
+                    },
+                    "batch_lookups": {
+                        "num_unique_lookups": len(lookups),
+                        "cache_hits": cache.hits if cache is not None else 0,
+                        "label_index_version": cache.version if cache is not None else None,
+                    },
                 },
             )
             return results
@@ -716,6 +762,9 @@ def main() -> None:
             mcp_config_path=mcp_cfg,
             server_key=str(args.server_key),
             enable_fuzzy=bool(args.enable_fuzzy),
+            use_lookup_cache=not bool(args.no_lookup_cache),
+            lookup_cache_root=Path(args.lookup_cache_dir),
+            concurrency=int(args.concurrency),
         )
     )
 
@@ -0,0 +1,146 @@
+"""
+Internal merge for the grounding runtime: canonicalize subjects that are identical except IRI.
+
+Two URIRef subjects are identical when they have the same set of outgoing
+(predicate, object) pairs, where URIRefs are compared by their current canonical
+representative. Merging two subjects can make the subjects that point at them
+identical in turn, so this is a fixpoint in rounds.
+
+`grounding_agent` used to recompute the signature of every subject in every
+round and regroup them all, which costs rounds x triples even when a round
+merges a handful of nodes. Here the rounds are a worklist refinement (as in
+partition refinement / bisimulation):
+
+- each class keeps the signature of its representative and a table maps
+  signatures to representatives;
+- a reverse index maps every subject IRI to the subjects whose triples mention
+  it (as predicate or object);
+- after a round, only the representatives of subjects that mention a node whose
+  representative changed are re-signed and regrouped against the table.
+
+A signature only mentions representatives, and merges only coarsen the classes,
+so a class none of whose referenced nodes changed keeps its signature, and the
+representatives and number of rounds come out exactly as with a full recompute.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, List, Set, Tuple
+
+from rdflib import Graph, URIRef
+from rdflib.term import BNode, Literal
+
+# ("uri" | "bnode" | "lit" | "other", value); "uri" values are IRIs, mapped to representatives
+TermKey = Tuple[str, str]
+Signature = Tuple[Tuple[TermKey, TermKey], ...]
+
+
+def _term_key(t: object) -> TermKey:
+    if isinstance(t, URIRef):
+        return ("uri", str(t))
+    if isinstance(t, BNode):
+        # BNodes are scoped to a parse; treat by N3 for stability within this merged graph
+        return ("bnode", t.n3())
+    if isinstance(t, Literal):
+        return ("lit", t.n3())
+    return ("other", str(t))
+
+
+def compute_internal_merge_mapping(
+    graph: Graph,
+    *,
+    max_rounds: int = 10,
+) -> Dict[str, str]:
+    """
+    Compute a canonicalization mapping for subjects that are identical *except IRI*.
+
+    Definition of "identical" here:
+    - Same set of outgoing triples (predicate, object) for the subject
+    - Subject IRI itself is ignored
+    - URIRef objects are compared using the current canonical representative (fixpoint iteration)
+
+    The representative of a class is its smallest IRI. At most `max_rounds` rounds
+    of merges are run.
+
+    Returns: old_iri -> canonical_iri (only for IRIs that change).
+    """
+    # Union-find over URIRefs (subjects only; but can be pointed-to by object and still be canonicalized)
+    parents: Dict[str, str] = {}
+
+    def find(x: str) -> str:
+        root = parents.get(x, x)
+        if root == x:
+            return x
+        while parents.get(root, root) != root:
+            root = parents[root]
+        while parents[x] != root:
+            parents[x], x = root, parents[x]
+        return root
+
+    # Outgoing pairs of the URIRef subjects (skip blank nodes), in one scan: signatures
+    # are sorted, so the order the store yields triples in does not matter
+    pairs_of: Dict[str, List[Tuple[TermKey, TermKey]]] = {}
+    for s, p, o in graph:
+        if isinstance(s, URIRef):
+            pairs_of.setdefault(str(s), []).append((_term_key(p), _term_key(o)))
+    subjects: List[str] = sorted(pairs_of)
+
+    # Subject IRI -> subjects whose triples mention it
+    dependants: Dict[str, Set[str]] = {}
+    for s, pairs in pairs_of.items():
+        for pair in pairs:
+            for kind, value in pair:
+                if kind == "uri" and value in pairs_of:
+                    dependants.setdefault(value, set()).add(s)
+
+    def norm(key: TermKey) -> TermKey:
+        # Representatives are not in `parents`, so most keys are returned as they are
+        return ("uri", find(key[1])) if key[1] in parents and key[0] == "uri" else key
+
+    def signature_for(root: str) -> Signature:
+        return tuple(sorted((norm(p), norm(o)) for p, o in pairs_of[root]))
+
+    members: Dict[str, List[str]] = {s: [s] for s in subjects}
+    signature_of: Dict[str, Signature] = {}
+    root_by_signature: Dict[Signature, str] = {}
+
+    # Round 1 signs every subject; later rounds only the classes a merge may have changed
+    dirty: Set[str] = set(subjects)
+    for _round in range(max_rounds):
+        if not dirty:
+            break
+        for root in dirty:
+            old = signature_of.pop(root, None)
+            if old is not None and root_by_signature.get(old) == root:
+                del root_by_signature[old]
+        groups: Dict[Signature, List[str]] = {}
+        for root in dirty:
+            sig = signature_of[root] = signature_for(root)
+            groups.setdefault(sig, []).append(root)
+
+        moved: List[str] = []
+        for sig, roots in groups.items():
+            settled = root_by_signature.get(sig)
+            if settled is not None:
+                roots.append(settled)
+            canon = min(roots)
+            for other in roots:
+                if other == canon:
+                    continue
+                # deterministic: attach larger to smaller
+                parents[other] = canon
+                del signature_of[other]
+                other_members = members.pop(other)
+                moved.extend(other_members)
+                members[canon].extend(other_members)
+            root_by_signature[sig] = canon
+
+        dirty = {find(dep) for node in moved for dep in dependants.get(node, ())}
+
+    # Emit mapping for subjects that change
+    out: Dict[str, str] = {}
+    for s in subjects:
+        r = find(s)
+        if r != s:
+            out[s] = r
+    return out
@@ -0,0 +1,187 @@
+"""
+Batched, memoized fuzzy lookups for the grounding runtime.
+
+`grounding_agent` used to await one `fuzzy_lookup_<Class>(label)` MCP call at a
+time for every label x class of every candidate, and looked up the same label
+again for every TTL that mentioned it. This module:
+
+- deduplicates lookups on (class, normalized label) across a whole batch. The
+  normalized label only collapses whitespace: chemical labels are case-sensitive
+  (CO/Co, NO/No, HF/Hf), so labels differing in case are different lookups;
+- fans the remaining lookups out concurrently over one open MCP session,
+  bounded by a semaphore;
+- memoizes the rows in a JSON file per label-index version, so re-grounding a
+  batch after adding a few papers only queries labels that were never seen.
+
+The label-index version is a hash over the Script C module and the label cache
+files the MCP server is configured with (`--script-c`, `--labels-dir` in
+`configs/grounding.json`). Rebuilding the label cache therefore starts a new
+cache file instead of serving stale rows.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+DEFAULT_CACHE_ROOT = Path("data/grounding_cache")
+DEFAULT_CONCURRENCY = 8
+# Part of the label-index version; bumped when the rows stored for a key change meaning
+LOOKUP_FORMAT = 3
+
+# (class local name, normalized label)
+LookupKey = Tuple[str, str]
+
+
+def normalize_label(label: str) -> str:
+    """Label with whitespace collapsed, case kept ("CO" and "Co" are different species)."""
+    return " ".join(str(label).split())
+
+
+def _server_arg(args: Sequence[str], flag: str) -> Optional[str]:
+    args = list(args)
+    for i, a in enumerate(args):
+        if a == flag and i + 1 < len(args):
+            return str(args[i + 1])
+        if a.startswith(flag + "="):
+            return a.split("=", 1)[1]
+    return None
+
+
+def label_index_version(server_cfg: Dict[str, Any]) -> Optional[str]:
+    """
+    Content stamp of the label index behind an MCP server config entry.
+
+    Hashes path, size and mtime of the Script C file and of every file under the
+    labels directory. Returns None when the config does not name a labels
+    directory or it does not exist (the lookups are then not persisted).
+    """
+    args = server_cfg.get("args", []) or []
+    labels_dir = _server_arg(args, "--labels-dir")
+    if not labels_dir or not Path(labels_dir).is_dir():
+        return None
+
+    h = hashlib.sha256(f"lookup-format-{LOOKUP_FORMAT}\n".encode("utf-8"))
+    files: List[Path] = sorted(p for p in Path(labels_dir).rglob("*") if p.is_file())
+    script_c = _server_arg(args, "--script-c")
+    if script_c and Path(script_c).is_file():
+        files.append(Path(script_c))
+    for p in files:
+        st = p.stat()
+        h.update(f"{p.as_posix()}\0{st.st_size}\0{st.st_mtime_ns}\n".encode("utf-8"))
+    return h.hexdigest()[:16]
+
+
+class LookupCache:
+    """
+    On-disk memo of fuzzy lookup rows for one label-index version.
+
+    Entries are keyed by class, normalized label, limit and cutoff. Nothing is
+    written until `save()`.
+    """
+
+    def __init__(self, path: Optional[Path], version: Optional[str] = None):
+        self.path = Path(path) if path else None
+        self.version = version
+        self._rows: Dict[str, List[Dict[str, Any]]] = {}
+        self._dirty = False
+        self.hits = 0
+        self.misses = 0
+        self._load()
+
+    @classmethod
+    def for_server(
+        cls, server_cfg: Dict[str, Any], server_key: str, cache_root: Path = DEFAULT_CACHE_ROOT
+    ) -> "LookupCache":
+        """Cache file `<cache_root>/<server_key>/lookups/<version>.json`; in-memory only without a version."""
+        version = label_index_version(server_cfg)
+        if version is None:
+            return cls(None)
+        return cls(Path(cache_root) / server_key / "lookups" / f"{version}.json", version)
+
+    @staticmethod
+    def _key(cls_name: str, label: str, limit: int, cutoff: float) -> str:
+        return json.dumps([cls_name, label, int(limit), float(cutoff)], ensure_ascii=False)
+
+    def _load(self) -> None:
+        if self.path is None or not self.path.exists():
+            return
+        try:
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        if isinstance(data, dict) and data.get("version") == self.version:
+            self._rows = dict(data.get("rows") or {})
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def get(self, cls_name: str, label: str, limit: int, cutoff: float) -> Optional[List[Dict[str, Any]]]:
+        rows = self._rows.get(self._key(cls_name, label, limit, cutoff))
+        if rows is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return rows
+
+    def put(self, cls_name: str, label: str, limit: int, cutoff: float, rows: List[Dict[str, Any]]) -> None:
+        self._rows[self._key(cls_name, label, limit, cutoff)] = list(rows)
+        self._dirty = True
+
+    def save(self) -> None:
+        """Write the cache atomically if it changed and has a file."""
+        if self.path is None or not self._dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        tmp.write_text(
+            json.dumps({"version": self.version, "rows": self._rows}, sort_keys=True, ensure_ascii=False),
+            encoding="utf-8",
+        )
+        os.replace(tmp, self.path)
+        self._dirty = False
+
+
+async def fetch_lookups(
+    client: Any,
+    keys: Iterable[LookupKey],
+    *,
+    limit: int = 10,
+    cutoff: float = 0.6,
+    cache: Optional[LookupCache] = None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    known: Optional[Dict[LookupKey, List[Dict[str, Any]]]] = None,
+) -> Dict[LookupKey, List[Dict[str, Any]]]:
+    """
+    Rows for each distinct (class, normalized label) key.
+
+    Keys already in `known` or `cache` are not queried; the rest are awaited
+    concurrently via `client.fuzzy_lookup`, at most `concurrency` at a time.
+    New rows are added to `known` (returned) and `cache`.
+    """
+    out: Dict[LookupKey, List[Dict[str, Any]]] = known if known is not None else {}
+    todo: List[LookupKey] = []
+    for key in sorted(set(keys)):
+        if key in out:
+            continue
+        rows = cache.get(key[0], key[1], limit, cutoff) if cache is not None else None
+        if rows is not None:
+            out[key] = rows
+        else:
+            todo.append(key)
+
+    sem = asyncio.Semaphore(max(1, int(concurrency)))
+
+    async def _one(key: LookupKey) -> None:
+        async with sem:
+            rows = await client.fuzzy_lookup(key[0], key[1], limit=limit, cutoff=cutoff)
+        out[key] = list(rows or [])
+        if cache is not None:
+            cache.put(key[0], key[1], limit, cutoff, out[key])
+
+    await asyncio.gather(*(_one(k) for k in todo))
+    return out
@@ -1,6 +1,9 @@
 #!/usr/bin/env python3
 """
 Chemical fuzzy search functionality for OntoMOP entities based on molecular formula and weight matching.
+
+Candidates are scored over a precomputed composition index (composition_index.py),
+built once from the KG labels and rebuilt only when the extraction files change.
 """
 
 import json
@@ -9,6 +12,9 @@ from pathlib import Path
 from typing import List, Dict, Any, Optional
 from collections import Counter
 
+from src.mcp_servers.sparql.composition_index import CompositionIndex, get_composition_index
+from src.mcp_servers.sparql.label_index import FORMULAS_FILE, IDENTIFIERS_FILE, LABELS_FILE, load_json_cached
+
 # ---- atomic weights (avg) ----
 ATOMIC_WEIGHTS = {
     "H": 1.00794, "C": 12.0107, "N": 14.0067, "O": 15.9994, "F": 18.9984032, "P": 30.973762,
@@ -201,58 +207,55 @@ def load_kg_labels_from_json() -> List[Dict[str, Any]]:
     
     try:
         # Load formulas - these are always chemical formulas so include all
-        formula_file = Path("data/ontomop_extraction/all_formulas.json")
+        formula_file = FORMULAS_FILE
         if formula_file.exists():
-            with open(formula_file, 'r', encoding='utf-8') as f:
-                formula_data = json.load(f)
-                for item in formula_data:
-                    formula = item.get('formula', '').strip()
-                    if formula:  # Only include non-empty formulas
+            formula_data = load_json_cached(formula_file)
+            for item in formula_data:
+                formula = item.get('formula', '').strip()
+                if formula:  # Only include non-empty formulas
+                    kg_entities.append({
+                        "label": formula,
+                        "subject": item.get('subject', ''),
+                        "subjectType": item.get('subjectType', ''),
+                        "formulaType": item.get('formulaType', ''),
+                        "data_type": "formula"
+                    })
+        
+        # Load labels - filter to those that look like chemical formulas
+        labels_file = LABELS_FILE
+        if labels_file.exists():
+            labels_data = load_json_cached(labels_file)
+            for item in labels_data:
+                label = item.get('label', '').strip()
+                # Include labels that contain chemical formula indicators
+                # Look for brackets, parentheses, and common chemical elements
+                if label and any(char in label for char in ['[', ']', '(', ')', 'C', 'H', 'N', 'O', 'S', 'P']):
+                    # Additional filtering to avoid non-chemical labels
+                    if not any(word in label.lower() for word in ['unit', 'per', 'gram', 'mole', 'charge', 'angstrom']):
                         kg_entities.append({
-                            "label": formula,
+                            "label": label,
                             "subject": item.get('subject', ''),
                             "subjectType": item.get('subjectType', ''),
-                            "formulaType": item.get('formulaType', ''),
-                            "data_type": "formula"
+                            "data_type": "label"
                         })
         
-        # Load labels - filter to those that look like chemical formulas
-        labels_file = Path("data/ontomop_extraction/all_labels.json")
-        if labels_file.exists():
-            with open(labels_file, 'r', encoding='utf-8') as f:
-                labels_data = json.load(f)
-                for item in labels_data:
-                    label = item.get('label', '').strip()
-                    # Include labels that contain chemical formula indicators
-                    # Look for brackets, parentheses, and common chemical elements
-                    if label and any(char in label for char in ['[', ']', '(', ')', 'C', 'H', 'N', 'O', 'S', 'P']):
-                        # Additional filtering to avoid non-chemical labels
-                        if not any(word in label.lower() for word in ['unit', 'per', 'gram', 'mole', 'charge', 'angstrom']):
-                            kg_entities.append({
-                                "label": label,
-                                "subject": item.get('subject', ''),
-                                "subjectType": item.get('subjectType', ''),
-                                "data_type": "label"
-                            })
-        
         # Load identifiers - filter to those that might contain chemical formulas
-        identifiers_file = Path("data/ontomop_extraction/all_identifiers.json")
+        identifiers_file = IDENTIFIERS_FILE
         if identifiers_file.exists():
-            with open(identifiers_file, 'r', encoding='utf-8') as f:
-                identifiers_data = json.load(f)
-                for item in identifiers_data:
-                    identifier = item.get('identifier', '').strip()
-                    # Include identifiers that look like they contain chemical formulas
-                    # Be more selective here since most identifiers are likely not chemical formulas
-                    if identifier and any(char in identifier for char in ['[', ']', '(', ')']):
-                        # Also require at least one common element
-                        if any(elem in identifier for elem in ['C', 'H', 'N', 'O', 'Cu', 'Fe', 'Ni']):
-                            kg_entities.append({
-                                "label": identifier,
-                                "subject": item.get('subject', ''),
-                                "subjectType": item.get('subjectType', ''),
-                                "data_type": "identifier"
-                            })
+            identifiers_data = load_json_cached(identifiers_file)
+            for item in identifiers_data:
+                identifier = item.get('identifier', '').strip()
+                # Include identifiers that look like they contain chemical formulas
+                # Be more selective here since most identifiers are likely not chemical formulas
+                if identifier and any(char in identifier for char in ['[', ']', '(', ')']):
+                    # Also require at least one common element
+                    if any(elem in identifier for elem in ['C', 'H', 'N', 'O', 'Cu', 'Fe', 'Ni']):
+                        kg_entities.append({
+                            "label": identifier,
+                            "subject": item.get('subject', ''),
+                            "subjectType": item.get('subjectType', ''),
+                            "data_type": "identifier"
+                        })
                         
     except FileNotFoundError as e:
         print(f"Data file not found: {e}")
@@ -264,6 +267,19 @@ def load_kg_labels_from_json() -> List[Dict[str, Any]]:
     return kg_entities
 
 
+def get_kg_composition_index() -> CompositionIndex:
+    """Composition index over load_kg_labels_from_json(), rebuilt when an extraction file changes."""
+    def _build(stamps):
+        return CompositionIndex.build(
+            load_kg_labels_from_json(),
+            parse_kg_label_atoms,
+            hill_string,
+            ATOMIC_WEIGHTS,
+            sources=stamps,
+        )
+    return get_composition_index([FORMULAS_FILE, LABELS_FILE, IDENTIFIERS_FILE], _build)
+
+
 def chemical_fuzzy_search(
     target_name: str,
     target_formula: str,
@@ -291,64 +307,30 @@ def chemical_fuzzy_search(
         List[Dict]: Sorted list of matching entities with scores and metadata
     """
     try:
-        # Define target derived properties
-        target_derived = {
-            "name": target_name,
-            "formula": target_formula,
-            "mol_weight": target_mol_weight,
-            "smiles": target_smiles or "",
-            "inchi": target_inchi or "",
-            "inchikey": target_inchikey or ""
-        }
+        index = get_kg_composition_index()
         
-        # Load KG labels from JSON files
-        kg_entities = load_kg_labels_from_json()
-        
-        if not kg_entities:
+        if not len(index):
             return []
         
-        # Score each candidate
+        # Vectorized score_candidate over all indexed entities (or only the
+        # exact-formula rows when strict), sorted by score then weight error
         results = []
-        for entity in kg_entities:
-            label = entity.get('label', '')
-            if not label:
-                continue
-                
-            try:
-                # Parse atomic composition from label
-                atoms = parse_kg_label_atoms(label)
-                if not atoms:  # Skip if no atoms found
-                    continue
-                    
-                # Score the candidate
-                score_result = score_candidate(atoms, target_derived)
-                
-                # Apply strict filtering if requested
-                if strict and not score_result.get("formula_match", False):
-                    continue  # Skip results that don't have exact formula match
-                
-                # Create result entry
-                result = {
-                    "kg_label": label,
-                    "subject": entity.get('subject', ''),
-                    "subjectType": entity.get('subjectType', ''),
-                    "data_type": entity.get('data_type', ''),
-                    "atoms": dict(atoms),
-                    **score_result,
-                    "target_name": target_name,
-                    "target_formula": target_formula,
-                    "target_mol_weight": target_mol_weight
-                }
-                results.append(result)
-                
-            except Exception as e:
-                # Skip entities that can't be parsed
-                continue
-        
-        # Sort by score (descending) and molecular weight error (ascending)
-        results.sort(key=lambda r: (-r["score"], r["mw_rel_err"]))
+        for scored in index.top(target_formula, target_mol_weight, limit=limit, strict=strict):
+            row = scored.pop("row")
+            entity = index.entities[row]
+            results.append({
+                "kg_label": entity.get('label', ''),
+                "subject": entity.get('subject', ''),
+                "subjectType": entity.get('subjectType', ''),
+                "data_type": entity.get('data_type', ''),
+                "atoms": index.atoms(row),
+                **scored,
+                "target_name": target_name,
+                "target_formula": target_formula,
+                "target_mol_weight": target_mol_weight
+            })
         
-        return results[:limit]
+        return results
         
     except Exception as e:
         print(f"Error in chemical fuzzy search: {e}")
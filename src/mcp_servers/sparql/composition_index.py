@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+"""
+Precomputed element-composition index for chemical_fuzzy_search.
+
+Parsing every KG label and scoring it in Python on each query made
+chemical_fuzzy_search linear in the number of labels, with a large constant.
+The index is built once from the candidate entities (see
+`load_kg_labels_from_json`):
+
+- `counts.npy`: dense int32 matrix, one row per parsable KG entity, one column
+  per element;
+- `mol_weights.npy`: molecular weight per row (counts @ atomic weights);
+- `meta.json`: element columns, Hill formula and metadata per row, and the
+  mtime/size of the source JSON files.
+
+The files are persisted under `data/ontomop_extraction/composition_index/` and
+memory-mapped on load; the index is rebuilt when a source file changes. Each save
+writes a fresh `build-*` directory and publishes it by atomically replacing the
+`CURRENT` file, which names the build, so a rebuild never overwrites arrays that
+another process has mapped, nor pairs the meta of one build with the arrays of
+another. The previous build is kept for readers that still map it. Queries
+look up exact Hill formulas in a hash map and compute molecular-weight errors
+and scores over the whole mw array at once.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+INDEX_DIR = Path("data/ontomop_extraction/composition_index")
+COUNTS_FILE = "counts.npy"
+MW_FILE = "mol_weights.npy"
+META_FILE = "meta.json"
+CURRENT_FILE = "CURRENT"
+BUILD_PREFIX = "build-"
+INDEX_VERSION = 1
+
+# Relative molecular-weight error thresholds -> score, as in score_candidate
+MW_SCORE_THRESHOLDS = [(0.003, 4), (0.007, 3), (0.015, 2), (0.03, 1)]
+FORMULA_SCORE = 6
+
+
+class CompositionIndex:
+    """Atom-count matrix, molecular weights and formula lookup for KG entities."""
+
+    def __init__(self, counts: np.ndarray, mol_weights: np.ndarray, meta: Dict[str, Any]):
+        self.counts = counts
+        self.mol_weights = mol_weights
+        self.elements: List[str] = meta["elements"]
+        self.formulas: List[str] = meta["formulas"]
+        self.entities: List[Dict[str, Any]] = meta["entities"]
+        self.sources: Dict[str, List[int]] = meta.get("sources", {})
+        self.by_formula: Dict[str, List[int]] = {}
+        for row, formula in enumerate(self.formulas):
+            self.by_formula.setdefault(formula, []).append(row)
+
+    def __len__(self) -> int:
+        return len(self.formulas)
+
+    @classmethod
+    def build(
+        cls,
+        kg_entities: List[Dict[str, Any]],
+        parse_atoms: Callable[[str], Counter],
+        hill: Callable[[Counter], str],
+        atomic_weights: Dict[str, float],
+        sources: Optional[Dict[str, List[int]]] = None,
+    ) -> "CompositionIndex":
+        """Parse each entity label once; entities without atoms are left out."""
+        rows: List[Counter] = []
+        entities: List[Dict[str, Any]] = []
+        for entity in kg_entities:
+            label = entity.get('label', '')
+            if not label:
+                continue
+            try:
+                atoms = parse_atoms(label)
+            except Exception:
+                continue
+            if not atoms:
+                continue
+            rows.append(atoms)
+            entities.append({k: entity.get(k, '') for k in ("label", "subject", "subjectType", "data_type")})
+
+        elements = sorted({el for atoms in rows for el in atoms})
+        column = {el: j for j, el in enumerate(elements)}
+        counts = np.zeros((len(rows), len(elements)), dtype=np.int32)
+        for i, atoms in enumerate(rows):
+            for el, n in atoms.items():
+                counts[i, column[el]] = n
+        weights = np.array([atomic_weights.get(el, 0.0) for el in elements], dtype=np.float64)
+        mol_weights = np.round(counts @ weights, 4) if len(elements) else np.zeros(len(rows))
+
+        meta = {
+            "version": INDEX_VERSION,
+            "elements": elements,
+            "formulas": [hill(atoms) for atoms in rows],
+            "entities": entities,
+            "sources": sources or {},
+        }
+        return cls(counts, mol_weights, meta)
+
+    # ── persistence ──
+    def save(self, index_dir: Path = INDEX_DIR) -> None:
+        """Write the arrays and metadata into a new build directory, then publish it."""
+        index_dir = Path(index_dir)
+        index_dir.mkdir(parents=True, exist_ok=True)
+        build_dir = Path(tempfile.mkdtemp(prefix=BUILD_PREFIX, dir=index_dir))
+        np.save(build_dir / COUNTS_FILE, self.counts)
+        np.save(build_dir / MW_FILE, self.mol_weights)
+        meta = {
+            "version": INDEX_VERSION,
+            "elements": self.elements,
+            "formulas": self.formulas,
+            "entities": self.entities,
+            "sources": self.sources,
+        }
+        with open(build_dir / META_FILE, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+
+        previous = _current_build(index_dir)
+        tmp = index_dir / f"{CURRENT_FILE}.{build_dir.name}.tmp"
+        tmp.write_text(build_dir.name, encoding='utf-8')
+        os.replace(tmp, index_dir / CURRENT_FILE)
+        _remove_old_builds(index_dir, keep={build_dir.name, previous})
+
+    @classmethod
+    def load(cls, index_dir: Path = INDEX_DIR) -> Optional["CompositionIndex"]:
+        """Memory-map the published index, or None if it is missing or unreadable."""
+        build = _current_build(Path(index_dir))
+        if build is None:
+            return None
+        index_dir = Path(index_dir) / build
+        try:
+            with open(index_dir / META_FILE, 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+            if meta.get("version") != INDEX_VERSION:
+                return None
+            counts = np.load(index_dir / COUNTS_FILE, mmap_mode="r")
+            mol_weights = np.load(index_dir / MW_FILE, mmap_mode="r")
+        except (OSError, ValueError):
+            return None
+        if len(mol_weights) != len(meta.get("formulas", [])):
+            return None
+        return cls(counts, mol_weights, meta)
+
+    # ── queries ──
+    def atoms(self, row: int) -> Dict[str, int]:
+        """Element -> count for one row."""
+        values = self.counts[row]
+        return {el: int(values[j]) for j, el in enumerate(self.elements) if values[j]}
+
+    def score(self, target_formula: str, target_mol_weight: float, strict: bool = False) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Score rows against a target, as score_candidate does for one entity.
+
+        Returns:
+            (rows, scores, mw_rel_errs, formula_match) for the rows considered, in row order.
+            With `strict`, only rows whose Hill formula equals `target_formula`.
+        """
+        match_rows = self.by_formula.get(target_formula, [])
+        if strict:
+            rows = np.array(match_rows, dtype=np.int64)
+        else:
+            rows = np.arange(len(self.formulas), dtype=np.int64)
+
+        mw = np.asarray(self.mol_weights)[rows]
+        if target_mol_weight:
+            rel_err = np.abs(mw - target_mol_weight) / target_mol_weight
+        else:
+            rel_err = np.ones(len(rows))
+
+        if strict:
+            formula_match = np.ones(len(rows), dtype=bool)
+        else:
+            formula_match = np.zeros(len(rows), dtype=bool)
+            formula_match[match_rows] = True
+        conditions = [rel_err <= limit for limit, _ in MW_SCORE_THRESHOLDS]
+        mw_score = np.select(conditions, [s for _, s in MW_SCORE_THRESHOLDS], default=0)
+        scores = FORMULA_SCORE * formula_match + mw_score
+        return rows, scores, rel_err, formula_match
+
+    def top(self, target_formula: str, target_mol_weight: float, limit: int = 10, strict: bool = False) -> List[Dict[str, Any]]:
+        """Best `limit` rows by score (desc) then relative mw error (asc), ties in row order."""
+        rows, scores, rel_err, formula_match = self.score(target_formula, target_mol_weight, strict)
+        if not len(rows):
+            return []
+        rounded_err = np.round(rel_err, 6)
+        order = np.lexsort((rounded_err, -scores))[:limit]
+
+        results = []
+        for k in order:
+            row = int(rows[k])
+            mw_score = int(scores[k]) - (FORMULA_SCORE if formula_match[k] else 0)
+            results.append({
+                "row": row,
+                "kg_formula": self.formulas[row],
+                "kg_mw": float(self.mol_weights[row]),
+                "formula_match": bool(formula_match[k]),
+                "mw_rel_err": float(rounded_err[k]),
+                "score": int(scores[k]),
+                "formula_score": FORMULA_SCORE if formula_match[k] else 0,
+                "mw_score": mw_score,
+            })
+        return results
+
+
+def _current_build(index_dir: Path) -> Optional[str]:
+    """Name of the published build directory, or None."""
+    try:
+        name = (Path(index_dir) / CURRENT_FILE).read_text(encoding='utf-8').strip()
+    except OSError:
+        return None
+    return name or None
+
+
+def _remove_old_builds(index_dir: Path, keep: set) -> None:
+    """Best effort: a build still mapped by another process may not be removable (Windows)."""
+    for path in Path(index_dir).iterdir():
+        if path.is_dir() and path.name.startswith(BUILD_PREFIX) and path.name not in keep:
+            shutil.rmtree(path, ignore_errors=True)
+        elif path.is_file() and path.name in (COUNTS_FILE, MW_FILE, META_FILE):
+            # Files of the single-directory layout written by earlier versions
+            path.unlink()
+
+
+# ── process-wide index ──
+_lock = threading.Lock()
+_index: Optional[CompositionIndex] = None
+
+
+def source_stamps(paths: List[Path]) -> Dict[str, List[int]]:
+    """mtime_ns and size of each existing source file."""
+    stamps = {}
+    for path in paths:
+        path = Path(path)
+        if path.exists():
+            st = path.stat()
+            stamps[str(path)] = [st.st_mtime_ns, st.st_size]
+    return stamps
+
+
+def get_composition_index(
+    sources: List[Path],
+    build: Callable[[Dict[str, List[int]]], CompositionIndex],
+    index_dir: Path = INDEX_DIR,
+) -> CompositionIndex:
+    """
+    The index for `sources`: kept in memory, else memory-mapped from `index_dir`,
+    else built with `build(stamps)` and persisted. Any source change triggers a rebuild.
+    """
+    global _index
+    stamps = source_stamps(sources)
+    with _lock:
+        if _index is not None and _index.sources == stamps:
+            return _index
+        index = CompositionIndex.load(index_dir)
+        if index is None or index.sources != stamps:
+            index = build(stamps)
+            try:
+                index.save(index_dir)
+            except OSError as e:
+                print(f"Could not persist composition index: {e}")
+        _index = index
+        return index
+
+
+def clear_composition_index() -> None:
+    """Drop the in-memory index (the persisted copy is kept)."""
+    global _index
+    with _lock:
+        _index = None
@@ -1,22 +1,34 @@
 #!/usr/bin/env python3
 """
 Fuzzy search functionality for OntoMOP entities.
+
+Formulas are served from the in-memory index in label_index.py, which is only
+rebuilt when all_formulas.json changes.
 """
 
-import json
-from pathlib import Path
-from typing import List, Dict, Any
-from fuzzywuzzy import fuzz, process
+from typing import List, Dict, Any, Optional
+
+from src.mcp_servers.sparql.label_index import FORMULAS_FILE, formula_index, load_json_cached
 
 def load_formula_data() -> List[Dict[str, Any]]:
-    """Load formula data from the extracted JSON file."""
-    formula_file = Path("data/ontomop_extraction/all_formulas.json")
-    
-    if not formula_file.exists():
-        raise FileNotFoundError(f"Formula data file not found: {formula_file}")
-    
-    with open(formula_file, 'r', encoding='utf-8') as f:
-        return json.load(f)
+    """Load formula data from the extracted JSON file (cached until the file changes)."""
+    if not FORMULAS_FILE.exists():
+        raise FileNotFoundError(f"Formula data file not found: {FORMULAS_FILE}")
+    return load_json_cached(FORMULAS_FILE)
+
+def _fuzzy_search(search_string: str, limit: int, scorer: str, match_type: Optional[str]) -> List[Dict[str, Any]]:
+    """Score formulas against `search_string` using the cached formula index."""
+    index = formula_index()
+    results = []
+    for formula, score in index.fuzzy(search_string, scorer=scorer, limit=limit):
+        # Last entity wins for duplicate formulas, as with the previous dict mapping
+        entity = index.by_value[formula][-1].copy()
+        entity['similarity_score'] = score
+        entity['matched_formula'] = formula
+        if match_type:
+            entity['match_type'] = match_type
+        results.append(entity)
+    return results
 
 def entity_fuzzy_search(search_string: str, limit: int = 5) -> List[Dict[str, Any]]:
     """
@@ -30,45 +42,8 @@ def entity_fuzzy_search(search_string: str, limit: int = 5) -> List[Dict[str, An
         List[Dict[str, Any]]: List of matching entities with similarity scores
     """
     try:
-        # Load formula data
-        formula_data = load_formula_data()
-        
-        if not formula_data:
-            return []
-        
-        # Extract formulas and create a mapping
-        formula_texts = []
-        formula_mapping = {}
-        
-        for item in formula_data:
-            formula = item.get('formula', '')
-            if formula:
-                formula_texts.append(formula)
-                formula_mapping[formula] = item
-        
-        if not formula_texts:
-            return []
-        
-        # Perform fuzzy matching using process.extract
         # Using fuzz.ratio for exact character matching
-        matches = process.extract(
-            search_string, 
-            formula_texts, 
-            scorer=fuzz.ratio,
-            limit=limit
-        )
-        
-        # Convert matches to result format
-        results = []
-        for formula, score in matches:
-            if formula in formula_mapping:
-                entity = formula_mapping[formula].copy()
-                entity['similarity_score'] = score
-                entity['matched_formula'] = formula
-                results.append(entity)
-        
-        return results
-        
+        return _fuzzy_search(search_string, limit, "ratio", None)
     except Exception as e:
         print(f"Error in fuzzy search: {e}")
         return []
@@ -85,45 +60,7 @@ def entity_fuzzy_search_partial(search_string: str, limit: int = 5) -> List[Dict
         List[Dict[str, Any]]: List of matching entities with similarity scores
     """
     try:
-        # Load formula data
-        formula_data = load_formula_data()
-        
-        if not formula_data:
-            return []
-        
-        # Extract formulas and create a mapping
-        formula_texts = []
-        formula_mapping = {}
-        
-        for item in formula_data:
-            formula = item.get('formula', '')
-            if formula:
-                formula_texts.append(formula)
-                formula_mapping[formula] = item
-        
-        if not formula_texts:
-            return []
-        
-        # Perform fuzzy matching using partial ratio
-        matches = process.extract(
-            search_string, 
-            formula_texts, 
-            scorer=fuzz.partial_ratio,
-            limit=limit
-        )
-        
-        # Convert matches to result format
-        results = []
-        for formula, score in matches:
-            if formula in formula_mapping:
-                entity = formula_mapping[formula].copy()
-                entity['similarity_score'] = score
-                entity['matched_formula'] = formula
-                entity['match_type'] = 'partial'
-                results.append(entity)
-        
-        return results
-        
+        return _fuzzy_search(search_string, limit, "partial_ratio", "partial")
     except Exception as e:
         print(f"Error in partial fuzzy search: {e}")
         return []
@@ -140,45 +77,7 @@ def entity_fuzzy_search_token_sort(search_string: str, limit: int = 5) -> List[D
         List[Dict[str, Any]]: List of matching entities with similarity scores
     """
     try:
-        # Load formula data
-        formula_data = load_formula_data()
-        
-        if not formula_data:
-            return []
-        
-        # Extract formulas and create a mapping
-        formula_texts = []
-        formula_mapping = {}
-        
-        for item in formula_data:
-            formula = item.get('formula', '')
-            if formula:
-                formula_texts.append(formula)
-                formula_mapping[formula] = item
-        
-        if not formula_texts:
-            return []
-        
-        # Perform fuzzy matching using token sort ratio
-        matches = process.extract(
-            search_string, 
-            formula_texts, 
-            scorer=fuzz.token_sort_ratio,
-            limit=limit
-        )
-        
-        # Convert matches to result format
-        results = []
-        for formula, score in matches:
-            if formula in formula_mapping:
-                entity = formula_mapping[formula].copy()
-                entity['similarity_score'] = score
-                entity['matched_formula'] = formula
-                entity['match_type'] = 'token_sort'
-                results.append(entity)
-        
-        return results
-        
+        return _fuzzy_search(search_string, limit, "token_sort_ratio", "token_sort")
     except Exception as e:
         print(f"Error in token sort fuzzy search: {e}")
         return []
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+In-memory label index for the OntoMOP extraction files.
+
+The fuzzy search and label lookup tools used to re-open and `json.load` the
+`data/ontomop_extraction/*.json` files on every call and score the whole list.
+Here each file is loaded once per server process and reloaded when its mtime or
+size changes. Every indexed field gets:
+
+- hash maps from the raw and the normalized value to its entries (exact lookups
+  do not depend on the file size);
+- a trigram inverted index over the normalized values, used to prune candidates
+  for substring and fuzzy queries before any string is scored;
+- batch scoring of the remaining candidates with rapidfuzz (falls back to
+  fuzzywuzzy when rapidfuzz is not installed).
+
+Normalization matches fuzzywuzzy's default processor (non-alphanumerics to
+spaces, lowercased, stripped), so scores are the same as the previous full scan
+whenever the best matches survive pruning; small indexes are always scored in full.
+"""
+
+import json
+import os
+import re
+import threading
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+try:
+    from rapidfuzz import fuzz as _fuzz, process as _process
+    from rapidfuzz.utils import default_process as _default_process
+    _RAPIDFUZZ = True
+except ImportError:  # pragma: no cover
+    _RAPIDFUZZ = False
+    try:
+        from fuzzywuzzy import fuzz as _fuzz, process as _process  # type: ignore
+    except ImportError:
+        _fuzz = _process = None  # type: ignore
+
+EXTRACTION_DIR = Path("data/ontomop_extraction")
+FORMULAS_FILE = EXTRACTION_DIR / "all_formulas.json"
+LABELS_FILE = EXTRACTION_DIR / "all_labels.json"
+IDENTIFIERS_FILE = EXTRACTION_DIR / "all_identifiers.json"
+COMPLETE_INDEX_FILE = EXTRACTION_DIR / "complete_label_index.json"
+
+# Indexes up to this many distinct values are scored in full (no pruning)
+FULL_SCAN_LIMIT = 1000
+# Otherwise at least this many candidates (or 20 x limit) are scored
+MIN_CANDIDATES = 200
+
+_NON_ALNUM = re.compile(r"(?ui)\W")
+
+
+def normalize(text: str) -> str:
+    """fuzzywuzzy's full_process: non-alphanumerics to spaces, lowercase, strip."""
+    return _NON_ALNUM.sub(" ", text or "").lower().strip()
+
+
+def trigrams(text: str) -> set:
+    """Trigrams of an already normalized string, padded so short strings still index."""
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class LabelIndex:
+    """Lookup structures over one text field of a list of entity dicts."""
+
+    def __init__(self, entries: List[Dict[str, Any]], field: str):
+        self.field = field
+        self.entries = entries
+        self.by_value: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self.by_normalized: Dict[str, List[str]] = defaultdict(list)
+        for item in entries:
+            value = item.get(field, '')
+            if value and isinstance(value, str):
+                self.by_value[value].append(item)
+
+        # One slot per distinct value, in first-seen order (the previous scan order)
+        self.values: List[str] = list(self.by_value)
+        self.normalized: List[str] = [normalize(v) for v in self.values]
+        self.lowered: List[str] = [v.lower() for v in self.values]
+        self.grams: Dict[str, List[int]] = defaultdict(list)
+        for i, (value, norm) in enumerate(zip(self.values, self.normalized)):
+            self.by_normalized[norm].append(value)
+            for gram in trigrams(norm):
+                self.grams[gram].append(i)
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    # ── exact ──
+    def exact(self, term: str) -> List[Dict[str, Any]]:
+        """Entries whose field equals `term`."""
+        return list(self.by_value.get(term, []))
+
+    def normalized_exact(self, term: str) -> List[Dict[str, Any]]:
+        """Entries whose normalized field equals the normalized `term`."""
+        out: List[Dict[str, Any]] = []
+        for value in self.by_normalized.get(normalize(term), []):
+            out.extend(self.by_value[value])
+        return out
+
+    # ── substring ──
+    def contains(self, term: str) -> List[Dict[str, Any]]:
+        """Entries whose field contains `term`, case-insensitively, grouped by value in file order."""
+        needle = (term or "").lower()
+        norm = normalize(term)
+        if len(norm) >= 3 and norm == needle:
+            # Every trigram of the needle must occur in a matching value
+            candidates = self._shared_grams(norm, require_all=True)
+            slots = sorted(candidates)
+        else:
+            slots = range(len(self.values))
+        out: List[Dict[str, Any]] = []
+        for i in slots:
+            if needle in self.lowered[i]:
+                out.extend(self.by_value[self.values[i]])
+        return out
+
+    # ── fuzzy ──
+    def _shared_grams(self, norm: str, require_all: bool = False) -> Dict[int, int]:
+        """
+        Slot -> number of query trigrams it shares. With `require_all`, only slots
+        containing every unpadded trigram of `norm` (possible substring matches).
+        """
+        if require_all:
+            query = {norm[i:i + 3] for i in range(len(norm) - 2)}
+        else:
+            query = trigrams(norm)
+        counts: Dict[int, int] = defaultdict(int)
+        for gram in query:
+            for i in self.grams.get(gram, ()):
+                counts[i] += 1
+        if require_all:
+            return {i: c for i, c in counts.items() if c == len(query)}
+        return counts
+
+    def candidates(self, term: str, limit: int) -> List[int]:
+        """Slots worth scoring for `term`: all of them for small indexes, else the best trigram overlaps."""
+        if len(self.values) <= FULL_SCAN_LIMIT:
+            return list(range(len(self.values)))
+        counts = self._shared_grams(normalize(term))
+        keep = max(MIN_CANDIDATES, 20 * limit)
+        ranked = sorted(counts, key=lambda i: (-counts[i], i))[:keep]
+        return sorted(ranked)
+
+    def fuzzy(self, term: str, scorer: str = "ratio", limit: int = 5) -> List[Tuple[str, int]]:
+        """(value, score) pairs for the best `limit` matches, scores 0-100."""
+        if _process is None:
+            raise ImportError("rapidfuzz or fuzzywuzzy is required for fuzzy label search")
+        slots = self.candidates(term, limit)
+        if not slots:
+            return []
+        choices = [self.values[i] for i in slots]
+        scorer_fn: Callable = getattr(_fuzz, scorer)
+        if _RAPIDFUZZ:
+            matches = _process.extract(term, choices, scorer=scorer_fn, processor=_default_process, limit=limit)
+            return [(value, int(round(score))) for value, score, _ in matches]
+        return list(_process.extract(term, choices, scorer=scorer_fn, limit=limit))
+
+
+# ── file-backed caches ──
+_lock = threading.Lock()
+_json_cache: Dict[str, Tuple[Tuple[int, int], Any]] = {}
+_index_cache: Dict[Tuple[str, str], Tuple[Tuple[int, int], LabelIndex]] = {}
+
+
+def _stamp(path: Path) -> Tuple[int, int]:
+    st = os.stat(path)
+    return st.st_mtime_ns, st.st_size
+
+
+def load_json_cached(path: Path) -> Any:
+    """
+    Parsed content of a JSON file, re-read only when its mtime or size changes.
+
+    The returned object is shared between calls; callers must copy before mutating.
+
+    Raises:
+        FileNotFoundError: If the file does not exist
+    """
+    path = Path(path)
+    stamp = _stamp(path)
+    key = str(path.resolve())
+    with _lock:
+        cached = _json_cache.get(key)
+        if cached and cached[0] == stamp:
+            return cached[1]
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    with _lock:
+        _json_cache[key] = (stamp, data)
+    return data
+
+
+def get_index(path: Path, field: str, entries_key: Optional[str] = None) -> LabelIndex:
+    """
+    Index over `field` of the entries in a JSON file, rebuilt when the file changes.
+
+    Args:
+        path: JSON file holding a list of entries (or a dict, see `entries_key`)
+        field: Entry field to index (e.g. 'formula', 'label', 'identifier')
+        entries_key: Key of the entry list when the file holds a dict
+
+    Raises:
+        FileNotFoundError: If the file does not exist
+    """
+    path = Path(path)
+    stamp = _stamp(path)
+    key = (str(path.resolve()), f"{entries_key}:{field}")
+    with _lock:
+        cached = _index_cache.get(key)
+        if cached and cached[0] == stamp:
+            return cached[1]
+    data = load_json_cached(path)
+    entries = data.get(entries_key, []) if entries_key else data
+    index = LabelIndex(entries or [], field)
+    with _lock:
+        _index_cache[key] = (stamp, index)
+    return index
+
+
+def formula_index() -> LabelIndex:
+    """Index over `data/ontomop_extraction/all_formulas.json`."""
+    if not FORMULAS_FILE.exists():
+        raise FileNotFoundError(f"Formula data file not found: {FORMULAS_FILE}")
+    return get_index(FORMULAS_FILE, 'formula')
+
+
+def clear_caches() -> None:
+    """Drop all loaded files and indexes."""
+    with _lock:
+        _json_cache.clear()
+        _index_cache.clear()
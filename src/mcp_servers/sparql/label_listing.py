@@ -4,20 +4,25 @@ Label listing functionality for OntoMOP entities.
 Provides exact label matching and listing capabilities.
 """
 
-import json
-from pathlib import Path
 from typing import List, Dict, Any, Optional
 
+from src.mcp_servers.sparql.label_index import (
+    COMPLETE_INDEX_FILE,
+    FORMULAS_FILE,
+    LabelIndex,
+    get_index,
+    load_json_cached,
+)
+
 def load_complete_label_data() -> Dict[str, Any]:
-    """Load complete label index from the extracted JSON file."""
-    index_file = Path("data/ontomop_extraction/complete_label_index.json")
+    """Load complete label index from the extracted JSON file (cached until the file changes)."""
+    index_file = COMPLETE_INDEX_FILE
     
     if not index_file.exists():
         # Fallback to old formula data
-        formula_file = Path("data/ontomop_extraction/all_formulas.json")
+        formula_file = FORMULAS_FILE
         if formula_file.exists():
-            with open(formula_file, 'r', encoding='utf-8') as f:
-                formula_data = json.load(f)
+            formula_data = load_json_cached(formula_file)
             return {
                 "all_entities": formula_data,
                 "label_to_entity_map": {},
@@ -27,8 +32,15 @@ def load_complete_label_data() -> Dict[str, Any]:
         else:
             raise FileNotFoundError(f"Label data files not found: {index_file} or {formula_file}")
     
-    with open(index_file, 'r', encoding='utf-8') as f:
-        return json.load(f)
+    return load_json_cached(index_file)
+
+def _formula_index() -> LabelIndex:
+    """Formula index over the same entities as load_formula_data()."""
+    if COMPLETE_INDEX_FILE.exists():
+        return get_index(COMPLETE_INDEX_FILE, 'formula', entries_key="all_entities")
+    if FORMULAS_FILE.exists():
+        return get_index(FORMULAS_FILE, 'formula')
+    raise FileNotFoundError(f"Label data files not found: {COMPLETE_INDEX_FILE} or {FORMULAS_FILE}")
 
 def load_formula_data() -> List[Dict[str, Any]]:
     """Load formula data (backward compatibility)."""
@@ -46,23 +58,8 @@ def list_all_labels(limit: Optional[int] = None) -> List[str]:
         List[str]: List of available labels/formulas
     """
     try:
-        formula_data = load_formula_data()
-        
-        if not formula_data:
-            return []
-        
-        # Extract unique formulas
-        labels = []
-        seen = set()
-        
-        for item in formula_data:
-            formula = item.get('formula', '')
-            if formula and formula not in seen:
-                labels.append(formula)
-                seen.add(formula)
-        
-        # Sort labels alphabetically
-        labels.sort()
+        # Unique formulas, sorted alphabetically
+        labels = sorted(_formula_index().values)
         
         # Apply limit if specified
         if limit is not None:
@@ -124,28 +121,20 @@ def get_entity_by_label(label: str, exact_match: bool = True) -> List[Dict[str,
         List[Dict[str, Any]]: List of entities with the specified label
     """
     try:
-        formula_data = load_formula_data()
+        index = _formula_index()
         
-        if not formula_data:
-            return []
+        if exact_match:
+            # Exact match
+            matches, match_type = index.exact(label), 'exact'
+        else:
+            # Case-insensitive partial match
+            matches, match_type = index.contains(label), 'partial'
         
         matching_entities = []
-        
-        for item in formula_data:
-            formula = item.get('formula', '')
-            
-            if exact_match:
-                # Exact match
-                if formula == label:
-                    entity = item.copy()
-                    entity['match_type'] = 'exact'
-                    matching_entities.append(entity)
-            else:
-                # Case-insensitive partial match
-                if label.lower() in formula.lower():
-                    entity = item.copy()
-                    entity['match_type'] = 'partial'
-                    matching_entities.append(entity)
+        for item in matches:
+            entity = item.copy()
+            entity['match_type'] = match_type
+            matching_entities.append(entity)
         
         return matching_entities
         
@@ -8,6 +8,7 @@ from src.mcp_servers.sparql.ontology_sparql_example_rag import list_sparql_examp
 from src.mcp_servers.sparql.chemical_fuzzy_search import chemical_fuzzy_search
 from src.mcp_servers.sparql.fuzzy_search import get_best_fuzzy_matches
 from src.mcp_servers.sparql.label_listing import list_all_labels, get_entity_by_label, get_label_statistics
+from src.mcp_servers.sparql.label_index import FORMULAS_FILE, IDENTIFIERS_FILE, LABELS_FILE, get_index, load_json_cached
 from src.mcp_servers.sparql.ontology_sampling import generate_improved_sampling_report
 from typing import Literal, Optional, List
 
@@ -432,17 +433,13 @@ def list_labels_by_category_tool(
         Dictionary with status and list of labels for the specified category
     """
     try:
-        import json
-        from pathlib import Path
-        
         results = {"labels": [], "formulas": [], "identifiers": []}
         
         if category == "all" or category == "ChemicalBuildingUnit":
             # Load formulas (CBUs have formulas)
-            formula_file = Path("data/ontomop_extraction/all_formulas.json")
+            formula_file = FORMULAS_FILE
             if formula_file.exists():
-                with open(formula_file, 'r', encoding='utf-8') as f:
-                    formula_data = json.load(f)
+                formula_data = load_json_cached(formula_file)
                 cbu_formulas = [item['formula'] for item in formula_data 
                               if item.get('subjectType', '').endswith('ChemicalBuildingUnit')]
                 if category == "ChemicalBuildingUnit":
@@ -452,10 +449,9 @@ def list_labels_by_category_tool(
         
         if category == "all" or category in ["MetalOrganicPolyhedron", "AssemblyModel", "GenericBuildingUnitType", "MetalSite", "OrganicSite"]:
             # Load labels
-            labels_file = Path("data/ontomop_extraction/all_labels.json")
+            labels_file = LABELS_FILE
             if labels_file.exists():
-                with open(labels_file, 'r', encoding='utf-8') as f:
-                    labels_data = json.load(f)
+                labels_data = load_json_cached(labels_file)
                 
                 if category == "all":
                     filtered_labels = [item['label'] for item in labels_data]
@@ -467,10 +463,9 @@ def list_labels_by_category_tool(
         
         if category == "all" or category == "MetalOrganicPolyhedron":
             # Load identifiers (MOPs have CCDC numbers)
-            identifiers_file = Path("data/ontomop_extraction/all_identifiers.json")
+            identifiers_file = IDENTIFIERS_FILE
             if identifiers_file.exists():
-                with open(identifiers_file, 'r', encoding='utf-8') as f:
-                    identifiers_data = json.load(f)
+                identifiers_data = load_json_cached(identifiers_file)
                 mop_identifiers = [item['identifier'] for item in identifiers_data 
                                  if 'MetalOrganicPolyhedron' in item.get('subjectType', '')]
                 if category == "MetalOrganicPolyhedron":
@@ -536,59 +531,21 @@ def get_entity_details_by_label_tool(
         Dictionary with status and comprehensive entity details
     """
     try:
-        import json
-        from pathlib import Path
-        
         results = {
             "label_matches": [],
             "formula_matches": [],
             "identifier_matches": []
         }
         
-        # Search in labels
-        labels_file = Path("data/ontomop_extraction/all_labels.json")
-        if labels_file.exists():
-            with open(labels_file, 'r', encoding='utf-8') as f:
-                labels_data = json.load(f)
-            
-            for item in labels_data:
-                label = item.get('label', '')
-                if exact_match:
-                    if label == search_term:
-                        results["label_matches"].append(item)
-                else:
-                    if search_term.lower() in label.lower():
-                        results["label_matches"].append(item)
-        
-        # Search in formulas  
-        formula_file = Path("data/ontomop_extraction/all_formulas.json")
-        if formula_file.exists():
-            with open(formula_file, 'r', encoding='utf-8') as f:
-                formula_data = json.load(f)
-            
-            for item in formula_data:
-                formula = item.get('formula', '')
-                if exact_match:
-                    if formula == search_term:
-                        results["formula_matches"].append(item)
-                else:
-                    if search_term.lower() in formula.lower():
-                        results["formula_matches"].append(item)
-        
-        # Search in identifiers
-        identifiers_file = Path("data/ontomop_extraction/all_identifiers.json")
-        if identifiers_file.exists():
-            with open(identifiers_file, 'r', encoding='utf-8') as f:
-                identifiers_data = json.load(f)
-            
-            for item in identifiers_data:
-                identifier = item.get('identifier', '')
-                if exact_match:
-                    if identifier == search_term:
-                        results["identifier_matches"].append(item)
-                else:
-                    if search_term.lower() in identifier.lower():
-                        results["identifier_matches"].append(item)
+        # Search labels, formulas and identifiers through their cached indexes
+        for key, data_file, field in (
+            ("label_matches", LABELS_FILE, "label"),
+            ("formula_matches", FORMULAS_FILE, "formula"),
+            ("identifier_matches", IDENTIFIERS_FILE, "identifier"),
+        ):
+            if data_file.exists():
+                index = get_index(data_file, field)
+                results[key] = index.exact(search_term) if exact_match else index.contains(search_term)
         
         # Count total matches
         total_matches = len(results["label_matches"]) + len(results["formula_matches"]) + len(results["identifier_matches"])
@@ -648,8 +605,6 @@ def get_ontomop_statistics_tool() -> Any:
         Dictionary with comprehensive statistics across all data types
     """
     try:
-        import json
-        from pathlib import Path
         from collections import defaultdict
         
         stats = {
@@ -660,10 +615,9 @@ def get_ontomop_statistics_tool() -> Any:
         }
         
         # Analyze labels
-        labels_file = Path("data/ontomop_extraction/all_labels.json")
+        labels_file = LABELS_FILE
         if labels_file.exists():
-            with open(labels_file, 'r', encoding='utf-8') as f:
-                labels_data = json.load(f)
+            labels_data = load_json_cached(labels_file)
             
             stats["labels"]["total"] = len(labels_data)
             type_counts = defaultdict(int)
@@ -673,10 +627,9 @@ def get_ontomop_statistics_tool() -> Any:
             stats["labels"]["by_type"] = dict(type_counts)
         
         # Analyze formulas
-        formula_file = Path("data/ontomop_extraction/all_formulas.json")
+        formula_file = FORMULAS_FILE
         if formula_file.exists():
-            with open(formula_file, 'r', encoding='utf-8') as f:
-                formula_data = json.load(f)
+            formula_data = load_json_cached(formula_file)
             
             stats["formulas"]["total"] = len(formula_data)
             type_counts = defaultdict(int)
@@ -686,10 +639,9 @@ def get_ontomop_statistics_tool() -> Any:
             stats["formulas"]["by_type"] = dict(type_counts)
         
         # Analyze identifiers
-        identifiers_file = Path("data/ontomop_extraction/all_identifiers.json")
+        identifiers_file = IDENTIFIERS_FILE
         if identifiers_file.exists():
-            with open(identifiers_file, 'r', encoding='utf-8') as f:
-                identifiers_data = json.load(f)
+            identifiers_data = load_json_cached(identifiers_file)
             
             stats["identifiers"]["total"] = len(identifiers_data)
             type_counts = defaultdict(int)
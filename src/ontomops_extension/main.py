@@ -33,7 +33,7 @@ def instruction_prompt():
         "This server provides tools to create and manage ChemicalBuildingUnits and MetalOrganicPolyhedra instances "
         "with their properties and relationships. All tools accept plain strings and numbers and return IRIs as strings. "
         "IRIs are minted to be readable and stable. "
-        "The server uses entity-specific memory with global state management. The agent writes global state to ontomops_global_state.json, "
+        "The server uses entity-specific memory. The pipeline passes the hash and entity to the server (session context, or ontomops_global_state.json), "
         "and the MCP server reads it automatically. No need to pass hash or entity parameters to tools. "
         "Prefer to use paper exact wording for rdfs:label fields to preserve provenance. "
         "\n\n"
@@ -69,7 +69,7 @@ def instruction_prompt():
 # =========================
 # Memory API
 # =========================
-@mcp.tool(name="init_memory", description="Initialize or resume the persistent graph. Reads from ontomops_global_state.json for hash and entity information.")
+@mcp.tool(name="init_memory", description="Initialize or resume the persistent graph. Reads hash and entity from the session context (or ontomops_global_state.json).")
 @mcp_tool_logger
 def init_memory(hash_value: str = None, top_level_entity_name: str = None) -> str:
     return _init_memory(hash_value, top_level_entity_name)
@@ -10,7 +10,6 @@ import re
 import json
 import uuid
 import time
-import tempfile
 import unicodedata
 from contextlib import contextmanager
 from typing import Optional, Tuple, List, Dict
@@ -22,6 +21,8 @@ from filelock import FileLock
 from rdflib import Graph, Namespace, URIRef, Literal
 from rdflib.namespace import RDF, RDFS, OWL, XSD
 from models.locations import DATA_DIR
+from src.utils.resident_graph import get_resident_store
+from src.utils.session_context import read_session_context
 
 # ----------------------------------------------------------------------------------------------------------------------
 # Namespaces (from ontology)
@@ -47,7 +48,12 @@ def _read_global_state() -> Tuple[str, str, str]:
     """Read global state: returns (hash_value, top_level_entity_name, top_level_entity_iri). Read-only, no writes.
     
     Returns the hash value (8-character hex string) that identifies the paper.
+    The session context this server was spawned with takes precedence over
+    ontomops_global_state.json.
     """
+    session = read_session_context()
+    if session is not None:
+        return session
     os.makedirs(GLOBAL_STATE_DIR, exist_ok=True)
     lock = FileLock(GLOBAL_STATE_LOCK)
     lock.acquire(timeout=30.0)
@@ -105,42 +111,38 @@ def get_memory_paths(hash_value: str, top_level_entity_name: str):
         'lock': os.path.join(mem_dir, f"{top_level_entity_name}.lock")
     }
 
+def _bind_prefixes(g: Graph) -> None:
+    # Bind prefixes for nicer serialization and readability
+    g.bind("kg", KG)
+    g.bind("ontomops", ONTOMOPS)
+    g.bind("dc", DC)
+    g.bind("owl", OWL)
+    g.bind("rdf", RDF)
+    g.bind("rdfs", RDFS)
+    g.bind("xsd", XSD)
+
 @contextmanager
-def locked_graph(hash_value: Optional[str] = None, top_level_entity_name: Optional[str] = None, timeout: float = 30.0):
-    """Lock, load, yield, then atomically write-back the memory graph for the given hash and entity.
-    If hash_value/top_level_entity_name are not provided, resolve them from ontomops_global_state.json.
+def locked_graph(hash_value: Optional[str] = None, top_level_entity_name: Optional[str] = None, timeout: float = 30.0, flush: bool = False):
+    """Lock and yield the resident memory graph for the given hash and entity.
+    If hash_value/top_level_entity_name are not provided, resolve them from the session context
+    (or ontomops_global_state.json when the server was started without one).
+
+    The graph stays parsed in process; mutations are journaled on exit and the TTL is
+    rewritten periodically, on `flush=True`, and at shutdown (see src/utils/resident_graph.py).
     
     Args:
         hash_value: The 8-character hash identifying the paper (NOT a DOI)
         top_level_entity_name: Name of the top-level entity
         timeout: Lock acquisition timeout in seconds
+        flush: Rewrite the memory TTL before returning
     """
     if not hash_value or not top_level_entity_name:
         hash_g, entity_g, _ = _read_global_state()
         hash_value = hash_value or hash_g
         top_level_entity_name = top_level_entity_name or entity_g
     paths = get_memory_paths(hash_value, top_level_entity_name)
-    lock = FileLock(paths['lock'])
-    lock.acquire(timeout=timeout)
-    g = Graph()
-    # Bind prefixes for nicer serialization and readability
-    g.bind("kg", KG)
-    g.bind("ontomops", ONTOMOPS)
-    g.bind("dc", DC)
-    g.bind("owl", OWL)
-    g.bind("rdf", RDF)
-    g.bind("rdfs", RDFS)
-    g.bind("xsd", XSD)
-    if os.path.exists(paths['ttl']):
-        g.parse(paths['ttl'], format="turtle")
-    try:
+    with get_resident_store().open(paths['ttl'], paths['lock'], timeout=timeout, bind=_bind_prefixes, flush=flush) as g:
         yield g
-        fd, tmp = tempfile.mkstemp(dir=paths['dir'], suffix=".ttl.tmp")
-        os.close(fd)
-        g.serialize(destination=tmp, format="turtle")
-        os.replace(tmp, paths['ttl'])
-    finally:
-        lock.release()
 
 # ----------------------------------------------------------------------------------------------------------------------
 # IRI helpers
@@ -330,7 +332,7 @@ def export_memory() -> str:
     output_dir = os.path.join(DATA_DIR, hash_value, "ontomops_output")
     os.makedirs(output_dir, exist_ok=True)
     file_path = os.path.join(output_dir, filename)
-    with locked_graph(timeout=30.0) as g:
+    with locked_graph(timeout=30.0, flush=True) as g:
         g.serialize(destination=file_path, format="turtle")
     
     # Update mapping file: entity_label -> actual_filename
@@ -1,7 +1,7 @@
 #!/usr/bin/env python3
 # ontospecies_extension.py — creation-time hard typing for every node
 
-import os, tempfile, hashlib, re
+import os, hashlib, re
 from datetime import datetime, timezone
 from contextlib import contextmanager
 from typing import Optional, List, Tuple
@@ -11,6 +11,9 @@ from filelock import FileLock
 from rdflib import Graph, Namespace, URIRef, Literal
 from rdflib.namespace import RDF, RDFS, XSD
 
+from src.utils.resident_graph import get_resident_store
+from src.utils.session_context import read_session_context
+
 # ========= Namespaces =========
 OS  = Namespace("http://www.theworldavatar.com/ontology/ontospecies/OntoSpecies.owl#")
 ONTOSYN = Namespace("https://www.theworldavatar.com/kg/OntoSyn/")
@@ -64,7 +67,12 @@ def _read_global_state():
     """Read global state: returns (hash_value, top_level_entity_name, top_level_entity_iri).
     
     Returns the hash value (8-character hex string) that identifies the paper.
+    The session context this server was spawned with takes precedence over
+    ontospecies_global_state.json.
     """
+    session = read_session_context()
+    if session is not None:
+        return session
     if not os.path.exists(GLOBAL_STATE_JSON):
         return "default-hash", "default-entity", ""
     from json import load
@@ -178,27 +186,20 @@ def _memory_paths():
         "dir":  mem_dir,
     }
 
-@contextmanager
-def locked_graph(timeout: float = 30.0):
-    paths = _memory_paths()
-    lock = FileLock(paths["lock"])
-    lock.acquire(timeout=timeout)
-    g = Graph()
+def _bind_prefixes(g: Graph) -> None:
     # Bind needed prefixes (rdf first so Turtle prints 'a')
     g.bind("rdf", RDF)
     g.bind("rdfs", RDFS)
     g.bind("xsd", XSD)
     g.bind("ontospecies", OS)
     g.bind("periodic", PER)
-    if os.path.exists(paths["ttl"]):
-        g.parse(paths["ttl"], format="turtle")
-    try:
+
+@contextmanager
+def locked_graph(timeout: float = 30.0, flush: bool = False):
+    # Resident graph: parsed once per process, mutations journaled, TTL rewritten periodically/on flush.
+    paths = _memory_paths()
+    with get_resident_store().open(paths["ttl"], paths["lock"], timeout=timeout, bind=_bind_prefixes, flush=flush) as g:
         yield g
-        fd, tmp = tempfile.mkstemp(dir=paths["dir"], suffix=".ttl.tmp"); os.close(fd)
-        g.serialize(destination=tmp, format="turtle")
-        os.replace(tmp, paths["ttl"])
-    finally:
-        lock.release()
 
 def _ensure_type_with_label(g: Graph, iri: URIRef, cls: URIRef, label: Optional[str] = None) -> None:
     g.add((iri, RDF.type, cls))
@@ -663,7 +664,7 @@ def export_memory() -> str:
     out_dir = os.path.join(os.path.dirname(mem["dir"]), "ontospecies_output")
     os.makedirs(out_dir, exist_ok=True)
     out = os.path.join(out_dir, f"{_slugify(ent)}.ttl")
-    with locked_graph() as g:
+    with locked_graph(flush=True) as g:
         g.serialize(destination=out, format="turtle")
     return os.path.abspath(out)
 
@@ -11,7 +11,7 @@ Each extension:
 3. Links the extension A-Box to the main OntoSynthesis A-Box
 """
 
-from .extract import run_step
+from .extract import run_step, cache_spec
 
-__all__ = ["run_step"]
+__all__ = ["run_step", "cache_spec"]
 
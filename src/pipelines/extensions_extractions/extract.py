@@ -207,6 +207,48 @@ async def process_extension(
     logger.info(f"  ✅ Extraction completed for {entity_label}")
 
 
+def cache_spec(doi_hash: str, config: dict) -> dict:
+    """Inputs and outputs of this step for the step cache (src/pipelines/utils/step_cache.py)."""
+    doi_folder = os.path.join(config.get("data_dir", "data"), doi_hash)
+    meta_config_path = os.path.join(project_root, "configs/meta_task/meta_task_config.json")
+    with open(meta_config_path, 'r', encoding='utf-8') as f:
+        extensions = json.load(f).get("ontologies", {}).get("extensions", [])
+
+    inputs = [
+        os.path.join(doi_folder, f"{doi_hash}_stitched.md"),
+        os.path.join(doi_folder, "mcp_run", "iter1_top_entities.json"),
+        meta_config_path,
+        os.path.join(project_root, "configs", "extraction_models.json"),
+        os.path.join(project_root, "data", "ontologies", "*-subgraph.ttl"),
+    ]
+    outputs = [".extensions_extractions_done"]
+    for extension in extensions:
+        ontology_name = extension.get("name")
+        iterations_path = os.path.join(
+            project_root, "ai_generated_contents_candidate/iterations", ontology_name, "iterations.json"
+        )
+        inputs.append(iterations_path)
+        if not os.path.exists(iterations_path):
+            continue
+        with open(iterations_path, 'r', encoding='utf-8') as f:
+            iteration = (json.load(f).get("iterations") or [{}])[0]
+        if iteration.get("extraction_prompt"):
+            # Same candidate -> production lookup as load_prompt
+            prompt_path = iteration["extraction_prompt"].replace("\\", "/")
+            inputs += [
+                os.path.join(project_root, prompt_path.replace("ai_generated_contents/", "ai_generated_contents_candidate/", 1)),
+                os.path.join(project_root, prompt_path),
+            ]
+        if iteration.get("inputs", {}).get("tbox"):
+            inputs.append(os.path.join(project_root, iteration["inputs"]["tbox"]))
+        iteration_outputs = iteration.get("outputs", {})
+        if iteration_outputs.get("extraction_file"):
+            outputs.append(iteration_outputs["extraction_file"].replace("{entity_safe}", "*"))
+        outputs.append(iteration_outputs.get("extraction_prompt_file", "prompts/extraction_{entity_safe}.md").replace("{entity_safe}", "*"))
+
+    return {"inputs": inputs, "outputs": outputs}
+
+
 def run_step(doi_hash: str, config: dict) -> bool:
     """
     Main Extensions Extractions step: Process OntoMOPs and OntoSpecies extensions.
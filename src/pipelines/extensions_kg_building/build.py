@@ -20,6 +20,9 @@ from filelock import FileLock
 from models.BaseAgent import BaseAgent
 from models.ModelConfig import ModelConfig
 from src.pipelines.utils.ttl_publisher import get_output_naming_config, load_meta_task_config
+from src.utils.resident_graph import sync_memory_file
+from src.utils.session_context import entity_concurrency, session_env
+from src.pipelines.utils.scheduler import run_bounded
 
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(message)s')
@@ -271,9 +274,13 @@ async def run_extension_agent(
     prompt_file: str,
     output_ttl_name: str,
     data_dir: str = "data",
-    ontology_name: str = None
+    ontology_name: str = None,
+    mcp_env: Optional[Dict[str, str]] = None
 ) -> str:
-    """Run extension agent for a single entity."""
+    """Run extension agent for a single entity.
+
+    `mcp_env` is the session context handed to the extension MCP server at spawn.
+    """
     doi_folder = os.path.join(data_dir, doi_hash)
     output_ttl_path = os.path.join(doi_folder, output_ttl_name)
 
@@ -327,6 +334,8 @@ async def run_extension_agent(
                 os.path.join(mem_dir, f"{safe_local.lower()}.ttl"),
             ]
             for mem_path in mem_candidates:
+                # Fold any un-flushed journal (resident memory graph) into the TTL first
+                sync_memory_file(mem_path)
                 if os.path.exists(mem_path):
                     os.makedirs(os.path.dirname(output_ttl_path), exist_ok=True)
                     shutil.copy2(mem_path, output_ttl_path)
@@ -345,6 +354,8 @@ async def run_extension_agent(
                 os.path.join(shared_mem_dir, f"{safe_local.lower()}.ttl"),
             ]
             for mem_path in shared_mem_candidates:
+                # Fold any un-flushed journal (resident memory graph) into the TTL first
+                sync_memory_file(mem_path)
                 if os.path.exists(mem_path):
                     os.makedirs(os.path.dirname(output_ttl_path), exist_ok=True)
                     shutil.copy2(mem_path, output_ttl_path)
@@ -429,7 +440,8 @@ async def run_extension_agent(
         model_config=model_config,
         remote_model=True,
         mcp_tools=mcp_tools,
-        mcp_set_name=mcp_set_name
+        mcp_set_name=mcp_set_name,
+        mcp_env=mcp_env
     )
     
     # Retry mechanism for agent execution
@@ -503,6 +515,8 @@ async def run_extension_agent(
                             os.path.join(mem_dir, f"{safe_local.lower()}.ttl"),
                         ]
                         for mem_path in mem_candidates:
+                            # Fold any un-flushed journal (resident memory graph) into the TTL first
+                            sync_memory_file(mem_path)
                             if os.path.exists(mem_path):
                                 os.makedirs(os.path.dirname(output_ttl_path), exist_ok=True)
                                 shutil.copy2(mem_path, output_ttl_path)
@@ -562,8 +576,14 @@ async def process_extension_kg(
     test_mcp_config: str = None,
     main_ontology_name: str = "ontosynthesis",
     meta_cfg: Optional[dict] = None,
+    write_legacy_global_state: bool = True,
 ):
-    """Process KG building for a single extension entity."""
+    """Process KG building for a single extension entity.
+
+    The (hash, entity, IRI) context is passed to the MCP server through its environment;
+    `write_legacy_global_state` additionally writes <ontology>_global_state.json for
+    servers that predate the session context (only safe when entities run one at a time).
+    """
     entity_label = entity.get("label", "")
     entity_uri = entity.get("uri", "")
     safe = _safe_name(entity_label)
@@ -738,7 +758,8 @@ async def process_extension_kg(
     logger.info(f"    🔍 Resolving DOI from hash: {doi_hash}")
     doi_us, doi_sl = resolve_doi_from_hash(doi_hash, data_dir)
     logger.info(f"    ✅ Resolved DOI - underscore: {doi_us}, slash: {doi_sl}")
-    write_global_state(ontology_name, doi_hash, entity_label, entity_uri, data_dir)
+    if write_legacy_global_state:
+        write_global_state(ontology_name, doi_hash, entity_label, entity_uri, data_dir)
     
     # Get optional parameters with defaults
     recursion_limit = iteration.get("recursion_limit", 50)  # Default recursion limit
@@ -768,12 +789,29 @@ async def process_extension_kg(
         prompt_file=extension_prompt_file,
         output_ttl_name=output_ttl,
         data_dir=data_dir,
-        ontology_name=ontology_name
+        ontology_name=ontology_name,
+        mcp_env=session_env(doi_hash, entity_label, entity_uri)
     )
     
     logger.info(f"  ✅ KG building completed for {entity_label}")
 
 
+def stale_outputs(doi_hash: str, config: dict) -> List[str]:
+    """Files this step skips on; the step cache deletes them when an upstream step changed (src/pipelines/utils/step_cache.py)."""
+    meta_config_path = os.path.join(config.get("project_root", "."), "configs/meta_task/meta_task_config.json")
+    try:
+        with open(meta_config_path, "r", encoding="utf-8") as f:
+            extensions = json.load(f).get("ontologies", {}).get("extensions", [])
+    except (OSError, ValueError):
+        extensions = []
+    patterns = [".extensions_kg_building_done", "*_extension_*.ttl"]
+    for extension in extensions:
+        name = extension.get("name")
+        if name:
+            patterns += [f"{name}_output/**", f"memory_{name}/**"]
+    return patterns
+
+
 def run_step(doi_hash: str, config: dict) -> bool:
     """
     Main Extensions KG Building step: Build KG for OntoMOPs and OntoSpecies extensions.
@@ -781,10 +819,14 @@ def run_step(doi_hash: str, config: dict) -> bool:
     Args:
         doi_hash: DOI hash for the paper
         config: Pipeline configuration dictionary
+                (step_configs.extensions_kg_building.max_concurrency: entities built at once, default 1;
+                 more than 1 also needs session_context_servers: true, see src/utils/session_context.py)
         
     Returns:
         True if KG building completed successfully
     """
+    # Reject an unsupported max_concurrency before any agent runs
+    entity_concurrency(config)
     # Extract config parameters
     data_dir = config.get("data_dir", "data")
     project_root = config.get("project_root", ".")
@@ -847,9 +889,12 @@ def run_step(doi_hash: str, config: dict) -> bool:
     
     logger.info(f"Found {len(top_entities)} top entities")
     
-    # Process all extensions and entities sequentially using a single event loop
+    # Entities of one extension are independent once each agent session carries its own context
+    max_concurrency = entity_concurrency(config)
+    
+    # Process all extensions (in order) and their entities using a single event loop
     async def process_all_extensions():
-        """Process all extensions and entities sequentially in a single event loop."""
+        """Process all extensions in order, up to `max_concurrency` entities at a time."""
         # Process each extension ontology
         for extension in extensions:
             ontology_name = extension.get("name")
@@ -882,14 +927,14 @@ def run_step(doi_hash: str, config: dict) -> bool:
                 logger.error(f"  ❌ Failed to load iterations config: {e}")
                 continue
             
-            # Process each entity STRICTLY SEQUENTIALLY
-            # This ensures global state is set correctly for each entity
-            for i, entity in enumerate(top_entities):
+            # The legacy global state file only holds one entity, so it is written
+            # (and relied upon) only when entities run one at a time
+            async def _process_entity(indexed_entity) -> None:
+                i, entity = indexed_entity
                 entity_label = entity.get("label", "")
                 logger.info(f"\n  Entity {i+1}/{len(top_entities)}: {entity_label}")
                 
                 try:
-                    # Await each entity sequentially - no parallel processing
                     await process_extension_kg(
                         ontology_name=ontology_name,
                         doi_hash=doi_hash,
@@ -900,13 +945,18 @@ def run_step(doi_hash: str, config: dict) -> bool:
                         test_mcp_config=config.get("test_mcp_config"),
                         main_ontology_name=main_ontology_name,
                         meta_cfg=meta_config,
+                        write_legacy_global_state=max_concurrency == 1,
                     )
                     logger.info(f"  ✅ Completed entity {i+1}/{len(top_entities)}: {entity_label}")
                 except Exception as e:
                     logger.error(f"  ❌ KG building failed for '{entity_label}': {e}")
                     import traceback
                     logger.error(f"  Traceback: {traceback.format_exc()}")
-                    continue
+            
+            await run_bounded(
+                list(enumerate(top_entities)), _process_entity, max_concurrency,
+                key=lambda indexed: _safe_name(indexed[1].get("label", "")),
+            )
     
     # Run all processing in a single event loop
     try:
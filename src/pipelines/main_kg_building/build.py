@@ -19,6 +19,9 @@ from models.ModelConfig import ModelConfig
 from src.utils.global_logger import get_logger
 from src.utils.extraction_models import get_extraction_model
 from src.pipelines.utils.ttl_publisher import load_meta_task_config, publish_ttl
+from src.utils.resident_graph import sync_memory_file
+from src.utils.session_context import entity_concurrency, session_env
+from src.pipelines.utils.scheduler import run_bounded
 
 logger = get_logger("pipeline", "MainKGBuilding")
 
@@ -100,6 +103,7 @@ def _try_copy_entity_ttl_to_intermediate(
     os.makedirs(os.path.dirname(intermediate_ttl), exist_ok=True)
 
     memory_ttl = os.path.join(doi_folder, "memory", f"{entity_safe}.ttl")
+    sync_memory_file(memory_ttl)
     if os.path.exists(memory_ttl):
         shutil.copy2(memory_ttl, intermediate_ttl)
         logger.info(f"    ✅ Saved intermediate TTL from memory: {os.path.basename(memory_ttl)}")
@@ -157,7 +161,8 @@ async def run_kg_building_agent(
     iter_num: int,
     mcp_tools: List[str],
     mcp_set_name: str,
-    data_dir: str = "data"
+    data_dir: str = "data",
+    write_legacy_global_state: bool = True
 ) -> str:
     """
     Run KG building agent for a single entity.
@@ -172,6 +177,8 @@ async def run_kg_building_agent(
         mcp_tools: List of MCP tools to use
         mcp_set_name: MCP set name
         data_dir: Data directory
+        write_legacy_global_state: Also write data/global_state.json for servers that
+            do not read the session context (only safe when entities run one at a time)
         
     Returns:
         Agent response content
@@ -207,8 +214,9 @@ async def run_kg_building_agent(
     except Exception as e:
         logger.warning(f"Failed to save prompt to {prompt_file}: {e}")
     
-    # Write global state for MCP server
-    write_global_state(doi_hash, safe, entity_uri)
+    # The MCP server resolves its memory file from the session context passed at spawn
+    if write_legacy_global_state:
+        write_global_state(doi_hash, safe, entity_uri)
     
     # Create agent
     logger.info(f"    🚀 Running KG building agent for '{entity_label}' (iter {iter_num})")
@@ -218,6 +226,7 @@ async def run_kg_building_agent(
         remote_model=True,
         mcp_tools=mcp_tools,
         mcp_set_name=mcp_set_name,
+        mcp_env=session_env(doi_hash, safe, entity_uri),
     )
     
     # Run agent with retry
@@ -269,6 +278,8 @@ async def _process_iterations(doi_hash: str, config: dict, doi_folder: str,
                               ontology_name: str = "ontosynthesis") -> bool:
     """Async helper to process all iterations and entities."""
     meta_cfg = load_meta_task_config()
+    max_concurrency = entity_concurrency(config)
+    sequential = max_concurrency == 1
     intermediate_ttl_dir = os.path.join(doi_folder, "intermediate_ttl_files")
     os.makedirs(intermediate_ttl_dir, exist_ok=True)
     
@@ -302,8 +313,10 @@ async def _process_iterations(doi_hash: str, config: dict, doi_folder: str,
             logger.error(f"  ❌ Failed to load KG building prompt for iteration {iter_num}")
             continue
         
-        # Process each entity sequentially with strict isolation
-        for idx, entity in enumerate(top_entities):
+        # Entities are independent: each agent session carries its own (hash, entity, IRI)
+        # context, so up to `max_concurrency` entities can be built at once.
+        async def _build_entity(indexed_entity) -> None:
+            idx, entity = indexed_entity
             entity_label = entity.get("label", "")
             entity_uri = entity.get("uri", "")
             safe = _safe_name(entity_label)
@@ -316,20 +329,20 @@ async def _process_iterations(doi_hash: str, config: dict, doi_folder: str,
             
             if os.path.exists(response_file) and os.path.exists(intermediate_ttl):
                 logger.info(f"    ⏭️  KG building already completed")
-                continue
+                return
             
             # Load hints
             hints_file = os.path.join(mcp_run_dir, f"iter{iter_num}_hints_{safe}.txt")
             if not os.path.exists(hints_file):
                 logger.warning(f"    ⚠️  Hints file not found: {hints_file}")
-                continue
+                return
             
             try:
                 with open(hints_file, 'r', encoding='utf-8') as f:
                     hints_content = f.read()
             except Exception as e:
                 logger.error(f"    ❌ Failed to read hints file: {e}")
-                continue
+                return
             
             # Run KG building agent
             try:
@@ -342,7 +355,8 @@ async def _process_iterations(doi_hash: str, config: dict, doi_folder: str,
                     iter_num=iter_num,
                     mcp_tools=mcp_tools,
                     mcp_set_name=mcp_set_name,
-                    data_dir=data_dir
+                    data_dir=data_dir,
+                    write_legacy_global_state=sequential
                 )
                 
                 # Copy output.ttl to intermediate TTL file
@@ -423,30 +437,58 @@ async def _process_iterations(doi_hash: str, config: dict, doi_folder: str,
                 
             except Exception as e:
                 logger.error(f"    ❌ KG building failed for '{entity_label}': {e}")
-                continue
+                return
             
-            # CRITICAL: Synchronization point between entities
-            # Wait to ensure all MCP server file operations are flushed to disk
-            # before moving to next entity (which will overwrite global state)
-            if idx < len(top_entities) - 1:  # Not the last entity
+            # With the legacy global state file, wait to ensure all MCP server file operations
+            # are flushed to disk before the next entity overwrites the global state
+            if sequential and idx < len(top_entities) - 1:  # Not the last entity
                 logger.info(f"    🔒 Entity synchronization point (preparing for next entity)...")
                 await asyncio.sleep(2)
                 logger.info(f"    ✅ Ready for next entity")
+        
+        await run_bounded(
+            list(enumerate(top_entities)), _build_entity, max_concurrency,
+            key=lambda indexed: _safe_name(indexed[1].get("label", "")),
+        )
     
     return True
 
 
+def stale_outputs(doi_hash: str, config: dict) -> List[str]:
+    """Files this step skips on; the step cache deletes them when an upstream step changed (src/pipelines/utils/step_cache.py)."""
+    entities_path = os.path.join(config.get("data_dir", "data"), doi_hash, "mcp_run", "iter1_top_entities.json")
+    try:
+        with open(entities_path, "r", encoding="utf-8") as f:
+            top_entities = json.load(f)
+    except (OSError, ValueError):
+        top_entities = []
+    patterns = [".main_kg_building_done", "intermediate_ttl_files/**", "responses/iter*_kg_building/**"]
+    for entity in top_entities:
+        safe = _safe_name(entity.get("label", ""))
+        patterns += [f"memory/{safe}.ttl", f"exports/{safe}_*.ttl"]
+    return patterns
+
+
 def run_step(doi_hash: str, config: dict) -> bool:
     """
     Main KG Building step: Build knowledge graphs for iterations 2, 3, and 4.
     
+    Each agent session passes its (hash, entity, entity IRI) to the MCP server at
+    spawn (src/utils/session_context.py). max_concurrency > 1 stops writing the shared
+    data/global_state.json, so it also needs session_context_servers: true
+    (every server in the MCP set reads the session context); otherwise it raises
+    ValueError.
+    
     Args:
         doi_hash: DOI hash for the paper
         config: Pipeline configuration dictionary
+                (step_configs.main_kg_building.max_concurrency: entities built at once, default 1)
         
     Returns:
         True if KG building succeeded
     """
+    # Reject an unsupported max_concurrency before any agent runs
+    entity_concurrency(config)
     # Extract config parameters
     data_dir = config.get("data_dir", "data")
     project_root = config.get("project_root", ".")
@@ -1,6 +1,6 @@
 """Main Ontology Extractions Pipeline Step"""
 
-from .extract import run_step
+from .extract import run_step, cache_spec
 
-__all__ = ['run_step']
+__all__ = ['run_step', 'cache_spec']
 
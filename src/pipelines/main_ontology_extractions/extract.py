@@ -27,6 +27,12 @@ from models.ModelConfig import ModelConfig
 from models.LLMCreator import LLMCreator
 from src.utils.global_logger import get_logger
 from src.utils.extraction_models import get_extraction_model
+from src.pipelines.utils.scheduler import (
+    DEFAULT_MAX_CONCURRENCY,
+    ModelRateLimiter,
+    build_rate_limiter,
+    run_bounded,
+)
 
 logger = get_logger("pipeline", "main_ontology_extractions")
 
@@ -59,6 +65,11 @@ def _safe_name(label: str) -> str:
     return (label or "entity").replace(" ", "_").replace("/", "_")
 
 
+def _entity_key(entity: dict) -> str:
+    """Scheduling key: entities sharing a safe name share output files and must not overlap."""
+    return _safe_name(entity.get("label", ""))
+
+
 def resolve_file_path(path_template: str, doi_hash: str, entity_safe: str, data_dir: str = "data") -> str:
     """
     Resolve a file path template with placeholders.
@@ -151,7 +162,8 @@ async def run_pre_extraction(
     prompt_template: str,
     model_key: str,
     iter_num: int,
-    data_dir: str = "data"
+    data_dir: str = "data",
+    rate_limiter: ModelRateLimiter = None
 ) -> str:
     """
     Run pre-extraction for an entity (e.g., iteration 3 pre-extraction).
@@ -207,6 +219,8 @@ async def run_pre_extraction(
     for attempt in range(max_retries):
         try:
             logger.info(f"    🔍 Running pre-extraction (attempt {attempt + 1}/{max_retries})")
+            if rate_limiter is not None:
+                await rate_limiter.acquire(model_name)
             result = await llm.ainvoke(prompt)
             content = result.content if hasattr(result, 'content') else str(result)
             
@@ -270,7 +284,8 @@ async def run_extraction(
     iter_num: int,
     use_agent: bool = False,
     mcp_tools: list = None,
-    mcp_set_name: str = None
+    mcp_set_name: str = None,
+    rate_limiter: ModelRateLimiter = None
 ) -> str:
     """
     Run extraction (hints generation) for an entity.
@@ -358,6 +373,8 @@ async def run_extraction(
                     )
                 
                 logger.info(f"    🔍 Running agent extraction (attempt {attempt + 1}/{max_retries})")
+                if rate_limiter is not None:
+                    await rate_limiter.acquire(model_name)
                 result, _meta = await agent.run(prompt, recursion_limit=600)
                 content = str(result or "")
             else:
@@ -368,6 +385,8 @@ async def run_extraction(
                     model_config=ModelConfig(temperature=0, top_p=1.0),
                     remote_model=True,
                 ).setup_llm()
+                if rate_limiter is not None:
+                    await rate_limiter.acquire(model_name)
                 result = await llm.ainvoke(prompt)
                 content = result.content if hasattr(result, 'content') else str(result)
             
@@ -458,15 +477,64 @@ async def run_extraction(
 # This module ONLY handles extraction (hints generation)
 
 
+def cache_spec(doi_hash: str, config: dict) -> dict:
+    """Inputs and outputs of this step for the step cache (src/pipelines/utils/step_cache.py)."""
+    from src.pipelines.top_entity_kg_building.build import load_meta_config
+    doi_folder = os.path.join(config.get("data_dir", "data"), doi_hash)
+    ontology_name = load_meta_config().get("ontologies", {}).get("main", {}).get("name", "ontosynthesis")
+    iterations_path = resolve_generated_file(f"ai_generated_contents/iterations/{ontology_name}/iterations.json")
+
+    inputs = [
+        os.path.join(doi_folder, f"{doi_hash}_stitched.md"),
+        os.path.join(doi_folder, "mcp_run", "iter1_top_entities.json"),
+        iterations_path,
+        os.path.join(project_root, "configs", "extraction_models.json"),
+    ]
+    outputs = [".main_ontology_extractions_done", "pre_extraction/**"]
+    for iteration in load_iterations_config(ontology_name).get("iterations", []):
+        iter_num = iteration.get("iteration_number")
+        hint_template = iteration.get("outputs", {}).get("hints_file", f"mcp_run/iter{iter_num}_hints_{{entity_safe}}.txt")
+        outputs.append(hint_template.replace("{entity_safe}", "*"))
+        for stage in ("pre_extraction", "extraction"):
+            outputs += [f"prompts/iter{iter_num}_{stage}/**", f"responses/iter{iter_num}_{stage}/**"]
+        prompt_paths = [iteration.get("pre_extraction_prompt"), iteration.get("extraction_prompt")]
+        for sub_iter in iteration.get("sub_iterations", []):
+            sub_num = sub_iter.get("iteration_number")
+            sub_outputs = sub_iter.get("outputs", {})
+            default_marker = f"mcp_run/iter{sub_iter.get('enriches')}_{sub_num}_done_{{entity_safe}}.marker"
+            outputs.append(sub_outputs.get("done_marker", default_marker).replace("{entity_safe}", "*"))
+            if sub_outputs.get("hints_file"):
+                outputs.append(sub_outputs["hints_file"].replace("{entity_safe}", "*"))
+            outputs += [f"prompts/iter{sub_num}_enrichment/**", f"responses/iter{sub_num}_enrichment/**"]
+            prompt_paths.append(sub_iter.get("extraction_prompt"))
+        inputs += [resolve_generated_file(p) for p in prompt_paths if p]
+
+    return {
+        "inputs": inputs,
+        "config": {
+            "ontology": ontology_name,
+            "skip_iter2_extraction": config.get("skip_iter2_extraction", False),
+            "skip_iter3_extraction": config.get("skip_iter3_extraction", False),
+            "skip_iter4_extraction": config.get("skip_iter4_extraction", False),
+        },
+        "outputs": outputs,
+    }
+
+
 def run_step(doi_hash: str, config: dict) -> bool:
     """
     Main entry point for the main ontology extractions pipeline step.
     
-    This step processes iterations 2+ for all top-level entities.
+    This step processes iterations 2+ for all top-level entities. Within an
+    iteration, entities are processed concurrently (pre-extraction -> extraction
+    stays sequential per entity); iterations and sub-iterations run in order.
     
     Args:
         doi_hash: The DOI hash to process
         config: Pipeline configuration dictionary
+                (step_configs.main_ontology_extractions.max_concurrency: int, default 4;
+                 rate_limits: {model name | "default": requests per minute};
+                 rate_limit_burst: bucket size)
         
     Returns:
         True if all extractions succeeded
@@ -531,6 +599,10 @@ def run_step(doi_hash: str, config: dict) -> bool:
     skip_iter3 = config.get("skip_iter3_extraction", False)
     skip_iter4 = config.get("skip_iter4_extraction", False)
     
+    # Entities within an iteration run concurrently; LLM calls share per-model rate limits
+    max_concurrency = int(config.get("max_concurrency", DEFAULT_MAX_CONCURRENCY))
+    rate_limiter = build_rate_limiter(config)
+    
     # Process each iteration
     for iteration in iterations:
         iter_num = iteration.get("iteration_number")
@@ -562,17 +634,41 @@ def run_step(doi_hash: str, config: dict) -> bool:
         model_key = iteration.get("model_config_key", f"iter{iter_num}_hints")
         pre_extraction_model_key = iteration.get("pre_extraction_model_key", "iter3_pre_extraction")
         
-        # Process each entity
-        for entity in top_entities:
+        # Get output paths from config (with fallback to defaults)
+        outputs = iteration.get("outputs", {})
+        hint_file_template = outputs.get("hints_file", f"mcp_run/iter{iter_num}_hints_{{entity_safe}}.txt")
+        
+        # Prompts are shared by all entities of this iteration
+        pre_extraction_prompt = ""
+        if has_pre_extraction and pre_extraction_prompt_path:
+            pre_extraction_prompt = load_prompt(pre_extraction_prompt_path)
+        extraction_prompt = load_prompt(extraction_prompt_path) if extraction_prompt_path else ""
+        
+        # Determine if this iteration uses agent for extraction
+        # (iter2 uses agent, iter3/4 use simple LLM)
+        extraction_uses_agent = use_agent and (
+            iteration.get("extraction_mcp_tools") is not None or 
+            iteration.get("mcp_tools") is not None
+        )
+        
+        # Get MCP configuration for extraction (if using agent)
+        # Use extraction-specific config if available, otherwise fall back to general config
+        extraction_mcp_set = iteration.get("extraction_mcp_set_name") or iteration.get("mcp_set_name") if extraction_uses_agent else None
+        extraction_mcp_tools = iteration.get("extraction_mcp_tools") or iteration.get("mcp_tools") if extraction_uses_agent else None
+        
+        # If test MCP config is provided, override the set name for generated tools
+        # (but keep extraction-specific tools like pubchem, websearch unchanged)
+        if "test_mcp_config" in config and extraction_mcp_tools and "llm_created_mcp" in extraction_mcp_tools:
+            extraction_mcp_set = config["test_mcp_config"]
+        
+        async def _extract_entity(entity: dict) -> bool:
+            """Pre-extraction -> extraction for one entity; True if its hints file exists afterwards."""
             entity_label = entity.get("label", "")
             entity_uri = entity.get("uri", "")
             safe = _safe_name(entity_label)
             
             logger.info(f"  📌 Entity: {entity_label}")
             
-            # Get output paths from config (with fallback to defaults)
-            outputs = iteration.get("outputs", {})
-            hint_file_template = outputs.get("hints_file", f"mcp_run/iter{iter_num}_hints_{{entity_safe}}.txt")
             hint_file = resolve_file_path(hint_file_template, doi_hash, safe, data_dir)
             
             # Ensure directory exists
@@ -580,56 +676,46 @@ def run_step(doi_hash: str, config: dict) -> bool:
             
             # Step 1: Pre-extraction (if needed)
             source_text = paper_content
-            if has_pre_extraction and pre_extraction_prompt_path:
-                logger.info(f"    🔍 Pre-extraction for iteration {iter_num}")
-                pre_extraction_prompt = load_prompt(pre_extraction_prompt_path)
-                if pre_extraction_prompt:
-                    try:
-                        pre_extracted_text = asyncio.run(run_pre_extraction(
-                            doi_hash, entity_label, entity_uri, paper_content,
-                            pre_extraction_prompt, pre_extraction_model_key, iter_num, data_dir
-                        ))
-                        if pre_extracted_text:
-                            source_text = pre_extracted_text
-                    except Exception as e:
-                        logger.error(f"    ❌ Pre-extraction failed: {e}")
+            if pre_extraction_prompt:
+                logger.info(f"    🔍 Pre-extraction for iteration {iter_num} ('{entity_label}')")
+                try:
+                    pre_extracted_text = await run_pre_extraction(
+                        doi_hash, entity_label, entity_uri, paper_content,
+                        pre_extraction_prompt, pre_extraction_model_key, iter_num, data_dir,
+                        rate_limiter=rate_limiter
+                    )
+                    if pre_extracted_text:
+                        source_text = pre_extracted_text
+                except Exception as e:
+                    logger.error(f"    ❌ Pre-extraction failed for '{entity_label}': {e}")
             
             # Step 2: Extraction (hints generation)
             # For iter2: extraction uses agent with MCP tools
             # For iter3/4: extraction uses simple LLM
-            if extraction_prompt_path:
-                logger.info(f"    📝 Extraction for iteration {iter_num}")
-                extraction_prompt = load_prompt(extraction_prompt_path)
-                if extraction_prompt:
-                    # Determine if this iteration uses agent for extraction
-                    # (iter2 uses agent, iter3/4 use simple LLM)
-                    extraction_uses_agent = use_agent and (
-                        iteration.get("extraction_mcp_tools") is not None or 
-                        iteration.get("mcp_tools") is not None
+            if extraction_prompt:
+                logger.info(f"    📝 Extraction for iteration {iter_num} ('{entity_label}')")
+                try:
+                    await run_extraction(
+                        doi_hash, entity_label, entity_uri, source_text,
+                        extraction_prompt, model_key, hint_file, iter_num,
+                        use_agent=extraction_uses_agent,
+                        mcp_tools=extraction_mcp_tools,
+                        mcp_set_name=extraction_mcp_set,
+                        rate_limiter=rate_limiter
                     )
-                    
-                    # Get MCP configuration for extraction (if using agent)
-                    # Use extraction-specific config if available, otherwise fall back to general config
-                    extraction_mcp_set = iteration.get("extraction_mcp_set_name") or iteration.get("mcp_set_name") if extraction_uses_agent else None
-                    extraction_mcp_tools = iteration.get("extraction_mcp_tools") or iteration.get("mcp_tools") if extraction_uses_agent else None
-                    
-                    # If test MCP config is provided, override the set name for generated tools
-                    # (but keep extraction-specific tools like pubchem, websearch unchanged)
-                    if "test_mcp_config" in config and extraction_mcp_tools and "llm_created_mcp" in extraction_mcp_tools:
-                        extraction_mcp_set = config["test_mcp_config"]
-                    
-                    try:
-                        hints = asyncio.run(run_extraction(
-                            doi_hash, entity_label, entity_uri, source_text,
-                            extraction_prompt, model_key, hint_file, iter_num,
-                            use_agent=extraction_uses_agent,
-                            mcp_tools=extraction_mcp_tools,
-                            mcp_set_name=extraction_mcp_set
-                        ))
-                    except Exception as e:
-                        logger.error(f"    ❌ Extraction failed: {e}")
-                        continue
+                except Exception as e:
+                    logger.error(f"    ❌ Extraction failed for '{entity_label}': {e}")
+            
+            return os.path.exists(hint_file)
         
+        # Entities are independent: run their chains concurrently, report in entity order
+        logger.info(f"    ⚙️  Processing {len(top_entities)} entities (max concurrency: {max_concurrency})")
+        results = asyncio.run(run_bounded(top_entities, _extract_entity, max_concurrency, key=_entity_key))
+        for entity, ok in zip(top_entities, results):
+            if ok is not True:
+                logger.warning(f"    ⚠️  No iteration {iter_num} hints for '{entity.get('label', '')}'")
+        
+
         # Handle sub-iterations (enrichment steps like 3.1, 3.2)
         sub_iterations = iteration.get("sub_iterations", [])
         for sub_iter in sub_iterations:
@@ -651,7 +737,7 @@ def run_step(doi_hash: str, config: dict) -> bool:
                 continue
             
             # Process each entity for enrichment
-            for entity in top_entities:
+            async def _enrich_entity(entity: dict) -> None:
                 entity_label = entity.get("label", "")
                 safe = _safe_name(entity_label)
                 
@@ -666,8 +752,8 @@ def run_step(doi_hash: str, config: dict) -> bool:
                 done_marker = resolve_file_path(done_marker_template, doi_hash, safe, data_dir)
                 
                 if os.path.exists(done_marker):
-                    logger.info(f"    ⏭️  Sub-iteration {sub_iter_num} already completed")
-                    continue
+                    logger.info(f"    ⏭️  Sub-iteration {sub_iter_num} already completed for '{entity_label}'")
+                    return
                 
                 # Resolve base hints file path
                 base_hints_template = sub_inputs.get("base_hints", f"mcp_run/iter{enriches}_hints_{{entity_safe}}.txt")
@@ -675,7 +761,7 @@ def run_step(doi_hash: str, config: dict) -> bool:
                 
                 if not os.path.exists(base_hint_file):
                     logger.warning(f"    ⚠️  Base hints file not found: {base_hint_file}")
-                    continue
+                    return
                 
                 # Read base hints
                 with open(base_hint_file, 'r', encoding='utf-8') as f:
@@ -713,27 +799,24 @@ def run_step(doi_hash: str, config: dict) -> bool:
                 except Exception as e:
                     logger.warning(f"    ⚠️  Failed to save enrichment prompt: {e}")
                 
-                logger.info(f"    🔍 Running enrichment for sub-iteration {sub_iter_num}")
+                logger.info(f"    🔍 Running enrichment for sub-iteration {sub_iter_num} ('{entity_label}')")
                 
                 # Run enrichment extraction with retry logic
                 max_retries = 3
                 enriched_content = None
+                model_name = get_extraction_model(sub_model_key)
                 for attempt in range(max_retries):
                     try:
-                        async def _run_enrichment():
-                            model_name = get_extraction_model(sub_model_key)
-                            llm = LLMCreator(
-                                model=model_name,
-                                model_config=ModelConfig(temperature=0, top_p=1.0),
-                                remote_model=True,
-                            ).setup_llm()
-                            
-                            result = await llm.ainvoke(enrichment_prompt)
-                            enriched_content = result.content if hasattr(result, 'content') else str(result)
-                            return enriched_content
+                        llm = LLMCreator(
+                            model=model_name,
+                            model_config=ModelConfig(temperature=0, top_p=1.0),
+                            remote_model=True,
+                        ).setup_llm()
                         
-                        logger.info(f"    Enrichment attempt {attempt + 1}/{max_retries}")
-                        enriched_content = asyncio.run(_run_enrichment())
+                        logger.info(f"    Enrichment attempt {attempt + 1}/{max_retries} ('{entity_label}')")
+                        await rate_limiter.acquire(model_name)
+                        result = await llm.ainvoke(enrichment_prompt)
+                        enriched_content = result.content if hasattr(result, 'content') else str(result)
                         
                         if enriched_content and enriched_content.strip():
                             logger.info(f"    ✅ Enrichment succeeded on attempt {attempt + 1}")
@@ -743,21 +826,19 @@ def run_step(doi_hash: str, config: dict) -> bool:
                             if attempt < max_retries - 1:
                                 wait_time = 5 * (attempt + 1)
                                 logger.info(f"    Waiting {wait_time}s before retry...")
-                                import time
-                                time.sleep(wait_time)
+                                await asyncio.sleep(wait_time)
                     except Exception as e:
                         logger.error(f"    ❌ Enrichment attempt {attempt + 1}/{max_retries} failed: {e}")
                         if attempt < max_retries - 1:
                             wait_time = 5 * (attempt + 1)
                             logger.info(f"    Waiting {wait_time}s before retry...")
-                            import time
-                            time.sleep(wait_time)
+                            await asyncio.sleep(wait_time)
                         else:
-                            raise RuntimeError(f"Enrichment failed after {max_retries} attempts. Last error: {e}")
+                            raise RuntimeError(f"Enrichment failed for '{entity_label}' after {max_retries} attempts. Last error: {e}")
                 
                 if not enriched_content or not enriched_content.strip():
                     logger.error(f"    ❌ Enrichment returned empty content after {max_retries} attempts")
-                    continue
+                    return
                 
                 # Write enriched hints
                 # Get output hints file path (usually same as input to overwrite)
@@ -786,7 +867,13 @@ def run_step(doi_hash: str, config: dict) -> bool:
                 with open(done_marker, 'w', encoding='utf-8') as f:
                     f.write("done")
                 
-                logger.info(f"    ✅ Enrichment completed for sub-iteration {sub_iter_num}")
+                logger.info(f"    ✅ Enrichment completed for sub-iteration {sub_iter_num} ('{entity_label}')")
+            
+            results = asyncio.run(run_bounded(top_entities, _enrich_entity, max_concurrency, key=_entity_key))
+            # Surface the first failure in entity order, after every other entity has finished
+            for result in results:
+                if isinstance(result, BaseException):
+                    raise result
     
     # Create completion marker
     try:
@@ -331,6 +331,11 @@ def perform_final_integration(hash_value: str) -> Optional[List[Dict[str, Any]]]
     return results if results else None
 
 
+def stale_outputs(doi_hash: str, config: dict) -> List[str]:
+    """Files this step skips on; the step cache deletes them when an upstream step changed (src/pipelines/utils/step_cache.py)."""
+    return [".mop_derivation_done", "cbu_derivation/**"]
+
+
 def run_step(doi_hash: str, config: dict) -> bool:
     """
     Main MOP Derivation step: Derive metal and organic CBUs, then integrate.
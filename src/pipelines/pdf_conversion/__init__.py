@@ -1,6 +1,6 @@
 """PDF Conversion Pipeline Step"""
 
-from .convert import run_step
+from .convert import run_step, cache_spec
 
-__all__ = ['run_step']
+__all__ = ['run_step', 'cache_spec']
 
@@ -6,12 +6,20 @@ Creates three files per PDF:
   - <name>_text.md (text extraction)
   - <name>_tables.md (table extraction)
   - <name>.md (combined)
+
+Tables are recognised by a pool of long-lived docling workers (engine.py) while
+the text is extracted here. The `tables` step config
+picks the pages: "all" (default), "detected" (only pages table_detection.py
+flags) or "none". Either way `<name>_tables_report.json` records which pages
+went to docling and how long each took.
 """
 
 import os
 import sys
+import json
+import functools
 import importlib.util
-from typing import Optional
+from typing import List, Optional
 
 # Add project root to path for imports
 project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
@@ -29,9 +37,13 @@ try:
 except Exception:  # pragma: no cover
     pd = None  # type: ignore
 
+from src.pipelines.pdf_conversion.engine import PendingTables, get_engine
+from src.pipelines.pdf_conversion.table_detection import TABLE_MODES, PageScore, detect_table_pages
+
 
+@functools.lru_cache(maxsize=None)
 def _load_simple_conversion_module():
-    """Load scripts/simple_conversion.py as a module."""
+    """Load scripts/simple_conversion.py as a module (once per process)."""
     scripts_dir = os.path.join(project_root, "scripts")
     simple_path = os.path.join(scripts_dir, "simple_conversion.py")
     
@@ -78,23 +90,72 @@ def _extract_text_md(pdf_path: str, output_folder: str) -> str:
     return text_md
 
 
-def _extract_tables_md(pdf_path: str, output_folder: str) -> Optional[str]:
-    """Extract tables from PDF to <pdf>_tables.md using docling."""
+def _submit_tables(pdf_path: str, page_scores: Optional[List[PageScore]] = None) -> Optional[PendingTables]:
+    """
+    Start the docling table pass for `pdf_path` on the engine (None without docling).
+    With `page_scores` (from detect_table_pages), only the candidate pages are converted.
+    """
     if DocumentConverter is None:
+        return None
+    if page_scores is None:
+        return get_engine().submit(pdf_path)
+    return get_engine().submit(pdf_path, pages=[s.page for s in page_scores if s.candidate])
+
+
+def _write_tables_report(
+    pdf_path: str, output_folder: str, mode: str, pending: PendingTables, page_scores: Optional[List[PageScore]]
+) -> str:
+    """Pages scored and sent to docling, with per-page detection and per-range docling timing."""
+    base_name = os.path.splitext(os.path.basename(pdf_path))[0]
+    report_path = os.path.join(output_folder, f"{base_name}_tables_report.json")
+    ranges = []
+    for page_range, tables, seconds in pending.by_range():
+        pages = page_range[1] - page_range[0] + 1 if page_range else None
+        ranges.append({
+            "pages": list(page_range) if page_range else "all",
+            "tables": len(tables),
+            "seconds": round(seconds, 3),
+            "seconds_per_page": round(seconds / pages, 3) if pages else None,
+        })
+    report = {
+        "pdf": os.path.basename(pdf_path),
+        "mode": mode,
+        "detection": None if page_scores is None else {
+            "seconds": round(sum(s.seconds for s in page_scores), 4),
+            "candidates": [s.page for s in page_scores if s.candidate],
+            "pages": [s.to_json() for s in page_scores],
+        },
+        "docling": ranges,
+    }
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    return report_path
+
+
+def _extract_tables_md(
+    pdf_path: str,
+    output_folder: str,
+    pending: Optional[PendingTables] = None,
+    mode: str = "all",
+    page_scores: Optional[List[PageScore]] = None,
+) -> Optional[str]:
+    """Extract tables from PDF to <pdf>_tables.md using docling (`pending`: from _submit_tables)."""
+    if DocumentConverter is None or mode == "none":
         # Allow pipeline to run without docling; tables will simply be absent.
         return None
 
     base_name = os.path.splitext(os.path.basename(pdf_path))[0]
     tables_md = os.path.join(output_folder, f"{base_name}_tables.md")
 
-    converter = DocumentConverter()
-    res = converter.convert(pdf_path)
+    if pending is None:
+        pending = _submit_tables(pdf_path, page_scores)
+    tables = pending.result()
+    _write_tables_report(pdf_path, output_folder, mode, pending, page_scores)
 
     lines = []
-    for i, table in enumerate(res.document.tables or [], start=1):
-        df = table.export_to_dataframe()
+    for i, table in enumerate(tables, start=1):
         lines.append(f"## Table {i}\n")
-        lines.append(df.to_markdown(index=False))
+        lines.append(table)
         lines.append("")
 
     with open(tables_md, "w", encoding="utf-8") as f:
@@ -127,23 +188,39 @@ def _combine_text_and_tables(text_md: str, tables_md: Optional[str], combined_md
     return combined_md
 
 
-def convert_pdf_to_markdown(pdf_path: str, output_folder: str) -> Optional[str]:
+def convert_pdf_to_markdown(pdf_path: str, output_folder: str, tables_mode: str = "all") -> Optional[str]:
     """
     Convert a single PDF to markdown format.
     
     Args:
         pdf_path: Path to the PDF file
         output_folder: Directory to save markdown files
+        tables_mode: Pages to run docling on: "all", "detected" or "none"
         
     Returns:
         Path to combined markdown file, or None if conversion failed
     """
+    pending = None
     try:
         print(f"  Converting {os.path.basename(pdf_path)}...")
 
         base_name = os.path.splitext(os.path.basename(pdf_path))[0]
         combined_md = os.path.join(output_folder, f"{base_name}.md")
 
+        # Tables are recognised in the background while the text is extracted
+        page_scores = None
+        pending_error = None
+        try:
+            if tables_mode == "detected" and DocumentConverter is not None:
+                page_scores = detect_table_pages(pdf_path)
+                candidates = sum(1 for s in page_scores if s.candidate)
+                detect_s = sum(s.seconds for s in page_scores)
+                print(f"    ✓ Table detection: {candidates}/{len(page_scores)} pages to docling ({detect_s:.2f}s)")
+            if tables_mode != "none":
+                pending = _submit_tables(pdf_path, page_scores)
+        except Exception as e:
+            pending_error = e
+
         # 1) Text extraction
         text_md = _extract_text_md(pdf_path, output_folder)
         print(f"    ✓ Text extracted")
@@ -151,13 +228,17 @@ def convert_pdf_to_markdown(pdf_path: str, output_folder: str) -> Optional[str]:
         # 2) Table extraction (optional)
         tables_md = None
         try:
-            tables_md = _extract_tables_md(pdf_path, output_folder)
+            if pending_error is not None:
+                raise pending_error
+            tables_md = _extract_tables_md(pdf_path, output_folder, pending, tables_mode, page_scores)
         except Exception as e:
             print(f"    ⚠️  Tables extraction skipped: {e}")
             tables_md = None
         else:
             if tables_md:
                 print(f"    ✓ Tables extracted")
+            elif tables_mode == "none":
+                print(f"    ⏭️  Tables not extracted (tables: none)")
             else:
                 print(f"    ⚠️  No tables extracted (docling unavailable)")
 
@@ -168,17 +249,20 @@ def convert_pdf_to_markdown(pdf_path: str, output_folder: str) -> Optional[str]:
         return final_md
 
     except Exception as e:
+        if pending is not None:
+            pending.cancel()
         print(f"    ✗ Error converting {pdf_path}: {str(e)}")
         return None
 
 
-def convert_doi_pdfs(doi_hash: str, data_dir: str) -> bool:
+def convert_doi_pdfs(doi_hash: str, data_dir: str, tables_mode: str = "all") -> bool:
     """
     Convert PDFs for a specific DOI hash.
     
     Args:
         doi_hash: The DOI hash identifier
         data_dir: Base data directory (e.g., 'data')
+        tables_mode: Pages to run docling on: "all", "detected" or "none"
         
     Returns:
         True if at least one PDF was successfully converted or already exists
@@ -214,7 +298,7 @@ def convert_doi_pdfs(doi_hash: str, data_dir: str) -> bool:
             skipped_count += 1
             success_count += 1
         else:
-            output_file = convert_pdf_to_markdown(pdf_path, doi_folder)
+            output_file = convert_pdf_to_markdown(pdf_path, doi_folder, tables_mode)
             if output_file:
                 success_count += 1
             else:
@@ -230,6 +314,26 @@ def convert_doi_pdfs(doi_hash: str, data_dir: str) -> bool:
     return False
 
 
+def cache_spec(doi_hash: str, config: dict) -> dict:
+    """Inputs and outputs of this step for the step cache (src/pipelines/utils/step_cache.py)."""
+    doi_folder = os.path.join(config.get("data_dir", "data"), doi_hash)
+    outputs = []
+    for stem in (doi_hash, f"{doi_hash}_si"):
+        outputs += [f"{stem}.md", f"{stem}_text.md", f"{stem}_tables.md", f"{stem}_tables_report.json"]
+    return {
+        "inputs": [
+            os.path.join(doi_folder, f"{doi_hash}.pdf"),
+            os.path.join(doi_folder, f"{doi_hash}_si.pdf"),
+            os.path.join(project_root, "scripts", "simple_conversion.py"),
+            os.path.abspath(__file__),
+            os.path.join(os.path.dirname(os.path.abspath(__file__)), "engine.py"),
+            os.path.join(os.path.dirname(os.path.abspath(__file__)), "table_detection.py"),
+        ],
+        "config": {"docling": DocumentConverter is not None, "tables": config.get("tables", "all")},
+        "outputs": outputs,
+    }
+
+
 def run_step(doi_hash: str, config: dict) -> bool:
     """
     Main entry point for PDF conversion step.
@@ -242,9 +346,12 @@ def run_step(doi_hash: str, config: dict) -> bool:
         True if conversion succeeded
     """
     data_dir = config.get("data_dir", "data")
+    tables_mode = config.get("tables", "all")
+    if tables_mode not in TABLE_MODES:
+        raise ValueError(f"Unknown tables mode {tables_mode!r}; expected one of {', '.join(TABLE_MODES)}")
     
     print(f"▶️  PDF Conversion: {doi_hash}")
-    success = convert_doi_pdfs(doi_hash, data_dir)
+    success = convert_doi_pdfs(doi_hash, data_dir, tables_mode)
     
     if success:
         print(f"✅ PDF Conversion completed: {doi_hash}")
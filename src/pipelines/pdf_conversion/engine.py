@@ -0,0 +1,209 @@
+"""
+Worker pool for the docling table pass of the PDF conversion step.
+
+Building a docling `DocumentConverter` loads its layout and table-structure
+models, which costs more than converting a typical paper. The step used to build
+one per PDF; this engine builds one per worker and keeps it:
+
+- worker processes (MOPS_PDF_WORKERS) each create a converter in their
+  initializer and reuse it for every task until the process exits;
+- by default a PDF is one task, converted whole as the step always did. With
+  MOPS_PDF_PAGES_PER_TASK > 0 it is cut into page ranges of that many pages,
+  converted as separate tasks, so a long SI PDF is spread over all workers. A
+  table running across a range boundary may then come out split or differently
+  recognised, so keep the default until `scripts/compare_pdf_table_split.py`
+  reports the same tables as whole-PDF conversion on your PDFs;
+- `submit` returns at once; the caller extracts the text with fitz while the
+  tables are being recognised and collects them with `PendingTables.result()`;
+- `submit(..., pages=[...])` converts only those pages (e.g. the candidates of
+  table_detection.py), contiguous pages still going together;
+- every task is timed in the worker (`PendingTables.by_range()`).
+
+With MOPS_PDF_WORKERS=0 the tables are recognised in one background thread of
+the calling process (still with a single, reused converter).
+
+The engine is created on first use and lives as long as the process, so in the
+DAG executor every pipeline worker keeps its warm docling workers across DOIs.
+
+Configuration (environment):
+- MOPS_PDF_WORKERS: docling worker processes (default 2; 0 = in process)
+- MOPS_PDF_PAGES_PER_TASK: pages per docling task (default 0 = whole PDF)
+"""
+
+import inspect
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Iterable, List, Optional, Tuple
+
+DEFAULT_WORKERS = int(os.getenv("MOPS_PDF_WORKERS", "2"))
+DEFAULT_PAGES_PER_TASK = int(os.getenv("MOPS_PDF_PAGES_PER_TASK", "0"))
+
+# (first page, last page), 1-based and inclusive as docling takes it; None = whole PDF
+PageRange = Optional[Tuple[int, int]]
+
+# The converter of this process (a docling worker, or the caller with workers=0)
+_converter = None
+_converter_lock = threading.Lock()
+
+
+def _get_converter():
+    global _converter
+    with _converter_lock:
+        if _converter is None:
+            from docling.document_converter import DocumentConverter  # type: ignore
+
+            _converter = DocumentConverter()
+        return _converter
+
+
+def _init_worker() -> None:
+    # Load the models before the first task arrives
+    _get_converter()
+
+
+def supports_page_ranges() -> bool:
+    try:
+        from docling.document_converter import DocumentConverter  # type: ignore
+    except Exception:
+        return False
+    return "page_range" in inspect.signature(DocumentConverter.convert).parameters
+
+
+def tables_markdown(pdf_path: str, page_range: PageRange = None) -> List[str]:
+    """Markdown of each table docling finds in `pdf_path` (within `page_range`), in document order."""
+    converter = _get_converter()
+    if page_range is None:
+        res = converter.convert(pdf_path)
+    else:
+        res = converter.convert(pdf_path, page_range=page_range)
+    return [table.export_to_dataframe().to_markdown(index=False) for table in res.document.tables or []]
+
+
+def _timed_tables(tables_fn: Callable[[str, PageRange], List[str]], pdf_path: str, page_range: PageRange):
+    t0 = time.perf_counter()
+    tables = tables_fn(pdf_path, page_range)
+    return tables, time.perf_counter() - t0
+
+
+def page_ranges(num_pages: int, pages_per_task: int) -> List[PageRange]:
+    if num_pages <= 0 or pages_per_task <= 0 or num_pages <= pages_per_task:
+        return [None]
+    return [(start, min(start + pages_per_task - 1, num_pages)) for start in range(1, num_pages + 1, pages_per_task)]
+
+
+def subset_ranges(pages: Iterable[int], pages_per_task: int) -> List[PageRange]:
+    """Ranges covering exactly `pages` (1-based): runs of consecutive pages, split every `pages_per_task`."""
+    ranges: List[PageRange] = []
+    for page in sorted(set(pages)):
+        last = ranges[-1] if ranges else None
+        if last is not None and last[1] == page - 1 and (pages_per_task <= 0 or page - last[0] < pages_per_task):
+            ranges[-1] = (last[0], page)
+        else:
+            ranges.append((page, page))
+    return ranges
+
+
+def count_pages(pdf_path: str) -> int:
+    """Number of pages of `pdf_path` (0 if fitz cannot tell)."""
+    try:
+        import fitz  # PyMuPDF
+    except ImportError:
+        return 0
+    with fitz.open(pdf_path) as doc:
+        return len(doc)
+
+
+class PendingTables:
+    """Tables of one PDF being recognised; one future per page range."""
+
+    def __init__(self, ranges: List[PageRange], futures: List[Future]):
+        self.ranges = ranges
+        self._futures = futures
+
+    def by_range(self) -> List[Tuple[PageRange, List[str], float]]:
+        """(page range, its tables, seconds docling took) per task; raises if any range failed."""
+        out = []
+        for page_range, future in zip(self.ranges, self._futures):
+            tables, seconds = future.result()
+            out.append((page_range, tables, seconds))
+        return out
+
+    def result(self) -> List[str]:
+        """Markdown of every table in document order; raises if any range failed."""
+        return [table for _range, tables, _seconds in self.by_range() for table in tables]
+
+    def cancel(self) -> None:
+        for future in self._futures:
+            future.cancel()
+
+
+class TableExtractionEngine:
+    """Pool of docling converters shared by all PDFs of a process; see module docstring."""
+
+    def __init__(
+        self,
+        workers: int = DEFAULT_WORKERS,
+        pages_per_task: int = DEFAULT_PAGES_PER_TASK,
+        tables_fn: Callable[[str, PageRange], List[str]] = tables_markdown,
+        split_pages: Optional[bool] = None,
+    ):
+        self.workers = max(0, int(workers))
+        self.pages_per_task = int(pages_per_task)
+        self.tables_fn = tables_fn
+        # Older docling cannot convert a page range; those convert whole PDFs
+        self.split_pages = supports_page_ranges() if split_pages is None else split_pages
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+
+    def _pool(self) -> Executor:
+        with self._lock:
+            if self._executor is None:
+                if self.workers == 0:
+                    self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="docling")
+                else:
+                    # Spawn (not fork): docling/torch start threads of their own
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                        initializer=_init_worker if self.tables_fn is tables_markdown else None,
+                    )
+            return self._executor
+
+    def submit(
+        self, pdf_path: str, num_pages: Optional[int] = None, pages: Optional[Iterable[int]] = None
+    ) -> PendingTables:
+        """
+        Start recognising the tables of `pdf_path` (only on `pages`, 1-based, if
+        given); returns immediately. Without page-range support, `pages` is
+        ignored and the whole PDF is converted.
+        """
+        ranges: List[PageRange] = [None]
+        if self.split_pages:
+            if pages is not None:
+                ranges = subset_ranges(pages, self.pages_per_task)
+            else:
+                ranges = page_ranges(count_pages(pdf_path) if num_pages is None else num_pages, self.pages_per_task)
+        pool = self._pool()
+        return PendingTables(ranges, [pool.submit(_timed_tables, self.tables_fn, pdf_path, r) for r in ranges])
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True, cancel_futures=True)
+                self._executor = None
+
+
+_engine: Optional[TableExtractionEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_engine() -> TableExtractionEngine:
+    """The engine of this process, created on first use."""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = TableExtractionEngine()
+        return _engine
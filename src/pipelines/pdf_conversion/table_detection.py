@@ -0,0 +1,145 @@
+"""
+Cheap fitz pre-pass picking the PDF pages that may hold a table.
+
+docling's layout and table models are by far the slowest part of the PDF
+conversion step, yet most SI pages are spectra, figures or plain text. This
+pass looks at each page's vector drawings and text layout only (milliseconds
+per page) and scores three signals:
+
+- ruling lines: long horizontal or vertical strokes (lines or hairline
+  rectangles), as drawn around and between table rows;
+- aligned text columns: rows of three or more separate text pieces whose left
+  edges line up with those of other such rows;
+- a caption: a line starting with "Table 3", "Table S2", "TABLE 1", ...
+
+The weighted score is compared with a threshold (DEFAULT_THRESHOLD); pages at
+or above it are sent to docling as page ranges (engine.py), the others are
+skipped. The pipeline uses this with `"tables": "detected"` in the
+pdf_conversion step config; scripts/benchmark_table_detection.py measures the
+recall against converting every page.
+"""
+
+import re
+import time
+from collections import Counter
+from dataclasses import asdict, dataclass
+from typing import Any, Dict, List
+
+# `tables` step-config values: every page, detected pages only, no table pass
+TABLE_MODES = ("all", "detected", "none")
+
+DEFAULT_THRESHOLD = 0.3
+CAPTION_WEIGHT = 0.4
+RULING_WEIGHT = 0.3
+ALIGNED_WEIGHT = 0.3
+# Signal counts at which the ruling and column signals saturate
+FULL_RULINGS = 4
+FULL_ALIGNED_ROWS = 4
+
+# Rulings span at least this fraction of the page width (horizontal) or this many points (vertical)
+MIN_RULING_WIDTH = 0.2
+MIN_RULING_HEIGHT = 10.0
+HAIRLINE = 2.0
+# Text pieces within this many points vertically share a row; left edges are compared on this grid
+ROW_TOLERANCE = 3.0
+COLUMN_GRID = 4.0
+MIN_CELLS = 3
+
+_CAPTION = re.compile(r"^\s*table\s+s?\d+", re.IGNORECASE)
+
+
+@dataclass
+class PageScore:
+    page: int  # 1-based
+    score: float
+    rulings: int
+    aligned_rows: int
+    caption: bool
+    seconds: float
+    candidate: bool = False
+
+    def to_json(self) -> Dict[str, Any]:
+        out = asdict(self)
+        out["score"] = round(self.score, 3)
+        out["seconds"] = round(self.seconds, 4)
+        return out
+
+
+def count_rulings(page: Any) -> int:
+    """Long horizontal/vertical strokes among the page's vector drawings."""
+    min_width = MIN_RULING_WIDTH * page.rect.width
+    rulings = 0
+    for drawing in page.get_drawings():
+        for item in drawing.get("items", ()):
+            if item[0] == "l":
+                p1, p2 = item[1], item[2]
+                dx, dy = abs(p2.x - p1.x), abs(p2.y - p1.y)
+            elif item[0] == "re":
+                dx, dy = item[1].width, item[1].height
+            else:
+                continue
+            if (dy <= HAIRLINE and dx >= min_width) or (dx <= HAIRLINE and dy >= MIN_RULING_HEIGHT):
+                rulings += 1
+    return rulings
+
+
+def text_layout(page: Any):
+    """(rows of left edges of the text pieces sharing a row, text of every line)."""
+    pieces = []
+    texts = []
+    for block in page.get_text("dict").get("blocks", []) or []:
+        if block.get("type") not in (None, 0):
+            continue
+        for line in block.get("lines", []) or []:
+            text = "".join(span.get("text", "") for span in line.get("spans", []) or []).strip()
+            if not text:
+                continue
+            x0, y0, _x1, y1 = line["bbox"]
+            pieces.append(((y0 + y1) / 2, x0))
+            texts.append(text)
+    rows: List[List[float]] = []
+    last_y = None
+    for y, x0 in sorted(pieces):
+        if last_y is None or y - last_y > ROW_TOLERANCE:
+            rows.append([])
+        rows[-1].append(x0)
+        last_y = y
+    return rows, texts
+
+
+def count_aligned_rows(rows: List[List[float]]) -> int:
+    """Rows of MIN_CELLS+ pieces with at least MIN_CELLS left edges on columns shared with other such rows."""
+    multi = [{round(x / COLUMN_GRID) for x in row} for row in rows if len(row) >= MIN_CELLS]
+    columns = Counter(c for row in multi for c in row)
+    shared = {c for c, n in columns.items() if n >= MIN_CELLS}
+    return sum(1 for row in multi if len(row & shared) >= MIN_CELLS)
+
+
+def score_page(page: Any, page_number: int, threshold: float = DEFAULT_THRESHOLD) -> PageScore:
+    t0 = time.perf_counter()
+    rulings = count_rulings(page)
+    rows, texts = text_layout(page)
+    aligned = count_aligned_rows(rows)
+    caption = any(_CAPTION.match(t) for t in texts)
+    score = (
+        CAPTION_WEIGHT * caption
+        + RULING_WEIGHT * min(1.0, rulings / FULL_RULINGS)
+        + ALIGNED_WEIGHT * min(1.0, aligned / FULL_ALIGNED_ROWS)
+    )
+    return PageScore(
+        page=page_number,
+        score=score,
+        rulings=rulings,
+        aligned_rows=aligned,
+        caption=caption,
+        seconds=time.perf_counter() - t0,
+        candidate=score >= threshold,
+    )
+
+
+def detect_table_pages(pdf_path: str, threshold: float = DEFAULT_THRESHOLD) -> List[PageScore]:
+    """Score every page of `pdf_path`; `PageScore.candidate` marks the pages to send to docling."""
+    import fitz  # PyMuPDF
+
+    with fitz.open(pdf_path) as doc:
+        return [score_page(doc.load_page(i), i + 1, threshold) for i in range(len(doc))]
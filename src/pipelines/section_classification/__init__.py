@@ -1,6 +1,6 @@
 """Section Classification Pipeline Step"""
 
-from .classify import run_step
+from .classify import run_step, cache_spec
 
-__all__ = ['run_step']
+__all__ = ['run_step', 'cache_spec']
 
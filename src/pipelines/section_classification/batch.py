@@ -0,0 +1,161 @@
+"""Batched section classification via structured-output LLM calls.
+
+Instead of one ReAct agent run (and one `document` MCP server start) per section,
+all section titles and snippets are sent in one or a few structured-output calls.
+The returned keep/discard map is validated and written to sections.json once;
+sections the batch could not decide are left unclassified so the per-section
+agent can pick them up.
+"""
+
+import os
+import sys
+import json
+import asyncio
+from typing import Dict, List, Literal, Optional, Tuple
+
+from pydantic import BaseModel, Field
+
+# Add project root to path
+project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', '..'))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from models.LLMCreator import LLMCreator
+from models.ModelConfig import ModelConfig
+
+BATCH_SIZE = 40
+SNIPPET_CHARS = 600
+MAX_RETRIES = 2
+
+
+class SectionDecision(BaseModel):
+    section_index: int = Field(description="The number N from the 'Section N' key")
+    decision: Literal["keep", "discard"]
+
+
+class SectionDecisions(BaseModel):
+    decisions: List[SectionDecision]
+
+
+def _section_fields(section_data) -> Tuple[str, str, str]:
+    if isinstance(section_data, dict):
+        return (
+            section_data.get('title', 'Untitled'),
+            section_data.get('content', ''),
+            section_data.get('source', 'unknown'),
+        )
+    return 'Untitled', str(section_data), 'unknown'
+
+
+def build_batch_prompt(sections: Dict[str, object], snippet_chars: int = SNIPPET_CHARS) -> str:
+    """Render the classification prompt for one batch of sections."""
+    blocks = []
+    for section_key, section_data in sections.items():
+        title, content, source = _section_fields(section_data)
+        snippet = content[:snippet_chars] + ("..." if len(content) > snippet_chars else "")
+        blocks.append(
+            f"### {section_key}\n"
+            f"Title: {title}\n"
+            f"Source: {source}\n"
+            f"Snippet:\n{snippet}"
+        )
+    joined = "\n\n".join(blocks)
+    return f"""Please analyze the following sections from a scientific paper and decide for EACH section whether to KEEP or DISCARD it.
+
+Decision Criteria:
+- KEEP: Sections related to synthesis, characterization, properties, experimental methods, results, discussion of MOPs
+- DISCARD: References, acknowledgements, author information, copyright notices, table of contents
+
+Return exactly one decision per section, using the number N from its "Section N" heading as section_index.
+
+{joined}
+"""
+
+
+def validate_decisions(result: Optional[SectionDecisions], expected_keys: List[str]) -> Dict[str, str]:
+    """Turn an LLM result into a {section_key: keep|discard} map restricted to `expected_keys`.
+
+    Unknown indices are ignored; a section that receives conflicting decisions is left undecided.
+    """
+    expected = set(expected_keys)
+    decided: Dict[str, str] = {}
+    conflicted = set()
+    for item in (result.decisions if result is not None else []):
+        key = f"Section {item.section_index}"
+        if key not in expected:
+            continue
+        if key in decided and decided[key] != item.decision:
+            conflicted.add(key)
+        decided[key] = item.decision
+    for key in conflicted:
+        decided.pop(key, None)
+    return decided
+
+
+async def _classify_batch(llm, batch: Dict[str, object]) -> Dict[str, str]:
+    prompt = build_batch_prompt(batch)
+    for attempt in range(MAX_RETRIES):
+        try:
+            result = await llm.ainvoke(prompt)
+            return validate_decisions(result, list(batch.keys()))
+        except Exception as e:
+            print(f"    ✗ Batch classification attempt {attempt + 1}/{MAX_RETRIES} failed: {e}")
+    return {}
+
+
+async def classify_sections_batched(
+    sections_dict: dict,
+    sections_json_path: str,
+    llm=None,
+    batch_size: int = BATCH_SIZE,
+) -> Tuple[dict, List[str]]:
+    """
+    Classify all unclassified sections with a few structured-output LLM calls.
+
+    Args:
+        sections_dict: Dictionary of sections
+        sections_json_path: Path to sections JSON file (written once)
+        llm: Optional pre-built structured-output LLM (defaults to gpt-4.1)
+        batch_size: Maximum sections per LLM call
+
+    Returns:
+        (updated sections dictionary, keys of sections left undecided)
+    """
+    pending = {
+        key: data for key, data in sections_dict.items()
+        if not (isinstance(data, dict) and 'keep_or_discard' in data)
+    }
+    if not pending:
+        return sections_dict, []
+
+    if llm is None:
+        llm = LLMCreator(
+            model="gpt-4.1",
+            remote_model=True,
+            model_config=ModelConfig(temperature=0.2, top_p=0.02),
+            structured_output=True,
+            structured_output_schema=SectionDecisions,
+        ).setup_llm()
+
+    keys = list(pending.keys())
+    batches = [{k: pending[k] for k in keys[i:i + batch_size]} for i in range(0, len(keys), batch_size)]
+    print(f"    🔍 Classifying {len(keys)} sections in {len(batches)} batched call(s)...")
+    results = await asyncio.gather(*(_classify_batch(llm, b) for b in batches))
+
+    decided: Dict[str, str] = {}
+    for r in results:
+        decided.update(r)
+
+    updated = dict(sections_dict)
+    for key, option in decided.items():
+        if isinstance(updated[key], dict):
+            updated[key] = {**updated[key], "keep_or_discard": option}
+        else:
+            updated[key] = {"content": updated[key], "keep_or_discard": option}
+
+    with open(sections_json_path, 'w', encoding='utf-8') as f:
+        json.dump(updated, f, indent=2, ensure_ascii=False)
+
+    undecided = [k for k in keys if k not in decided]
+    print(f"    ✓ Batch decided {len(decided)}/{len(keys)} sections")
+    return updated, undecided
@@ -12,6 +12,7 @@ if project_root not in sys.path:
 
 from .division import divide_md_by_subsection
 from .agent import classify_sections_with_agent
+from .batch import classify_sections_batched
 
 
 def save_sections_json(sections_dict: dict, output_path: str) -> str:
@@ -38,13 +39,24 @@ def save_sections_json(sections_dict: dict, output_path: str) -> str:
     return output_path
 
 
-def classify_sections(doi_hash: str, data_dir: str) -> bool:
+async def _classify(sections_dict: dict, doi_hash: str, sections_json_path: str, mode: str) -> dict:
+    """Run the configured classifier; batched mode falls back to the agent for undecided sections."""
+    if mode == "batched":
+        sections_dict, undecided = await classify_sections_batched(sections_dict, sections_json_path)
+        if not undecided:
+            return sections_dict
+        print(f"    ↪️  Falling back to per-section agent for {len(undecided)} section(s)")
+    return await classify_sections_with_agent(sections_dict, doi_hash, sections_json_path)
+
+
+def classify_sections(doi_hash: str, data_dir: str, mode: str = "batched") -> bool:
     """
     Classify sections for a specific DOI hash.
     
     Args:
         doi_hash: The DOI hash identifier
         data_dir: Base data directory
+        mode: "batched" (structured-output calls + agent fallback) or "agent" (one agent run per section)
         
     Returns:
         True if classification succeeded
@@ -90,7 +102,7 @@ def classify_sections(doi_hash: str, data_dir: str) -> bool:
                 print(f"  🤖 Classifying sections with LLM...")
                 try:
                     updated_sections = asyncio.run(
-                        classify_sections_with_agent(sections_dict, doi_hash, sections_json_path)
+                        _classify(sections_dict, doi_hash, sections_json_path, mode)
                     )
                     print(f"    ✓ Classification completed")
                     return True
@@ -113,7 +125,7 @@ def classify_sections(doi_hash: str, data_dir: str) -> bool:
     print(f"  🤖 Classifying sections with LLM...")
     try:
         updated_sections = asyncio.run(
-            classify_sections_with_agent(sections_dict, doi_hash, sections_json_path)
+            _classify(sections_dict, doi_hash, sections_json_path, mode)
         )
         print(f"    ✓ Classification completed")
         return True
@@ -122,6 +134,22 @@ def classify_sections(doi_hash: str, data_dir: str) -> bool:
         return False
 
 
+def cache_spec(doi_hash: str, config: dict) -> dict:
+    """Inputs and outputs of this step for the step cache (src/pipelines/utils/step_cache.py)."""
+    doi_folder = os.path.join(config.get("data_dir", "data"), doi_hash)
+    step_dir = os.path.dirname(os.path.abspath(__file__))
+    return {
+        # Prompts and model settings are defined in the step's own modules
+        "inputs": [
+            os.path.join(doi_folder, f"{doi_hash}.md"),
+            os.path.join(doi_folder, f"{doi_hash}_si.md"),
+            os.path.join(step_dir, "*.py"),
+        ],
+        "config": {"mode": config.get("mode", "batched")},
+        "outputs": ["sections.json"],
+    }
+
+
 def run_step(doi_hash: str, config: dict) -> bool:
     """
     Main entry point for section classification step.
@@ -129,14 +157,16 @@ def run_step(doi_hash: str, config: dict) -> bool:
     Args:
         doi_hash: The DOI hash to process
         config: Pipeline configuration dictionary
+                (step_configs.section_classification.mode: "batched" | "agent")
         
     Returns:
         True if classification succeeded
     """
     data_dir = config.get("data_dir", "data")
+    mode = config.get("mode", "batched")
     
-    print(f"▶️  Section Classification: {doi_hash}")
-    success = classify_sections(doi_hash, data_dir)
+    print(f"▶️  Section Classification: {doi_hash} (mode: {mode})")
+    success = classify_sections(doi_hash, data_dir, mode=mode)
     
     if success:
         print(f"✅ Section Classification completed: {doi_hash}")
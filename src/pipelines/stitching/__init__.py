@@ -1,6 +1,6 @@
 """Stitching Pipeline Step"""
 
-from .stitch import run_step
+from .stitch import run_step, cache_spec
 
-__all__ = ['run_step']
+__all__ = ['run_step', 'cache_spec']
 
@@ -97,6 +97,15 @@ def stitch_markdown(doi_hash: str, data_dir: str) -> bool:
         return False
 
 
+def cache_spec(doi_hash: str, config: dict) -> dict:
+    """Inputs and outputs of this step for the step cache (src/pipelines/utils/step_cache.py)."""
+    doi_folder = os.path.join(config.get("data_dir", "data"), doi_hash)
+    return {
+        "inputs": [os.path.join(doi_folder, "sections.json"), os.path.abspath(__file__)],
+        "outputs": [f"{doi_hash}_stitched.md"],
+    }
+
+
 def run_step(doi_hash: str, config: dict) -> bool:
     """
     Main entry point for stitching step.
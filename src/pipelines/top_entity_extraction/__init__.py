@@ -1,6 +1,6 @@
 """Top Entity Extraction Pipeline Step"""
 
-from .extract import run_step
+from .extract import run_step, cache_spec
 
-__all__ = ['run_step']
+__all__ = ['run_step', 'cache_spec']
 
@@ -174,6 +174,21 @@ async def extract_top_entities(doi_hash: str, data_dir: str, ontology_name: str)
     return False
 
 
+def cache_spec(doi_hash: str, config: dict) -> dict:
+    """Inputs and outputs of this step for the step cache (src/pipelines/utils/step_cache.py)."""
+    doi_dir = os.path.join(config.get("data_dir", "data"), doi_hash)
+    ontology_name = load_meta_config().get("ontologies", {}).get("main", {}).get("name", "ontosynthesis")
+    return {
+        "inputs": [
+            os.path.join(doi_dir, f"{doi_hash}_stitched.md"),
+            resolve_generated_file(f"ai_generated_contents/prompts/{ontology_name}/EXTRACTION_ITER_1.md"),
+        ],
+        "models": [get_extraction_model("iter1_hints")],
+        "config": {"ontology": ontology_name},
+        "outputs": ["top_entities.txt", "iter1_full_prompt.md"],
+    }
+
+
 def run_step(doi_hash: str, config: dict) -> bool:
     """
     Main entry point for the top entity extraction pipeline step.
@@ -21,6 +21,7 @@ from models.BaseAgent import BaseAgent
 from models.ModelConfig import ModelConfig
 from src.utils.global_logger import get_logger
 from src.pipelines.utils.ttl_publisher import publish_top_ttl
+from src.utils.session_context import session_env
 
 logger = get_logger("pipeline", "top_entity_kg_building")
 
@@ -155,7 +156,8 @@ async def run_kg_building_agent(
         model_config=ModelConfig(temperature=temperature, top_p=top_p),
         remote_model=True,
         mcp_tools=mcp_tools,
-        mcp_set_name=mcp_set_name
+        mcp_set_name=mcp_set_name,
+        mcp_env=session_env(doi_hash, "top"),
     )
     
     logger.info(f"🚀 Running KG building agent for {doi_hash}")
@@ -483,6 +485,11 @@ def parse_top_entities_from_ttl(doi_hash: str, ontology_name: str, data_dir: str
         return False
 
 
+def stale_outputs(doi_hash: str, config: dict) -> List[str]:
+    """Files this step skips on; the step cache deletes them when an upstream step changed (src/pipelines/utils/step_cache.py)."""
+    return ["iteration_1.ttl", "output_top.ttl", "output.ttl", "memory/top.ttl", "exports/top_*.ttl"]
+
+
 def run_step(doi_hash: str, config: dict) -> bool:
     """
     Main entry point for the top entity KG building pipeline step.
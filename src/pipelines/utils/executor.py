@@ -0,0 +1,191 @@
+"""DAG step executor for generic_main.py ("mode": "dag").
+
+The per-DOI runner executes every step of one DOI before starting the next, so
+CPU-bound PDF conversion and I/O-bound LLM steps never overlap. This executor
+keeps many DOIs in flight at once and schedules each (DOI, step) pair as soon as
+that DOI's dependencies for the step have succeeded:
+
+- step dependencies come from `step_dependencies` in the pipeline config
+  ({step: [steps it needs]}); without it, `steps` is treated as a linear chain;
+- CPU-bound steps (`executor.cpu_steps`, default pdf_conversion + stitching) run
+  in a process pool;
+- all other steps are driven from one asyncio loop and run in worker threads
+  (their `run_step` functions are synchronous and call `asyncio.run` themselves),
+  each capped by its own `executor.step_concurrency` limit;
+- a failed or raising step only skips the steps of the same DOI that depend on it;
+- steps go through the step cache when `step_cache` is enabled (step_cache.py).
+
+The KG-building steps still coordinate with the generated MCP servers through
+one shared file, data/global_state.json (and <ontology>_global_state.json), which
+holds the hash and entity being built. Those steps (`executor.exclusive_steps`,
+default GLOBAL_STATE_STEPS) share one lock: across all DOIs in flight only one of
+them runs at a time, whatever their `step_concurrency`.
+"""
+
+import asyncio
+import contextlib
+import multiprocessing
+import os
+import traceback
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from .loader import load_step_module
+from .step_cache import StepCache, run_cached_step
+
+CPU_BOUND_STEPS = ["pdf_conversion", "stitching"]
+# Steps that write the global state file the generated MCP servers read
+GLOBAL_STATE_STEPS = ["top_entity_kg_building", "main_kg_building", "extensions_kg_building"]
+DEFAULT_STEP_CONCURRENCY = 4
+DEFAULT_MAX_DOIS_IN_FLIGHT = 4
+DEFAULT_PROCESS_WORKERS = 2
+
+
+def resolve_dependencies(steps: List[str], declared: Optional[Dict[str, List[str]]] = None) -> Dict[str, List[str]]:
+    """
+    Build {step: [dependencies]} for `steps`.
+
+    Without `declared`, each step depends on the one before it. Dependencies on
+    steps that are not part of this run (e.g. filtered out by --iter1) are dropped.
+
+    Raises:
+        ValueError: If the dependencies contain a cycle
+    """
+    if declared is None:
+        deps = {step: ([steps[i - 1]] if i > 0 else []) for i, step in enumerate(steps)}
+    else:
+        deps = {step: [d for d in declared.get(step, []) if d in steps and d != step] for step in steps}
+
+    # Kahn's algorithm, only to reject cycles before anything is started
+    remaining = {step: set(d) for step, d in deps.items()}
+    while remaining:
+        ready = [step for step, d in remaining.items() if not d]
+        if not ready:
+            raise ValueError(f"Cyclic step dependencies: {sorted(remaining)}")
+        for step in ready:
+            del remaining[step]
+        for d in remaining.values():
+            d.difference_update(ready)
+    return deps
+
+
+def topological_order(steps: List[str], deps: Dict[str, List[str]]) -> List[str]:
+    """Order steps so that dependencies come first, keeping config order among ready steps."""
+    ordered: List[str] = []
+    done = set()
+    while len(ordered) < len(steps):
+        for step in steps:
+            if step not in done and all(d in done for d in deps[step]):
+                ordered.append(step)
+                done.add(step)
+                break
+    return ordered
+
+
+def _run_step(step_name: str, doi_hash: str, step_config: dict, cache_config: Optional[dict] = None,
+              upstream: Optional[List[str]] = None) -> bool:
+    """Load and run one step; module-level so it can be sent to a worker process."""
+    step_module = load_step_module(step_name)
+    if not step_module:
+        print(f"[FAIL] Missing step module '{step_name}' for {doi_hash}")
+        return False
+    cache = StepCache.from_config(cache_config, step_config.get("data_dir", "data"))
+    return run_cached_step(step_name, step_module, doi_hash, step_config, cache, upstream)
+
+
+class DagExecutor:
+    """Runs the configured steps for many DOIs concurrently; see module docstring."""
+
+    def __init__(
+        self,
+        steps: List[str],
+        build_step_config: Callable[[str], dict],
+        dependencies: Optional[Dict[str, List[str]]] = None,
+        executor_config: Optional[dict] = None,
+        data_dir: str = "data",
+        cache_config: Optional[dict] = None,
+    ):
+        executor_config = executor_config or {}
+        self.steps = list(steps)
+        self.deps = resolve_dependencies(self.steps, dependencies)
+        self.order = topological_order(self.steps, self.deps)
+        self.build_step_config = build_step_config
+        self.data_dir = data_dir
+        self.cache_config = cache_config
+        self.cpu_steps = set(executor_config.get("cpu_steps", CPU_BOUND_STEPS))
+        self.max_dois_in_flight = max(1, int(executor_config.get("max_dois_in_flight", DEFAULT_MAX_DOIS_IN_FLIGHT)))
+        self.process_workers = max(1, int(executor_config.get("process_workers", DEFAULT_PROCESS_WORKERS)))
+        self.exclusive_steps = set(executor_config.get("exclusive_steps", GLOBAL_STATE_STEPS))
+
+        configured = executor_config.get("step_concurrency", {})
+        self.step_concurrency: Dict[str, int] = {}
+        for step in self.steps:
+            default = 1 if step in self.exclusive_steps else DEFAULT_STEP_CONCURRENCY
+            if step in self.cpu_steps:
+                default = self.process_workers
+            self.step_concurrency[step] = max(1, int(configured.get(step, default)))
+
+    # ── scheduling ──
+    async def _step_task(self, doi_hash: str, step: str, dep_tasks: List[asyncio.Task]) -> bool:
+        for dep_task in dep_tasks:
+            if not await dep_task:
+                print(f"[SKIP] {doi_hash}: '{step}' skipped because a dependency failed")
+                return False
+
+        loop = asyncio.get_running_loop()
+        exclusive = self._exclusive_lock if step in self.exclusive_steps else contextlib.nullcontext()
+        async with self._semaphores[step], exclusive:
+            print(f"\n📍 [{doi_hash}] Step: {step}")
+            try:
+                step_config = self.build_step_config(step)
+                pool = self._process_pool if step in self.cpu_steps else self._thread_pool
+                success = await loop.run_in_executor(pool, _run_step, step, doi_hash, step_config, self.cache_config, self.deps[step])
+            except Exception as e:
+                print(f"[ERROR] Step '{step}' raised exception for {doi_hash}: {e}")
+                traceback.print_exc()
+                success = False
+
+        if not success:
+            print(f"[FAIL] Step '{step}' failed for {doi_hash}")
+        return success
+
+    async def _run_doi(self, doi_hash: str, progress=None) -> bool:
+        async with self._doi_semaphore:
+            os.makedirs(os.path.join(self.data_dir, doi_hash), exist_ok=True)
+            print(f"\n[OK] {doi_hash}: started ({len(self.order)} steps)")
+
+            tasks: Dict[str, asyncio.Task] = {}
+            for step in self.order:
+                tasks[step] = asyncio.create_task(
+                    self._step_task(doi_hash, step, [tasks[d] for d in self.deps[step]])
+                )
+            results = await asyncio.gather(*tasks.values())
+            success = all(results)
+
+            print(f"\n{'='*60}")
+            print(f"Completed: {doi_hash}" + ("" if success else " (with failures)"))
+            print(f"{'='*60}")
+            if progress is not None:
+                progress.set_postfix_str(f"last: {doi_hash}")
+                progress.update(1)
+            return success
+
+    async def _run_all(self, doi_hashes: List[str], progress=None) -> bool:
+        self._semaphores = {step: asyncio.Semaphore(n) for step, n in self.step_concurrency.items()}
+        self._exclusive_lock = asyncio.Lock()
+        self._doi_semaphore = asyncio.Semaphore(self.max_dois_in_flight)
+        results = await asyncio.gather(*(self._run_doi(h, progress) for h in doi_hashes))
+        return all(results)
+
+    def run(self, doi_hashes: List[str], progress=None) -> bool:
+        """Process all DOIs; returns True only if every step succeeded for every DOI."""
+        thread_workers = sum(n for step, n in self.step_concurrency.items() if step not in self.cpu_steps) or 1
+        # Spawn (not fork): the process is multi-threaded by the time CPU steps are submitted
+        with ProcessPoolExecutor(
+            max_workers=self.process_workers, mp_context=multiprocessing.get_context("spawn")
+        ) as process_pool, ThreadPoolExecutor(
+            max_workers=thread_workers, thread_name_prefix="pipeline-step"
+        ) as thread_pool:
+            self._process_pool = process_pool
+            self._thread_pool = thread_pool
+            return asyncio.run(self._run_all(doi_hashes, progress))
@@ -0,0 +1,114 @@
+"""Concurrent per-entity scheduling for pipeline steps.
+
+Entities of one paper are independent of each other within an iteration, so
+their work (e.g. pre-extraction -> extraction, or one KG-building agent run) can
+run side by side. Each entity's chain stays sequential; only different entities
+overlap. Concurrency is capped by a semaphore, and every LLM/agent call can first
+take a token from a per-model token bucket so a burst of entities cannot exceed
+the provider's rate limit. Results are returned in input order regardless of
+completion order.
+"""
+
+import asyncio
+import time
+from typing import Awaitable, Callable, Dict, Hashable, List, Optional, Sequence, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+DEFAULT_MAX_CONCURRENCY = 4
+
+
+class TokenBucket:
+    """
+    Async token bucket: `capacity` tokens, refilled at `rate` tokens per second.
+
+    A caller that finds the bucket empty reserves its token anyway (the balance
+    goes negative) and sleeps until the refill covers it, so waiters are served
+    in arrival order without a lock and the bucket is not tied to one event loop.
+    """
+
+    def __init__(self, rate: float, capacity: Optional[float] = None, clock: Callable[[], float] = time.monotonic):
+        if rate <= 0:
+            raise ValueError(f"Token bucket rate must be positive, got {rate}")
+        self.rate = float(rate)
+        self.capacity = float(capacity) if capacity else max(1.0, self.rate)
+        self._tokens = self.capacity
+        self._clock = clock
+        self._updated = clock()
+
+    def reserve(self, tokens: float = 1.0) -> float:
+        """Take `tokens` now and return how many seconds the caller must wait before using them."""
+        now = self._clock()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        self._tokens -= tokens
+        return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    async def acquire(self, tokens: float = 1.0) -> None:
+        """Wait until `tokens` are available, then take them."""
+        delay = self.reserve(tokens)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class ModelRateLimiter:
+    """
+    One token bucket per model name.
+
+    `limits` maps a model name (or "default") to a requests-per-minute budget.
+    Models without an entry and no "default" are not throttled.
+    """
+
+    def __init__(self, limits: Optional[Dict[str, float]] = None, burst: Optional[int] = None):
+        self.limits = dict(limits or {})
+        self.burst = burst
+        self._buckets: Dict[str, Optional[TokenBucket]] = {}
+
+    def _bucket(self, model: str) -> Optional[TokenBucket]:
+        if model not in self._buckets:
+            rpm = self.limits.get(model, self.limits.get("default"))
+            self._buckets[model] = TokenBucket(float(rpm) / 60.0, self.burst) if rpm else None
+        return self._buckets[model]
+
+    async def acquire(self, model: str) -> None:
+        bucket = self._bucket(model)
+        if bucket is not None:
+            await bucket.acquire()
+
+
+async def run_bounded(
+    items: Sequence[T],
+    worker: Callable[[T], Awaitable[R]],
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    key: Optional[Callable[[T], Hashable]] = None,
+) -> List[R]:
+    """
+    Run `worker(item)` for every item with at most `max_concurrency` in flight.
+
+    Items with the same `key` (e.g. entities that map to the same output file)
+    run one after another in input order, as they would in a serial loop.
+    Returns the results in the order of `items`. Exceptions raised by a worker
+    are returned in its slot instead of cancelling the other workers.
+    """
+    semaphore = asyncio.Semaphore(max(1, int(max_concurrency or 1)))
+    groups: Dict[Hashable, List[int]] = {}
+    for index, item in enumerate(items):
+        groups.setdefault(key(item) if key else index, []).append(index)
+    results: List = [None] * len(items)
+
+    async def _run_group(indices: List[int]) -> None:
+        async with semaphore:
+            for index in indices:
+                try:
+                    results[index] = await worker(items[index])
+                except Exception as e:
+                    results[index] = e
+
+    await asyncio.gather(*(_run_group(indices) for indices in groups.values()))
+    return results
+
+
+def build_rate_limiter(config: dict) -> ModelRateLimiter:
+    """Build the limiter from step config (`rate_limits`: {model|"default": rpm}, `rate_limit_burst`)."""
+    return ModelRateLimiter(config.get("rate_limits"), config.get("rate_limit_burst"))
@@ -0,0 +1,385 @@
+"""Content-addressed cache for pipeline step outputs.
+
+The steps only check "output exists -> skip", which goes stale when a prompt,
+model, T-Box or step config changes. A step opts into caching by exposing
+
+    cache_spec(doi_hash, config) -> {
+        "inputs":  [file paths or glob patterns],  # paper files, prompts, T-Boxes, configs
+        "texts":   [inline prompt text],
+        "models":  [model names],
+        "config":  {settings that change the output},
+        "outputs": [glob patterns relative to data/<doi_hash>/],
+    }
+
+next to its `run_step`. `run_cached_step` hashes everything that goes into the
+step into a key and:
+
+- keeps the step's own skip logic when the key matches the one recorded for the
+  DOI (`data/<doi_hash>/.step_cache/<step>.json`);
+- removes the recorded outputs (and so the step's done markers) when the key
+  changed, so only steps whose inputs changed are recomputed;
+- restores outputs from `<root>/<step>/<key>/` before running the step, and
+  stores them after a successful run. Files are copied both ways, so a step that
+  rewrites its outputs in place never changes a cache entry.
+
+Every record also carries the keys recorded for the step's upstream steps (the
+DAG dependencies, or the preceding steps in sequential mode). Cached steps hash
+them into their key. Steps without `cache_spec` (the agent-driven KG-building and
+derivation steps) are keyed on them alone. When that upstream key changes, such a
+step deletes the files listed by its optional
+
+    stale_outputs(doi_hash, config) -> [glob patterns relative to data/<doi_hash>/]
+
+(its done markers and the per-entity files it skips on) before it runs. A restored
+or recomputed upstream step therefore never leaves a stale downstream output behind.
+
+Each entry has a `manifest.json` with the sha256 of every file; restore verifies
+the hashes and drops entries that no longer match. `gc()` evicts least recently
+used entries above `max_bytes`; it runs after a store at most every
+`gc_interval` seconds (tracked across processes by the mtime of `<root>/.last_gc`).
+
+Enabled by the pipeline config:
+
+    "step_cache": {"enabled": true, "root": "data/cache/steps", "max_bytes": 10737418240,
+                   "gc_interval": 600}
+"""
+
+import glob
+import hashlib
+import json
+import os
+import shutil
+import time
+from typing import Dict, List, Optional
+
+CACHE_VERSION = 2
+DEFAULT_MAX_BYTES = 10 * 1024 ** 3
+DEFAULT_GC_INTERVAL = 600
+MANIFEST_NAME = "manifest.json"
+RECORD_DIR = ".step_cache"
+GC_STAMP_NAME = ".last_gc"
+
+# Keys of the step config that do not change a step's output
+_IGNORED_CONFIG_KEYS = {"data_dir"}
+
+
+def hash_file(path: str) -> str:
+    """sha256 hex digest of a file's content."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def expand_patterns(patterns: List[str], base_dir: Optional[str] = None) -> List[str]:
+    """Expand file paths / glob patterns (`**` is recursive) to existing files, sorted."""
+    found = set()
+    for pattern in patterns or []:
+        full = os.path.join(base_dir, pattern) if base_dir else pattern
+        for path in glob.glob(full, recursive=True):
+            if os.path.isfile(path):
+                found.add(os.path.normpath(path))
+    return sorted(found)
+
+
+def _copy(src: str, dst: str) -> None:
+    os.makedirs(os.path.dirname(dst) or ".", exist_ok=True)
+    if os.path.lexists(dst):
+        os.remove(dst)
+    shutil.copy2(src, dst)
+
+
+def _rel(path: str, doi_folder: str) -> str:
+    """Path used in keys and manifests: relative to the DOI folder when inside it."""
+    path = os.path.normpath(path)
+    folder = os.path.normpath(doi_folder)
+    if path == folder or path.startswith(folder + os.sep):
+        return "@doi/" + os.path.relpath(path, folder).replace(os.sep, "/")
+    return path.replace(os.sep, "/")
+
+
+class StepCache:
+    """Content-addressed store of step outputs; see module docstring."""
+
+    def __init__(self, root: str, max_bytes: int = DEFAULT_MAX_BYTES, gc_interval: float = DEFAULT_GC_INTERVAL):
+        self.root = root
+        self.max_bytes = int(max_bytes)
+        self.gc_interval = float(gc_interval)
+
+    @classmethod
+    def from_config(cls, cache_config: Optional[dict], data_dir: str = "data") -> Optional["StepCache"]:
+        """Build a cache from the pipeline's `step_cache` section; None when disabled."""
+        if not cache_config or not cache_config.get("enabled", False):
+            return None
+        root = cache_config.get("root") or os.path.join(data_dir, "cache", "steps")
+        return cls(
+            root,
+            cache_config.get("max_bytes", DEFAULT_MAX_BYTES),
+            cache_config.get("gc_interval", DEFAULT_GC_INTERVAL),
+        )
+
+    # ── keys ──
+    def key(self, step_name: str, doi_hash: str, spec: dict, doi_folder: str) -> str:
+        """Hash of everything that determines the step's outputs."""
+        inputs = []
+        for path in expand_patterns(spec.get("inputs", [])):
+            inputs.append([_rel(path, doi_folder), hash_file(path)])
+        config = {k: v for k, v in (spec.get("config") or {}).items() if k not in _IGNORED_CONFIG_KEYS}
+        payload = {
+            "version": CACHE_VERSION,
+            "step": step_name,
+            "doi": doi_hash,
+            "inputs": inputs,
+            "texts": [hashlib.sha256(t.encode("utf-8")).hexdigest() for t in spec.get("texts", [])],
+            "models": list(spec.get("models", [])),
+            "config": config,
+            "upstream": spec.get("upstream"),
+        }
+        blob = json.dumps(payload, sort_keys=True, default=str).encode("utf-8")
+        return hashlib.sha256(blob).hexdigest()
+
+    def _entry_dir(self, step_name: str, key: str) -> str:
+        return os.path.join(self.root, step_name, key)
+
+    def lookup(self, step_name: str, key: str) -> Optional[dict]:
+        """Manifest of a cached entry, or None."""
+        manifest_path = os.path.join(self._entry_dir(step_name, key), MANIFEST_NAME)
+        try:
+            with open(manifest_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    # ── restore / store ──
+    def restore(self, step_name: str, key: str, doi_folder: str) -> bool:
+        """Copy a cached entry's files into `doi_folder`; False on miss or a corrupted entry."""
+        manifest = self.lookup(step_name, key)
+        if not manifest:
+            return False
+        entry = self._entry_dir(step_name, key)
+        files_dir = os.path.join(entry, "files")
+
+        for item in manifest.get("files", []):
+            src = os.path.join(files_dir, item["path"])
+            try:
+                ok = os.path.getsize(src) == item["size"] and hash_file(src) == item["sha256"]
+            except OSError:
+                ok = False
+            if not ok:
+                print(f"  ⚠️  Step cache entry {step_name}/{key[:12]} is corrupted, dropping it")
+                shutil.rmtree(entry, ignore_errors=True)
+                return False
+
+        for item in manifest.get("files", []):
+            _copy(os.path.join(files_dir, item["path"]), os.path.join(doi_folder, item["path"]))
+
+        manifest["last_used"] = time.time()
+        self._write_manifest(entry, manifest)
+        return True
+
+    def store(self, step_name: str, key: str, doi_folder: str, outputs: List[str]) -> Optional[dict]:
+        """Add the step's outputs to the cache; returns the manifest, or None if nothing matched."""
+        paths = expand_patterns(outputs, doi_folder)
+        paths = [p for p in paths if RECORD_DIR not in os.path.relpath(p, doi_folder).split(os.sep)]
+        if not paths:
+            return None
+
+        existing = self.lookup(step_name, key)
+        if existing:
+            return existing
+
+        step_dir = os.path.join(self.root, step_name)
+        tmp = os.path.join(step_dir, f".tmp-{key}-{os.getpid()}-{time.time_ns()}")
+        files = []
+        try:
+            for path in paths:
+                rel = os.path.relpath(path, doi_folder).replace(os.sep, "/")
+                _copy(path, os.path.join(tmp, "files", rel))
+                files.append({"path": rel, "sha256": hash_file(path), "size": os.path.getsize(path)})
+            manifest = {
+                "version": CACHE_VERSION,
+                "step": step_name,
+                "key": key,
+                "created": time.time(),
+                "last_used": time.time(),
+                "files": files,
+            }
+            self._write_manifest(tmp, manifest)
+            try:
+                os.rename(tmp, self._entry_dir(step_name, key))
+            except OSError:
+                # Another worker stored the same key first
+                shutil.rmtree(tmp, ignore_errors=True)
+            return manifest
+        except OSError as e:
+            print(f"  ⚠️  Failed to store {step_name} outputs in step cache: {e}")
+            shutil.rmtree(tmp, ignore_errors=True)
+            return None
+
+    @staticmethod
+    def _write_manifest(entry_dir: str, manifest: dict) -> None:
+        os.makedirs(entry_dir, exist_ok=True)
+        tmp_path = os.path.join(entry_dir, MANIFEST_NAME + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, os.path.join(entry_dir, MANIFEST_NAME))
+
+    # ── eviction ──
+    def entries(self) -> List[dict]:
+        """All complete entries as {"dir", "size", "last_used"}."""
+        result = []
+        if not os.path.isdir(self.root):
+            return result
+        for step_name in sorted(os.listdir(self.root)):
+            step_dir = os.path.join(self.root, step_name)
+            if not os.path.isdir(step_dir):
+                continue
+            for key in os.listdir(step_dir):
+                if key.startswith("."):
+                    continue
+                manifest = self.lookup(step_name, key)
+                entry = os.path.join(step_dir, key)
+                if manifest is None:
+                    result.append({"dir": entry, "size": 0, "last_used": 0.0, "incomplete": True})
+                    continue
+                size = sum(item.get("size", 0) for item in manifest.get("files", []))
+                result.append({"dir": entry, "size": size, "last_used": manifest.get("last_used", 0.0)})
+        return result
+
+    def gc(self, max_bytes: Optional[int] = None) -> int:
+        """Drop incomplete entries and evict LRU entries until the cache fits; returns bytes freed."""
+        limit = self.max_bytes if max_bytes is None else int(max_bytes)
+        entries = self.entries()
+        freed = 0
+        for entry in [e for e in entries if e.get("incomplete")]:
+            shutil.rmtree(entry["dir"], ignore_errors=True)
+        entries = sorted((e for e in entries if not e.get("incomplete")), key=lambda e: e["last_used"])
+        total = sum(e["size"] for e in entries)
+        for entry in entries:
+            if total <= limit:
+                break
+            shutil.rmtree(entry["dir"], ignore_errors=True)
+            total -= entry["size"]
+            freed += entry["size"]
+        return freed
+
+    def maybe_gc(self) -> int:
+        """Run `gc()` unless it ran less than `gc_interval` seconds ago; returns bytes freed."""
+        stamp = os.path.join(self.root, GC_STAMP_NAME)
+        try:
+            if time.time() - os.path.getmtime(stamp) < self.gc_interval:
+                return 0
+        except OSError:
+            pass
+        os.makedirs(self.root, exist_ok=True)
+        with open(stamp, "w", encoding="utf-8") as f:
+            f.write(str(time.time()))
+        return self.gc()
+
+
+# ── per-DOI records ──
+def _record_path(doi_folder: str, step_name: str) -> str:
+    return os.path.join(doi_folder, RECORD_DIR, f"{step_name}.json")
+
+
+def read_record(doi_folder: str, step_name: str) -> Optional[dict]:
+    """Key and outputs of the last cached run of `step_name` for this DOI, or None."""
+    try:
+        with open(_record_path(doi_folder, step_name), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def write_record(doi_folder: str, step_name: str, key: str, outputs: List[str]) -> None:
+    path = _record_path(doi_folder, step_name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"key": key, "outputs": outputs, "updated": time.time()}, f, indent=2)
+
+
+def upstream_key(doi_folder: str, upstream: Optional[List[str]]) -> str:
+    """Hash of the keys recorded for the upstream steps of this DOI (None for steps without a record)."""
+    keys = {}
+    for step_name in sorted(upstream or []):
+        record = read_record(doi_folder, step_name)
+        keys[step_name] = record.get("key") if record else None
+    return hashlib.sha256(json.dumps(keys, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def remove_outputs(doi_folder: str, outputs: List[str]) -> int:
+    """Delete previously recorded output files; returns how many were removed."""
+    removed = 0
+    for rel in outputs:
+        path = os.path.join(doi_folder, rel)
+        if os.path.isfile(path):
+            os.remove(path)
+            removed += 1
+    return removed
+
+
+def _run_uncached_step(step_name: str, step_module, doi_hash: str, step_config: dict, doi_folder: str, key: str) -> bool:
+    """Run a step without `cache_spec`, first deleting its `stale_outputs` when the upstream key changed."""
+    stale_fn = getattr(step_module, "stale_outputs", None)
+    record = read_record(doi_folder, step_name)
+    if record and record.get("key") != key:
+        patterns = stale_fn(doi_hash, step_config) if stale_fn else []
+        stale = [os.path.relpath(p, doi_folder) for p in expand_patterns(patterns, doi_folder)]
+        removed = remove_outputs(doi_folder, stale)
+        print(f"  ♻️  {step_name}: upstream outputs changed, removed {removed} stale output(s)")
+
+    success = bool(step_module.run_step(doi_hash, step_config))
+    if success:
+        write_record(doi_folder, step_name, key, [])
+    return success
+
+
+def run_cached_step(step_name: str, step_module, doi_hash: str, step_config: dict,
+                    cache: Optional[StepCache] = None, upstream: Optional[List[str]] = None) -> bool:
+    """
+    Run `step_module.run_step` through the step cache.
+
+    `upstream` names the steps this one depends on. Runs without a cache call
+    `run_step` directly; steps without `cache_spec` only track the upstream key.
+    """
+    if cache is None:
+        return bool(step_module.run_step(doi_hash, step_config))
+
+    doi_folder = os.path.join(step_config.get("data_dir", "data"), doi_hash)
+    upstream_hash = upstream_key(doi_folder, upstream)
+    spec_fn = getattr(step_module, "cache_spec", None)
+    if spec_fn is None:
+        return _run_uncached_step(step_name, step_module, doi_hash, step_config, doi_folder, upstream_hash)
+
+    try:
+        spec = spec_fn(doi_hash, step_config)
+        key = cache.key(step_name, doi_hash, dict(spec, upstream=upstream_hash), doi_folder) if spec else None
+    except Exception as e:
+        print(f"  ⚠️  {step_name}: cache spec unavailable ({e}), running uncached")
+        key = None
+    if key is None:
+        return bool(step_module.run_step(doi_hash, step_config))
+
+    record = read_record(doi_folder, step_name)
+    if record and record.get("key") == key:
+        # Outputs on disk were produced from these exact inputs
+        return bool(step_module.run_step(doi_hash, step_config))
+
+    if record:
+        removed = remove_outputs(doi_folder, record.get("outputs", []))
+        print(f"  ♻️  {step_name}: inputs changed, removed {removed} stale output(s)")
+
+    manifest = cache.lookup(step_name, key)
+    if manifest and cache.restore(step_name, key, doi_folder):
+        write_record(doi_folder, step_name, key, [item["path"] for item in manifest.get("files", [])])
+        print(f"  ⚡ {step_name}: restored {len(manifest.get('files', []))} file(s) from step cache")
+        return True
+
+    success = bool(step_module.run_step(doi_hash, step_config))
+    if success:
+        manifest = cache.store(step_name, key, doi_folder, spec.get("outputs", []))
+        outputs = [item["path"] for item in manifest.get("files", [])] if manifest else []
+        write_record(doi_folder, step_name, key, outputs)
+        cache.maybe_gc()
+    return success
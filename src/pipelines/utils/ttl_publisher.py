@@ -18,6 +18,8 @@ import shutil
 from dataclasses import dataclass
 from typing import Iterable, Optional
 
+from src.utils.resident_graph import sync_memory_file
+
 
 @dataclass(frozen=True)
 class OutputNamingConfig:
@@ -124,6 +126,7 @@ def publish_ttl(
     dest_path = os.path.join(out_dir, out_name)
 
     mem_path = os.path.join(doi_folder, "memory", f"{entity_safe}.ttl")
+    sync_memory_file(mem_path)
     exports_dir = os.path.join(doi_folder, "exports")
     exp_path = _latest_export(exports_dir=exports_dir, prefix=entity_safe)
 
@@ -166,6 +169,7 @@ def publish_top_ttl(
     dest_path = os.path.join(out_dir, naming.top_ttl_name)
 
     mem_path = os.path.join(doi_folder, "memory", "top.ttl")
+    sync_memory_file(mem_path)
     exports_dir = os.path.join(doi_folder, "exports")
     exp_path = _latest_export(exports_dir=exports_dir, prefix="top")
 
@@ -0,0 +1,348 @@
+"""
+Resident, journaled memory graphs for the ontology MCP servers.
+
+The MCP servers (ontomops_extension, ontospecies_extension and the generated
+`universal_utils.locked_graph`) persist one A-Box per (hash, entity) as a Turtle
+file. Parsing and re-serializing that file on every tool call makes a KG-building
+run quadratic in the size of the A-Box, so this module keeps the parsed graph in
+process instead:
+
+- mutations made inside `ResidentGraphStore.open()` are appended to a JSON-lines
+  journal next to the TTL (`<entity>.ttl.journal`) when the block exits cleanly,
+  and rolled back in memory when it raises;
+- the TTL is rewritten (and the journal truncated) when the flush interval has
+  elapsed, on `open(..., flush=True)` (used by `export_memory`), on LRU eviction
+  and at interpreter shutdown;
+- on load, a non-empty journal is replayed on top of the TTL, so a crashed server
+  loses nothing that was acknowledged to the agent;
+- the per-file `FileLock` is still taken for every call, and the TTL/journal
+  stat is compared against what this process last saw, so a second process
+  writing the same memory file forces a reload instead of a lost update.
+
+Configuration (environment):
+- MOPS_MEMORY_FLUSH_INTERVAL: seconds between TTL rewrites (default 5; 0 = write-through)
+- MOPS_MEMORY_MAX_GRAPHS: resident graphs kept per process (default 8)
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from filelock import FileLock
+from rdflib import BNode, Graph, Literal, URIRef
+
+JOURNAL_SUFFIX = ".journal"
+
+DEFAULT_FLUSH_INTERVAL = float(os.getenv("MOPS_MEMORY_FLUSH_INTERVAL", "5"))
+DEFAULT_MAX_GRAPHS = int(os.getenv("MOPS_MEMORY_MAX_GRAPHS", "8"))
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Journal encoding
+# ----------------------------------------------------------------------------------------------------------------------
+
+def _encode_term(term) -> dict:
+    if isinstance(term, URIRef):
+        return {"u": str(term)}
+    if isinstance(term, BNode):
+        return {"b": str(term)}
+    if isinstance(term, Literal):
+        out = {"l": str(term)}
+        if term.language:
+            out["lang"] = term.language
+        if term.datatype:
+            out["dt"] = str(term.datatype)
+        return out
+    raise TypeError(f"Unsupported RDF term in journal: {term!r}")
+
+
+def _decode_term(data: dict):
+    if "u" in data:
+        return URIRef(data["u"])
+    if "b" in data:
+        return BNode(data["b"])
+    return Literal(data["l"], lang=data.get("lang"), datatype=URIRef(data["dt"]) if data.get("dt") else None)
+
+
+def _encode_op(op: str, triple) -> str:
+    return json.dumps({"op": op, "t": [_encode_term(x) for x in triple]}, ensure_ascii=False)
+
+
+def replay_journal(g: Graph, journal_path: str) -> int:
+    """Apply every complete journal record to `g`. Returns the number of records applied.
+
+    A torn last line (crash mid-write) is ignored.
+    """
+    if not os.path.exists(journal_path):
+        return 0
+    applied = 0
+    with open(journal_path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                rec = json.loads(line)
+                triple = tuple(_decode_term(x) for x in rec["t"])
+            except Exception:
+                continue
+            if rec.get("op") == "+":
+                g.add(triple)
+            elif rec.get("op") == "-":
+                g.remove(triple)
+            else:
+                continue
+            applied += 1
+    return applied
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Journaled graph
+# ----------------------------------------------------------------------------------------------------------------------
+
+class JournaledGraph(Graph):
+    """rdflib Graph that records effective add/remove operations while a transaction is open.
+
+    Only triples that actually change the graph are recorded, so a rollback (undo in reverse
+    order) restores the exact previous state.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._pending: Optional[List[Tuple[str, tuple]]] = None
+
+    def begin(self) -> None:
+        self._pending = []
+
+    def take_pending(self) -> List[Tuple[str, tuple]]:
+        pending, self._pending = self._pending or [], None
+        return pending
+
+    def rollback(self) -> None:
+        pending = self.take_pending()
+        for op, triple in reversed(pending):
+            if op == "+":
+                Graph.remove(self, triple)
+            else:
+                Graph.add(self, triple)
+
+    def add(self, triple):
+        is_new = self._pending is not None and triple not in self
+        super().add(triple)
+        if is_new:
+            self._pending.append(("+", triple))
+        return self
+
+    def addN(self, quads):  # noqa: N802
+        if self._pending is None:
+            return super().addN(quads)
+        for s, p, o, _ in quads:
+            self.add((s, p, o))
+        return self
+
+    def remove(self, triple):
+        if self._pending is not None:
+            for t in list(self.triples(triple)):
+                self._pending.append(("-", t))
+        return super().remove(triple)
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Resident store
+# ----------------------------------------------------------------------------------------------------------------------
+
+def _stat_key(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        st = os.stat(path)
+        return st.st_mtime_ns, st.st_size
+    except FileNotFoundError:
+        return None
+
+
+def _write_ttl_atomic(g: Graph, ttl_path: str) -> None:
+    fd, tmp = tempfile.mkstemp(dir=os.path.dirname(ttl_path) or ".", suffix=".ttl.tmp")
+    os.close(fd)
+    g.serialize(destination=tmp, format="turtle")
+    os.replace(tmp, ttl_path)
+
+
+class _ResidentEntry:
+    def __init__(self, ttl_path: str, graph: JournaledGraph):
+        self.ttl_path = ttl_path
+        self.journal_path = ttl_path + JOURNAL_SUFFIX
+        self.graph = graph
+        self.dirty = False
+        self.last_flush = time.monotonic()
+        self.ttl_stat: Optional[Tuple[int, int]] = None
+        self.journal_stat: Optional[Tuple[int, int]] = None
+
+    def remember_disk_state(self) -> None:
+        self.ttl_stat = _stat_key(self.ttl_path)
+        self.journal_stat = _stat_key(self.journal_path)
+
+    def disk_changed(self) -> bool:
+        return _stat_key(self.ttl_path) != self.ttl_stat or _stat_key(self.journal_path) != self.journal_stat
+
+    def append_journal(self, ops: List[Tuple[str, tuple]]) -> None:
+        if not ops:
+            return
+        with open(self.journal_path, "a", encoding="utf-8") as f:
+            f.write("".join(_encode_op(op, t) + "\n" for op, t in ops))
+            f.flush()
+            os.fsync(f.fileno())
+        self.dirty = True
+
+    def flush(self) -> None:
+        """Rewrite the TTL from memory and truncate the journal. Caller must hold the file lock."""
+        if self.dirty or not os.path.exists(self.ttl_path):
+            _write_ttl_atomic(self.graph, self.ttl_path)
+        if os.path.exists(self.journal_path):
+            os.remove(self.journal_path)
+        self.dirty = False
+        self.last_flush = time.monotonic()
+        self.remember_disk_state()
+
+
+class ResidentGraphStore:
+    """Process-wide cache of parsed memory graphs keyed by TTL path."""
+
+    def __init__(self, flush_interval: float = DEFAULT_FLUSH_INTERVAL, max_graphs: int = DEFAULT_MAX_GRAPHS):
+        self.flush_interval = flush_interval
+        self.max_graphs = max(1, max_graphs)
+        self._entries: "OrderedDict[str, _ResidentEntry]" = OrderedDict()
+        self._lock = threading.RLock()
+        atexit.register(self.flush_all)
+
+    @staticmethod
+    def _lock_path(ttl_path: str) -> str:
+        base, _ = os.path.splitext(ttl_path)
+        return base + ".lock"
+
+    def _load(self, ttl_path: str, bind: Optional[Callable[[Graph], None]]) -> _ResidentEntry:
+        g = JournaledGraph()
+        if bind is not None:
+            bind(g)
+        if os.path.exists(ttl_path):
+            g.parse(ttl_path, format="turtle")
+        entry = _ResidentEntry(ttl_path, g)
+        if replay_journal(g, entry.journal_path):
+            # Recovered un-flushed mutations from a previous process; consolidate now.
+            entry.dirty = True
+            entry.flush()
+        entry.remember_disk_state()
+        return entry
+
+    def _evict_over_capacity(self, keep: str) -> None:
+        while len(self._entries) > self.max_graphs:
+            victim_path = next(p for p in self._entries if p != keep)
+            victim = self._entries.pop(victim_path)
+            if victim.dirty:
+                with FileLock(self._lock_path(victim_path)):
+                    if not victim.disk_changed():
+                        victim.flush()
+
+    @contextmanager
+    def open(
+        self,
+        ttl_path: str,
+        lock_path: Optional[str] = None,
+        timeout: float = 30.0,
+        bind: Optional[Callable[[Graph], None]] = None,
+        flush: bool = False,
+    ) -> Iterator[Graph]:
+        """Lock, yield the resident graph for `ttl_path`, then journal (and maybe flush) the changes.
+
+        Args:
+            ttl_path: Memory TTL file backing the graph
+            lock_path: FileLock path (defaults to `<ttl stem>.lock`)
+            timeout: Lock acquisition timeout in seconds
+            bind: Called once on a freshly created graph to bind namespace prefixes
+            flush: Rewrite the TTL before returning (e.g. before exporting)
+        """
+        ttl_path = os.path.abspath(ttl_path)
+        lock = FileLock(lock_path or self._lock_path(ttl_path))
+        with self._lock:
+            lock.acquire(timeout=timeout)
+            try:
+                entry = self._entries.get(ttl_path)
+                if entry is None or entry.disk_changed():
+                    entry = self._load(ttl_path, bind)
+                    self._entries[ttl_path] = entry
+                self._entries.move_to_end(ttl_path)
+
+                entry.graph.begin()
+                try:
+                    yield entry.graph
+                except BaseException:
+                    entry.graph.rollback()
+                    raise
+                entry.append_journal(entry.graph.take_pending())
+                entry.remember_disk_state()
+
+                due = time.monotonic() - entry.last_flush >= self.flush_interval
+                if flush or (entry.dirty and due) or not os.path.exists(ttl_path):
+                    entry.flush()
+            finally:
+                lock.release()
+            self._evict_over_capacity(keep=ttl_path)
+
+    def flush(self, ttl_path: str, lock_path: Optional[str] = None, timeout: float = 30.0) -> None:
+        """Write the resident graph for `ttl_path` back to disk if it has pending changes."""
+        ttl_path = os.path.abspath(ttl_path)
+        with self._lock:
+            entry = self._entries.get(ttl_path)
+            if entry is None or not entry.dirty:
+                return
+            with FileLock(lock_path or self._lock_path(ttl_path), timeout=timeout):
+                if not entry.disk_changed():
+                    entry.flush()
+
+    def flush_all(self) -> None:
+        for ttl_path in list(self._entries):
+            try:
+                self.flush(ttl_path)
+            except Exception:
+                # Journal still holds the changes; the next load replays them.
+                pass
+
+
+def sync_memory_file(ttl_path: str, lock_path: Optional[str] = None, timeout: float = 30.0) -> bool:
+    """Fold a pending journal into its TTL from any process (e.g. before copying memory files).
+
+    Returns True if the TTL was rewritten.
+    """
+    journal_path = ttl_path + JOURNAL_SUFFIX
+    if not os.path.exists(journal_path):
+        return False
+    base, _ = os.path.splitext(ttl_path)
+    with FileLock(lock_path or base + ".lock", timeout=timeout):
+        if not os.path.exists(journal_path) or os.path.getsize(journal_path) == 0:
+            return False
+        g = Graph()
+        if os.path.exists(ttl_path):
+            g.parse(ttl_path, format="turtle")
+        replay_journal(g, journal_path)
+        _write_ttl_atomic(g, ttl_path)
+        os.remove(journal_path)
+    return True
+
+
+_DEFAULT_STORE: Optional[ResidentGraphStore] = None
+_DEFAULT_STORE_LOCK = threading.Lock()
+
+
+def get_resident_store() -> ResidentGraphStore:
+    """Return the process-wide store shared by all memory-backed MCP operations."""
+    global _DEFAULT_STORE
+    with _DEFAULT_STORE_LOCK:
+        if _DEFAULT_STORE is None:
+            _DEFAULT_STORE = ResidentGraphStore()
+        return _DEFAULT_STORE
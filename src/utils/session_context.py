@@ -0,0 +1,86 @@
+"""
+Per-session KG-building context for the ontology MCP servers.
+
+The MCP servers resolve their memory file from (hash, top-level entity, entity IRI).
+Historically the pipeline wrote that triple to one shared JSON file
+(`data/global_state.json`, `data/<ontology>_global_state.json`) right before each
+agent run, so only one entity of one paper could be built at a time.
+
+With a session context, the triple is handed to each server process in its
+environment when the agent spawns it (`BaseAgent(mcp_env=session_env(...))`).
+Servers check `read_session_context()` first and only fall back to the global
+state file when no session context is set, so concurrent agent sessions for
+different entities or papers each see their own context.
+
+The generated ontology servers (ai_generated_contents_candidate/scripts/*, built on
+universal_utils) still read only the global state file. A KG-building step builds
+more than one entity at a time (`max_concurrency` > 1) only when its config also
+sets `session_context_servers: true`, confirming every server in its MCP set reads
+the session context; see `entity_concurrency()`.
+"""
+
+from __future__ import annotations
+
+import os
+from typing import Any, Dict, Mapping, Optional, Tuple
+
+SESSION_HASH_ENV = "MOPS_SESSION_HASH"
+SESSION_ENTITY_ENV = "MOPS_SESSION_ENTITY"
+SESSION_ENTITY_IRI_ENV = "MOPS_SESSION_ENTITY_IRI"
+
+
+def session_env(hash_value: str, top_level_entity_name: str, top_level_entity_iri: str | None = None) -> Dict[str, str]:
+    """Environment variables that carry one agent session's context to its MCP servers."""
+    return {
+        SESSION_HASH_ENV: hash_value or "",
+        SESSION_ENTITY_ENV: top_level_entity_name or "",
+        SESSION_ENTITY_IRI_ENV: top_level_entity_iri or "",
+    }
+
+
+def read_session_context(environ: Optional[Mapping[str, str]] = None) -> Optional[Tuple[str, str, str]]:
+    """
+    Return (hash_value, top_level_entity_name, top_level_entity_iri) from the process
+    environment, or None when this process was not started with a session context.
+    """
+    environ = os.environ if environ is None else environ
+    hash_value = (environ.get(SESSION_HASH_ENV) or "").strip()
+    entity = (environ.get(SESSION_ENTITY_ENV) or "").strip()
+    if not hash_value or not entity:
+        return None
+    return hash_value, entity, (environ.get(SESSION_ENTITY_IRI_ENV) or "").strip()
+
+
+def entity_concurrency(step_config: Mapping[str, Any]) -> int:
+    """
+    Number of entities a KG-building step may build at once (`max_concurrency`, default 1).
+
+    Raises ValueError for `max_concurrency` > 1 unless `session_context_servers` is
+    set: concurrent entities would overwrite each other's global state file.
+    """
+    max_concurrency = max(1, int(step_config.get("max_concurrency", 1)))
+    if max_concurrency > 1 and not step_config.get("session_context_servers"):
+        raise ValueError(
+            f"max_concurrency={max_concurrency} needs MCP servers that read the session context "
+            f"({SESSION_HASH_ENV}/{SESSION_ENTITY_ENV}); the generated ontology servers only read "
+            "data/global_state.json. Set max_concurrency to 1, or set session_context_servers: true "
+            "if every server in the MCP set reads the session context."
+        )
+    return max_concurrency
+
+
+def apply_session_env(server_cfg: Dict[str, Dict[str, Any]], env: Mapping[str, str]) -> Dict[str, Dict[str, Any]]:
+    """
+    Add `env` to every stdio server in an MCP client config.
+
+    The stdio client replaces (rather than extends) the child environment when a
+    config has an `env` entry, so the parent environment and any configured
+    variables are carried over. Non-stdio servers are returned unchanged.
+    """
+    out: Dict[str, Dict[str, Any]] = {}
+    for name, cfg in (server_cfg or {}).items():
+        cfg = dict(cfg or {})
+        if cfg.get("command") and cfg.get("transport", "stdio") == "stdio":
+            cfg["env"] = {**os.environ, **(cfg.get("env") or {}), **dict(env)}
+        out[name] = cfg
+    return out
@@ -0,0 +1,211 @@
+"""
+Parallel parsing of many Turtle files into rdflib graphs.
+
+MARIE's KG load, the grounding batch mode and the per-hash TTL merge each parse
+dozens to hundreds of files. rdflib's Turtle parser is pure Python, so doing that
+in one thread leaves every other core idle. Here the files are parsed in a
+process pool instead:
+
+- each worker parses one file into a private Graph and ships it back compactly:
+  a term table (one row per distinct term) plus an int32 array of term ids,
+  three per triple, instead of pickled rdflib objects;
+- the parent decodes every term once and yields the files in input order, so the
+  merged graph (and anything serialized from it) does not depend on which worker
+  finished first;
+- blank nodes are renamed per file, exactly as separate `Graph.parse` calls
+  would keep them apart;
+- a file that fails to parse is reported on its own (`ParsedTTL.error`) and does
+  not take down the rest of the batch.
+
+Starting the pool costs about a second (each spawned worker imports rdflib), which
+only pays off on large batches. So unless the caller asks for a number of
+workers, files are parsed in process when they total less than
+MOPS_TTL_PARSE_POOL_MIN_BYTES. With one worker, or a single file, everything runs
+in process without a pool too.
+
+The workers are spawned with the lightweight src.utils.ttl_parse_worker as their
+`__main__`, so callers need no `__main__` guard, and the MARIE KG server is not
+re-imported by every worker; worker output goes to stderr, never to the caller's
+stdout (the MCP stdio stream of the KG server).
+
+Configuration (environment):
+- MOPS_TTL_PARSE_WORKERS: worker processes (default 0 = one per CPU, at most
+  DEFAULT_MAX_WORKERS; 1 = no pool)
+- MOPS_TTL_PARSE_POOL_MIN_BYTES: total size of the files below which they are
+  parsed in process (default 2000000, about as long to parse as the pool takes
+  to start)
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import os
+import sys
+import threading
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from rdflib import BNode, Graph, Literal, URIRef
+
+from src.utils import ttl_parse_worker
+from src.utils.ttl_parse_worker import Encoded, declared_namespaces
+
+Triple = Tuple[Any, Any, Any]
+
+# Spawned workers each cost an interpreter plus rdflib; more rarely pays off
+DEFAULT_MAX_WORKERS = 4
+DEFAULT_POOL_MIN_BYTES = 2_000_000
+
+# Serializes the sys.modules["__main__"] swap of concurrent pool starts
+_main_lock = threading.Lock()
+
+
+class TTLParseError(Exception):
+    """A Turtle file that could not be parsed."""
+
+    def __init__(self, path: str, message: str):
+        super().__init__(f"Failed to parse {path}: {message}")
+        self.path = path
+
+
+@dataclass
+class ParsedTTL:
+    """The triples and prefix declarations of one file, or why it could not be parsed."""
+
+    path: str
+    triples: List[Triple] = field(default_factory=list)
+    namespaces: List[Tuple[str, URIRef]] = field(default_factory=list)
+    error: Optional[str] = None
+
+    def add_to(self, graph: Graph) -> None:
+        """Add the triples to `graph` and bind the file's prefixes, as `graph.parse` would."""
+        for prefix, namespace in self.namespaces:
+            graph.bind(prefix, namespace)
+        graph.addN((s, p, o, graph) for s, p, o in self.triples)
+
+    def graph(self) -> Graph:
+        g = Graph()
+        self.add_to(g)
+        return g
+
+
+def default_workers() -> int:
+    workers = int(os.getenv("MOPS_TTL_PARSE_WORKERS", "0"))
+    return workers if workers > 0 else min(os.cpu_count() or 1, DEFAULT_MAX_WORKERS)
+
+
+def pool_min_bytes() -> int:
+    return int(os.getenv("MOPS_TTL_PARSE_POOL_MIN_BYTES", str(DEFAULT_POOL_MIN_BYTES)))
+
+
+def _total_bytes(paths: Sequence[str]) -> int:
+    total = 0
+    for path in paths:
+        try:
+            total += os.path.getsize(path)
+        except OSError:
+            pass
+    return total
+
+
+@contextmanager
+def _worker_main() -> Iterator[None]:
+    """
+    Spawn pool processes with ttl_parse_worker as their `__main__`.
+
+    A spawned process re-imports the parent's `__main__` module (the caller's
+    script or the KG server) before it runs anything. The start method reads it
+    from sys.modules when a process is launched, which for a ProcessPoolExecutor
+    happens in `submit`, so the swap only has to cover submitting the work. The
+    swap is process-wide: concurrent callers take turns, or one could restore
+    the other's replacement as the real `__main__`.
+    """
+    with _main_lock:
+        main = sys.modules.get("__main__")
+        sys.modules["__main__"] = ttl_parse_worker
+        try:
+            yield
+        finally:
+            if main is not None:
+                sys.modules["__main__"] = main
+
+
+# ----------------------------------------------------------------------------------------------------------------------
+# Parent side
+# ----------------------------------------------------------------------------------------------------------------------
+
+def _decode(path: str, encoded: Encoded) -> ParsedTTL:
+    terms, raw, namespaces, error = encoded
+    if error is not None:
+        return ParsedTTL(path, error=error)
+    decoded: List[Any] = []
+    for row in terms:
+        kind = row[0]
+        if kind == "u":
+            decoded.append(URIRef(row[1]))
+        elif kind == "b":
+            # Fresh per file: ids from different workers may collide
+            decoded.append(BNode())
+        else:
+            decoded.append(Literal(row[1], datatype=URIRef(row[2]) if row[2] else None, lang=row[3] or None))
+    ids = array("i")
+    ids.frombytes(raw)
+    triples = [(decoded[ids[i]], decoded[ids[i + 1]], decoded[ids[i + 2]]) for i in range(0, len(ids), 3)]
+    return ParsedTTL(path, triples, [(prefix, URIRef(namespace)) for prefix, namespace in namespaces])
+
+
+def _parse_local(path: str, fmt: str) -> ParsedTTL:
+    try:
+        graph = ttl_parse_worker.parse(path, fmt)
+    except Exception as e:
+        return ParsedTTL(path, error=f"{type(e).__name__}: {e}")
+    return ParsedTTL(path, list(graph), declared_namespaces(graph))
+
+
+def parse_ttl_files(paths: Iterable[Any], workers: Optional[int] = None, fmt: str = "turtle") -> Iterator[ParsedTTL]:
+    """
+    Parse `paths` in a process pool and yield one ParsedTTL per file, in input order.
+
+    Files that fail are yielded with `error` set; the caller decides whether that
+    is fatal (see `parse_into`). Without `workers`, small batches (under
+    `pool_min_bytes()` in total) are parsed in process.
+    """
+    paths = [str(p) for p in paths]
+    if workers is None:
+        workers = default_workers() if _total_bytes(paths) >= pool_min_bytes() else 1
+    workers = min(workers, len(paths))
+    if workers <= 1:
+        for path in paths:
+            yield _parse_local(path, fmt)
+        return
+    # spawn: the callers (e.g. the MARIE KG server) run threads, which fork does not mix with
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=ttl_parse_worker.init_worker) as pool:
+        with _worker_main():
+            results = pool.map(ttl_parse_worker.parse_encoded, paths, [fmt] * len(paths))
+        for path, encoded in zip(paths, results):
+            yield _decode(path, encoded)
+
+
+def parse_into(
+    graph: Graph, paths: Sequence[Any], workers: Optional[int] = None, fmt: str = "turtle", strict: bool = True
+) -> Dict[str, str]:
+    """
+    Parse `paths` (in parallel) and add them to `graph` in input order.
+
+    With `strict`, the first file that fails raises TTLParseError, with the files
+    before it already added (as a loop of `graph.parse` calls would leave it).
+    Otherwise failed files are skipped. Returns {path: error} of skipped files.
+    """
+    errors: Dict[str, str] = {}
+    for parsed in parse_ttl_files(paths, workers=workers, fmt=fmt):
+        if parsed.error is not None:
+            if strict:
+                raise TTLParseError(parsed.path, parsed.error)
+            errors[parsed.path] = parsed.error
+            continue
+        parsed.add_to(graph)
+    return errors
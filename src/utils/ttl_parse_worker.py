@@ -0,0 +1,74 @@
+"""
+Worker side of the parallel Turtle parsing in src.utils.ttl_loader.
+
+The pool's processes are spawned with this module as their `__main__`
+(`ttl_loader._worker_main`), so a worker imports rdflib and nothing else: not the
+caller's script, which may lack a `__main__` guard, and not the MARIE KG server,
+whose stdout is the MCP stdio stream. `init_worker` also points the worker's
+stdout (and logging) at stderr, so nothing a parse prints can reach that stream.
+
+Keep this module free of imports beyond rdflib and the standard library.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import sys
+from array import array
+from typing import Any, Dict, List, Optional, Tuple
+
+from rdflib import BNode, Graph, URIRef
+
+# (term table, term ids as int32 bytes, prefixes, error)
+Encoded = Tuple[List[Tuple[str, ...]], bytes, List[Tuple[str, str]], Optional[str]]
+
+
+def init_worker() -> None:
+    """Pool initializer: send everything the worker writes to stderr."""
+    sys.stdout = sys.stderr
+    try:
+        os.dup2(sys.stderr.fileno(), 1)
+    except (OSError, ValueError, AttributeError):
+        pass
+    logging.basicConfig(stream=sys.stderr, level=logging.WARNING)
+
+
+def declared_namespaces(graph: Graph) -> List[Tuple[str, URIRef]]:
+    """Bindings a parse added on top of those every new Graph starts with."""
+    defaults = set(Graph().namespaces())
+    return [(prefix, namespace) for prefix, namespace in graph.namespaces() if (prefix, namespace) not in defaults]
+
+
+def parse(path: str, fmt: str) -> Graph:
+    graph = Graph()
+    graph.parse(path, format=fmt)
+    return graph
+
+
+def encode_term(term: Any) -> Tuple[str, ...]:
+    if isinstance(term, URIRef):
+        return ("u", str(term))
+    if isinstance(term, BNode):
+        return ("b", str(term))
+    return ("l", str(term), str(term.datatype or ""), term.language or "")
+
+
+def parse_encoded(path: str, fmt: str) -> Encoded:
+    """Parse one file; (term table, term ids as int32 bytes, prefixes, error)."""
+    try:
+        graph = parse(path, fmt)
+    except Exception as e:
+        return [], b"", [], f"{type(e).__name__}: {e}"
+    ids: Dict[Any, int] = {}
+    terms: List[Tuple[str, ...]] = []
+    triples = array("i")
+    for triple in graph:
+        for term in triple:
+            i = ids.get(term)
+            if i is None:
+                i = ids[term] = len(terms)
+                terms.append(encode_term(term))
+            triples.append(i)
+    namespaces = [(prefix, str(namespace)) for prefix, namespace in declared_namespaces(graph)]
+    return terms, triples.tobytes(), namespaces, None
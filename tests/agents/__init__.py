@@ -0,0 +1,3 @@
+"""
+Agent tests package.
+"""
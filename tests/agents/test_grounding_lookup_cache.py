@@ -0,0 +1,104 @@
+"""
+Unit tests for the batched, memoized grounding lookups (src.agents.grounding.lookup_cache).
+
+A fake client stands in for the OntoSpecies MCP session and records every query.
+"""
+
+import asyncio
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.agents.grounding.lookup_cache import LookupCache, fetch_lookups, label_index_version, normalize_label
+
+
+class FakeClient:
+    def __init__(self):
+        self.calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def fuzzy_lookup(self, cls, query, *, limit=10, cutoff=0.6):
+        self.calls.append((cls, query))
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        return [{"label": query, "iri": f"http://example.org/{cls}/{query}", "score": 1.0}]
+
+
+class TestFetchLookups(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.labels_dir = Path(self.temp_dir) / "labels"
+        self.labels_dir.mkdir()
+        (self.labels_dir / "Species.jsonl").write_text('{"label": "water"}\n', encoding="utf-8")
+        self.server_cfg = {"command": "python", "args": ["--labels-dir", str(self.labels_dir)]}
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _cache(self):
+        return LookupCache.for_server(self.server_cfg, "ontospecies", Path(self.temp_dir) / "cache")
+
+    def _fetch(self, client, labels, cache=None, concurrency=4):
+        keys = [(cls, normalize_label(label)) for label in labels for cls in ("Solvent", "Species")]
+        return asyncio.run(fetch_lookups(client, keys, cache=cache, concurrency=concurrency))
+
+    def test_duplicate_labels_are_queried_once(self):
+        client = FakeClient()
+        rows = self._fetch(client, ["Water", "Water ", "  Water", "Ethanol"])
+        self.assertEqual(len(client.calls), 4)
+        self.assertEqual(set(rows), {("Solvent", "Water"), ("Species", "Water"), ("Solvent", "Ethanol"), ("Species", "Ethanol")})
+
+    def test_labels_differing_in_case_are_different_lookups(self):
+        client = FakeClient()
+        rows = self._fetch(client, ["CO", "Co", "co", "Co ", "HF", "Hf"])
+        self.assertEqual(sorted(q for cls, q in client.calls if cls == "Species"), ["CO", "Co", "HF", "Hf", "co"])
+        self.assertEqual(rows[("Species", "CO")][0]["iri"], "http://example.org/Species/CO")
+        self.assertEqual(rows[("Species", "Co")][0]["iri"], "http://example.org/Species/Co")
+
+    def test_concurrency_is_bounded(self):
+        client = FakeClient()
+        self._fetch(client, [f"label {i}" for i in range(20)], concurrency=3)
+        self.assertEqual(len(client.calls), 40)
+        self.assertGreater(client.max_in_flight, 1)
+        self.assertLessEqual(client.max_in_flight, 3)
+
+    def test_persisted_cache_only_queries_new_labels(self):
+        cache = self._cache()
+        self._fetch(FakeClient(), ["water", "ethanol"], cache=cache)
+        cache.save()
+
+        client = FakeClient()
+        cache = self._cache()
+        rows = self._fetch(client, ["water", "ethanol", "toluene"], cache=cache)
+        self.assertEqual(sorted(client.calls), [("Solvent", "toluene"), ("Species", "toluene")])
+        self.assertEqual(rows[("Species", "water")][0]["iri"], "http://example.org/Species/water")
+        self.assertEqual(cache.hits, 4)
+
+    def test_label_index_change_starts_new_cache(self):
+        cache = self._cache()
+        self._fetch(FakeClient(), ["water"], cache=cache)
+        cache.save()
+
+        (self.labels_dir / "Species.jsonl").write_text('{"label": "water"}\n{"label": "ice"}\n', encoding="utf-8")
+        client = FakeClient()
+        self._fetch(client, ["water"], cache=self._cache())
+        self.assertEqual(len(client.calls), 2)
+
+    def test_no_labels_dir_means_no_persistence(self):
+        self.assertIsNone(label_index_version({"args": []}))
+        cache = LookupCache.for_server({"args": []}, "ontospecies", Path(self.temp_dir) / "cache")
+        self._fetch(FakeClient(), ["water"], cache=cache)
+        cache.save()
+        self.assertFalse((Path(self.temp_dir) / "cache").exists())
+
+
+if __name__ == '__main__':
+    unittest.main()
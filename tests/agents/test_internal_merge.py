@@ -0,0 +1,82 @@
+"""
+Unit tests for the grounding internal merge (src.agents.grounding.internal_merge).
+
+The worklist implementation is checked against the full-recompute fixpoint it
+replaced (kept in scripts/benchmark_internal_merge.py) on hand-written and
+synthetic graphs.
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from rdflib import Graph
+
+from scripts.benchmark_internal_merge import reference_internal_merge_mapping, synthetic_graph
+from src.agents.grounding.internal_merge import compute_internal_merge_mapping
+
+EX = "https://example.org/"
+
+TTL = """
+@prefix ex: <https://example.org/> .
+@prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> .
+
+# Leaves merge in round 1, their parents in round 2, the grandparents in round 3
+ex:leafB rdfs:label "water" .
+ex:leafA rdfs:label "water" .
+ex:leafC rdfs:label "water"@en .
+ex:midB ex:has ex:leafB .
+ex:midA ex:has ex:leafA .
+ex:midC ex:has ex:leafC .
+ex:topB ex:has ex:midB ; rdfs:label "top" .
+ex:topA ex:has ex:midA ; rdfs:label "top" .
+
+# Predicates are compared by representative too
+ex:p1 rdfs:label "part of" .
+ex:p2 rdfs:label "part of" .
+ex:x ex:p1 ex:leafA .
+ex:y ex:p2 ex:leafB .
+
+# Blank-node objects stay distinct
+ex:bn1 ex:has [ rdfs:label "b" ] .
+ex:bn2 ex:has [ rdfs:label "b" ] .
+"""
+
+
+class TestInternalMerge(unittest.TestCase):
+    def test_cascading_merges(self):
+        graph = Graph()
+        graph.parse(data=TTL, format="turtle")
+        mapping = compute_internal_merge_mapping(graph)
+        self.assertEqual(mapping, {
+            EX + "leafB": EX + "leafA",
+            EX + "midB": EX + "midA",
+            EX + "topB": EX + "topA",
+            EX + "p2": EX + "p1",
+            EX + "y": EX + "x",
+        })
+        self.assertEqual(mapping, reference_internal_merge_mapping(graph))
+        # One round per level of the cascade
+        self.assertEqual(compute_internal_merge_mapping(graph, max_rounds=1), {
+            EX + "leafB": EX + "leafA",
+            EX + "p2": EX + "p1",
+        })
+
+    def test_matches_full_recompute(self):
+        for seed in range(6):
+            graph = synthetic_graph(3000, seed=seed, depth=4 + seed % 3, copies=2 + seed % 3)
+            for max_rounds in (1, 2, 3, 10):
+                with self.subTest(seed=seed, max_rounds=max_rounds):
+                    self.assertEqual(
+                        compute_internal_merge_mapping(graph, max_rounds=max_rounds),
+                        reference_internal_merge_mapping(graph, max_rounds=max_rounds),
+                    )
+
+    def test_empty_graph(self):
+        self.assertEqual(compute_internal_merge_mapping(Graph()), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,3 @@
+"""
+MCP server tests package.
+"""
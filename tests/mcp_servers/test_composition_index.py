@@ -0,0 +1,140 @@
+"""
+Unit tests for the precomputed composition index behind chemical_fuzzy_search
+(src.mcp_servers.sparql.composition_index).
+
+The vectorized ranking is checked against the per-candidate score_candidate.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+import numpy as np
+
+from src.mcp_servers.sparql import composition_index
+from src.mcp_servers.sparql.chemical_fuzzy_search import (
+    ATOMIC_WEIGHTS,
+    hill_string,
+    parse_kg_label_atoms,
+    score_candidate,
+)
+from src.mcp_servers.sparql.composition_index import CompositionIndex, get_composition_index
+
+
+ENTITIES = [
+    {"label": "[CuCl2(C5H3N)2(CO2)2]", "subject": "s1", "data_type": "formula"},
+    {"label": "C16H10O4", "subject": "s2", "data_type": "formula"},
+    {"label": "[Cu2(C10H10N2)2]", "subject": "s3", "data_type": "label"},
+    {"label": "C16H10O4", "subject": "s4", "data_type": "identifier"},
+    {"label": "no atoms here", "subject": "s5", "data_type": "label"},
+    {"label": "[V6O6(OCH3)9(SO4)4]", "subject": "s6", "data_type": "formula"},
+]
+
+
+def _reference(target_formula, target_mw, limit, strict=False):
+    """The previous per-candidate implementation."""
+    results = []
+    for entity in ENTITIES:
+        atoms = parse_kg_label_atoms(entity["label"])
+        if not atoms:
+            continue
+        scored = score_candidate(atoms, {"formula": target_formula, "mol_weight": target_mw})
+        if strict and not scored["formula_match"]:
+            continue
+        results.append((entity["subject"], scored))
+    results.sort(key=lambda r: (-r[1]["score"], r[1]["mw_rel_err"]))
+    return results[:limit]
+
+
+class TestCompositionIndex(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.index = CompositionIndex.build(ENTITIES, parse_kg_label_atoms, hill_string, ATOMIC_WEIGHTS)
+        composition_index.clear_composition_index()
+
+    def tearDown(self):
+        composition_index.clear_composition_index()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _ranked(self, target_formula, target_mw, limit, strict=False):
+        return [
+            (self.index.entities[r["row"]]["subject"], r)
+            for r in self.index.top(target_formula, target_mw, limit=limit, strict=strict)
+        ]
+
+    def test_rows_skip_unparsable_labels(self):
+        self.assertEqual(len(self.index), 5)
+        self.assertNotIn("s5", [e["subject"] for e in self.index.entities])
+
+    def test_ranking_matches_per_candidate_scoring(self):
+        for target_formula, target_mw, strict in [
+            ("C16H10O4", 266.25, False),
+            ("C16H10O4", 266.25, True),
+            ("C20H20Cu2N4", 443.5, False),
+            ("C99", 0, False),
+        ]:
+            expected = _reference(target_formula, target_mw, 10, strict)
+            actual = self._ranked(target_formula, target_mw, 10, strict)
+            self.assertEqual([s for s, _ in actual], [s for s, _ in expected], target_formula)
+            for (_, got), (_, want) in zip(actual, expected):
+                for key in ("kg_formula", "kg_mw", "formula_match", "mw_rel_err", "score", "formula_score", "mw_score"):
+                    self.assertEqual(got[key], want[key], key)
+
+    def test_atoms_roundtrip(self):
+        row = [e["subject"] for e in self.index.entities].index("s3")
+        self.assertEqual(self.index.atoms(row), dict(parse_kg_label_atoms("[Cu2(C10H10N2)2]")))
+
+    def test_saved_index_is_memory_mapped(self):
+        self.index.save(Path(self.temp_dir))
+        loaded = CompositionIndex.load(Path(self.temp_dir))
+        self.assertIsInstance(loaded.mol_weights, np.memmap)
+        self.assertEqual(loaded.formulas, self.index.formulas)
+        self.assertEqual(
+            [r["row"] for r in loaded.top("C16H10O4", 266.25)],
+            [r["row"] for r in self.index.top("C16H10O4", 266.25)],
+        )
+
+    def test_save_does_not_touch_mapped_index(self):
+        index_dir = Path(self.temp_dir)
+        self.index.save(index_dir)
+        mapped = CompositionIndex.load(index_dir)
+        before = np.array(mapped.mol_weights)
+
+        smaller = CompositionIndex.build(ENTITIES[:2], parse_kg_label_atoms, hill_string, ATOMIC_WEIGHTS)
+        smaller.save(index_dir)
+        np.testing.assert_array_equal(np.asarray(mapped.mol_weights), before)
+        self.assertEqual(len(CompositionIndex.load(index_dir)), len(smaller))
+
+        # Only the published build and the one before it are kept
+        smaller.save(index_dir)
+        builds = [p for p in index_dir.iterdir() if p.name.startswith(composition_index.BUILD_PREFIX)]
+        self.assertEqual(len(builds), 2)
+
+    def test_rebuilt_when_source_changes(self):
+        source = Path(self.temp_dir) / "all_formulas.json"
+        source.write_text("[]", encoding="utf-8")
+        builds = []
+
+        def build(stamps):
+            builds.append(stamps)
+            return CompositionIndex.build(ENTITIES, parse_kg_label_atoms, hill_string, ATOMIC_WEIGHTS, sources=stamps)
+
+        index_dir = Path(self.temp_dir) / "index"
+        get_composition_index([source], build, index_dir)
+        get_composition_index([source], build, index_dir)
+        composition_index.clear_composition_index()
+        get_composition_index([source], build, index_dir)  # from disk
+        self.assertEqual(len(builds), 1)
+
+        source.write_text("[{}]", encoding="utf-8")
+        get_composition_index([source], build, index_dir)
+        self.assertEqual(len(builds), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
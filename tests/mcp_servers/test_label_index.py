@@ -0,0 +1,104 @@
+"""
+Unit tests for the in-memory OntoMOP label index (src.mcp_servers.sparql.label_index).
+"""
+
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.mcp_servers.sparql import label_index
+from src.mcp_servers.sparql.label_index import LabelIndex, get_index, load_json_cached
+
+
+FORMULAS = [
+    {"subject": "s1", "formula": "[V6O6(OCH3)9(SO4)4]"},
+    {"subject": "s2", "formula": "[Cu2(C10H10N2)2]"},
+    {"subject": "s3", "formula": "[V6O6(OCH3)9(SO4)4]"},
+    {"subject": "s4", "formula": "C16H10O4"},
+    {"subject": "s5"},
+]
+
+
+class TestLabelIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = LabelIndex(FORMULAS, "formula")
+
+    def test_exact_lookup_returns_all_entries_for_value(self):
+        subjects = [e["subject"] for e in self.index.exact("[V6O6(OCH3)9(SO4)4]")]
+        self.assertEqual(subjects, ["s1", "s3"])
+        self.assertEqual(self.index.exact("missing"), [])
+
+    def test_normalized_lookup_ignores_case_and_punctuation(self):
+        subjects = [e["subject"] for e in self.index.normalized_exact("cu2 c10h10n2 2")]
+        self.assertEqual(subjects, ["s2"])
+
+    def test_contains_matches_previous_scan(self):
+        for term in ["v6o6", "C10H10", "(SO4)", "h", "xyz"]:
+            expected = [e for e in FORMULAS if e.get("formula") and term.lower() in e["formula"].lower()]
+            self.assertEqual(
+                sorted(e["subject"] for e in self.index.contains(term)),
+                sorted(e["subject"] for e in expected),
+                term,
+            )
+
+    def test_candidate_pruning_keeps_closest_values(self):
+        entries = [{"formula": f"C{i}H{i}O{i % 7}"} for i in range(3000)]
+        entries.append({"formula": "[Me2NH2]5[V6O6(OCH3)9(SO4)4]"})
+        index = LabelIndex(entries, "formula")
+        with mock.patch.object(label_index, "MIN_CANDIDATES", 10):
+            slots = index.candidates("[Me2NH2]5[V6O6(OCH3)9(SO4)4]", limit=1)
+        self.assertLessEqual(len(slots), 20)
+        self.assertIn(len(entries) - 1, slots)
+
+    @unittest.skipIf(label_index._process is None, "rapidfuzz/fuzzywuzzy not installed")
+    def test_fuzzy_ranks_best_match_first(self):
+        matches = self.index.fuzzy("[V6O6(OCH3)9(SO4)]", scorer="ratio", limit=2)
+        self.assertEqual(matches[0][0], "[V6O6(OCH3)9(SO4)4]")
+        self.assertTrue(all(isinstance(score, int) for _, score in matches))
+
+
+class TestFileCaches(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = Path(self.temp_dir) / "all_formulas.json"
+        self._write(FORMULAS)
+        label_index.clear_caches()
+
+    def tearDown(self):
+        label_index.clear_caches()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _write(self, data):
+        with open(self.path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+
+    def test_file_is_parsed_once(self):
+        first = load_json_cached(self.path)
+        with mock.patch.object(label_index.json, "load", side_effect=AssertionError("re-parsed")):
+            self.assertIs(load_json_cached(self.path), first)
+            self.assertIs(get_index(self.path, "formula"), get_index(self.path, "formula"))
+
+    def test_index_reloads_when_file_changes(self):
+        index = get_index(self.path, "formula")
+        self.assertEqual(index.exact("NEW"), [])
+        self._write(FORMULAS + [{"subject": "s6", "formula": "NEW"}])
+        stat = os.stat(self.path)
+        os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        reloaded = get_index(self.path, "formula")
+        self.assertIsNot(reloaded, index)
+        self.assertEqual([e["subject"] for e in reloaded.exact("NEW")], ["s6"])
+
+    def test_missing_file_raises(self):
+        with self.assertRaises(FileNotFoundError):
+            get_index(Path(self.temp_dir) / "missing.json", "formula")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,3 @@
+"""
+mini_marie tests package.
+"""
@@ -0,0 +1,150 @@
+"""
+Unit tests for the web app's MARIE agent pool (mini_marie.webapp.agent_pool).
+
+Fake agents record how many questions run at once; no LLM or MCP server is started.
+"""
+
+import asyncio
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from mini_marie.webapp.agent_pool import MarieAgentPool, PoolBusyError
+
+
+class FakeAgent:
+    built = 0
+    warmed = 0
+    active = 0
+    max_active = 0
+    cancelled = 0
+
+    def __init__(self, model_name):
+        FakeAgent.built += 1
+        self.model_name = model_name
+
+    async def warm_up(self):
+        FakeAgent.warmed += 1
+
+    async def ask(self, question, **kwargs):
+        FakeAgent.active += 1
+        FakeAgent.max_active = max(FakeAgent.max_active, FakeAgent.active)
+        try:
+            await asyncio.sleep(0.02)
+            if question == "fail":
+                raise ValueError("boom")
+            return f"answer to {question}", {"agent": id(self)}
+        finally:
+            FakeAgent.active -= 1
+
+    async def astream(self, question, **kwargs):
+        FakeAgent.active += 1
+        try:
+            for word in question.split():
+                await asyncio.sleep(0.01)
+                yield {"type": "token", "content": word}
+            yield {"type": "done", "answer": question, "metadata": {"time_to_first_token_s": 0.01}}
+        except asyncio.CancelledError:
+            FakeAgent.cancelled += 1
+            raise
+        finally:
+            FakeAgent.active -= 1
+
+
+class TestMarieAgentPool(unittest.TestCase):
+    def setUp(self):
+        FakeAgent.built = FakeAgent.warmed = FakeAgent.active = FakeAgent.max_active = FakeAgent.cancelled = 0
+
+    def _pool(self, **kwargs):
+        return MarieAgentPool(agent_factory=FakeAgent, **kwargs)
+
+    def test_agents_are_built_once_and_reused(self):
+        async def run():
+            pool = self._pool(workers=2)
+            await asyncio.gather(*(pool.ask(f"q{i}") for i in range(6)))
+            return pool
+
+        pool = asyncio.run(run())
+        self.assertEqual(FakeAgent.built, 2)
+        self.assertEqual(FakeAgent.warmed, 1)
+        self.assertEqual(pool.stats()["served"], 6)
+        self.assertEqual(FakeAgent.max_active, 2)
+
+    def test_full_queue_is_rejected(self):
+        async def run():
+            pool = self._pool(workers=1, max_queue=1)
+            return await asyncio.gather(*(pool.ask(f"q{i}") for i in range(3)), return_exceptions=True)
+
+        results = asyncio.run(run())
+        self.assertEqual(sum(isinstance(r, PoolBusyError) for r in results), 1)
+
+    def test_wait_timeout(self):
+        async def run():
+            pool = self._pool(workers=1, queue_timeout=0.001)
+            return await asyncio.gather(pool.ask("a"), pool.ask("b"), return_exceptions=True)
+
+        first, second = asyncio.run(run())
+        self.assertEqual(first[0], "answer to a")
+        self.assertIsInstance(second, PoolBusyError)
+
+    def test_agent_returned_after_error(self):
+        async def run():
+            pool = self._pool(workers=1)
+            with self.assertRaises(ValueError):
+                await pool.ask("fail")
+            answer, _ = await pool.ask("again")
+            return pool, answer
+
+        pool, answer = asyncio.run(run())
+        self.assertEqual(answer, "answer to again")
+        self.assertEqual(pool.stats()["busy"], 0)
+
+    def test_stream_yields_events_and_returns_agent(self):
+        async def run():
+            pool = self._pool(workers=1)
+            events = [e async for e in pool.stream("a b c")]
+            return pool, events
+
+        pool, events = asyncio.run(run())
+        self.assertEqual([e["content"] for e in events if e["type"] == "token"], ["a", "b", "c"])
+        self.assertEqual(events[-1]["type"], "done")
+        self.assertEqual(pool.stats()["busy"], 0)
+        self.assertEqual(pool.stats()["served"], 1)
+
+    def test_cancelled_stream_stops_agent_and_frees_it(self):
+        async def consume(pool):
+            async for _ in pool.stream("one two three four five"):
+                pass
+
+        async def run():
+            pool = self._pool(workers=1)
+            task = asyncio.ensure_future(consume(pool))
+            await asyncio.sleep(0.025)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+            # The only agent is free again for the next request
+            answer, _ = await pool.ask("next")
+            return pool, answer
+
+        pool, answer = asyncio.run(run())
+        self.assertEqual(FakeAgent.cancelled, 1)
+        self.assertEqual(FakeAgent.active, 0)
+        self.assertEqual(answer, "answer to next")
+
+    def test_from_env(self):
+        os.environ["MARIE_WORKERS"] = "3"
+        os.environ["MARIE_ANSWER_CACHE"] = "0"
+        try:
+            pool = MarieAgentPool.from_env(max_queue=5, agent_factory=FakeAgent)
+        finally:
+            del os.environ["MARIE_WORKERS"]
+            del os.environ["MARIE_ANSWER_CACHE"]
+        self.assertEqual((pool.workers, pool.max_queue), (3, 5))
+        self.assertIsNone(pool.answer_cache)
+
+
+if __name__ == '__main__':
+    unittest.main()
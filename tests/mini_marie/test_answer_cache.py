@@ -0,0 +1,188 @@
+"""
+Unit tests for the MARIE answer cache (mini_marie.webapp.answer_cache) and its
+use by the agent pool.
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from mini_marie.kg_server.fuzzy_index import FuzzyLabelIndex, save_label_index
+from mini_marie.webapp.agent_pool import MarieAgentPool
+from mini_marie.webapp.answer_cache import AnswerCache
+
+USAGE = {"prompt_tokens": 900, "completion_tokens": 100, "total_tokens": 1000, "calls": 3, "total_cost_usd": 0.01}
+
+
+class CountingAgent:
+    asked = 0
+
+    def __init__(self, model_name):
+        self.model_name = model_name
+
+    async def ask(self, question, **kwargs):
+        CountingAgent.asked += 1
+        return f"answer to {question}", {"aggregated_usage": dict(USAGE), "per_call_usage": [{}]}
+
+    async def astream(self, question, **kwargs):
+        CountingAgent.asked += 1
+        yield {"type": "token", "content": "answer"}
+        yield {"type": "done", "answer": f"streamed {question}", "metadata": {"aggregated_usage": dict(USAGE)}}
+
+
+class TestAnswerCache(unittest.TestCase):
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        root = Path(self._tmp.name)
+        self.merged = root / "merged_tll"
+        self._write_ttl("paper1", "a")
+        self.index_path = root / "kg_label_index.bin"
+        save_label_index(self.index_path, {}, {
+            "syntheses": FuzzyLabelIndex(["VMOP-17", "VMOP-18", "UMC-1"]),
+            "mops": FuzzyLabelIndex(["Cage 1a"]),
+            "chemicals": FuzzyLabelIndex(["N,N-dimethylformamide"]),
+        })
+        self.db_path = root / "answers.sqlite"
+        self.cache = self._cache()
+
+    def tearDown(self):
+        self.cache.close()
+        self._tmp.cleanup()
+
+    def _cache(self, **kwargs):
+        return AnswerCache(db_path=self.db_path, merged_dir=self.merged, index_path=self.index_path, **kwargs)
+
+    def _write_ttl(self, name, content):
+        d = self.merged / name
+        d.mkdir(parents=True, exist_ok=True)
+        (d / f"{name}.ttl").write_text(content)
+
+    def test_entity_mentions_are_normalized(self):
+        self.assertEqual(self.cache.normalize("recipe for VMOP-17")[1], ["syntheses:VMOP-17"])
+        self.assertEqual(
+            self.cache.normalize("recipe for VMOP-17"), self.cache.normalize("What is the recipe of VMOP 17?")
+        )
+        self.assertEqual(self.cache.normalize("tell me about cage 1A")[1], ["mops:Cage 1a"])
+        self.assertEqual(self.cache.normalize("reactions using n,n-dimethylformamide")[1],
+                         ["chemicals:N,N-dimethylformamide"])
+        # Similar names are different entities
+        self.assertNotEqual(self.cache.key("recipe for VMOP-17"), self.cache.key("recipe for VMOP-18"))
+        self.assertNotEqual(self.cache.key("recipe for VMOP-17"), self.cache.key("steps of VMOP-17"))
+        # Connectives, negations and the kind of answer asked for are part of the question
+        self.assertNotEqual(self.cache.key("MOPs with Cu and Zr"), self.cache.key("MOPs with Cu or Zr"))
+        self.assertNotEqual(self.cache.key("MOPs with Cu"), self.cache.key("MOPs not with Cu"))
+        self.assertNotEqual(self.cache.key("list the steps of VMOP-17"), self.cache.key("explain the steps of VMOP-17"))
+
+    def test_numbers_and_formulas_are_not_merged(self):
+        pairs = [
+            ("syntheses run at -20 °C", "syntheses run at 20 °C"),
+            ("MOPs made with 1.5 mmol of linker", "MOPs made with 15 mmol of linker"),
+            ("MOPs containing Co", "MOPs containing CO"),
+            ("MOPs made with HF", "MOPs made with Hf"),
+        ]
+        for first, second in pairs:
+            with self.subTest(first=first):
+                self.assertNotEqual(self.cache.key(first), self.cache.key(second))
+        # Dictionary words still ignore case, plurals and trailing punctuation
+        self.assertEqual(
+            self.cache.key("Which MOPs use 1.5 mmol?"), self.cache.key("which MOPs use 1.5 mmol")
+        )
+        self.assertEqual(self.cache.normalize("Syntheses run at -20 °C")[0], "synthese run -20 C")
+
+    def test_labels_differing_in_case_stay_apart(self):
+        save_label_index(self.index_path, {}, {"mops": FuzzyLabelIndex(["Co-MOP", "CO-MOP", "Cage 1a"])})
+        self.cache.close()
+        self.cache = self._cache()
+        self.assertEqual(self.cache.normalize("tell me about Co-MOP")[1], ["mops:Co-MOP"])
+        self.assertEqual(self.cache.normalize("tell me about CO MOP")[1], ["mops:CO-MOP"])
+        self.assertEqual(self.cache.normalize("tell me about co-mop")[1], [])
+        self.assertEqual(self.cache.normalize("tell me about CAGE 1A")[1], ["mops:Cage 1a"])
+
+    def test_hit_after_put(self):
+        self.assertIsNone(self.cache.get("recipe for VMOP-17"))
+        self.cache.put("recipe for VMOP-17", "the recipe", {"aggregated_usage": USAGE, "per_call_usage": [{}]})
+        answer, metadata = self.cache.get("What is the recipe of VMOP 17?")
+        self.assertEqual(answer, "the recipe")
+        self.assertEqual(metadata["aggregated_usage"]["total_tokens"], 0)
+        self.assertEqual(metadata["answer_cache"]["saved_usage"], USAGE)
+        self.assertNotIn("per_call_usage", metadata)
+        stats = self.cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"], stats["entries"]), (1, 1, 1))
+        self.assertEqual(stats["hit_rate"], 0.5)
+
+        # A follow-up is keyed on the previous question too
+        self.assertIsNone(self.cache.get("recipe for VMOP-17", previous_question="steps of UMC-1"))
+        # ... and on the previous answer
+        self.cache.put("and its yield?", "yield A", {}, previous_question="recipe for VMOP-17", previous_answer="recipe A")
+        self.assertEqual(
+            self.cache.get("and its yield?", previous_question="recipe for VMOP-17", previous_answer="recipe A")[0],
+            "yield A",
+        )
+        self.assertIsNone(
+            self.cache.get("and its yield?", previous_question="recipe for VMOP-17", previous_answer="recipe B")
+        )
+
+    def test_entries_expire(self):
+        self.cache.close()
+        self.cache = self._cache(ttl=0.05)
+        self.cache.put("recipe for VMOP-17", "the recipe", {})
+        time.sleep(0.1)
+        self.assertIsNone(self.cache.get("recipe for VMOP-17"))
+        self.assertEqual(self.cache.stats()["entries"], 0)
+
+    def test_least_recently_used_is_evicted(self):
+        self.cache.close()
+        self.cache = self._cache(max_entries=2)
+        self.cache.put("recipe for VMOP-17", "a", {})
+        time.sleep(0.01)
+        self.cache.put("recipe for VMOP-18", "b", {})
+        time.sleep(0.01)
+        self.assertIsNotNone(self.cache.get("recipe for VMOP-17"))
+        time.sleep(0.01)
+        self.cache.put("recipe for UMC-1", "c", {})
+        self.assertIsNone(self.cache.get("recipe for VMOP-18"))
+        self.assertIsNotNone(self.cache.get("recipe for VMOP-17"))
+        self.assertEqual(self.cache.stats()["entries"], 2)
+
+    def test_merged_ttl_change_invalidates(self):
+        self.cache.put("recipe for VMOP-17", "old", {})
+        self.assertIsNotNone(self.cache.get("recipe for VMOP-17"))
+        self._write_ttl("paper2", "b")
+        self.assertIsNone(self.cache.get("recipe for VMOP-17"))
+        self.assertEqual(self.cache.stats()["invalidations"], 1)
+        self.assertEqual(self.cache.stats()["entries"], 0)
+
+    def test_entries_survive_restart(self):
+        self.cache.put("recipe for VMOP-17", "the recipe", {})
+        self.cache.close()
+        self.cache = self._cache()
+        self.assertEqual(self.cache.get("recipe of vmop 17")[0], "the recipe")
+
+    def test_pool_serves_repeats_from_cache(self):
+        CountingAgent.asked = 0
+
+        async def run():
+            pool = MarieAgentPool(workers=1, agent_factory=CountingAgent, answer_cache=self.cache)
+            first = await pool.ask("recipe for VMOP-17")
+            second = await pool.ask("What is the recipe of VMOP 17?")
+            streamed = [e async for e in pool.stream("steps of UMC-1")]
+            again = [e async for e in pool.stream("Steps of UMC 1")]
+            return first, second, streamed, again
+
+        first, second, streamed, again = asyncio.run(run())
+        self.assertEqual(CountingAgent.asked, 2)
+        self.assertEqual(second[0], first[0])
+        self.assertTrue(second[1]["answer_cache"]["hit"])
+        self.assertEqual([e["type"] for e in streamed], ["token", "done"])
+        self.assertEqual(again, [{"type": "done", "answer": "streamed steps of UMC-1", "metadata": again[0]["metadata"]}])
+        self.assertTrue(again[0]["metadata"]["answer_cache"]["hit"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+"""
+Unit tests for the trigram fuzzy label index (mini_marie.kg_server.fuzzy_index).
+
+Every lookup is checked against the full difflib scan it replaces.
+"""
+
+import os
+import random
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from mini_marie.kg_server import fuzzy_index
+from mini_marie.kg_server.fuzzy_index import (
+    FuzzyLabelIndex,
+    _typo,
+    benchmark,
+    full_scan_rank,
+    load_label_index,
+    save_label_index,
+    synthetic_labels,
+)
+
+
+LABELS = ["VMOP-17", "VMOP-18", "UMC-1", "vmop-17", "IRMOP-50", "Cage ZrT-1", "Zr-MOC-1", "CIAC-105", "Cu24(BDC)24"]
+
+
+class TestFuzzyLabelIndex(unittest.TestCase):
+    def test_small_index_matches_full_scan(self):
+        index = FuzzyLabelIndex(LABELS)
+        for query in ("VMOP-17", "vmop 17", "  umc1 ", "cage", "zrt", "", "x", "CIAC-150"):
+            for limit, cutoff in ((10, 0.6), (2, 0.3), (1, 0.0), (5, 1.0)):
+                self.assertEqual(
+                    index.rank(query, limit=limit, cutoff=cutoff),
+                    full_scan_rank(query, LABELS, limit=limit, cutoff=cutoff),
+                    (query, limit, cutoff),
+                )
+
+    def test_pruned_index_matches_full_scan(self):
+        labels = synthetic_labels(800, seed=1)
+        rng = random.Random(1)
+        queries = [_typo(rng.choice(labels), rng) for _ in range(8)] + ["cage", "VMOP", "zz"]
+        with mock.patch.object(fuzzy_index, "FULL_SCAN_LIMIT", 50), mock.patch.object(fuzzy_index, "MIN_CANDIDATES", 20):
+            index = FuzzyLabelIndex(labels)
+            for query in queries:
+                for limit, cutoff in ((10, 0.6), (3, 0.8), (5, 0.3)):
+                    self.assertEqual(
+                        index.rank(query, limit=limit, cutoff=cutoff),
+                        full_scan_rank(query, labels, limit=limit, cutoff=cutoff),
+                        (query, limit, cutoff),
+                    )
+
+    def test_upper_bounds_cap_ratio(self):
+        index = FuzzyLabelIndex(LABELS)
+        bounds = index.upper_bounds("vmop-17")
+        for i, label in enumerate(LABELS):
+            score = full_scan_rank("vmop-17", [label], cutoff=0.0)[0]["score"]
+            self.assertGreaterEqual(round(bounds[i], 4), score)
+
+    def test_binary_round_trip(self):
+        categories = {"syntheses": FuzzyLabelIndex(LABELS), "mops": FuzzyLabelIndex(["CIAC-105", "Κλωβός-1"]), "empty": FuzzyLabelIndex([])}
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "kg_label_index.bin"
+            save_label_index(path, {"source_merged_ttl_latest_mtime": 12.5}, categories)
+            meta, loaded = load_label_index(path)
+            self.assertEqual(meta["source_merged_ttl_latest_mtime"], 12.5)
+            self.assertEqual(list(loaded), ["syntheses", "mops", "empty"])
+            for name, index in categories.items():
+                self.assertEqual(loaded[name].labels, index.labels)
+                self.assertEqual(loaded[name].rank("VMOP-17"), index.rank("VMOP-17"))
+            self.assertEqual(loaded["mops"].rank("κλωβός"), categories["mops"].rank("κλωβός"))
+
+            path.write_bytes(path.read_bytes()[:-3])
+            self.assertIsNone(load_label_index(path))
+            self.assertIsNone(load_label_index(Path(tmp) / "missing.bin"))
+
+    def test_benchmark_reports_identical_results(self):
+        with mock.patch.object(fuzzy_index, "FULL_SCAN_LIMIT", 100):
+            report = benchmark(n=2000, queries=5, seed=3)
+        self.assertEqual(report["identical_results"], "5/5")
+        self.assertEqual(report["recall"], 1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
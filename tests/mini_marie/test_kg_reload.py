@@ -0,0 +1,282 @@
+"""
+Unit tests for the incremental reload of single papers in the MOPs KG
+(kg_operations.refresh_kg) and the lock guarding it (mini_marie.kg_server.rw_lock).
+
+After every reload, tool answers, fuzzy lookups and views are checked against a
+KG loaded from scratch.
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from rdflib import Dataset
+
+from mini_marie.kg_server import kg_operations
+from mini_marie.kg_server.query_cache import QueryResultCache
+from mini_marie.kg_server.rw_lock import ReadWriteLock
+
+
+PREFIXES = """
+@prefix ontosyn: <https://www.theworldavatar.com/kg/OntoSyn/> .
+@prefix ontomops: <https://www.theworldavatar.com/kg/ontomops/> .
+@prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> .
+@prefix xsd: <http://www.w3.org/2001/XMLSchema#> .
+"""
+
+PAPER1 = PREFIXES + """
+ontosyn:syn1 a ontosyn:ChemicalSynthesis ;
+    rdfs:label "VMOP-17" ;
+    ontosyn:hasChemicalInput ontosyn:dmf1 ;
+    ontosyn:hasSynthesisStep ontosyn:step1 .
+ontosyn:step1 a ontosyn:Add ; rdfs:label "Add 1" ; ontosyn:hasOrder "1"^^xsd:integer .
+ontosyn:dmf1 rdfs:label "DMF" .
+"""
+
+PAPER2 = PREFIXES + """
+ontosyn:syn2 a ontosyn:ChemicalSynthesis ;
+    rdfs:label "UMC-1" ;
+    ontosyn:hasChemicalInput ontosyn:dmf, ontosyn:water ;
+    ontosyn:hasSynthesisStep ontosyn:step2 .
+ontosyn:step2 a ontosyn:Add ; rdfs:label "Add x" ; ontosyn:hasOrder "1"^^xsd:integer .
+ontosyn:dmf rdfs:label "DMF" .
+ontosyn:water rdfs:label "water" .
+"""
+
+PAPER2_V2 = PREFIXES + """
+ontosyn:syn2 a ontosyn:ChemicalSynthesis ;
+    rdfs:label "UMC-2" ;
+    ontosyn:hasChemicalInput ontosyn:ethanol ;
+    ontosyn:hasSynthesisStep ontosyn:step2, ontosyn:step3 .
+ontosyn:step2 a ontosyn:Add ; rdfs:label "Add y" ; ontosyn:hasOrder "1"^^xsd:integer .
+ontosyn:step3 a ontosyn:HeatChill ; rdfs:label "Heat" ; ontosyn:hasOrder "2"^^xsd:integer .
+ontosyn:ethanol rdfs:label "ethanol" .
+"""
+
+PAPER3 = PREFIXES + """
+ontosyn:syn3 a ontosyn:ChemicalSynthesis ;
+    rdfs:label "IRMOP-50" ;
+    ontosyn:hasChemicalInput ontosyn:dmf .
+ontosyn:dmf rdfs:label "DMF" .
+"""
+
+# Uses p2's water node without labelling it itself
+PAPER4 = PREFIXES + """
+ontosyn:syn4 a ontosyn:ChemicalSynthesis ;
+    rdfs:label "MOP-4" ;
+    ontosyn:hasChemicalInput ontosyn:water .
+"""
+
+NAMES = ("VMOP-17", "UMC-1", "UMC-2", "IRMOP-50", "MOP-4")
+
+
+class TestRefreshKG(unittest.TestCase):
+    def setUp(self):
+        self._saved = {
+            name: getattr(kg_operations, name)
+            for name in ("_kg", "_kg_version", "_kg_sources", "_kg_snapshot", "_synthesis_views", "_label_index")
+        }
+        self._tmp = tempfile.TemporaryDirectory()
+        root = Path(self._tmp.name)
+        self.merged = root / "merged_tll"
+        cache = root / "cache"
+        cache.mkdir()
+        self._patches = [
+            mock.patch.object(kg_operations, "_merged_ttl_dir", return_value=self.merged),
+            mock.patch.object(kg_operations, "_snapshot_dir", return_value=cache / "kg_snapshot"),
+            mock.patch.object(kg_operations, "_index_path", return_value=cache / "kg_label_index.bin"),
+            mock.patch.object(kg_operations, "_views_path", return_value=cache / "synthesis_views.json"),
+            mock.patch.object(kg_operations, "_result_cache", QueryResultCache()),
+        ]
+        for p in self._patches:
+            p.start()
+        self._write("p1", PAPER1)
+        self._write("p2", PAPER2)
+        self._reset()
+
+    def tearDown(self):
+        for p in self._patches:
+            p.stop()
+        self._tmp.cleanup()
+        for name, value in self._saved.items():
+            setattr(kg_operations, name, value)
+
+    def _write(self, paper, text):
+        d = self.merged / paper
+        d.mkdir(parents=True, exist_ok=True)
+        ttl = d / f"{paper}.ttl"
+        ttl.write_text(text)
+        # Distinct mtimes even on coarse file systems
+        stamp = time.time() + len(list(self.merged.iterdir())) + getattr(self, "_bump", 0)
+        self._bump = getattr(self, "_bump", 0) + 10
+        os.utime(ttl, (stamp, stamp))
+
+    def _reset(self):
+        kg_operations._kg = None
+        kg_operations._kg_sources = {}
+        kg_operations._kg_snapshot = None
+        kg_operations._synthesis_views = None
+        kg_operations._label_index = None
+
+    def _state(self):
+        """Everything the reload has to keep consistent, as the tools see it."""
+        return {
+            "steps": {n: kg_operations.get_synthesis_step_index(n) for n in NAMES},
+            "overview": {n: kg_operations.get_synthesis_overview(n) for n in NAMES},
+            "syntheses": sorted(r["match"] for r in kg_operations.fuzzy_lookup_synthesis_name("UMC-1", limit=10, cutoff=0.1)),
+            "chemicals": sorted(kg_operations.warm_label_index()["chemicals"].labels),
+            "triples": len(kg_operations.ensure_kg_loaded()),
+        }
+
+    def _fresh_state(self):
+        self._reset()
+        return self._state()
+
+    def _load(self):
+        kg_operations.ensure_kg_loaded()
+        kg_operations.warm_label_index()
+        kg_operations.build_synthesis_views()
+
+    def test_changed_paper_is_reloaded_alone(self):
+        self._load()
+        self.assertIsInstance(kg_operations._kg, Dataset)
+        kg_operations.get_synthesis_steps("VMOP-17")
+        kg_operations.get_synthesis_steps("UMC-1")
+
+        self._write("p2", PAPER2_V2)
+        summary = kg_operations.refresh_kg()
+        self.assertEqual((summary["changed"], summary["removed"]), (["p2"], []))
+
+        # Unaffected synthesis: still answered from the views and the carried-over cache
+        misses = kg_operations._result_cache.misses
+        kg_operations.get_synthesis_step_index("VMOP-17")
+        kg_operations.get_synthesis_steps("VMOP-17")
+        self.assertEqual(kg_operations._result_cache.misses, misses)
+
+        state = self._state()
+        self.assertEqual([r["stepLabel"] for r in state["steps"]["UMC-2"]], ["Add y", "Heat"])
+        self.assertEqual(state["steps"]["UMC-1"], [])
+        self.assertIn("UMC-2", state["syntheses"])
+        self.assertNotIn("UMC-1", state["syntheses"])
+        # "water" was only used by the old version; "DMF" is still used by p1
+        self.assertEqual(state["chemicals"], ["DMF", "ethanol"])
+        self.assertEqual(state, self._fresh_state())
+
+    def test_papers_sharing_nodes_are_recomputed(self):
+        self._write("p4", PAPER4)
+        self._load()
+        self.assertEqual([r["chemicalLabel"] for r in kg_operations.get_synthesis_recipe("MOP-4")], ["water"])
+
+        self._write("p2", PAPER2_V2)
+        self.assertEqual(kg_operations.refresh_kg()["changed"], ["p2"])
+        # p2 no longer labels the water node p4 points at
+        self.assertEqual([r["chemicalLabel"] for r in kg_operations.get_synthesis_recipe("MOP-4")], [None])
+        self.assertEqual(self._state(), self._fresh_state())
+
+    def test_added_and_removed_papers(self):
+        self._load()
+        self._write("p3", PAPER3)
+        self.assertEqual(kg_operations.refresh_kg()["changed"], ["p3"])
+        self.assertEqual(self._state(), self._fresh_state())
+
+        self._load()
+        for f in (self.merged / "p1").iterdir():
+            f.unlink()
+        (self.merged / "p1").rmdir()
+        self.assertEqual(kg_operations.refresh_kg()["removed"], ["p1"])
+        state = self._state()
+        # DMF is shared with p3, so it survives dropping p1
+        self.assertEqual(state["chemicals"], ["DMF", "water"])
+        self.assertEqual(state["steps"]["VMOP-17"], [])
+        self.assertEqual(state, self._fresh_state())
+
+    def test_reload_from_snapshot(self):
+        self._load()
+        self._reset()
+        kg_operations.ensure_kg_loaded()
+        self.assertIsNotNone(kg_operations._kg_snapshot)
+        kg_operations.warm_label_index()
+        kg_operations.build_synthesis_views()
+
+        self._write("p2", PAPER2_V2)
+        self.assertEqual(kg_operations.refresh_kg()["changed"], ["p2"])
+        self.assertIsInstance(kg_operations._kg, Dataset)
+        self.assertIsNone(kg_operations._kg_snapshot)
+        self.assertEqual(self._state(), self._fresh_state())
+
+        # The rewritten snapshot holds the new state
+        self._reset()
+        kg_operations.ensure_kg_loaded()
+        self.assertIsNotNone(kg_operations._kg_snapshot)
+        self.assertEqual([r["stepLabel"] for r in kg_operations.get_synthesis_step_index("UMC-2")], ["Add y", "Heat"])
+
+    def test_nothing_changed(self):
+        self._load()
+        version = kg_operations._kg_version
+        summary = kg_operations.refresh_kg()
+        self.assertEqual((summary["changed"], summary["removed"]), ([], []))
+        self.assertEqual(kg_operations._kg_version, version)
+
+
+class TestReadWriteLock(unittest.TestCase):
+    def test_writer_waits_for_readers_and_blocks_new_ones(self):
+        lock = ReadWriteLock()
+        events = []
+        reading = threading.Event()
+        release = threading.Event()
+
+        def reader():
+            with lock.read():
+                reading.set()
+                release.wait()
+                events.append("read done")
+
+        def writer():
+            with lock.write():
+                events.append("write")
+
+        r = threading.Thread(target=reader)
+        r.start()
+        reading.wait()
+        w = threading.Thread(target=writer)
+        w.start()
+        time.sleep(0.05)
+        self.assertEqual(events, [])
+        release.set()
+        r.join(1)
+        w.join(1)
+        self.assertEqual(events, ["read done", "write"])
+
+    def test_nested_reads_do_not_deadlock_with_waiting_writer(self):
+        lock = ReadWriteLock()
+        entered = threading.Event()
+        done = []
+
+        def writer():
+            with lock.write():
+                done.append("write")
+
+        with lock.read():
+            w = threading.Thread(target=writer)
+            w.start()
+            time.sleep(0.05)
+            with lock.read():
+                done.append("nested read")
+        w.join(1)
+        self.assertEqual(done, ["nested read", "write"])
+        # The writer may read what it writes
+        with lock.write():
+            with lock.read():
+                entered.set()
+        self.assertTrue(entered.is_set())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,159 @@
+"""
+Unit tests for the compiled merged-KG snapshot (mini_marie.kg_server.kg_snapshot).
+
+SPARQL over the snapshot store is checked against the same queries over the
+parsed in-memory graph.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from rdflib import Graph, Literal, URIRef
+
+from mini_marie.kg_server.kg_snapshot import build_snapshot, load_snapshot
+
+
+TTL = """
+@prefix ontosyn: <https://www.theworldavatar.com/kg/OntoSyn/> .
+@prefix ontomops: <https://www.theworldavatar.com/kg/ontomops/> .
+@prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> .
+@prefix xsd: <http://www.w3.org/2001/XMLSchema#> .
+
+ontosyn:syn1 a ontosyn:ChemicalSynthesis ;
+    rdfs:label "UMC-1 synthesis" ;
+    ontosyn:hasChemicalInput ontosyn:chem1, ontosyn:chem2 ;
+    ontosyn:hasChemicalOutput ontomops:mop1 ;
+    ontosyn:hasStep [ a ontosyn:HeatChill ; ontosyn:hasOrder "1"^^xsd:integer ] .
+
+ontosyn:syn2 a ontosyn:ChemicalSynthesis ;
+    rdfs:label "IRMOP-50 synthesis"@en ;
+    ontosyn:hasChemicalInput ontosyn:chem1 .
+
+ontosyn:chem1 rdfs:label "DMF" .
+ontosyn:chem2 rdfs:label "Cu(NO3)2" .
+ontomops:mop1 a ontomops:MetalOrganicPolyhedron ;
+    rdfs:label "UMC-1" ;
+    ontomops:hasCCDCNumber "1479720" ;
+    ontomops:hasMolecularWeight "1234.5"^^xsd:double .
+"""
+
+QUERIES = [
+    """SELECT ?s ?label WHERE { ?s a <https://www.theworldavatar.com/kg/OntoSyn/ChemicalSynthesis> ; rdfs:label ?label }""",
+    """PREFIX ontosyn: <https://www.theworldavatar.com/kg/OntoSyn/>
+       SELECT ?label (COUNT(?syn) AS ?n) WHERE { ?syn ontosyn:hasChemicalInput ?c . ?c rdfs:label ?label }
+       GROUP BY ?label ORDER BY DESC(?n) ?label""",
+    """PREFIX ontosyn: <https://www.theworldavatar.com/kg/OntoSyn/>
+       SELECT ?syn ?order WHERE { ?syn ontosyn:hasStep/ontosyn:hasOrder ?order }""",
+    """PREFIX ontomops: <https://www.theworldavatar.com/kg/ontomops/>
+       SELECT ?m ?ccdc ?mw WHERE { ?m rdfs:label "UMC-1" . OPTIONAL { ?m ontomops:hasCCDCNumber ?ccdc }
+       OPTIONAL { ?m ontomops:hasMolecularWeight ?mw } FILTER(?mw > 1000) }""",
+    """SELECT ?s WHERE { ?s rdfs:label "IRMOP-50 synthesis"@en }""",
+    """SELECT ?s WHERE { ?s rdfs:label "not in the graph" }""",
+    """SELECT ?s ?p ?o WHERE { ?s ?p ?o } ORDER BY ?s ?p ?o""",
+]
+
+
+class TestKGSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.snapshot_dir = Path(self.temp_dir) / "kg_snapshot"
+        self.graph = Graph()
+        self.graph.parse(data=TTL, format="turtle")
+        build_snapshot(self.graph, self.snapshot_dir, source_mtime=100.0, ttl_files=1)
+        self.snapshot = load_snapshot(self.snapshot_dir, source_mtime=100.0)
+
+    def tearDown(self):
+        if self.snapshot is not None:
+            self.snapshot.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    @staticmethod
+    def _rows(graph, query):
+        # Blank node ids differ between graphs; compare them as a placeholder
+        return sorted(
+            tuple("_:b" if v is not None and v.n3().startswith("_:") else (v.n3() if v is not None else None) for v in row)
+            for row in graph.query(query)
+        )
+
+    def test_queries_match_parsed_graph(self):
+        snap_graph = self.snapshot.graph()
+        self.assertEqual(len(snap_graph), len(self.graph))
+        for query in QUERIES:
+            self.assertEqual(self._rows(snap_graph, query), self._rows(self.graph, query), query)
+
+    def test_pattern_lookups(self):
+        syn1 = URIRef("https://www.theworldavatar.com/kg/OntoSyn/syn1")
+        label = URIRef("http://www.w3.org/2000/01/rdf-schema#label")
+        self.assertEqual(list(self.snapshot.match(syn1, label, None)), [(syn1, label, Literal("UMC-1 synthesis"))])
+        self.assertEqual(len(list(self.snapshot.match(None, label, None))), len(list(self.graph.triples((None, label, None)))))
+        self.assertEqual(list(self.snapshot.match(None, None, Literal("missing"))), [])
+
+    def test_namespaces_are_kept(self):
+        namespaces = dict(self.snapshot.graph().namespaces())
+        self.assertEqual(str(namespaces["ontosyn"]), "https://www.theworldavatar.com/kg/OntoSyn/")
+
+    def test_store_is_read_only(self):
+        with self.assertRaises(TypeError):
+            self.snapshot.graph().add((URIRef("urn:a"), URIRef("urn:b"), URIRef("urn:c")))
+
+    def test_stale_or_incomplete_snapshot_is_ignored(self):
+        self.assertIsNone(load_snapshot(self.snapshot_dir, source_mtime=200.0))
+        with open(self.snapshot.snapshot_dir / "triples.bin", "ab") as f:
+            f.write(b"\0\0\0\0")
+        self.assertIsNone(load_snapshot(self.snapshot_dir, source_mtime=100.0))
+        self.assertIsNone(load_snapshot(Path(self.temp_dir) / "missing", source_mtime=0.0))
+
+    def test_rebuild_swaps_all_files_together(self):
+        old_dir = self.snapshot.snapshot_dir
+        extra = Graph()
+        extra.parse(data=TTL, format="turtle")
+        extra.add((URIRef("urn:a"), URIRef("urn:b"), Literal("c")))
+        build_snapshot(extra, self.snapshot_dir, source_mtime=150.0, ttl_files=2)
+        rebuilt = load_snapshot(self.snapshot_dir, source_mtime=150.0)
+        try:
+            self.assertNotEqual(rebuilt.snapshot_dir, old_dir)
+            self.assertEqual(rebuilt.num_triples, len(extra))
+            self.assertEqual(rebuilt.meta["ttl_files"], 2)
+            # The build an open snapshot maps is kept until the next rebuild
+            self.assertEqual(len(list(self.snapshot.match(None, None, None))), len(self.graph))
+        finally:
+            rebuilt.close()
+        build_snapshot(self.graph, self.snapshot_dir, source_mtime=200.0)
+        self.assertFalse(old_dir.exists())
+
+    def test_concurrent_first_term_lookups(self):
+        for _ in range(20):
+            snapshot = load_snapshot(self.snapshot_dir, source_mtime=100.0)
+            errors = []
+
+            def _lookup():
+                try:
+                    for i in range(snapshot.meta["terms"]):
+                        snapshot.term(i)
+                except Exception as e:
+                    errors.append(e)
+
+            threads = [threading.Thread(target=_lookup) for _ in range(4)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            snapshot.close()
+            self.assertEqual(errors, [])
+
+    def test_empty_graph(self):
+        build_snapshot(Graph(), self.snapshot_dir, source_mtime=100.0)
+        snapshot = load_snapshot(self.snapshot_dir, source_mtime=100.0)
+        self.assertEqual(len(snapshot.graph()), 0)
+        self.assertEqual(list(snapshot.graph().query("SELECT ?s WHERE { ?s ?p ?o }")), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+"""
+Unit tests for the prepared-query result cache of the MOPs KG tools
+(mini_marie.kg_server.query_cache and kg_operations.run_query).
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from rdflib import Graph
+
+from mini_marie.kg_server import kg_operations
+from mini_marie.kg_server.query_cache import QueryResultCache, estimate_size
+
+
+TTL = """
+@prefix ontosyn: <https://www.theworldavatar.com/kg/OntoSyn/> .
+@prefix ontomops: <https://www.theworldavatar.com/kg/ontomops/> .
+@prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> .
+
+ontosyn:syn1 a ontosyn:ChemicalSynthesis ;
+    rdfs:label "VMOP-17" ;
+    ontosyn:hasSynthesisStep ontosyn:step1, ontosyn:step2 .
+ontosyn:step1 a ontosyn:Add ; rdfs:label "Add 1" .
+ontosyn:step2 a ontosyn:HeatChill ; rdfs:label "Heat 2" .
+
+ontosyn:syn2 a ontosyn:ChemicalSynthesis ;
+    rdfs:label "UMC-1" ;
+    ontosyn:hasSynthesisStep ontosyn:step3 .
+ontosyn:step3 a ontosyn:Add ; rdfs:label "Add x" .
+
+ontomops:mop1 a ontomops:MetalOrganicPolyhedron ;
+    rdfs:label "CIAC-105" ;
+    ontomops:hasCCDCNumber "869988" ;
+    ontomops:hasChemicalBuildingUnit ontomops:cbu1 .
+ontomops:cbu1 ontomops:hasCBUFormula "[V6O6(OCH3)9(SO4)]" .
+"""
+
+
+class TestQueryResultCache(unittest.TestCase):
+    def test_get_returns_copies(self):
+        cache = QueryResultCache()
+        cache.put("k", [{"a": "1"}])
+        rows = cache.get("k")
+        rows[0]["a"] = "changed"
+        self.assertEqual(cache.get("k"), [{"a": "1"}])
+        self.assertEqual((cache.hits, cache.misses), (2, 0))
+        self.assertIsNone(cache.get("missing"))
+        self.assertEqual(cache.misses, 1)
+
+    def test_evicts_least_recently_used_over_budget(self):
+        rows = [{"x": "v" * 100}]
+        size = estimate_size(rows)
+        cache = QueryResultCache(max_bytes=2 * size)
+        cache.put("a", rows)
+        cache.put("b", rows)
+        cache.get("a")
+        cache.put("c", rows)
+        self.assertIsNotNone(cache.get("a"))
+        self.assertIsNone(cache.get("b"))
+        self.assertIsNotNone(cache.get("c"))
+        self.assertLessEqual(cache.stats()["bytes"], 2 * size)
+
+    def test_oversized_result_is_not_cached(self):
+        cache = QueryResultCache(max_bytes=10)
+        cache.put("k", [{"a": "1"}])
+        self.assertIsNone(cache.get("k"))
+        self.assertEqual(cache.stats()["entries"], 0)
+
+
+class TestRunQuery(unittest.TestCase):
+    def setUp(self):
+        self._saved = (kg_operations._kg, kg_operations._kg_version)
+        graph = Graph()
+        graph.parse(data=TTL, format="turtle")
+        kg_operations._kg = graph
+        kg_operations._kg_version += 1
+        kg_operations._result_cache.clear()
+
+    def tearDown(self):
+        kg_operations._kg, kg_operations._kg_version = self._saved
+        kg_operations._result_cache.clear()
+
+    def test_bindings_match_inlined_literal(self):
+        query = """
+        PREFIX ontosyn: <https://www.theworldavatar.com/kg/OntoSyn/>
+        PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
+        SELECT ?stepLabel WHERE {
+            ?s rdfs:label %s ; ontosyn:hasSynthesisStep ?step .
+            ?step rdfs:label ?stepLabel .
+        } ORDER BY ?stepLabel
+        """
+        for name in ("VMOP-17", "UMC-1", "unknown"):
+            expected = kg_operations.execute_sparql(query % f'"{name}"')
+            got = kg_operations.run_query("t", query % "?name", {"name": name})
+            self.assertEqual(got, expected)
+
+    def test_tool_results_are_cached_per_binding(self):
+        steps = kg_operations.get_synthesis_steps("VMOP-17")
+        self.assertEqual([r["stepLabel"] for r in steps], ["Add 1", "Heat 2"])
+        self.assertEqual(steps[0]["stepType"], "Add")
+
+        # Post-processing of the first call must not leak into the cached rows
+        again = kg_operations.get_synthesis_steps("VMOP-17")
+        self.assertEqual(again, steps)
+        self.assertEqual(kg_operations._result_cache.hits, 1)
+
+        other = kg_operations.get_synthesis_steps("UMC-1")
+        self.assertEqual([r["stepLabel"] for r in other], ["Add x"])
+
+    def test_parameters_with_quotes(self):
+        self.assertEqual(kg_operations.lookup_synthesis_iri('VMOP-17" . ?x ?y ?z'), [])
+        rows = kg_operations.lookup_synthesis_iri("VMOP-17")
+        self.assertEqual(rows[0]["synthesisLabel"], "VMOP-17")
+
+    def test_filter_and_statistics(self):
+        rows = kg_operations.find_mops_by_cbu_formula_contains("v6o6")
+        self.assertEqual([r["mopLabel"] for r in rows], ["CIAC-105"])
+        self.assertEqual(kg_operations.lookup_by_ccdc("869988")[0]["mopLabel"], "CIAC-105")
+        stats = kg_operations.get_kg_statistics()
+        self.assertEqual(stats["total_syntheses"], 2)
+        self.assertEqual(stats["total_synthesis_steps"], 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,140 @@
+"""
+Unit tests for the per-synthesis materialized views of the MOPs KG tools
+(mini_marie.kg_server.synthesis_views and kg_operations.get_synthesis_overview).
+
+Every overview tool answered from the views is checked against the same tool
+answered by its bound SPARQL query.
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from rdflib import Graph
+
+from mini_marie.kg_server import kg_operations
+from mini_marie.kg_server.synthesis_views import SynthesisViews, query_signature, unbound_query
+
+
+TTL = """
+@prefix ontosyn: <https://www.theworldavatar.com/kg/OntoSyn/> .
+@prefix ontomops: <https://www.theworldavatar.com/kg/ontomops/> .
+@prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> .
+@prefix xsd: <http://www.w3.org/2001/XMLSchema#> .
+
+ontosyn:syn1 a ontosyn:ChemicalSynthesis ;
+    rdfs:label "VMOP-17" ;
+    ontosyn:hasSynthesisStep ontosyn:step1, ontosyn:step2 ;
+    ontosyn:hasChemicalOutput ontosyn:out1 .
+ontosyn:step1 a ontosyn:Add ; rdfs:label "Add 1" ; ontosyn:hasOrder "1"^^xsd:integer .
+ontosyn:step2 a ontosyn:HeatChill ; rdfs:label "Heat 2" ; ontosyn:hasOrder "2"^^xsd:integer .
+ontosyn:out1 ontosyn:isRepresentedBy ontomops:mop1 .
+
+ontosyn:syn2 a ontosyn:ChemicalSynthesis ;
+    rdfs:label "UMC-1" ;
+    ontosyn:hasSynthesisStep ontosyn:step3 .
+ontosyn:step3 a ontosyn:Add ; rdfs:label "Add x" ; ontosyn:hasOrder "1"^^xsd:integer .
+
+ontosyn:syn3 a ontosyn:ChemicalSynthesis ;
+    rdfs:label "IRMOP-50"@en ;
+    ontosyn:hasSynthesisStep ontosyn:step4 .
+ontosyn:step4 a ontosyn:Add ; rdfs:label "Add y" .
+
+ontomops:mop1 a ontomops:MetalOrganicPolyhedron ;
+    rdfs:label "CIAC-105" ;
+    ontomops:hasCCDCNumber "869988" ;
+    ontomops:hasMOPFormula "[V6O6]" .
+"""
+
+
+class TestUnboundQuery(unittest.TestCase):
+    def test_projects_group_variable(self):
+        query = "SELECT DISTINCT ?a WHERE { ?s ?p ?a }"
+        self.assertEqual(unbound_query(query), "SELECT DISTINCT ?synthesisName ?a WHERE { ?s ?p ?a }")
+
+    def test_rejects_queries_that_cannot_be_grouped(self):
+        for query in (
+            "SELECT DISTINCT ?a WHERE { ?s ?p ?a } LIMIT 5",
+            "SELECT ?a (COUNT(?s) AS ?n) WHERE { ?s ?p ?a } GROUP BY ?a",
+            "SELECT ?a WHERE { ?s ?p ?a }",
+        ):
+            with self.assertRaises(ValueError):
+                unbound_query(query)
+
+
+class TestSynthesisViews(unittest.TestCase):
+    def setUp(self):
+        self._saved = (kg_operations._kg, kg_operations._kg_version, kg_operations._synthesis_views)
+        graph = Graph()
+        graph.parse(data=TTL, format="turtle")
+        kg_operations._kg = graph
+        kg_operations._kg_version += 1
+        kg_operations._synthesis_views = None
+        kg_operations._result_cache.clear()
+        self._tmp = tempfile.TemporaryDirectory()
+        self._views_path = Path(self._tmp.name) / "synthesis_views.json"
+        self._patches = [
+            mock.patch.object(kg_operations, "_views_path", return_value=self._views_path),
+            mock.patch.object(kg_operations, "_latest_mtime_in_dir", return_value=0.0),
+        ]
+        for p in self._patches:
+            p.start()
+
+    def tearDown(self):
+        for p in self._patches:
+            p.stop()
+        self._tmp.cleanup()
+        kg_operations._kg, kg_operations._kg_version, kg_operations._synthesis_views = self._saved
+        kg_operations._result_cache.clear()
+
+    def test_views_match_bound_queries(self):
+        names = ("VMOP-17", "UMC-1", "IRMOP-50", "unknown")
+        expected = {n: {s: fn(n) for s, fn in kg_operations._OVERVIEW_SECTIONS.items()} for n in names}
+
+        views = kg_operations.build_synthesis_views()
+        self.assertEqual(views.synthesis_names(), ["UMC-1", "VMOP-17"])
+        misses = kg_operations._result_cache.misses
+        for name in names:
+            for section, fn in kg_operations._OVERVIEW_SECTIONS.items():
+                self.assertEqual(fn(name), expected[name][section], f"{section} for {name}")
+        # Everything was answered from the views
+        self.assertEqual(kg_operations._result_cache.misses, misses)
+
+    def test_overview(self):
+        overview = kg_operations.get_synthesis_overview("VMOP-17")
+        self.assertEqual([r["stepLabel"] for r in overview["steps"]], ["Add 1", "Heat 2"])
+        self.assertEqual(overview["steps"][0]["stepType"], "Add")
+        self.assertEqual(overview["products"][0]["ccdcNumber"], "869988")
+        self.assertNotIn("yield", overview)
+        self.assertEqual(kg_operations.get_synthesis_overview("unknown"), {})
+        self.assertEqual(kg_operations.query_cache_stats()["synthesis_views"], len(kg_operations._overview_view_queries()))
+
+    def test_views_are_persisted_and_invalidated(self):
+        built = kg_operations.build_synthesis_views()
+        keys = list(built.views)
+        signature = query_signature(keys)
+
+        loaded = SynthesisViews.load(self._views_path, 0.0, signature)
+        self.assertIsNotNone(loaded)
+        for key in keys:
+            self.assertEqual(loaded.views[key].groups, built.views[key].groups)
+
+        self.assertIsNone(SynthesisViews.load(self._views_path, 1e12, signature))
+        self.assertIsNone(SynthesisViews.load(self._views_path, 0.0, "other"))
+
+    def test_new_graph_drops_views(self):
+        kg_operations.build_synthesis_views()
+        kg_operations._kg_version += 1
+        misses = kg_operations._result_cache.misses
+        # Stale views are ignored; the tools fall back to the graph
+        self.assertEqual([r["stepLabel"] for r in kg_operations.get_synthesis_step_index("UMC-1")], ["Add x"])
+        self.assertEqual(kg_operations._result_cache.misses, misses + 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
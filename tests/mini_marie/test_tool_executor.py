@@ -0,0 +1,95 @@
+"""
+Unit tests for the bounded executor of the mops-kg tools
+(mini_marie.kg_server.tool_executor) and the non-blocking label index swap.
+"""
+
+import asyncio
+import os
+import sys
+import threading
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from mini_marie.kg_server import kg_operations
+from mini_marie.kg_server.fuzzy_index import FuzzyLabelIndex
+from mini_marie.kg_server.tool_executor import KGToolExecutor
+
+
+class TestKGToolExecutor(unittest.TestCase):
+    def setUp(self):
+        self.executor = KGToolExecutor(max_workers=2)
+
+    def tearDown(self):
+        self.executor.shutdown()
+
+    def test_blocking_calls_overlap(self):
+        barrier = threading.Barrier(2, timeout=5)
+
+        def work(x):
+            # Deadlocks (BrokenBarrierError) unless both calls run at once
+            barrier.wait()
+            return x * 2
+
+        async def main():
+            return await asyncio.gather(self.executor.run(work, 1), self.executor.run(work, x=2))
+
+        self.assertEqual(asyncio.run(main()), [2, 4])
+        stats = self.executor.stats()
+        self.assertEqual(stats["peak_in_flight"], 2)
+        self.assertEqual((stats["in_flight"], stats["running"], stats["completed"]), (0, 0, 2))
+
+    def test_event_loop_stays_responsive(self):
+        release = threading.Event()
+
+        async def main():
+            slow = asyncio.ensure_future(self.executor.run(release.wait, 5))
+            await asyncio.sleep(0.01)
+            self.assertEqual(self.executor.stats()["in_flight"], 1)
+            release.set()
+            return await slow
+
+        self.assertTrue(asyncio.run(main()))
+
+    def test_failures_are_counted_and_raised(self):
+        def fail():
+            raise ValueError("boom")
+
+        with self.assertRaises(ValueError):
+            asyncio.run(self.executor.run(fail))
+        stats = self.executor.stats()
+        self.assertEqual((stats["in_flight"], stats["completed"], stats["failed"]), (0, 0, 1))
+
+
+class TestLabelIndexSwap(unittest.TestCase):
+    def setUp(self):
+        self._saved = kg_operations._label_index
+
+    def tearDown(self):
+        kg_operations._label_index = self._saved
+
+    def test_readers_see_old_index_during_rebuild(self):
+        kg_operations._label_index = {"meta": {}, "syntheses": FuzzyLabelIndex(["VMOP-17"])}
+        new = {"meta": {}, "syntheses": ["UMC-1"], "mops": [], "chemicals": [], "ir_materials": []}
+        building, finish = threading.Event(), threading.Event()
+
+        def build():
+            building.set()
+            finish.wait(5)
+            return new
+
+        with mock.patch.object(kg_operations, "_build_label_index", side_effect=build), \
+                mock.patch.object(kg_operations, "_index_path") as index_path:
+            index_path.return_value.write_text.return_value = 0
+            rebuild = threading.Thread(target=kg_operations.warm_label_index, kwargs={"force": True})
+            rebuild.start()
+            self.assertTrue(building.wait(5))
+            self.assertEqual(kg_operations.fuzzy_lookup_synthesis_name("VMOP-17")[0]["match"], "VMOP-17")
+            finish.set()
+            rebuild.join(5)
+        self.assertEqual(kg_operations.fuzzy_lookup_synthesis_name("UMC-1")[0]["match"], "UMC-1")
+
+
+if __name__ == '__main__':
+    unittest.main()
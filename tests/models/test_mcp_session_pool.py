@@ -0,0 +1,95 @@
+"""
+Tests for the process-wide MCP session pool (models.MCPSessionPool).
+
+A small FastMCP stdio server, written to a temporary directory, reports its
+process id and can be told to exit.
+"""
+
+import asyncio
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from models.MCPSessionPool import MCPSessionPool
+
+SERVER = '''
+import os
+from mcp.server.fastmcp import FastMCP
+
+mcp = FastMCP("fake")
+
+
+@mcp.tool()
+def pid() -> str:
+    """Process id of the server."""
+    return str(os.getpid())
+
+
+@mcp.tool()
+def crash() -> str:
+    """Exit the server process."""
+    os._exit(1)
+
+
+@mcp.prompt(name="instruction")
+def instruction() -> str:
+    return "Use the fake tools."
+
+
+if __name__ == "__main__":
+    mcp.run(transport="stdio")
+'''
+
+
+class TestMCPSessionPool(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        script = os.path.join(self.temp_dir, "fake_server.py")
+        with open(script, "w", encoding="utf-8") as f:
+            f.write(SERVER)
+        self.cfg = {"fake": {"command": sys.executable, "args": [script], "transport": "stdio"}}
+        self.pool = MCPSessionPool()
+
+    def tearDown(self):
+        self.pool.close()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _tools(self):
+        # Each agent run calls asyncio.run, so every lookup comes from a new loop
+        tools, instructions = asyncio.run(self.pool.get_tools_and_instructions("test.json", self.cfg, ["fake"]))
+        return {t.name: t for t in tools}, instructions
+
+    def test_reuses_server_across_runs(self):
+        tools, instructions = self._tools()
+        self.assertEqual([m.content for m in instructions], ["Use the fake tools."])
+        pid = asyncio.run(tools["pid"].ainvoke({}))
+
+        tools_again, _ = self._tools()
+        self.assertEqual(asyncio.run(tools_again["pid"].ainvoke({})), pid)
+        self.assertEqual(self.pool._servers[("test.json", "fake")].restarts, 0)
+
+    def test_concurrent_callers_restart_crashed_server_once(self):
+        tools, _ = self._tools()
+        pid = asyncio.run(tools["pid"].ainvoke({}))
+        with self.assertRaises(Exception):
+            asyncio.run(tools["crash"].ainvoke({}))
+
+        async def _callers():
+            return await asyncio.gather(*(tools["pid"].ainvoke({}) for _ in range(4)))
+
+        pids = asyncio.run(_callers())
+        self.assertEqual(len(set(pids)), 1)
+        self.assertNotEqual(pids[0], pid)
+        self.assertEqual(self.pool._servers[("test.json", "fake")].restarts, 1)
+
+        # The next run gets the restarted server
+        tools_again, _ = self._tools()
+        self.assertEqual(asyncio.run(tools_again["pid"].ainvoke({})), pids[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
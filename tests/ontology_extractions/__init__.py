@@ -0,0 +1,3 @@
+"""
+Ontology extraction pipeline tests package.
+"""
@@ -0,0 +1,111 @@
+"""
+Unit tests for the per-entity extraction scheduler.
+
+This module tests src.pipelines.main_ontology_extractions.scheduler with
+fake workers and a fake clock, so no LLM access is needed.
+"""
+
+import unittest
+import asyncio
+import os
+import sys
+
+# Add the project root to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.pipelines.utils.scheduler import (
+    ModelRateLimiter,
+    TokenBucket,
+    run_bounded,
+)
+
+
+class _FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestTokenBucket(unittest.TestCase):
+    def test_burst_then_wait(self):
+        clock = _FakeClock()
+        bucket = TokenBucket(rate=2.0, capacity=2, clock=clock)
+        self.assertEqual(bucket.reserve(), 0.0)
+        self.assertEqual(bucket.reserve(), 0.0)
+        self.assertAlmostEqual(bucket.reserve(), 0.5)
+        # Waiters queue up behind each other
+        self.assertAlmostEqual(bucket.reserve(), 1.0)
+
+    def test_refill_is_capped(self):
+        clock = _FakeClock()
+        bucket = TokenBucket(rate=1.0, capacity=1, clock=clock)
+        bucket.reserve()
+        clock.now = 100.0
+        self.assertEqual(bucket.reserve(), 0.0)
+        self.assertAlmostEqual(bucket.reserve(), 1.0)
+
+    def test_rejects_non_positive_rate(self):
+        with self.assertRaises(ValueError):
+            TokenBucket(rate=0)
+
+
+class TestModelRateLimiter(unittest.TestCase):
+    def test_buckets_are_per_model(self):
+        limiter = ModelRateLimiter({"gpt-4.1": 60, "default": 120})
+        self.assertIsNot(limiter._bucket("gpt-4.1"), limiter._bucket("gpt-4o"))
+        self.assertAlmostEqual(limiter._bucket("gpt-4.1").rate, 1.0)
+        self.assertAlmostEqual(limiter._bucket("gpt-4o").rate, 2.0)
+
+    def test_unconfigured_models_are_not_throttled(self):
+        limiter = ModelRateLimiter({"gpt-4.1": 60})
+        self.assertIsNone(limiter._bucket("gpt-4o"))
+        asyncio.run(limiter.acquire("gpt-4o"))
+
+
+class TestRunBounded(unittest.TestCase):
+    def test_results_follow_input_order_and_cap_is_respected(self):
+        in_flight = 0
+        peak = 0
+
+        async def worker(item):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            # Later items finish first
+            await asyncio.sleep(0.01 * (5 - item))
+            in_flight -= 1
+            return item * 10
+
+        results = asyncio.run(run_bounded([0, 1, 2, 3, 4], worker, max_concurrency=2))
+        self.assertEqual(results, [0, 10, 20, 30, 40])
+        self.assertEqual(peak, 2)
+
+    def test_exceptions_stay_in_their_slot(self):
+        async def worker(item):
+            if item == "bad":
+                raise RuntimeError("boom")
+            return item
+
+        results = asyncio.run(run_bounded(["a", "bad", "c"], worker))
+        self.assertEqual(results[0], "a")
+        self.assertIsInstance(results[1], RuntimeError)
+        self.assertEqual(results[2], "c")
+
+    def test_same_key_runs_sequentially(self):
+        order = []
+
+        async def worker(item):
+            order.append(("start", item))
+            await asyncio.sleep(0.01)
+            order.append(("end", item))
+            return item
+
+        items = ["x1", "x2"]
+        asyncio.run(run_bounded(items, worker, max_concurrency=4, key=lambda i: i[0]))
+        self.assertEqual(order, [("start", "x1"), ("end", "x1"), ("start", "x2"), ("end", "x2")])
+
+
+if __name__ == "__main__":
+    unittest.main()
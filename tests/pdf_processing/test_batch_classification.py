@@ -0,0 +1,111 @@
+"""
+Unit tests for batched section classification.
+
+This module tests src.pipelines.section_classification.batch with a fake
+structured-output LLM, so no network access is needed.
+"""
+
+import unittest
+import asyncio
+import tempfile
+import json
+import os
+import shutil
+import sys
+
+# Add the project root to the path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.pipelines.section_classification.batch import (
+    SectionDecision,
+    SectionDecisions,
+    build_batch_prompt,
+    classify_sections_batched,
+    validate_decisions,
+)
+
+
+class _FakeLLM:
+    """Returns a canned SectionDecisions for every call and records the prompts."""
+
+    def __init__(self, decisions, fail_times=0):
+        self.decisions = decisions
+        self.fail_times = fail_times
+        self.prompts = []
+
+    async def ainvoke(self, prompt):
+        self.prompts.append(prompt)
+        if self.fail_times > 0:
+            self.fail_times -= 1
+            raise RuntimeError("transient")
+        return SectionDecisions(decisions=[SectionDecision(section_index=i, decision=d) for i, d in self.decisions])
+
+
+class TestValidateDecisions(unittest.TestCase):
+    def test_ignores_unknown_and_conflicting_sections(self):
+        result = SectionDecisions(decisions=[
+            SectionDecision(section_index=0, decision="keep"),
+            SectionDecision(section_index=1, decision="keep"),
+            SectionDecision(section_index=1, decision="discard"),
+            SectionDecision(section_index=9, decision="discard"),
+        ])
+        decided = validate_decisions(result, ["Section 0", "Section 1", "Section 2"])
+        self.assertEqual(decided, {"Section 0": "keep"})
+
+    def test_none_result(self):
+        self.assertEqual(validate_decisions(None, ["Section 0"]), {})
+
+
+class TestClassifySectionsBatched(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.sections_file = os.path.join(self.temp_dir, "sections.json")
+        self.sections = {
+            "Section 0": {"title": "Introduction", "content": "Intro text", "source": "main"},
+            "Section 1": {"title": "Synthesis of MOP-1", "content": "x" * 5000, "source": "main"},
+            "Section 2": {"title": "References", "content": "Ref 1", "source": "main", "keep_or_discard": "discard"},
+            "Section 3": "Acknowledgements: we thank ...",
+        }
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_writes_decisions_once_and_reports_undecided(self):
+        llm = _FakeLLM([(0, "keep"), (1, "keep")])
+        updated, undecided = asyncio.run(
+            classify_sections_batched(self.sections, self.sections_file, llm=llm)
+        )
+        self.assertEqual(len(llm.prompts), 1)
+        self.assertEqual(undecided, ["Section 3"])
+        self.assertEqual(updated["Section 0"]["keep_or_discard"], "keep")
+        self.assertEqual(updated["Section 2"]["keep_or_discard"], "discard")
+        with open(self.sections_file, 'r', encoding='utf-8') as f:
+            self.assertEqual(json.load(f), updated)
+
+    def test_already_classified_sections_are_not_sent(self):
+        llm = _FakeLLM([])
+        asyncio.run(classify_sections_batched(self.sections, self.sections_file, llm=llm))
+        self.assertNotIn("### Section 2", llm.prompts[0])
+
+    def test_string_sections_are_converted(self):
+        llm = _FakeLLM([(3, "discard")])
+        updated, _ = asyncio.run(classify_sections_batched(self.sections, self.sections_file, llm=llm))
+        self.assertEqual(updated["Section 3"]["keep_or_discard"], "discard")
+        self.assertIn("Acknowledgements", updated["Section 3"]["content"])
+
+    def test_batches_and_retries(self):
+        llm = _FakeLLM([(0, "keep"), (1, "keep"), (3, "discard")], fail_times=1)
+        _, undecided = asyncio.run(
+            classify_sections_batched(self.sections, self.sections_file, llm=llm, batch_size=2)
+        )
+        self.assertEqual(len(llm.prompts), 3)
+        self.assertEqual(undecided, [])
+
+    def test_prompt_truncates_content(self):
+        prompt = build_batch_prompt({"Section 1": self.sections["Section 1"]}, snippet_chars=100)
+        self.assertIn("x" * 100 + "...", prompt)
+        self.assertNotIn("x" * 101, prompt)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,3 @@
+"""
+Pipeline runner tests package.
+"""
@@ -0,0 +1,122 @@
+"""
+Unit tests for the DAG step executor (src.pipelines.utils.executor).
+
+Steps are replaced by a fake `_run_step`, so no pipeline module is loaded.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.pipelines.utils import executor as executor_mod
+from src.pipelines.utils.executor import DagExecutor, resolve_dependencies, topological_order
+
+
+class TestDependencies(unittest.TestCase):
+    def test_default_is_linear_chain(self):
+        deps = resolve_dependencies(["a", "b", "c"])
+        self.assertEqual(deps, {"a": [], "b": ["a"], "c": ["b"]})
+
+    def test_declared_dependencies_drop_steps_not_in_run(self):
+        deps = resolve_dependencies(["a", "c"], {"c": ["a", "b"]})
+        self.assertEqual(deps, {"a": [], "c": ["a"]})
+
+    def test_cycle_is_rejected(self):
+        with self.assertRaises(ValueError):
+            resolve_dependencies(["a", "b"], {"a": ["b"], "b": ["a"]})
+
+    def test_topological_order_keeps_config_order(self):
+        steps = ["d", "a", "b", "c"]
+        deps = resolve_dependencies(steps, {"d": ["c"], "b": ["a"], "c": ["a"]})
+        self.assertEqual(topological_order(steps, deps), ["a", "b", "c", "d"])
+
+
+class TestDagExecutor(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _fake_run_step(self, failing):
+        def _run(step_name, doi_hash, step_config, cache_config=None, upstream=None):
+            with self.lock:
+                self.calls.append((doi_hash, step_name))
+            if (doi_hash, step_name) in failing:
+                raise RuntimeError("boom")
+            return True
+        return _run
+
+    def _executor(self, steps, dependencies=None):
+        return DagExecutor(
+            steps,
+            lambda step: {"data_dir": self.temp_dir},
+            dependencies=dependencies,
+            executor_config={"cpu_steps": []},
+            data_dir=self.temp_dir,
+        )
+
+    def test_failure_only_skips_dependents_of_the_same_doi(self):
+        steps = ["convert", "extract", "extension", "derive"]
+        dependencies = {"extract": ["convert"], "extension": ["convert"], "derive": ["extract", "extension"]}
+        with mock.patch.object(executor_mod, "_run_step", self._fake_run_step({("doi_a", "extract")})):
+            ok = self._executor(steps, dependencies).run(["doi_a", "doi_b"])
+
+        self.assertFalse(ok)
+        self.assertIn(("doi_a", "extension"), self.calls)
+        self.assertNotIn(("doi_a", "derive"), self.calls)
+        self.assertEqual(sorted(s for d, s in self.calls if d == "doi_b"), sorted(steps))
+
+    def test_dependencies_run_first(self):
+        steps = ["convert", "extract"]
+        with mock.patch.object(executor_mod, "_run_step", self._fake_run_step(set())):
+            ok = self._executor(steps).run(["doi_a"])
+        self.assertTrue(ok)
+        self.assertEqual(self.calls, [("doi_a", "convert"), ("doi_a", "extract")])
+        self.assertTrue(os.path.isdir(os.path.join(self.temp_dir, "doi_a")))
+
+    def test_shared_state_steps_default_to_one_at_a_time(self):
+        executor = self._executor(["main_kg_building", "main_ontology_extractions"])
+        self.assertEqual(executor.step_concurrency["main_kg_building"], 1)
+        self.assertGreater(executor.step_concurrency["main_ontology_extractions"], 1)
+
+    def test_global_state_steps_never_overlap_across_dois(self):
+        steps = ["top_entity_kg_building", "main_kg_building", "extensions_kg_building"]
+        dependencies = {"main_kg_building": ["top_entity_kg_building"], "extensions_kg_building": ["main_kg_building"]}
+        active = []
+        overlaps = []
+
+        def _run(step_name, doi_hash, step_config, cache_config=None, upstream=None):
+            with self.lock:
+                active.append((doi_hash, step_name))
+                overlaps.append(len(active))
+            time.sleep(0.02)
+            with self.lock:
+                active.remove((doi_hash, step_name))
+            return True
+
+        executor = DagExecutor(
+            steps,
+            lambda step: {"data_dir": self.temp_dir},
+            dependencies=dependencies,
+            # Raising the per-step limits does not lift the shared lock
+            executor_config={"cpu_steps": [], "step_concurrency": {step: 4 for step in steps}},
+            data_dir=self.temp_dir,
+        )
+        with mock.patch.object(executor_mod, "_run_step", _run):
+            self.assertTrue(executor.run(["doi_a", "doi_b", "doi_c"]))
+        self.assertEqual(len(overlaps), 9)
+        self.assertEqual(max(overlaps), 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,140 @@
+"""
+Unit tests for the docling table-extraction engine of the PDF conversion step
+(src.pipelines.pdf_conversion.engine).
+
+docling itself is replaced by `fake_tables`, which reports one table per page.
+`TestSplitMatchesWholePdf` runs the real docling on the multi-page PDFs under
+data/<hash>/ and is skipped when docling, fitz or those PDFs are missing.
+"""
+
+import glob
+import importlib.util
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.pipelines.pdf_conversion.engine import TableExtractionEngine, count_pages, page_ranges, subset_ranges
+from src.pipelines.pdf_conversion.table_detection import count_aligned_rows
+
+NUM_PAGES = 10
+
+
+def fake_tables(pdf_path, page_range=None):
+    first, last = page_range or (1, NUM_PAGES)
+    if pdf_path == "broken.pdf" and first > 1:
+        raise RuntimeError("page failed")
+    return [f"| {pdf_path} | page {p} | pid {os.getpid()} |" for p in range(first, last + 1)]
+
+
+class TestTableExtractionEngine(unittest.TestCase):
+    def test_page_ranges(self):
+        self.assertEqual(page_ranges(10, 4), [(1, 4), (5, 8), (9, 10)])
+        self.assertEqual(page_ranges(3, 4), [None])
+        self.assertEqual(page_ranges(10, 0), [None])
+        self.assertEqual(page_ranges(0, 4), [None])
+
+    def test_subset_ranges(self):
+        self.assertEqual(subset_ranges([7, 2, 3, 4, 9, 10, 3], 2), [(2, 3), (4, 4), (7, 7), (9, 10)])
+        self.assertEqual(subset_ranges([1, 2, 3, 4, 5], 0), [(1, 5)])
+        self.assertEqual(subset_ranges([], 4), [])
+
+    def test_selected_pages_only(self):
+        engine = TableExtractionEngine(workers=0, pages_per_task=4, tables_fn=fake_tables, split_pages=True)
+        try:
+            pending = engine.submit("a.pdf", pages=[9, 2, 3, 10])
+            by_range = pending.by_range()
+            self.assertEqual([r for r, _tables, _s in by_range], [(2, 3), (9, 10)])
+            self.assertTrue(all(seconds >= 0 for _r, _tables, seconds in by_range))
+            pages = [t.split("| page ")[1].split(" ")[0] for t in pending.result()]
+            self.assertEqual(pages, ["2", "3", "9", "10"])
+            self.assertEqual(engine.submit("a.pdf", pages=[]).result(), [])
+        finally:
+            engine.shutdown()
+
+    def _tables(self, engine, pdf="a.pdf"):
+        return [t.rsplit("|", 2)[0] for t in engine.submit(pdf, num_pages=NUM_PAGES).result()]
+
+    def test_split_tables_match_whole_document(self):
+        whole = TableExtractionEngine(workers=0, pages_per_task=0, tables_fn=fake_tables, split_pages=True)
+        expected = self._tables(whole)
+        whole.shutdown()
+        for workers in (0, 2):
+            engine = TableExtractionEngine(workers=workers, pages_per_task=3, tables_fn=fake_tables, split_pages=True)
+            try:
+                self.assertEqual(self._tables(engine), expected)
+                self.assertEqual(self._tables(engine, "b.pdf")[0], "| b.pdf | page 1 ")
+            finally:
+                engine.shutdown()
+
+    @unittest.skipIf("MOPS_PDF_PAGES_PER_TASK" in os.environ, "MOPS_PDF_PAGES_PER_TASK is set")
+    def test_whole_pdf_by_default(self):
+        engine = TableExtractionEngine(workers=0, tables_fn=fake_tables, split_pages=True)
+        try:
+            pending = engine.submit("a.pdf", num_pages=NUM_PAGES)
+            self.assertEqual(pending.ranges, [None])
+            self.assertEqual(len(pending.result()), NUM_PAGES)
+        finally:
+            engine.shutdown()
+
+    def test_workers_are_reused(self):
+        engine = TableExtractionEngine(workers=2, pages_per_task=1, tables_fn=fake_tables, split_pages=True)
+        try:
+            pids = set()
+            for pdf in ("a.pdf", "b.pdf", "c.pdf"):
+                pids.update(t.rsplit("pid ", 1)[1] for t in engine.submit(pdf, num_pages=NUM_PAGES).result())
+            self.assertLessEqual(len(pids), 2)
+            self.assertNotIn(f"{os.getpid()} |", pids)
+        finally:
+            engine.shutdown()
+
+    def test_failed_range_fails_the_document(self):
+        engine = TableExtractionEngine(workers=0, pages_per_task=5, tables_fn=fake_tables, split_pages=True)
+        try:
+            with self.assertRaises(RuntimeError):
+                engine.submit("broken.pdf", num_pages=NUM_PAGES).result()
+        finally:
+            engine.shutdown()
+
+
+def _multi_page_pdfs(pages_per_task):
+    if not all(importlib.util.find_spec(m) for m in ("docling", "fitz", "pandas")):
+        return []
+    pdfs = sorted(glob.glob(os.path.join(os.path.dirname(__file__), "..", "..", "data", "*", "*.pdf")))
+    return [pdf for pdf in pdfs if count_pages(pdf) > pages_per_task][:3]
+
+
+class TestSplitMatchesWholePdf(unittest.TestCase):
+    """Page-split tasks must give the `<name>_tables.md` of the whole-PDF conversion."""
+
+    PAGES_PER_TASK = 2
+
+    def test_split_tables_match_whole_pdf(self):
+        pdfs = _multi_page_pdfs(self.PAGES_PER_TASK)
+        if not pdfs:
+            self.skipTest("needs docling, fitz, pandas and multi-page PDFs under data/<hash>/")
+        from scripts.compare_pdf_table_split import compare_pdf
+
+        engine = TableExtractionEngine(workers=0, pages_per_task=self.PAGES_PER_TASK, split_pages=True)
+        try:
+            for pdf in pdfs:
+                with self.subTest(pdf=os.path.basename(pdf)):
+                    result = compare_pdf(engine, pdf)
+                    self.assertGreater(len(result["ranges"]), 1)
+                    self.assertTrue(result["identical"], "\n".join(result["diff"][:40]))
+        finally:
+            engine.shutdown()
+
+
+class TestTableDetection(unittest.TestCase):
+    def test_count_aligned_rows(self):
+        table = [[72.0, 180.5, 300.0], [72.4, 181.0, 301.2], [71.9, 180.0, 299.5, 420.0]]
+        prose = [[72.0], [72.0, 250.0], [90.0, 210.0, 330.0]]
+        self.assertEqual(count_aligned_rows(table), 3)
+        self.assertEqual(count_aligned_rows(prose), 0)
+        self.assertEqual(count_aligned_rows(table + prose), 3)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,196 @@
+"""
+Unit tests for the content-addressed step cache (src.pipelines.utils.step_cache).
+
+A fake step module stands in for a pipeline step: it writes one output file
+derived from its input and counts how often it really ran.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import types
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.pipelines.utils.step_cache import StepCache, read_record, run_cached_step
+
+
+class TestStepCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.data_dir = os.path.join(self.temp_dir, "data")
+        self.doi_folder = os.path.join(self.data_dir, "doi_a")
+        os.makedirs(self.doi_folder)
+        self.prompt_path = os.path.join(self.temp_dir, "PROMPT.md")
+        self._write(self.prompt_path, "prompt v1")
+        self._write(os.path.join(self.doi_folder, "input.md"), "paper")
+        self.cache = StepCache(os.path.join(self.temp_dir, "cache"))
+        self.runs = 0
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    @staticmethod
+    def _write(path, text):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+
+    @staticmethod
+    def _read(path):
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read()
+
+    def _module(self):
+        """Step that skips when its output exists, like the real steps."""
+        def run_step(doi_hash, config):
+            output = os.path.join(config["data_dir"], doi_hash, "output.md")
+            if os.path.exists(output):
+                return True
+            self.runs += 1
+            self._write(output, self._read(self.prompt_path) + "|" + self._read(os.path.join(self.doi_folder, "input.md")))
+            return True
+
+        def cache_spec(doi_hash, config):
+            return {
+                "inputs": [os.path.join(config["data_dir"], doi_hash, "input.md"), self.prompt_path],
+                "models": ["gpt-4o"],
+                "outputs": ["output.md"],
+            }
+
+        return types.SimpleNamespace(run_step=run_step, cache_spec=cache_spec)
+
+    def _run(self, module=None):
+        return run_cached_step("fake_step", module or self._module(), "doi_a", {"data_dir": self.data_dir}, self.cache)
+
+    def test_unchanged_inputs_keep_existing_outputs(self):
+        self.assertTrue(self._run())
+        self.assertTrue(self._run())
+        self.assertEqual(self.runs, 1)
+        self.assertIsNotNone(read_record(self.doi_folder, "fake_step"))
+
+    def test_prompt_change_recomputes(self):
+        self._run()
+        self._write(self.prompt_path, "prompt v2")
+        self._run()
+        self.assertEqual(self.runs, 2)
+        self.assertEqual(self._read(os.path.join(self.doi_folder, "output.md")), "prompt v2|paper")
+
+    def test_reverting_inputs_restores_from_cache(self):
+        self._run()
+        self._write(self.prompt_path, "prompt v2")
+        self._run()
+        self._write(self.prompt_path, "prompt v1")
+        self._run()
+        self.assertEqual(self.runs, 2)
+        self.assertEqual(self._read(os.path.join(self.doi_folder, "output.md")), "prompt v1|paper")
+
+    def test_corrupted_entry_is_dropped(self):
+        self._run()
+        key = read_record(self.doi_folder, "fake_step")["key"]
+        self._write(os.path.join(self.cache.root, "fake_step", key, "files", "output.md"), "tampered")
+        os.remove(os.path.join(self.doi_folder, "output.md"))
+        os.remove(os.path.join(self.doi_folder, ".step_cache", "fake_step.json"))
+        self._run()
+        self.assertEqual(self.runs, 2)
+        self.assertEqual(self._read(os.path.join(self.doi_folder, "output.md")), "prompt v1|paper")
+
+    def test_module_without_spec_is_not_stored(self):
+        module = self._module()
+        del module.cache_spec
+        self._run(module)
+        self.assertEqual(self.runs, 1)
+        # Only the upstream key is recorded, for its own downstream steps
+        self.assertEqual(read_record(self.doi_folder, "fake_step")["outputs"], [])
+        self.assertEqual(self.cache.entries(), [])
+
+    def test_gc_evicts_least_recently_used(self):
+        for i in range(3):
+            self._write(self.prompt_path, f"prompt v{i}" + "x" * 100)
+            self._run()
+        entries = sorted(self.cache.entries(), key=lambda e: e["last_used"])
+        freed = self.cache.gc(max_bytes=entries[-1]["size"])
+        remaining = self.cache.entries()
+        self.assertGreater(freed, 0)
+        self.assertEqual([e["dir"] for e in remaining], [entries[-1]["dir"]])
+
+    def test_cache_entries_are_copies(self):
+        self._run()
+        key = read_record(self.doi_folder, "fake_step")["key"]
+        cached = os.path.join(self.cache.root, "fake_step", key, "files", "output.md")
+        # A step rewriting its output in place leaves the entry intact
+        with open(os.path.join(self.doi_folder, "output.md"), "a", encoding="utf-8") as f:
+            f.write("|edited")
+        self.assertEqual(self._read(cached), "prompt v1|paper")
+
+    def _downstream_module(self):
+        """Step without cache_spec that skips on its done marker, like the KG-building steps."""
+        marker = os.path.join(self.doi_folder, ".downstream_done")
+
+        def run_step(doi_hash, config):
+            if os.path.exists(marker):
+                return True
+            self.downstream_runs += 1
+            self._write(marker, self._read(os.path.join(self.doi_folder, "output.md")))
+            return True
+
+        def stale_outputs(doi_hash, config):
+            return [".downstream_done"]
+
+        return types.SimpleNamespace(run_step=run_step, stale_outputs=stale_outputs)
+
+    def _run_downstream(self):
+        return run_cached_step(
+            "downstream", self._downstream_module(), "doi_a", {"data_dir": self.data_dir}, self.cache,
+            upstream=["fake_step"],
+        )
+
+    def test_upstream_change_invalidates_uncached_downstream(self):
+        self.downstream_runs = 0
+        self._run()
+        self._run_downstream()
+        self._run_downstream()
+        self.assertEqual(self.downstream_runs, 1)
+
+        # Recomputed upstream
+        self._write(self.prompt_path, "prompt v2")
+        self._run()
+        self._run_downstream()
+        self.assertEqual(self.downstream_runs, 2)
+        self.assertEqual(self._read(os.path.join(self.doi_folder, ".downstream_done")), "prompt v2|paper")
+
+        # Upstream restored from the cache
+        self._write(self.prompt_path, "prompt v1")
+        self._run()
+        self._run_downstream()
+        self.assertEqual(self.runs, 2)
+        self.assertEqual(self.downstream_runs, 3)
+        self.assertEqual(self._read(os.path.join(self.doi_folder, ".downstream_done")), "prompt v1|paper")
+
+    def test_gc_is_throttled(self):
+        with mock.patch.object(StepCache, "gc", return_value=0) as gc:
+            self._run()
+            self._write(self.prompt_path, "prompt v2")
+            self._run()
+        self.assertEqual(gc.call_count, 1)
+        self.cache.gc_interval = 0
+        with mock.patch.object(StepCache, "gc", return_value=0) as gc:
+            self._write(self.prompt_path, "prompt v3")
+            self._run()
+        self.assertEqual(gc.call_count, 1)
+
+
+class TestFromConfig(unittest.TestCase):
+    def test_disabled_by_default(self):
+        self.assertIsNone(StepCache.from_config(None))
+        self.assertIsNone(StepCache.from_config({"enabled": False}))
+
+    def test_default_root_under_data_dir(self):
+        cache = StepCache.from_config({"enabled": True}, "data")
+        self.assertEqual(cache.root, os.path.join("data", "cache", "steps"))
+
+
+if __name__ == '__main__':
+    unittest.main()
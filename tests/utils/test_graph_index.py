@@ -0,0 +1,191 @@
+"""
+Unit tests for the TTL -> JSON converters' graph index
+(scripts.output_conversion_ttl_to_json.graph_index).
+
+`TestConversionGoldens` converts the merged-KG fixtures in
+test_data/conversion/*.ttl and compares the four JSON files with
+test_data/conversion/<fixture>/*.json. Those were written by the SPARQL
+converters of commit 2a23cfb, before they were rebuilt on the graph index;
+only regenerate them for an intended change of the output.
+"""
+
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from rdflib import Graph, Literal, URIRef
+
+from scripts.output_conversion_ttl_to_json.graph_index import ONTOSYN, graph_index, indexed
+from scripts.output_conversion_ttl_to_json.ontosynthesis_characterisation_conversion import (
+    get_namespaces as char_get_namespaces,
+    query_characterisation_data,
+    query_characterisation_devices,
+)
+from scripts.output_conversion_ttl_to_json.ontosynthesis_step_conversion import (
+    _chemical_rows,
+    extract_duration,
+    extract_target_vessel,
+    get_namespaces,
+    query_step_chemicals,
+)
+from scripts.output_conversion_ttl_to_json.step.step_query import query_synthesis_steps
+from scripts.merge_and_conversion_main import CONVERSION_OUTPUTS, convert_graph
+
+CONVERSION_DATA = Path(__file__).parent / "test_data" / "conversion"
+
+TTL = """
+@prefix ex: <https://example.org/> .
+@prefix ontosyn: <https://www.theworldavatar.com/kg/OntoSyn/> .
+@prefix os: <http://www.theworldavatar.com/ontology/ontospecies/OntoSpecies.owl#> .
+@prefix om-2: <http://www.ontology-of-units-of-measure.org/resource/om-2/> .
+@prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> .
+
+ex:syn a ontosyn:ChemicalSynthesis ;
+    ontosyn:hasSynthesisStep ex:step2, ex:step1 .
+ex:other a ontosyn:ChemicalSynthesis ;
+    ontosyn:hasSynthesisStep ex:step3 .
+
+ex:step1 a ontosyn:Add ; rdfs:label "Add" ; ontosyn:hasOrder "1" ;
+    ontosyn:hasStepDuration ex:d1 ;
+    ontosyn:hasAddedChemicalInput ex:c1, ex:c2 ;
+    ontosyn:isTransferedTo ex:v1 .
+ex:step2 a ontosyn:Stir ; rdfs:label "Stir" ; ontosyn:hasOrder "2" .
+ex:step3 a ontosyn:Dry ; rdfs:label "Dry" ; ontosyn:hasOrder "1" .
+
+ex:d1 om-2:hasNumericalValue "abc", "2.5" ; om-2:hasUnit om-2:hour .
+
+ex:c1 rdfs:label "copper nitrate", "Cu(NO3)2" ; ontosyn:hasAmount "", "0.5 g" ;
+    ontosyn:hasChemicalFormula ex:cf1 .
+ex:cf1 rdfs:label "CuN2O6" ; os:hasChemicalFormulaValue "Cu(NO3)2" .
+ex:c2 ontosyn:hasAlternativeNames "DMF" .
+
+ex:v1 rdfs:label "vial" ; ontosyn:hasVesselType ex:vt0, ex:vt1 .
+ex:vt1 rdfs:label "glass vial" .
+"""
+
+CHEMICALS_QUERY = """
+PREFIX ontosyn: <https://www.theworldavatar.com/kg/OntoSyn/>
+PREFIX rdfs: <http://www.w3.org/2000/01/rdf-schema#>
+PREFIX os: <http://www.theworldavatar.com/ontology/ontospecies/OntoSpecies.owl#>
+SELECT DISTINCT ?chemical ?label ?amount ?alt ?cfLabel ?cfVal ?cfValSyn
+WHERE {
+    ?step ontosyn:hasAddedChemicalInput ?chemical .
+    OPTIONAL { ?chemical rdfs:label ?label }
+    OPTIONAL { ?chemical ontosyn:hasAmount ?amount }
+    OPTIONAL { ?chemical ontosyn:hasAlternativeNames ?alt }
+    OPTIONAL {
+      ?chemical ontosyn:hasChemicalFormula ?cf .
+      OPTIONAL { ?cf rdfs:label ?cfLabel }
+      OPTIONAL { ?cf os:hasChemicalFormulaValue ?cfVal }
+      OPTIONAL { ?cf ontosyn:hasChemicalFormulaValue ?cfValSyn }
+    }
+}
+"""
+
+EX = "https://example.org/"
+
+
+class TestGraphIndex(unittest.TestCase):
+    def setUp(self):
+        self.graph = Graph()
+        self.graph.parse(data=TTL, format="turtle")
+        self.index = graph_index(self.graph)
+
+    def test_orders_match_graph(self):
+        for s in set(self.graph.subjects()):
+            for p in set(self.graph.predicates(s)):
+                self.assertEqual(self.index.objects(s, p), list(self.graph.objects(s, p)))
+                for o in self.index.objects(s, p):
+                    self.assertEqual(self.index.subjects(p, o), list(self.graph.subjects(p, o)))
+        self.assertEqual(self.index.objects(URIRef(EX + "missing"), ONTOSYN.hasOrder), [])
+
+    def test_one_index_per_conversion(self):
+        with indexed(self.graph) as index:
+            self.assertIs(graph_index(self.graph), index)
+            with indexed(self.graph) as nested:
+                self.assertIs(nested, index)
+            self.assertIs(graph_index(self.graph), index)
+        self.assertIsNot(graph_index(self.graph), index)
+
+    def test_edits_between_conversions_are_seen(self):
+        step2 = URIRef(EX + "step2")
+        with indexed(self.graph) as index:
+            self.assertEqual(index.objects(step2, ONTOSYN.hasOrder), [Literal("2")])
+        # Same triple count before and after
+        self.graph.set((step2, ONTOSYN.hasOrder, Literal("3")))
+        with indexed(self.graph) as index:
+            self.assertEqual(index.objects(step2, ONTOSYN.hasOrder), [Literal("3")])
+
+    def test_chemical_rows_match_sparql(self):
+        step = URIRef(EX + "step1")
+        expected = [tuple(row) for row in self.graph.query(CHEMICALS_QUERY, initBindings={"step": step})]
+        rows = [
+            (r.chemical, r.label, r.amount, r.alt, r.cfLabel, r.cfVal, r.cfValSyn)
+            for r in _chemical_rows(self.index, step, ONTOSYN.hasAddedChemicalInput)
+        ]
+        self.assertEqual(list(dict.fromkeys(rows)), expected)
+
+    def test_step_fields(self):
+        ns = get_namespaces(self.graph)
+        step = EX + "step1"
+        # "abc" is not a number; the next value is used
+        self.assertEqual(extract_duration(self.graph, ns, step), "2.5 http://www.ontology-of-units-of-measure.org/resource/om-2/hour")
+        self.assertEqual(extract_target_vessel(self.graph, ns, step), {"name": "vial", "type": "glass vial"})
+        chemicals = query_step_chemicals(self.graph, ns, step)
+        self.assertEqual(chemicals["addedChemical"], [
+            {"chemicalName": ["copper nitrate", "CuN2O6", "Cu(NO3)2"], "chemicalAmount": "0.5 g"},
+            {"chemicalName": ["DMF"], "chemicalAmount": "N/A"},
+        ])
+        self.assertEqual(chemicals["washingSolvent"], [])
+
+    def test_steps_per_synthesis(self):
+        steps = query_synthesis_steps(self.graph, EX + "syn")
+        self.assertEqual([(s["label"], s["order"]) for s in steps], [("add", "1"), ("stir", "2")])
+        self.assertEqual([s["uri"] for s in query_synthesis_steps(self.graph, EX + "other")], [EX + "step3"])
+        self.assertEqual(query_synthesis_steps(self.graph, EX + "missing"), [])
+
+
+class TestConversionGoldens(unittest.TestCase):
+    def test_fixtures_convert_as_before(self):
+        fixtures = sorted(CONVERSION_DATA.glob("*.ttl"))
+        self.assertEqual([f.stem for f in fixtures], ["multi_valued", "no_mop_ccdc"])
+        for ttl in fixtures:
+            graph = Graph()
+            graph.parse(ttl, format="turtle")
+            with tempfile.TemporaryDirectory() as out_dir, contextlib.redirect_stdout(io.StringIO()):
+                convert_graph(graph, Path(out_dir))
+                actual = {name: json.loads((Path(out_dir) / name).read_text(encoding="utf-8")) for name in CONVERSION_OUTPUTS}
+            for name in CONVERSION_OUTPUTS:
+                with self.subTest(fixture=ttl.stem, output=name):
+                    expected = json.loads((CONVERSION_DATA / ttl.stem / name).read_text(encoding="utf-8"))
+                    self.assertEqual(actual[name], expected)
+
+    def test_first_value_chains(self):
+        # The characterisation converter follows the first value of each property
+        # (`_first_path`), as the LIMIT 1 queries took their first row, even when
+        # only a later value leads to a literal
+        graph = Graph()
+        graph.parse(CONVERSION_DATA / "multi_valued.ttl", format="turtle")
+        namespaces = char_get_namespaces(graph)
+        with contextlib.redirect_stdout(io.StringIO()):
+            record = query_characterisation_data(graph, namespaces)[0]
+            devices = query_characterisation_devices(graph, namespaces)
+        self.assertEqual(record["productCCDCNumber"], "CCDC-111111")
+        self.assertEqual(record["ElementalAnalysis"], {
+            "chemicalFormula": "C60H90O36V6",
+            "weightPercentageCalculated": "C 35.3; H 4.4",
+            "weightPercentageExperimental": "N/A",
+        })
+        self.assertEqual(record["InfraredSpectroscopy"]["material"], "N/A")
+        self.assertEqual(devices["HNMRDevice"], {})
+        self.assertEqual(devices["InfraredSpectroscopyDevice"], {"deviceName": "Nicolet iS10"})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+"""
+Unit tests for the incremental, per-hash build of scripts.merge_and_conversion_main.
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from scripts.merge_and_conversion_main import CONVERSION_OUTPUTS, STAMP_NAME, BuildOptions, build_all
+
+TTL = """
+@prefix ex: <https://example.org/{name}/> .
+@prefix ontosyn: <https://www.theworldavatar.com/kg/OntoSyn/> .
+@prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> .
+
+ex:syn a ontosyn:ChemicalSynthesis ;
+    rdfs:label "Synthesis of {name}" ;
+    ontosyn:hasSynthesisStep ex:step1 .
+ex:step1 a ontosyn:Add ; rdfs:label "Add" ; ontosyn:hasOrder "1" ;
+    ontosyn:hasAddedChemicalInput ex:c1 .
+ex:c1 rdfs:label "{chemical}" ; ontosyn:hasAmount "1 g" .
+"""
+
+
+class TestIncrementalBuild(unittest.TestCase):
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.data_root = self.tmp / "data"
+        self.output_root = self.tmp / "merged_tll"
+        for name in ("aaaa", "bbbb"):
+            self._write_input(name, "copper nitrate")
+        # Not part of the merge; changing it must not rebuild
+        (self.data_root / "aaaa" / "output_top.ttl").write_text("", encoding="utf-8")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp, ignore_errors=True)
+
+    def _write_input(self, name, chemical):
+        hash_dir = self.data_root / name
+        hash_dir.mkdir(parents=True, exist_ok=True)
+        (hash_dir / "output_synthesis.ttl").write_text(TTL.format(name=name, chemical=chemical), encoding="utf-8")
+
+    def _build(self, jobs=1, output_root=None, **options):
+        options.setdefault("changed_only", True)
+        results = build_all(["aaaa", "bbbb"], self.data_root, output_root or self.output_root, BuildOptions(**options), jobs=jobs)
+        for r in results:
+            self.assertNotIn("error", r, r.get("traceback"))
+        return {r["hash"]: (r["merged"], r["converted"]) for r in results}
+
+    def _outputs(self, output_root, name):
+        out_dir = output_root / name
+        return {f: (out_dir / f).read_text(encoding="utf-8") for f in CONVERSION_OUTPUTS + [f"{name}.ttl"]}
+
+    def test_rebuilds_only_changed_hash(self):
+        self.assertEqual(self._build(), {"aaaa": (True, True), "bbbb": (True, True)})
+        self.assertTrue((self.output_root / "aaaa" / STAMP_NAME).exists())
+        self.assertIn("copper nitrate", (self.output_root / "aaaa" / "steps.json").read_text(encoding="utf-8"))
+
+        self.assertEqual(self._build(), {"aaaa": (False, False), "bbbb": (False, False)})
+        (self.data_root / "aaaa" / "output_top.ttl").write_text("# edited", encoding="utf-8")
+        self.assertEqual(self._build(), {"aaaa": (False, False), "bbbb": (False, False)})
+
+        self._write_input("bbbb", "zinc nitrate")
+        self.assertEqual(self._build(), {"aaaa": (False, False), "bbbb": (True, True)})
+        self.assertIn("zinc nitrate", (self.output_root / "bbbb" / "steps.json").read_text(encoding="utf-8"))
+
+    def test_missing_output_and_changed_flags(self):
+        self._build()
+        (self.output_root / "aaaa" / "chemicals.json").unlink()
+        self.assertEqual(self._build(), {"aaaa": (False, True), "bbbb": (False, False)})
+        # --debug changes the JSON, not the merged TTL
+        self.assertEqual(self._build(debug=True), {"aaaa": (False, True), "bbbb": (False, True)})
+        # Without --changed-only everything is rebuilt
+        self.assertEqual(self._build(debug=True, changed_only=False), {"aaaa": (True, True), "bbbb": (True, True)})
+
+    def test_parallel_build_matches_serial(self):
+        self._build()
+        parallel_root = self.tmp / "parallel"
+        self.assertEqual(self._build(jobs=2, output_root=parallel_root), {"aaaa": (True, True), "bbbb": (True, True)})
+        for name in ("aaaa", "bbbb"):
+            self.assertEqual(self._outputs(parallel_root, name), self._outputs(self.output_root, name))
+
+
+if __name__ == '__main__':
+    unittest.main()
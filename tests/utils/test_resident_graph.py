@@ -0,0 +1,122 @@
+"""
+Unit tests for the resident, journaled memory graph store (src.utils.resident_graph).
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from rdflib import Graph, Literal, URIRef
+from rdflib.namespace import RDF, RDFS
+
+from src.utils.resident_graph import JOURNAL_SUFFIX, ResidentGraphStore, sync_memory_file
+
+EX = "https://example.org/"
+
+
+def _iri(local: str) -> URIRef:
+    return URIRef(EX + local)
+
+
+class TestResidentGraphStore(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.ttl = os.path.join(self.temp_dir, "entity.ttl")
+        self.journal = self.ttl + JOURNAL_SUFFIX
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _disk_graph(self) -> Graph:
+        g = Graph()
+        g.parse(self.ttl, format="turtle")
+        return g
+
+    def test_first_open_creates_ttl(self):
+        store = ResidentGraphStore(flush_interval=3600)
+        with store.open(self.ttl):
+            pass
+        self.assertTrue(os.path.exists(self.ttl))
+
+    def test_mutations_are_journaled_not_rewritten(self):
+        store = ResidentGraphStore(flush_interval=3600)
+        with store.open(self.ttl):
+            pass
+        with store.open(self.ttl) as g:
+            g.add((_iri("a"), RDF.type, _iri("Thing")))
+            g.set((_iri("a"), RDFS.label, Literal("A")))
+        self.assertEqual(len(self._disk_graph()), 0)
+        self.assertTrue(os.path.exists(self.journal))
+
+        store.flush(self.ttl)
+        self.assertEqual(len(self._disk_graph()), 2)
+        self.assertFalse(os.path.exists(self.journal))
+
+    def test_graph_stays_resident_between_calls(self):
+        store = ResidentGraphStore(flush_interval=3600)
+        with store.open(self.ttl) as g1:
+            g1.add((_iri("a"), RDF.type, _iri("Thing")))
+        with store.open(self.ttl) as g2:
+            self.assertIs(g1, g2)
+            self.assertIn((_iri("a"), RDF.type, _iri("Thing")), g2)
+
+    def test_exception_rolls_back_in_memory_changes(self):
+        store = ResidentGraphStore(flush_interval=3600)
+        with store.open(self.ttl) as g:
+            g.add((_iri("a"), RDFS.label, Literal("keep")))
+        with self.assertRaises(RuntimeError):
+            with store.open(self.ttl) as g:
+                g.set((_iri("a"), RDFS.label, Literal("changed")))
+                g.add((_iri("b"), RDF.type, _iri("Thing")))
+                raise RuntimeError("tool failed")
+        with store.open(self.ttl) as g:
+            self.assertEqual(set(g.objects(_iri("a"), RDFS.label)), {Literal("keep")})
+            self.assertNotIn((_iri("b"), RDF.type, _iri("Thing")), g)
+
+    def test_crash_recovers_from_journal(self):
+        store = ResidentGraphStore(flush_interval=3600)
+        with store.open(self.ttl) as g:
+            g.add((_iri("a"), RDF.type, _iri("Thing")))
+            g.add((_iri("a"), RDFS.label, Literal("α-MOP", lang="en")))
+        with store.open(self.ttl) as g:
+            g.remove((_iri("a"), RDF.type, None))
+        # Simulate a crash: a new process (store) opens the same file without any flush.
+        recovered = ResidentGraphStore(flush_interval=3600)
+        with recovered.open(self.ttl) as g:
+            self.assertEqual(set(g), {(_iri("a"), RDFS.label, Literal("α-MOP", lang="en"))})
+        self.assertFalse(os.path.exists(self.journal))
+
+    def test_external_write_forces_reload(self):
+        store_a = ResidentGraphStore(flush_interval=3600)
+        store_b = ResidentGraphStore(flush_interval=3600)
+        with store_a.open(self.ttl) as g:
+            g.add((_iri("a"), RDF.type, _iri("Thing")))
+        with store_b.open(self.ttl) as g:
+            g.add((_iri("b"), RDF.type, _iri("Thing")))
+        with store_a.open(self.ttl) as g:
+            self.assertIn((_iri("b"), RDF.type, _iri("Thing")), g)
+            self.assertIn((_iri("a"), RDF.type, _iri("Thing")), g)
+
+    def test_zero_interval_is_write_through(self):
+        store = ResidentGraphStore(flush_interval=0)
+        with store.open(self.ttl) as g:
+            g.add((_iri("a"), RDF.type, _iri("Thing")))
+        self.assertEqual(len(self._disk_graph()), 1)
+
+    def test_sync_memory_file_folds_journal(self):
+        store = ResidentGraphStore(flush_interval=3600)
+        with store.open(self.ttl):
+            pass
+        with store.open(self.ttl) as g:
+            g.add((_iri("a"), RDF.type, _iri("Thing")))
+        self.assertTrue(sync_memory_file(self.ttl))
+        self.assertEqual(len(self._disk_graph()), 1)
+        self.assertFalse(sync_memory_file(self.ttl))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+"""
+Unit tests for the per-session MCP server context (src.utils.session_context).
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from src.utils.session_context import (
+    SESSION_ENTITY_ENV,
+    SESSION_HASH_ENV,
+    apply_session_env,
+    entity_concurrency,
+    read_session_context,
+    session_env,
+)
+
+
+class TestSessionContext(unittest.TestCase):
+    def test_round_trip(self):
+        env = session_env("0a1b2c3d", "MOP_1", "https://example.org/MOP_1")
+        self.assertEqual(read_session_context(env), ("0a1b2c3d", "MOP_1", "https://example.org/MOP_1"))
+
+    def test_missing_context_returns_none(self):
+        self.assertIsNone(read_session_context({}))
+        self.assertIsNone(read_session_context({SESSION_HASH_ENV: "0a1b2c3d"}))
+        self.assertIsNone(read_session_context({SESSION_HASH_ENV: "0a1b2c3d", SESSION_ENTITY_ENV: "  "}))
+
+    def test_entity_concurrency_needs_session_context_servers(self):
+        self.assertEqual(entity_concurrency({}), 1)
+        self.assertEqual(entity_concurrency({"max_concurrency": 0}), 1)
+        with self.assertRaisesRegex(ValueError, "session_context_servers"):
+            entity_concurrency({"max_concurrency": 4})
+        self.assertEqual(entity_concurrency({"max_concurrency": 4, "session_context_servers": True}), 4)
+
+    def test_apply_only_to_stdio_servers(self):
+        server_cfg = {
+            "local": {"command": "python", "args": ["-m", "x"], "transport": "stdio", "env": {"FOO": "1"}},
+            "remote": {"url": "http://localhost:8000/sse", "transport": "sse"},
+        }
+        out = apply_session_env(server_cfg, session_env("0a1b2c3d", "MOP_1"))
+        self.assertEqual(out["local"]["env"]["FOO"], "1")
+        self.assertEqual(out["local"]["env"][SESSION_HASH_ENV], "0a1b2c3d")
+        self.assertIn("PATH", out["local"]["env"])
+        self.assertNotIn("env", out["remote"])
+        # The caller's config is left untouched
+        self.assertNotIn(SESSION_HASH_ENV, server_cfg["local"]["env"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,141 @@
+"""
+Unit tests for parallel Turtle parsing (src.utils.ttl_loader).
+"""
+
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from unittest import mock
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', '..'))
+
+from rdflib import BNode, Graph
+from rdflib.compare import isomorphic
+
+from src.utils import ttl_loader
+from src.utils.ttl_loader import TTLParseError, parse_into, parse_ttl_files
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+
+# A caller without a __main__ guard that prints to stdout on import, like an MCP server would
+UNGUARDED_SCRIPT = """
+import sys
+print("MAIN")
+from src.utils.ttl_loader import parse_ttl_files
+print(sum(len(p.triples) for p in parse_ttl_files(sys.argv[1:], workers=2)))
+"""
+
+TTL = """
+@prefix ex: <https://example.org/> .
+@prefix xsd: <http://www.w3.org/2001/XMLSchema#> .
+ex:s{i} ex:label "item {i}"@en ;
+    ex:order "{i}"^^xsd:integer ;
+    ex:amount [ ex:value "0.5{i}" ; ex:unit ex:gram ] .
+"""
+
+
+class TestParseTTLFiles(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.paths = []
+        for i in range(4):
+            path = os.path.join(self.temp_dir, f"f{i}.ttl")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(TTL.replace("{i}", str(i)))
+            self.paths.append(path)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _sequential(self, paths) -> Graph:
+        g = Graph()
+        for path in paths:
+            g.parse(path, format="turtle")
+        return g
+
+    def test_pool_matches_sequential_parse(self):
+        for workers in (1, 2):
+            g = Graph()
+            self.assertEqual(parse_into(g, self.paths, workers=workers), {})
+            self.assertTrue(isomorphic(g, self._sequential(self.paths)), workers)
+            # Blank nodes of different files stay apart
+            self.assertEqual(len({s for s in g.subjects() if isinstance(s, BNode)}), 4)
+            self.assertEqual(len(g), 4 * 5)
+            self.assertEqual(dict(g.namespaces())["ex"].toPython(), "https://example.org/")
+
+    def test_files_are_yielded_in_input_order(self):
+        order = list(reversed(self.paths))
+        self.assertEqual([p.path for p in parse_ttl_files(order, workers=3)], order)
+
+    def test_bad_file_is_reported_on_its_own(self):
+        bad = os.path.join(self.temp_dir, "bad.ttl")
+        with open(bad, "w", encoding="utf-8") as f:
+            f.write("@prefix ex: <https://example.org/> .\nex:a ex:b .\n")
+        paths = self.paths[:2] + [bad] + self.paths[2:]
+
+        g = Graph()
+        errors = parse_into(g, paths, workers=2, strict=False)
+        self.assertEqual(list(errors), [bad])
+        self.assertTrue(isomorphic(g, self._sequential(self.paths)))
+
+        g = Graph()
+        with self.assertRaises(TTLParseError) as ctx:
+            parse_into(g, paths, workers=2)
+        self.assertEqual(ctx.exception.path, bad)
+        # Files before the bad one were added, as a parse loop would leave them
+        self.assertTrue(isomorphic(g, self._sequential(self.paths[:2])))
+
+
+    def test_workers_do_not_import_callers_main(self):
+        script = os.path.join(self.temp_dir, "unguarded.py")
+        with open(script, "w", encoding="utf-8") as f:
+            f.write(UNGUARDED_SCRIPT)
+        env = dict(os.environ, PYTHONPATH=REPO_ROOT)
+        result = subprocess.run(
+            [sys.executable, script] + self.paths, capture_output=True, text=True, cwd=REPO_ROOT, env=env, timeout=120
+        )
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(result.stdout.split(), ["MAIN", str(4 * 5)])
+
+    def test_small_batches_are_parsed_in_process(self):
+        with mock.patch.dict(os.environ, {"MOPS_TTL_PARSE_WORKERS": "2"}):
+            with mock.patch.object(ttl_loader, "ProcessPoolExecutor", side_effect=AssertionError("pool started")):
+                g = Graph()
+                self.assertEqual(parse_into(g, self.paths), {})
+                self.assertTrue(isomorphic(g, self._sequential(self.paths)))
+            with mock.patch.dict(os.environ, {"MOPS_TTL_PARSE_POOL_MIN_BYTES": "1"}), \
+                    mock.patch.object(ttl_loader, "ProcessPoolExecutor", wraps=ProcessPoolExecutor) as pool:
+                g = Graph()
+                self.assertEqual(parse_into(g, self.paths), {})
+                self.assertTrue(isomorphic(g, self._sequential(self.paths)))
+                self.assertEqual(pool.call_count, 1)
+
+    def test_concurrent_pool_starts_restore_main(self):
+        main = sys.modules["__main__"]
+
+        def swap():
+            with ttl_loader._worker_main():
+                time.sleep(0.05)
+
+        threads = [threading.Thread(target=swap) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertIs(sys.modules["__main__"], main)
+
+    def test_default_workers_are_capped(self):
+        with mock.patch.dict(os.environ, {"MOPS_TTL_PARSE_WORKERS": "0"}), mock.patch.object(os, "cpu_count", return_value=64):
+            self.assertEqual(ttl_loader.default_workers(), ttl_loader.DEFAULT_MAX_WORKERS)
+        with mock.patch.dict(os.environ, {"MOPS_TTL_PARSE_WORKERS": "12"}):
+            self.assertEqual(ttl_loader.default_workers(), 12)
+
+
+if __name__ == '__main__':
+    unittest.main()